@@ -0,0 +1,22 @@
+"""
+LightCrypto GUI - Моделирование канала для ключей кодека
+Кривые ошибок символов, пропусков и ресинхронизации без сети
+"""
+
+from .simulate import (
+    CORRUPTION_MODELS,
+    ChannelConfig,
+    ChannelResult,
+    corruption_mask,
+    run_simulation,
+    write_results,
+)
+
+__all__ = [
+    'CORRUPTION_MODELS',
+    'ChannelConfig',
+    'ChannelResult',
+    'corruption_mask',
+    'run_simulation',
+    'write_results',
+]
@@ -0,0 +1,56 @@
+"""
+LightCrypto GUI - Моделирование канала из командной строки
+
+Запуск из каталога gui:
+    python3 -m common.channelsim --csv Q=4.csv --m 8 --q 4 --rates 0,1e-3,1e-2 --frames 100000 --out q4.csv
+"""
+
+import argparse
+import os
+import sys
+
+from ..constants import CIPHER_KEYS_DIR
+from .simulate import CORRUPTION_MODELS, ChannelConfig, run_simulation, write_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Моделирование искажений на линии для ключа кодека')
+    parser.add_argument('--csv', required=True, help='CSV ключа (имя в CipherKeys или путь)')
+    parser.add_argument('--m', type=int, default=8, help='Разрядность M')
+    parser.add_argument('--q', type=int, default=2, help='Бит информации на символ Q')
+    parser.add_argument('--fun', type=int, default=1, help='funType 1..5')
+    parser.add_argument('--rates', default='0,1e-4,1e-3,1e-2,1e-1',
+                        help='Вероятности искажения слова через запятую')
+    parser.add_argument('--model', choices=CORRUPTION_MODELS, default='word', help='Модель искажений')
+    parser.add_argument('--burst-length', type=float, default=4.0, help='Средняя длина пачки (model=burst)')
+    parser.add_argument('--frames', type=int, default=1000, help='Число кадров')
+    parser.add_argument('--frame-symbols', type=int, default=256, help='Символов в кадре')
+    parser.add_argument('--workers', type=int, default=0, help='Процессов (0 = все ядра)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--no-info', action='store_true', help='Без InfoInsteadOfRand')
+    parser.add_argument('--out', help='Файл результатов (.json или .csv)')
+    args = parser.parse_args(argv)
+
+    csv_path = args.csv if os.path.exists(args.csv) else os.path.join(CIPHER_KEYS_DIR, args.csv)
+    config = ChannelConfig(csv_path=csv_path, bits_m=args.m, bits_q=args.q, fun_type=args.fun,
+                           info_instead_of_rand=not args.no_info,
+                           error_rates=[float(r) for r in args.rates.split(',') if r.strip()],
+                           model=args.model, burst_length=args.burst_length, frames=args.frames,
+                           frame_symbols=args.frame_symbols, workers=args.workers, seed=args.seed)
+
+    def progress(done: int, total: int):
+        print(f'📡 Кадров: {done}/{total}', flush=True)
+
+    results = run_simulation(config, progress)
+    for r in results:
+        print(f'📊 p={r.error_rate:g}: SER {r.symbol_error_rate:.4%}, пропуски {r.skip_rate:.4%}, '
+              f'необнаруженные {r.undetected_rate:.4%}, FER {r.frame_error_rate:.2%}, '
+              f'ресинхронизация {r.resync_mean:.2f} симв. (без восстановления: {r.resync_censored})')
+    if args.out:
+        write_results(results, config, args.out)
+        print(f'✅ Результаты записаны: {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+LightCrypto GUI - Моделирование канала для ключей кодека
+Кадры случайных символов проходят encode → искажение слов → decode в пуле
+процессов для набора вероятностей ошибок; считаются ошибки символов,
+пропуски слов и расстояние ресинхронизации декодера
+"""
+
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..codec.engine import CodecParams, DigitalCodec, wrap_m
+from ..codec.tables import load_tables, tables_supported
+
+# Модели искажений: независимые слова (как inject_errors в tap_encrypt) и пачки
+CORRUPTION_MODELS = ('word', 'burst')
+# Гистограмма расстояний ресинхронизации: 0..RESYNC_HIST_MAX, последний столбец - больше
+RESYNC_HIST_MAX = 16
+
+_COUNTERS = ('frames', 'frame_errors', 'symbols', 'corrupted_words', 'symbol_errors',
+             'skips', 'undetected', 'resync_events', 'resync_censored', 'resync_total')
+
+
+@dataclass
+class ChannelConfig:
+    """
+    Параметры моделирования
+
+    error_rates: Вероятности искажения M-битного слова (ось кривых)
+    burst_length: Средняя длина пачки искажённых слов (модель 'burst')
+    frame_symbols: Символов в кадре; состояния h1/h2 синхронизируются в начале кадра
+    """
+    csv_path: str
+    bits_m: int = 8
+    bits_q: int = 2
+    fun_type: int = 1
+    h1: int = 7
+    h2: int = 23
+    info_instead_of_rand: bool = True
+    error_rates: List[float] = field(default_factory=lambda: [0.0, 1e-4, 1e-3, 1e-2, 1e-1])
+    model: str = 'word'
+    burst_length: float = 4.0
+    frames: int = 1000
+    frame_symbols: int = 256
+    frames_per_task: int = 100
+    workers: int = 0             # 0 = все ядра
+    seed: int = 1
+
+    def validate(self):
+        """Проверка диапазонов, как в CodecParams.validate()"""
+        self.codec_params().validate()
+        if self.model not in CORRUPTION_MODELS:
+            raise ValueError(f'model must be one of {CORRUPTION_MODELS}')
+        if any(not (0.0 <= r <= 1.0) for r in self.error_rates):
+            raise ValueError('error rates must be in [0, 1]')
+        if self.burst_length < 1.0:
+            raise ValueError('burst_length must be >= 1')
+        if self.frames < 1 or self.frame_symbols < 1 or self.frames_per_task < 1:
+            raise ValueError('frames, frame_symbols and frames_per_task must be positive')
+
+    def codec_params(self) -> CodecParams:
+        return CodecParams(bits_m=self.bits_m, bits_q=self.bits_q, fun_type=self.fun_type,
+                           h1=self.h1, h2=self.h2, info_instead_of_rand=self.info_instead_of_rand)
+
+
+@dataclass
+class ChannelResult:
+    """Результат для одной вероятности ошибок (доли - от переданных символов/кадров)"""
+    error_rate: float
+    model: str
+    frames: int
+    symbols: int
+    word_error_rate: float
+    symbol_error_rate: float
+    skip_rate: float
+    undetected_rate: float
+    frame_error_rate: float
+    resync_mean: float
+    resync_censored: int
+    resync_histogram: List[int]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def corruption_mask(rng: np.random.Generator, count: int, rate: float, model: str,
+                    burst_length: float) -> np.ndarray:
+    """
+    Позиции искажённых слов
+
+    'burst': пачки начинаются с вероятностью rate / burst_length на слово и имеют
+    геометрическую длину со средним burst_length - средняя доля искажений ≈ rate.
+    """
+    if rate <= 0.0:
+        return np.zeros(count, dtype=bool)
+    if model == 'word':
+        return rng.random(count) < rate
+    starts = np.flatnonzero(rng.random(count) < min(1.0, rate / burst_length))
+    mask = np.zeros(count, dtype=bool)
+    if starts.size:
+        lengths = rng.geometric(1.0 / burst_length, size=starts.size)
+        # Разметка пачек через разностный массив: +1 в начале, -1 после конца
+        delta = np.zeros(count + 1, dtype=np.int64)
+        np.add.at(delta, starts, 1)
+        np.add.at(delta, np.minimum(starts + lengths, count), -1)
+        mask = np.cumsum(delta[:-1]) > 0
+    return mask
+
+
+def corrupt_words(rng: np.random.Generator, words: np.ndarray, mask: np.ndarray, bits_m: int) -> np.ndarray:
+    """Инверсия одного случайного бита из M в каждом отмеченном слове (как inject_errors)"""
+    flips = np.zeros(words.size, dtype=np.int64)
+    flips[mask] = np.left_shift(1, rng.integers(0, bits_m, size=int(np.count_nonzero(mask))))
+    return wrap_m(words.astype(np.int64) ^ flips, bits_m)
+
+
+def resync_distances(corrupted: np.ndarray, correct: np.ndarray):
+    """
+    Расстояние ресинхронизации после каждой пачки искажений
+
+    Returns:
+        Tuple (расстояния - число неверных символов после последнего искажённого
+        слова пачки, число пачек без восстановления до конца кадра)
+    """
+    count = corrupted.size
+    ends = np.flatnonzero(corrupted & ~np.append(corrupted[1:], False)) + 1
+    if ends.size == 0:
+        return np.empty(0, dtype=np.int64), 0
+    # next_ok[p] - первая позиция >= p с верным символом (count, если её нет)
+    index = np.where(correct, np.arange(count), count)
+    next_ok = np.append(np.minimum.accumulate(index[::-1])[::-1], count)
+    recovered = next_ok[ends]
+    censored = recovered >= count
+    return (recovered - ends)[~censored & (ends < count)], int(np.count_nonzero(censored & (ends < count)))
+
+
+def simulate_batch(config_dict: dict, seed: int, frames: int) -> List[Dict]:
+    """
+    Моделирование frames кадров в рабочем процессе для всех вероятностей ошибок
+
+    Кадр кодируется один раз и искажается для каждой вероятности отдельно.
+    При M ≤ 8 кодер работает по кешу таблиц (run_simulation строит его заранее).
+
+    Returns:
+        Счётчики для каждой вероятности (в порядке config.error_rates)
+    """
+    config = ChannelConfig(**config_dict)
+    rng = np.random.default_rng(seed)
+    codec = DigitalCodec.from_csv(config.csv_path, config.codec_params(), seed=seed,
+                                  use_tables=tables_supported(config.bits_q, config.bits_m))
+    symbol_limit = min(codec.fun_count, 256)  # символы кодека хранятся в uint8
+    counters = [dict.fromkeys(_COUNTERS, 0) for _ in config.error_rates]
+    histograms = [np.zeros(RESYNC_HIST_MAX + 2, dtype=np.int64) for _ in config.error_rates]
+
+    for _ in range(frames):
+        symbols = rng.integers(0, symbol_limit, size=config.frame_symbols)
+        codec.sync_states(config.h1, config.h2)
+        words = codec.encode_symbols(symbols)
+        for counts, hist, rate in zip(counters, histograms, config.error_rates):
+            mask = corruption_mask(rng, words.size, rate, config.model, config.burst_length)
+            received = corrupt_words(rng, words, mask, config.bits_m) if mask.any() else words
+            codec.sync_states(config.h1, config.h2)
+            positions = codec.decode_positions(received)
+            correct = positions == symbols
+            distances, censored = resync_distances(mask, correct)
+
+            errors = int(np.count_nonzero(~correct))
+            counts['frames'] += 1
+            counts['frame_errors'] += int(errors > 0)
+            counts['symbols'] += int(symbols.size)
+            counts['corrupted_words'] += int(np.count_nonzero(mask))
+            counts['symbol_errors'] += errors
+            counts['skips'] += int(np.count_nonzero(positions < 0))
+            counts['undetected'] += int(np.count_nonzero((positions >= 0) & ~correct))
+            counts['resync_events'] += int(distances.size)
+            counts['resync_censored'] += censored
+            counts['resync_total'] += int(distances.sum())
+            hist += np.bincount(np.minimum(distances, RESYNC_HIST_MAX + 1), minlength=RESYNC_HIST_MAX + 2)
+
+    for counts, hist in zip(counters, histograms):
+        counts['resync_histogram'] = hist.tolist()
+    return counters
+
+
+def _merge(total: List[Dict], part: List[Dict]):
+    for acc, counts in zip(total, part):
+        for name in _COUNTERS:
+            acc[name] += counts[name]
+        acc['resync_histogram'] = [a + b for a, b in zip(acc['resync_histogram'], counts['resync_histogram'])]
+
+
+def run_simulation(config: ChannelConfig,
+                   progress: Optional[Callable[[int, int], None]] = None) -> List[ChannelResult]:
+    """
+    Моделирование config.frames кадров в пуле процессов
+
+    Args:
+        config: Параметры моделирования
+        progress: Вызывается как progress(готово кадров, всего) после каждой задачи
+
+    Returns:
+        ChannelResult для каждой вероятности ошибок
+    """
+    config.validate()
+    workers = config.workers or os.cpu_count() or 1
+    sizes = [min(config.frames_per_task, config.frames - start)
+             for start in range(0, config.frames, config.frames_per_task)]
+    # Seed задачи зависит только от её номера: результат не зависит от числа процессов
+    seeds = [config.seed * 1_000_003 + task for task in range(len(sizes))]
+    config_dict = asdict(config)
+    if tables_supported(config.bits_q, config.bits_m):
+        # Кеш таблиц строится один раз здесь, а не в каждом рабочем процессе
+        load_tables(config.csv_path, config.fun_type, config.bits_q, config.bits_m)
+
+    total = [dict.fromkeys(_COUNTERS, 0) for _ in config.error_rates]
+    for acc in total:
+        acc['resync_histogram'] = [0] * (RESYNC_HIST_MAX + 2)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for size, part in zip(sizes, pool.map(simulate_batch, [config_dict] * len(sizes), seeds, sizes)):
+            _merge(total, part)
+            done += size
+            if progress:
+                progress(done, config.frames)
+
+    results = []
+    for rate, acc in zip(config.error_rates, total):
+        symbols = max(acc['symbols'], 1)
+        results.append(ChannelResult(
+            error_rate=rate, model=config.model, frames=acc['frames'], symbols=acc['symbols'],
+            word_error_rate=acc['corrupted_words'] / symbols,
+            symbol_error_rate=acc['symbol_errors'] / symbols,
+            skip_rate=acc['skips'] / symbols,
+            undetected_rate=acc['undetected'] / symbols,
+            frame_error_rate=acc['frame_errors'] / max(acc['frames'], 1),
+            resync_mean=acc['resync_total'] / acc['resync_events'] if acc['resync_events'] else 0.0,
+            resync_censored=acc['resync_censored'],
+            resync_histogram=acc['resync_histogram'],
+        ))
+    return results
+
+
+def write_results(results: List[ChannelResult], config: ChannelConfig, path: str):
+    """
+    Запись результатов: .json - параметры и все поля, иначе CSV (строка на вероятность)
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump({'config': asdict(config), 'results': [r.to_dict() for r in results]}, f, indent=2)
+        return
+    fields = [name for name in ChannelResult.__dataclass_fields__ if name != 'resync_histogram']
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['csv', 'bits_m', 'bits_q', 'fun_type'] + fields)
+        for r in results:
+            row = r.to_dict()
+            writer.writerow([os.path.basename(config.csv_path), config.bits_m, config.bits_q, config.fun_type]
+                            + [row[name] for name in fields])
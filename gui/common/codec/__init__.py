@@ -0,0 +1,71 @@
+"""
+LightCrypto GUI - Цифровой кодек на стороне Python
+Эталонная реализация DigitalCodec для офлайн-проверки ключей и обработки трафика
+"""
+
+from .engine import (
+    CodecParams,
+    DigitalCodec,
+    load_coefficients_csv,
+    evaluate_functions,
+    pack_bytes_to_symbols,
+    unpack_symbols_to_bytes,
+    words_to_bytes,
+    bytes_to_words,
+    packed_wire_bytes,
+    pack_words,
+    unpack_words,
+    wrap_m,
+)
+from .tables import CodecTables, build_tables, load_tables, cached_tables, tables_supported
+from .native import NativeCodec, load_library
+from .analysis import KeyMetrics, analyze_key, analyze_csv_key, analyze_key_heatmap, analyze_csv_heatmap
+from .closed_form import (
+    ClosedFormMetrics, pair_collision_counts, analyze_key_closed_form, analyze_csv_closed_form,
+)
+from .autotune import LinkTarget, TuneResult, autotune
+from .state_graph import StateGraphMetrics, build_state_graph, analyze_state_graph, analyze_csv_state_graph
+from .certificate import Certificate, certify_key, certify_csv, read_certificates, write_certificate
+
+__all__ = [
+    'CodecParams',
+    'DigitalCodec',
+    'load_coefficients_csv',
+    'evaluate_functions',
+    'pack_bytes_to_symbols',
+    'unpack_symbols_to_bytes',
+    'words_to_bytes',
+    'bytes_to_words',
+    'packed_wire_bytes',
+    'pack_words',
+    'unpack_words',
+    'wrap_m',
+    'CodecTables',
+    'build_tables',
+    'load_tables',
+    'cached_tables',
+    'tables_supported',
+    'NativeCodec',
+    'load_library',
+    'KeyMetrics',
+    'analyze_key',
+    'analyze_csv_key',
+    'analyze_key_heatmap',
+    'analyze_csv_heatmap',
+    'ClosedFormMetrics',
+    'pair_collision_counts',
+    'analyze_key_closed_form',
+    'analyze_csv_closed_form',
+    'LinkTarget',
+    'TuneResult',
+    'autotune',
+    'StateGraphMetrics',
+    'build_state_graph',
+    'analyze_state_graph',
+    'analyze_csv_state_graph',
+    'Certificate',
+    'certify_key',
+    'certify_csv',
+    'read_certificates',
+    'write_certificate',
+]
@@ -0,0 +1,61 @@
+"""
+LightCrypto GUI - Офлайн-проверки ключей кодека из командной строки
+
+Запуск из каталога gui:
+    python3 -m common.codec certify --csv Q=6_optimized_fun1.csv --m 8,16,31
+"""
+
+import argparse
+import os
+import sys
+
+from ..constants import CIPHER_KEYS_DIR
+from .autotune import key_shape
+from .certificate import certificate_path, certify_csv
+
+
+def certify(args) -> int:
+    csv_path = args.csv if os.path.exists(args.csv) else os.path.join(CIPHER_KEYS_DIR, args.csv)
+    shape = key_shape(csv_path)
+    if shape is None:
+        print(f'❌ {csv_path}: CSV не подходит кодеку')
+        return 1
+    bits_q, fun_types = shape
+    if args.fun:
+        fun_types = [int(f) for f in args.fun.split(',') if f.strip()]
+    certified = 0
+    for fun_type in fun_types:
+        for bits_m in (int(m) for m in args.m.split(',') if m.strip()):
+            if bits_m < bits_q:
+                continue
+            try:
+                cert = certify_csv(csv_path, fun_type, bits_q, bits_m, write=not args.dry_run)
+            except ValueError as e:
+                print(f'⚠️ M={bits_m} funType={fun_type}: {e}')
+                continue
+            if cert is None:
+                print(f'❌ M={bits_m} funType={fun_type}: есть коллизии - сертификат невозможен')
+            else:
+                certified += 1
+                print(f'✅ M={bits_m} funType={fun_type}: инъективен ({cert.method})')
+    if certified and not args.dry_run:
+        print(f'✅ Сертификат записан: {certificate_path(csv_path)}')
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Офлайн-проверки ключей кодека')
+    commands = parser.add_subparsers(dest='command', required=True)
+    cert = commands.add_parser('certify', help='Сертификат инъективности ключа (<csv>.cert)')
+    cert.add_argument('--csv', required=True, help='CSV ключа (имя в CipherKeys или путь)')
+    cert.add_argument('--m', default='8,16,24,31', help='Проверяемые M через запятую')
+    cert.add_argument('--fun', default='', help='funType через запятую (по умолчанию - по числу столбцов CSV)')
+    cert.add_argument('--dry-run', action='store_true', help='Только проверка, без записи файла')
+    args = parser.parse_args(argv)
+    if args.command == 'certify':
+        return certify(args)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+LightCrypto GUI - Анализ коллизий ключа кодека
+Доля состояний с коллизиями, случайных подстановок и прямых передач Info
+по правилам DigitalCodec::encodeSymbols при равномерных символах и состояниях
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .engine import bytes_per_symbol, evaluate_ring, load_coefficients_csv, ring_dtype, to_ring, wrap_m
+from .tables import CodecTables, cached_tables, collision_block, state_index
+
+# Перебор всех 2^(2M) состояний, пока их не больше этого числа, иначе выборка
+ANALYSIS_MAX_STATES = 1 << 16
+# Предел элементов промежуточного массива состояния x функции x символы
+ANALYSIS_BLOCK_ELEMENTS = 1 << 22
+# Тепловая карта не крупнее 256 x 256 ячеек (при M ≤ 8 - ровно по состояниям)
+HEATMAP_MAX_BITS = 8
+# При выборке состояний - в среднем не меньше стольких состояний на ячейку карты
+HEATMAP_MIN_SAMPLES_PER_CELL = 16
+
+
+@dataclass
+class KeyMetrics:
+    """
+    Метрики ключа (доли от всех символов или состояний)
+
+    collision_rate: Доля состояний, где RR повторяются
+    fallback_rate: Доля символов, закодированных случайным словом (символ теряется)
+    direct_rate: Доля символов, переданных напрямую (InfoInsteadOfRand)
+    expansion_ratio: Бит на линии на один доставленный бит информации
+    """
+    bits_m: int
+    bits_q: int
+    fun_type: int
+    states: int
+    exhaustive: bool
+    collision_rate: float
+    fallback_rate: float
+    direct_rate: float
+    expansion_ratio: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def analysis_states(bits_m: int, max_states: int = ANALYSIS_MAX_STATES, seed: int = 0):
+    """
+    Состояния (h1, h2) для анализа
+
+    Returns:
+        Tuple (x, y, exhaustive): все 2^(2M) состояний или равномерная выборка max_states
+    """
+    total = 1 << (2 * bits_m)
+    if total <= max_states:
+        index = np.arange(total, dtype=np.int64)
+        exhaustive = True
+    else:
+        index = np.random.default_rng(seed).integers(0, total, size=max_states, dtype=np.int64)
+        exhaustive = False
+    mask = (1 << bits_m) - 1
+    return wrap_m(index >> bits_m, bits_m), wrap_m(index & mask, bits_m), exhaustive
+
+
+def symbol_outcomes(rr: np.ndarray, info_instead_of_rand: bool = True,
+                    min_dup: Optional[np.ndarray] = None):
+    """
+    Исход кодирования каждого символа в каждом состоянии
+
+    Args:
+        rr: Знаковые RR, форма (состояния, 2^Q)
+        info_instead_of_rand: Режим InfoInsteadOfRand
+        min_dup: Готовый minDupIdx состояний (из CodecTables), иначе считается по rr
+
+    Returns:
+        Tuple (collision, direct, fallback): булевы массивы (состояния,) и (состояния, 2^Q)
+    """
+    fun_count = rr.shape[1]
+    if min_dup is None:
+        _, min_dup = collision_block(rr)
+    collision = min_dup < fun_count
+    affected = np.arange(fun_count)[None, :] >= min_dup[:, None]
+    if info_instead_of_rand:
+        # directVal = sym + 1 допустим, если его нет среди RR состояния
+        direct_vals = np.arange(1, fun_count + 1, dtype=rr.dtype)
+        in_rr = (rr[:, :, None] == direct_vals[None, None, :]).any(axis=1)
+        direct = affected & ~in_rr
+    else:
+        direct = np.zeros_like(affected)
+    return collision, direct, affected & ~direct
+
+
+def analyze_key(coeff: np.ndarray, fun_type: int, bits_q: int, bits_m: int,
+                info_instead_of_rand: bool = True, max_states: int = ANALYSIS_MAX_STATES,
+                seed: int = 0, tables: Optional[CodecTables] = None) -> KeyMetrics:
+    """
+    Метрики коллизий для матрицы COEFF
+
+    Args:
+        coeff: Матрица COEFF (2^Q, cols)
+        fun_type: Тип функции 1..5
+        bits_q: Q
+        bits_m: M
+        info_instead_of_rand: Режим InfoInsteadOfRand
+        max_states: Предел перебора состояний (больше - случайная выборка)
+        seed: Seed выборки состояний (одинаковый seed - сравнимые результаты)
+        tables: Таблицы этого ключа (M ≤ 8): RR и коллизии берутся из них
+
+    Returns:
+        KeyMetrics
+    """
+    metrics, _ = _scan_states(coeff, fun_type, bits_q, bits_m, info_instead_of_rand,
+                              max_states, seed, heatmap_bits=0, tables=tables)
+    return metrics
+
+
+def analyze_key_heatmap(coeff: np.ndarray, fun_type: int, bits_q: int, bits_m: int,
+                        info_instead_of_rand: bool = True, max_states: int = ANALYSIS_MAX_STATES,
+                        seed: int = 0, tables: Optional[CodecTables] = None) -> Tuple[KeyMetrics, np.ndarray]:
+    """
+    Метрики и тепловая карта коллизий по (x, y)
+
+    Returns:
+        Tuple (KeyMetrics, карта float [G, G]): доля состояний с коллизией в ячейке,
+        строки - h1, столбцы - h2 (беззнаковые M-битные, старшие биты), NaN - ячейка без выборки
+    """
+    heatmap_bits = min(bits_m, HEATMAP_MAX_BITS)
+    if (1 << (2 * bits_m)) > max_states:
+        cells = max(1, max_states // HEATMAP_MIN_SAMPLES_PER_CELL)
+        heatmap_bits = max(1, min(heatmap_bits, (cells.bit_length() - 1) // 2))
+    return _scan_states(coeff, fun_type, bits_q, bits_m, info_instead_of_rand,
+                        max_states, seed, heatmap_bits, tables)
+
+
+def _scan_states(coeff: np.ndarray, fun_type: int, bits_q: int, bits_m: int,
+                 info_instead_of_rand: bool, max_states: int, seed: int,
+                 heatmap_bits: int,
+                 tables: Optional[CodecTables] = None) -> Tuple[KeyMetrics, Optional[np.ndarray]]:
+    """Проход по состояниям блоками с подсчётом исходов и (опционально) карты"""
+    if tables is not None and (tables.bits_m, tables.bits_q, tables.fun_type) != (bits_m, bits_q, fun_type):
+        raise ValueError('Таблицы построены для других Q, M или типа функции')
+    fun_count = 1 << bits_q
+    x, y, exhaustive = analysis_states(bits_m, max_states, seed)
+    dtype = ring_dtype(bits_m)
+    coeff_ring = to_ring(coeff, dtype)
+    mask = dtype((1 << bits_m) - 1)
+    block = max(1, ANALYSIS_BLOCK_ELEMENTS // (fun_count * fun_count))
+
+    cells = 1 << (2 * heatmap_bits)
+    heat_hits = np.zeros(cells, dtype=np.int64)
+    heat_total = np.zeros(cells, dtype=np.int64)
+    shift = bits_m - heatmap_bits
+
+    collisions = directs = fallbacks = 0
+    for start in range(0, x.size, block):
+        stop = min(x.size, start + block)
+        bx = to_ring(x[start:stop], dtype)
+        by = to_ring(y[start:stop], dtype)
+        if tables is not None:
+            index = state_index(x[start:stop], y[start:stop], bits_m)
+            rr = tables.rr[index].astype(np.int64)
+            min_dup = tables.min_dup[index]
+        else:
+            raw = evaluate_ring(coeff_ring, fun_type, bx[:, None], by[:, None])
+            rr = wrap_m((raw & mask).astype(np.int64), bits_m)
+            min_dup = None
+        collision, direct, fallback = symbol_outcomes(rr, info_instead_of_rand, min_dup)
+        collisions += int(np.count_nonzero(collision))
+        directs += int(np.count_nonzero(direct))
+        fallbacks += int(np.count_nonzero(fallback))
+        if heatmap_bits:
+            cell = ((((bx & mask) >> shift).astype(np.int64) << heatmap_bits)
+                    | ((by & mask) >> shift).astype(np.int64))
+            heat_total += np.bincount(cell, minlength=cells)
+            heat_hits += np.bincount(cell, weights=collision, minlength=cells).astype(np.int64)
+
+    symbols = x.size * fun_count
+    fallback_rate = fallbacks / symbols
+    # Случайная подстановка теряет символ, остальные доставляют Q бит за M-битное слово
+    delivered = bits_q * (1.0 - fallback_rate)
+    metrics = KeyMetrics(
+        bits_m=bits_m, bits_q=bits_q, fun_type=fun_type,
+        states=int(x.size), exhaustive=exhaustive,
+        collision_rate=collisions / x.size,
+        fallback_rate=fallback_rate,
+        direct_rate=directs / symbols,
+        expansion_ratio=(8 * bytes_per_symbol(bits_m) / delivered) if delivered > 0 else float('inf'),
+    )
+    if not heatmap_bits:
+        return metrics, None
+    side = 1 << heatmap_bits
+    with np.errstate(invalid='ignore', divide='ignore'):
+        heat = np.where(heat_total > 0, heat_hits / np.maximum(heat_total, 1), np.nan)
+    return metrics, heat.reshape(side, side)
+
+
+def analyze_csv_key(csv_path: str, fun_type: int, bits_q: int, bits_m: int,
+                    info_instead_of_rand: bool = True, max_states: int = ANALYSIS_MAX_STATES) -> KeyMetrics:
+    """analyze_key для CSV в формате loadCoefficientsCSV (при M ≤ 8 - по кешу таблиц)"""
+    coeff = load_coefficients_csv(csv_path, fun_type, bits_q)
+    tables = cached_tables(csv_path, fun_type, bits_q, bits_m)
+    return analyze_key(coeff, fun_type, bits_q, bits_m, info_instead_of_rand, max_states, tables=tables)
+
+
+def analyze_csv_heatmap(csv_path: str, fun_type: int, bits_q: int, bits_m: int,
+                        info_instead_of_rand: bool = True,
+                        max_states: int = ANALYSIS_MAX_STATES) -> Tuple[KeyMetrics, np.ndarray]:
+    """analyze_key_heatmap для CSV в формате loadCoefficientsCSV (при M ≤ 8 - по кешу таблиц)"""
+    coeff = load_coefficients_csv(csv_path, fun_type, bits_q)
+    tables = cached_tables(csv_path, fun_type, bits_q, bits_m)
+    return analyze_key_heatmap(coeff, fun_type, bits_q, bits_m, info_instead_of_rand, max_states,
+                               tables=tables)
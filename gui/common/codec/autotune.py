@@ -0,0 +1,249 @@
+"""
+LightCrypto GUI - Автоподбор параметров кодека под канал
+Для каждого ключа CipherKeys, допустимого funType и M оцениваются коллизии,
+расширение на линии и скорость кодирования; конфигурации ранжируются
+по ожидаемой полезной скорости (goodput)
+"""
+
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..constants import CIPHER_KEYS_DIR, CODEC_SHARED_LIB
+from .analysis import KeyMetrics, analyze_key
+from .certificate import coefficient_hash, read_certificates
+from .engine import CodecParams, DigitalCodec, bytes_per_symbol, load_coefficients_csv
+from .tables import cached_tables, tables_supported
+
+# M с наибольшей разрядностью для 1..4 байт на слово: при том же расширении меньше коллизий
+AUTOTUNE_M_CANDIDATES = (8, 16, 24, 31)
+# Объём тестовых данных для замера скорости кодирования/декодирования
+AUTOTUNE_SAMPLE_BYTES = 1 << 12
+# Выборка состояний для оценки коллизий (быстрая, для ранжирования достаточно)
+AUTOTUNE_ANALYSIS_STATES = 1 << 12
+# Шаг округления долей коллизий и подстановок в ключе кеша замеров скорости
+AUTOTUNE_SPEED_RATE_STEP = 0.01
+# Заголовки IPv4 + UDP на каждый пакет
+UDP_IP_OVERHEAD = 28
+# Заголовок кадра encodeMessage: длина (2 байта LE)
+CODEC_FRAME_HEADER = 2
+
+
+@dataclass
+class LinkTarget:
+    """
+    Целевой канал
+
+    max_payload: Максимальный UDP payload (байт)
+    error_rate: Вероятность искажения M-битного слова (как --error-rate в tap_encrypt)
+    cpu_budget: Доля одного ядра, доступная кодеку (на каждой стороне)
+    link_mbps: Пропускная способность канала (Мбит/с)
+    """
+    max_payload: int = 1400
+    error_rate: float = 0.0
+    cpu_budget: float = 1.0
+    link_mbps: float = 100.0
+
+    def validate(self):
+        if self.max_payload <= CODEC_FRAME_HEADER + 4:
+            raise ValueError('max_payload is too small')
+        if not (0.0 <= self.error_rate < 1.0):
+            raise ValueError('error_rate must be in [0, 1)')
+        if self.cpu_budget <= 0 or self.link_mbps <= 0:
+            raise ValueError('cpu_budget and link_mbps must be positive')
+
+
+@dataclass
+class TuneResult:
+    """Оценка одной конфигурации (скорости - полезные данные, Мбит/с)"""
+    csv_name: str
+    bits_m: int
+    bits_q: int
+    fun_type: int
+    expansion: float
+    collision_rate: float
+    fallback_rate: float
+    encode_mbps: float
+    decode_mbps: float
+    packet_success: float
+    goodput_mbps: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def key_shape(csv_path: str) -> Optional[Tuple[int, List[int]]]:
+    """
+    Q и допустимые funType ключа по числу строк и столбцов
+
+    Returns:
+        (Q, [funType, ...]) или None, если CSV не подходит кодеку
+    """
+    rows = 0
+    cols = 0
+    with open(csv_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            cells = [c for c in line.split(',') if c.split(';', 1)[0].strip()]
+            if not cells:
+                continue
+            cols = cols or len(cells)
+            rows += 1
+    if rows == 0 or rows & (rows - 1) or cols not in (3, 4):
+        return None
+    return rows.bit_length() - 1, ([1, 2, 3, 4] if cols == 3 else [5])
+
+
+def packet_model(bits_m: int, bits_q: int, fallback_rate: float, target: LinkTarget) -> Tuple[int, float]:
+    """
+    Полезные байты в пакете и вероятность его доставки без потерь
+
+    Пакет теряется целиком при искажении любого слова (состояния декодера
+    расходятся до конца кадра) или при случайной подстановке хотя бы одного символа.
+    """
+    words = (target.max_payload - CODEC_FRAME_HEADER) // bytes_per_symbol(bits_m)
+    info_bytes = words * bits_q // 8
+    success = ((1.0 - target.error_rate) * (1.0 - fallback_rate)) ** words
+    return info_bytes, success
+
+
+def is_certified(csv_path: str, coeff: np.ndarray, fun_type: int, bits_q: int, bits_m: int) -> bool:
+    """Есть ли для ключа запись <csv>.cert с тем же хешем COEFF (кодек не проверяет коллизии)"""
+    try:
+        records = read_certificates(csv_path)
+    except OSError:
+        return False
+    coeff_hash = coefficient_hash(coeff)
+    return any((c.bits_m, c.bits_q, c.fun_type, c.coeff_hash) == (bits_m, bits_q, fun_type, coeff_hash)
+               for c in records)
+
+
+def speed_key(bits_q: int, bits_m: int, fun_type: int, certified: bool, metrics: KeyMetrics) -> tuple:
+    """
+    Ключ кеша замеров скорости
+
+    Кроме (Q, M, funType) скорость зависит от пути кодирования: сертифицированный
+    ключ идёт без проверки коллизий, а коллизии и случайные подстановки
+    замедляют encode. Доли округляются до AUTOTUNE_SPEED_RATE_STEP.
+    """
+    def bucket(rate: float) -> int:
+        return int(round(rate / AUTOTUNE_SPEED_RATE_STEP))
+    return (bits_q, bits_m, fun_type, certified, bucket(metrics.collision_rate), bucket(metrics.fallback_rate))
+
+
+def benchmark_codec(csv_path: str, params: CodecParams, sample_bytes: int = AUTOTUNE_SAMPLE_BYTES,
+                    lib_path: str = CODEC_SHARED_LIB) -> Tuple[float, float]:
+    """
+    Замер скорости encode_message/decode_message на случайных данных
+
+    Используется libdigitalcodec.so, если она собрана, иначе движок на NumPy
+    (при M ≤ 8 - с кешем таблиц).
+
+    Returns:
+        (encode, decode) в Мбит/с полезных данных
+    """
+    data = np.random.default_rng(0).integers(0, 256, size=sample_bytes, dtype=np.uint8).tobytes()
+    if os.path.exists(lib_path):
+        from .native import NativeCodec
+        encoder = NativeCodec.from_csv(csv_path, params, lib_path=lib_path)
+        decoder = NativeCodec.from_csv(csv_path, params, lib_path=lib_path)
+    else:
+        use_tables = tables_supported(params.bits_q, params.bits_m)
+        encoder = DigitalCodec.from_csv(csv_path, params, seed=0, use_tables=use_tables)
+        decoder = DigitalCodec.from_csv(csv_path, params, seed=0, use_tables=use_tables)
+
+    start = time.perf_counter()
+    framed = encoder.encode_message(data)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    decoder.decode_message(framed)
+    decode_time = time.perf_counter() - start
+
+    bits = 8.0 * sample_bytes / 1e6
+    return bits / max(encode_time, 1e-9), bits / max(decode_time, 1e-9)
+
+
+def autotune(target: LinkTarget, keys_dir: str = CIPHER_KEYS_DIR,
+             csv_files: Optional[Sequence[str]] = None,
+             m_candidates: Sequence[int] = AUTOTUNE_M_CANDIDATES,
+             sample_bytes: int = AUTOTUNE_SAMPLE_BYTES,
+             progress: Optional[Callable[[int, int], None]] = None) -> List[TuneResult]:
+    """
+    Ранжирование конфигураций (ключ, M, funType) по ожидаемому goodput
+
+    goodput = min(канал, CPU) с учётом расширения, заголовков и потерь пакетов:
+    канал - link_mbps · (полезные байты / байты пакета с UDP/IP) · P(доставки),
+    CPU - min(encode, decode) · cpu_budget · P(доставки).
+
+    Args:
+        target: Целевой канал
+        keys_dir: Каталог ключей
+        csv_files: Имена CSV (по умолчанию все *.csv из keys_dir)
+        m_candidates: Проверяемые M (берутся только M ≥ Q)
+        sample_bytes: Объём данных для замера скорости
+        progress: Вызывается как progress(готово, всего) после каждой конфигурации
+
+    Returns:
+        Список TuneResult, лучший первым
+    """
+    target.validate()
+    if csv_files is None:
+        csv_files = sorted(f for f in os.listdir(keys_dir) if f.endswith('.csv')) if os.path.isdir(keys_dir) else []
+
+    configs = []
+    for name in csv_files:
+        path = os.path.join(keys_dir, name)
+        try:
+            shape = key_shape(path)
+        except (OSError, UnicodeDecodeError):
+            continue
+        if shape is None:
+            continue
+        bits_q, fun_types = shape
+        for fun_type in fun_types:
+            for bits_m in m_candidates:
+                if bits_m >= bits_q:
+                    configs.append((name, path, bits_q, fun_type, bits_m))
+
+    # Замер - один раз на (Q, M, funType, сертификат, доли коллизий и подстановок)
+    speed_cache: Dict[tuple, Tuple[float, float]] = {}
+    results = []
+    for done, (name, path, bits_q, fun_type, bits_m) in enumerate(configs, start=1):
+        try:
+            coeff = load_coefficients_csv(path, fun_type, bits_q)
+            tables = cached_tables(path, fun_type, bits_q, bits_m)
+            metrics = analyze_key(coeff, fun_type, bits_q, bits_m, max_states=AUTOTUNE_ANALYSIS_STATES,
+                                  tables=tables)
+            key = speed_key(bits_q, bits_m, fun_type,
+                            is_certified(path, coeff, fun_type, bits_q, bits_m), metrics)
+            if key not in speed_cache:
+                params = CodecParams(bits_m=bits_m, bits_q=bits_q, fun_type=fun_type)
+                speed_cache[key] = benchmark_codec(path, params, sample_bytes)
+        except (OSError, ValueError, RuntimeError):
+            continue
+        encode_mbps, decode_mbps = speed_cache[key]
+
+        info_bytes, success = packet_model(bits_m, bits_q, metrics.fallback_rate, target)
+        packet_bytes = target.max_payload + UDP_IP_OVERHEAD
+        link_goodput = target.link_mbps * info_bytes / packet_bytes * success
+        cpu_goodput = min(encode_mbps, decode_mbps) * target.cpu_budget * success
+        results.append(TuneResult(
+            csv_name=name, bits_m=bits_m, bits_q=bits_q, fun_type=fun_type,
+            expansion=8.0 * bytes_per_symbol(bits_m) / bits_q,
+            collision_rate=metrics.collision_rate,
+            fallback_rate=metrics.fallback_rate,
+            encode_mbps=encode_mbps, decode_mbps=decode_mbps,
+            packet_success=success,
+            goodput_mbps=min(link_goodput, cpu_goodput),
+        ))
+        if progress:
+            progress(done, len(configs))
+
+    # При равном goodput - меньше коллизий, затем больше M
+    results.sort(key=lambda r: (-r.goodput_mbps, r.collision_rate, -r.bits_m))
+    return results
@@ -0,0 +1,158 @@
+"""
+LightCrypto GUI - Сертификаты инъективности ключей кодека
+Офлайн-доказательство, что RR не совпадают ни в одном из 2^(2M) состояний:
+для funType 1 и 5 - замкнутая формула, для остальных - полный перебор.
+Запись сохраняется рядом с CSV (<csv>.cert); DigitalCodec::loadCertificate
+по ней пропускает проверку коллизий и вычисляет только RR[sym]
+"""
+
+import os
+from dataclasses import asdict, dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .closed_form import CLOSED_FORM_FUN_TYPES, pair_collision_counts
+from .engine import evaluate_ring, load_coefficients_csv, ring_dtype, to_ring, wrap_m
+
+CERTIFICATE_SUFFIX = '.cert'
+CERTIFICATE_RECORD = 'injective'
+# Полный перебор 2^(2M) состояний - только до этого M (M=12: 16M состояний)
+CERTIFY_EXHAUSTIVE_MAX_BITS = 12
+# Предел элементов блока состояния x функции при переборе
+CERTIFY_BLOCK_ELEMENTS = 1 << 22
+
+_FNV_OFFSET = 1469598103934665603
+_FNV_PRIME = 1099511628211
+
+
+@dataclass
+class Certificate:
+    """
+    Запись сертификата (строка файла <csv>.cert)
+
+    coeff_hash: FNV-1a 64 от COEFF (int32 little-endian по строкам), как DigitalCodec::coefficientHash
+    method: 'closed_form' или 'exhaustive'
+    """
+    bits_m: int
+    bits_q: int
+    fun_type: int
+    coeff_hash: int
+    method: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def to_line(self) -> str:
+        return (f'{CERTIFICATE_RECORD} bits_m={self.bits_m} bits_q={self.bits_q} fun_type={self.fun_type} '
+                f'coeff={self.coeff_hash:016x} method={self.method}')
+
+    @classmethod
+    def from_line(cls, line: str) -> Optional['Certificate']:
+        parts = line.split()
+        if not parts or parts[0] != CERTIFICATE_RECORD:
+            return None
+        fields = dict(part.split('=', 1) for part in parts[1:] if '=' in part)
+        try:
+            return cls(bits_m=int(fields['bits_m']), bits_q=int(fields['bits_q']),
+                       fun_type=int(fields['fun_type']), coeff_hash=int(fields['coeff'], 16),
+                       method=fields.get('method', ''))
+        except (KeyError, ValueError):
+            return None
+
+
+def coefficient_hash(coeff: np.ndarray) -> int:
+    """FNV-1a 64 от COEFF (значения int32, little-endian, по строкам)"""
+    data = (np.asarray(coeff, dtype=np.int64) & 0xFFFFFFFF).astype('<u4').tobytes()
+    h = _FNV_OFFSET
+    for byte in data:
+        h = ((h ^ byte) * _FNV_PRIME) & 0xFFFFFFFFFFFFFFFF
+    return h
+
+
+def find_collision_state(coeff: np.ndarray, fun_type: int, bits_m: int) -> Optional[Tuple[int, int]]:
+    """
+    Полный перебор состояний (x, y) блоками
+
+    Returns:
+        Первое состояние с совпадающими RR или None, если их нет
+    """
+    fun_count = int(np.asarray(coeff).shape[0])
+    dtype = ring_dtype(bits_m)
+    coeff_ring = to_ring(coeff, dtype)
+    mask = dtype((1 << bits_m) - 1)
+    side = 1 << bits_m
+    ys = to_ring(wrap_m(np.arange(side, dtype=np.int64), bits_m), dtype)
+    rows_per_block = max(1, CERTIFY_BLOCK_ELEMENTS // (side * fun_count))
+    for start in range(0, side, rows_per_block):
+        xs = wrap_m(np.arange(start, min(side, start + rows_per_block), dtype=np.int64), bits_m)
+        bx = np.repeat(to_ring(xs, dtype), side)
+        by = np.tile(ys, xs.size)
+        rr = np.sort(evaluate_ring(coeff_ring, fun_type, bx[:, None], by[:, None]) & mask, axis=1)
+        hit = np.flatnonzero((rr[:, 1:] == rr[:, :-1]).any(axis=1))
+        if hit.size:
+            state = int(hit[0])
+            x = int(xs[state // side])
+            y = int(wrap_m(np.array([state % side]), bits_m)[0])
+            return x, y
+    return None
+
+
+def certify_key(coeff: np.ndarray, fun_type: int, bits_q: int, bits_m: int) -> Optional[Certificate]:
+    """
+    Проверка инъективности RR во всех состояниях
+
+    Returns:
+        Certificate или None, если коллизия есть
+
+    Raises:
+        ValueError: funType 2..4 при M > CERTIFY_EXHAUSTIVE_MAX_BITS (перебор слишком велик)
+    """
+    if fun_type in CLOSED_FORM_FUN_TYPES:
+        if np.any(pair_collision_counts(coeff, fun_type, bits_m)):
+            return None
+        method = 'closed_form'
+    elif bits_m <= CERTIFY_EXHAUSTIVE_MAX_BITS:
+        if find_collision_state(coeff, fun_type, bits_m) is not None:
+            return None
+        method = 'exhaustive'
+    else:
+        raise ValueError(f'exhaustive certification supports M <= {CERTIFY_EXHAUSTIVE_MAX_BITS} '
+                         f'for funType {fun_type}')
+    return Certificate(bits_m=bits_m, bits_q=bits_q, fun_type=fun_type,
+                       coeff_hash=coefficient_hash(coeff), method=method)
+
+
+def certificate_path(csv_path: str) -> str:
+    return csv_path + CERTIFICATE_SUFFIX
+
+
+def read_certificates(csv_path: str) -> List[Certificate]:
+    """Все записи файла сертификата рядом с CSV (пустой список, если файла нет)"""
+    path = certificate_path(csv_path)
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [cert for cert in (Certificate.from_line(line) for line in f) if cert is not None]
+
+
+def write_certificate(csv_path: str, cert: Certificate):
+    """Добавление записи; прежняя запись для тех же (M, Q, funType) заменяется"""
+    records = [c for c in read_certificates(csv_path)
+               if (c.bits_m, c.bits_q, c.fun_type) != (cert.bits_m, cert.bits_q, cert.fun_type)]
+    records.append(cert)
+    records.sort(key=lambda c: (c.fun_type, c.bits_q, c.bits_m))
+    with open(certificate_path(csv_path), 'w') as f:
+        f.write(f'# LightCrypto: сертификат инъективности для {os.path.basename(csv_path)}\n')
+        for record in records:
+            f.write(record.to_line() + '\n')
+
+
+def certify_csv(csv_path: str, fun_type: int, bits_q: int, bits_m: int,
+                write: bool = True) -> Optional[Certificate]:
+    """certify_key для CSV в формате loadCoefficientsCSV; при успехе запись сохраняется рядом с CSV"""
+    coeff = load_coefficients_csv(csv_path, fun_type, bits_q)
+    cert = certify_key(coeff, fun_type, bits_q, bits_m)
+    if cert is not None and write:
+        write_certificate(csv_path, cert)
+    return cert
@@ -0,0 +1,208 @@
+"""
+LightCrypto GUI - Аналитический подсчёт коллизий ключа для funType 1 и 5
+Число состояний, где совпадают RR двух строк COEFF, считается через 2-адические
+нормирования разностей коэффициентов за O(строк²), без перебора 2^(2M) состояний
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Tuple
+
+import numpy as np
+
+from .engine import coeff_columns, evaluate_ring, load_coefficients_csv, ring_dtype, to_ring, wrap_m
+
+# Функции, для которых есть замкнутая формула (линейная и билинейная)
+CLOSED_FORM_FUN_TYPES = (1, 5)
+# Сверка с перебором - только для M не больше этого (2^(2M) состояний)
+BRUTE_FORCE_MAX_BITS = 10
+
+
+@dataclass
+class ClosedFormMetrics:
+    """
+    Аналитические метрики коллизий ключа (доли от 2^(2M) состояний)
+
+    colliding_pairs: Пары строк, совпадающие хотя бы в одном состоянии
+    expected_collisions: Среднее число совпадающих пар на состояние (сумма долей пар)
+    collision_rate_lower: Нижняя граница доли состояний с коллизией (худшая пара)
+    collision_rate_upper: Верхняя граница (min(1, expected_collisions))
+    """
+    bits_m: int
+    bits_q: int
+    fun_type: int
+    colliding_pairs: int
+    expected_collisions: float
+    collision_rate_lower: float
+    collision_rate_upper: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _valuation(value: int, bits_m: int) -> int:
+    """2-адическое нормирование value mod 2^M (для 0 - M)"""
+    value &= (1 << bits_m) - 1
+    if value == 0:
+        return bits_m
+    return (value & -value).bit_length() - 1
+
+
+def _linear_class(a: int, c: int, k: int):
+    """
+    Решения a*x + c ≡ 0 (mod 2^k) как класс вычетов
+
+    Returns:
+        (x0, s): x ≡ x0 (mod 2^s), или None если решений нет
+    """
+    if k == 0:
+        return 0, 0
+    v = min(_valuation(a, k), k)
+    if _valuation(c, k) < v:
+        return None
+    s = k - v
+    modulus = 1 << s
+    odd = (a >> v) % modulus if s else 0
+    x0 = (-(c >> v) * pow(odd, -1, modulus)) % modulus if s else 0
+    return x0, s
+
+
+def _count_common(first, second, bits_m: int) -> int:
+    """Число x в Z/2^M, лежащих в обоих классах вычетов"""
+    if first is None or second is None:
+        return 0
+    (x0, s), (x1, t) = first, second
+    low = min(s, t)
+    if (x0 - x1) % (1 << low):
+        return 0
+    return 1 << (bits_m - max(s, t))
+
+
+def pair_solutions_linear(da: int, db: int, dq: int, bits_m: int) -> int:
+    """
+    Число (x, y) с da*x + db*y + dq ≡ 0 (mod 2^M)
+
+    Образ (x, y) → da*x + db*y - подгруппа 2^v·Z/2^M, v = min(ν(da), ν(db)),
+    ядро - 2^(M+v) состояний; решения есть, если 2^v делит dq.
+    """
+    v = min(_valuation(da, bits_m), _valuation(db, bits_m))
+    if _valuation(dq, bits_m) < v:
+        return 0
+    return 1 << (bits_m + v)
+
+
+def pair_solutions_bilinear(da: int, db: int, dc: int, dq: int, bits_m: int) -> int:
+    """
+    Число (x, y) с da*x + db*x*y + dc*y + dq ≡ 0 (mod 2^M)
+
+    При фиксированном x: (db*x + dc)*y ≡ -(da*x + dq) имеет 2^w решений,
+    w = ν(db*x + dc), если 2^w делит da*x + dq. Группировка x по w сводится
+    к классам вычетов двух линейных сравнений - O(M) на пару.
+    """
+    total = 0
+    for k in range(bits_m):
+        # x с ν(db*x + dc) ≥ k и da*x + dq ≡ 0 (mod 2^k), минус те, где ν ≥ k + 1
+        exact = (_count_common(_linear_class(db, dc, k), _linear_class(da, dq, k), bits_m)
+                 - _count_common(_linear_class(db, dc, k + 1), _linear_class(da, dq, k), bits_m))
+        total += exact << k
+    # db*x + dc ≡ 0 (mod 2^M): годится любой y, если да*x + dq тоже ≡ 0
+    total += _count_common(_linear_class(db, dc, bits_m), _linear_class(da, dq, bits_m), bits_m) << bits_m
+    return total
+
+
+def pair_collision_counts(coeff: np.ndarray, fun_type: int, bits_m: int) -> np.ndarray:
+    """
+    Число состояний, где RR строк i и j совпадают
+
+    Args:
+        coeff: Матрица COEFF (2^Q, cols)
+        fun_type: 1 или 5
+        bits_m: M (до 31)
+
+    Returns:
+        Симметричная матрица int64 [2^Q, 2^Q] (диагональ - 0)
+    """
+    if fun_type not in CLOSED_FORM_FUN_TYPES:
+        raise ValueError('closed-form analysis supports funType 1 and 5 only')
+    if not (1 <= bits_m <= 31):
+        raise ValueError('bitsM must be in 1..31')
+    rows = [[int(v) for v in row] for row in np.asarray(coeff, dtype=np.int64)]
+    if rows and len(rows[0]) != coeff_columns(fun_type):
+        raise ValueError('COEFF columns do not match funType')
+
+    count = len(rows)
+    counts = np.zeros((count, count), dtype=np.int64)
+    for i in range(count):
+        for j in range(i + 1, count):
+            diff = [a - b for a, b in zip(rows[i], rows[j])]
+            if fun_type == 1:
+                solutions = pair_solutions_linear(diff[0], diff[1], diff[2], bits_m)
+            else:
+                solutions = pair_solutions_bilinear(diff[0], diff[1], diff[2], diff[3], bits_m)
+            counts[i, j] = counts[j, i] = solutions
+    return counts
+
+
+def analyze_key_closed_form(coeff: np.ndarray, fun_type: int, bits_q: int, bits_m: int) -> ClosedFormMetrics:
+    """
+    Аналитические метрики коллизий ключа
+
+    Доля состояний с коллизией - объединение событий по парам, поэтому
+    возвращаются точные границы: худшая пара и сумма по парам.
+    """
+    counts = pair_collision_counts(coeff, fun_type, bits_m)
+    states = float(1 << (2 * bits_m))
+    upper = np.triu(counts, 1)
+    expected = float(upper.sum()) / states
+    return ClosedFormMetrics(
+        bits_m=bits_m, bits_q=bits_q, fun_type=fun_type,
+        colliding_pairs=int(np.count_nonzero(upper)),
+        expected_collisions=expected,
+        collision_rate_lower=float(upper.max(initial=0)) / states,
+        collision_rate_upper=min(1.0, expected),
+    )
+
+
+def analyze_csv_closed_form(csv_path: str, fun_type: int, bits_q: int, bits_m: int) -> ClosedFormMetrics:
+    """analyze_key_closed_form для CSV в формате loadCoefficientsCSV"""
+    coeff = load_coefficients_csv(csv_path, fun_type, bits_q)
+    return analyze_key_closed_form(coeff, fun_type, bits_q, bits_m)
+
+
+def brute_force_pair_counts(coeff: np.ndarray, fun_type: int, bits_m: int) -> Tuple[np.ndarray, float]:
+    """
+    Перебор всех состояний для сверки с pair_collision_counts (M ≤ BRUTE_FORCE_MAX_BITS)
+
+    Returns:
+        Tuple (матрица совпадений пар, точная доля состояний с коллизией)
+    """
+    if bits_m > BRUTE_FORCE_MAX_BITS:
+        raise ValueError(f'brute force is limited to M <= {BRUTE_FORCE_MAX_BITS}')
+    dtype = ring_dtype(bits_m)
+    coeff_ring = to_ring(np.asarray(coeff, dtype=np.int64), dtype)
+    mask = dtype((1 << bits_m) - 1)
+    values = np.arange(1 << bits_m, dtype=np.int64)
+    y = to_ring(wrap_m(values, bits_m), dtype)
+
+    count = coeff_ring.shape[0]
+    counts = np.zeros((count, count), dtype=np.int64)
+    collided = 0
+    for x_value in wrap_m(values, bits_m):
+        # Одна строка x за проход: 2^M состояний x 2^Q функций
+        x = to_ring(np.full(y.size, x_value, dtype=np.int64), dtype)
+        rr = (evaluate_ring(coeff_ring, fun_type, x[:, None], y[:, None]) & mask).astype(np.int64)
+        equal = rr[:, :, None] == rr[:, None, :]
+        counts += equal.sum(axis=0)
+        collided += int(np.count_nonzero(equal.sum(axis=(1, 2)) > count))
+    np.fill_diagonal(counts, 0)
+    return counts, collided / float(1 << (2 * bits_m))
+
+
+def cross_check(coeff: np.ndarray, fun_type: int, bits_m: int) -> bool:
+    """Совпадают ли аналитические счётчики пар с перебором и лежит ли доля в границах"""
+    counts = pair_collision_counts(coeff, fun_type, bits_m)
+    brute, rate = brute_force_pair_counts(coeff, fun_type, bits_m)
+    states = float(1 << (2 * bits_m))
+    upper = np.triu(counts, 1)
+    lower_bound = float(upper.max(initial=0)) / states
+    upper_bound = min(1.0, float(upper.sum()) / states)
+    return bool(np.array_equal(counts, brute)) and lower_bound <= rate <= upper_bound
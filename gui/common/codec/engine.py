@@ -0,0 +1,911 @@
+"""
+LightCrypto GUI - Эталонный движок цифрового кодека на NumPy
+Побитово повторяет DigitalCodec::encodeMessage/decodeMessage из src/digital_codec.cpp
+"""
+
+import hashlib
+import math
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+SHA256_BYTES = 32
+
+# Сколько слов декодируется за один векторный блок
+DECODE_BLOCK_WORDS = 1 << 18
+# Минимальный блок на поток при параллельном декодировании
+DECODE_MIN_THREAD_WORDS = 1 << 14
+
+# Предел кеша состояний кодера (x, y) -> результат проверки коллизий
+ENCODE_STATE_CACHE_LIMIT = 1 << 16
+
+# Для малых Q C++ кодер ищет коллизии простым перебором, для больших - через хеш-таблицу.
+# Эти варианты по-разному определяют minDupIdx, поэтому граница должна совпадать с C++.
+SIMPLE_SEARCH_MAX_FUNCS = 4
+
+_CSV_NUMBER = re.compile(r'\s*([+-]?\d+)')
+
+BytesLike = Union[bytes, bytearray, memoryview, np.ndarray]
+
+
+@dataclass
+class CodecParams:
+    """Параметры кодека (аналог digitalcodec::CodecParams)"""
+    bits_m: int = 8
+    bits_q: int = 6
+    fun_type: int = 1
+    h1: int = 7
+    h2: int = 23
+    info_instead_of_rand: bool = True
+    stats_mode: bool = False
+    decode_threads: int = 1  # потоков для декодирования потока (0 = все ядра)
+    packed_wire: bool = False  # плотный формат кадра: ровно M бит на слово (packWords)
+    state_header: bool = False  # кадр начинается с состояний (h1, h2) кодера (stateHeader)
+
+    def validate(self):
+        """Проверка диапазонов, как в DigitalCodec::configure()"""
+        if not (1 <= self.bits_m <= 31):
+            raise ValueError('bitsM must be in 1..31')
+        if not (1 <= self.bits_q <= 16):
+            raise ValueError('bitsQ must be in 1..16')
+        if not (1 <= self.fun_type <= 5):
+            raise ValueError('funType must be 1..5')
+        if self.decode_threads < 0:
+            raise ValueError('decodeThreads must be >= 0')
+
+
+def coeff_columns(fun_type: int) -> int:
+    """Количество столбцов COEFF для типа функции"""
+    return 4 if fun_type == 5 else 3
+
+
+def bytes_per_symbol(bits_m: int) -> int:
+    """Число байт на одно M-битное слово (как DigitalCodec::bytesPerSymbol)"""
+    return (bits_m + 7) // 8
+
+
+def wrap_m(values, bits_m: int) -> np.ndarray:
+    """
+    Приведение к M-битному знаковому кольцу (two's complement) через маски
+
+    Args:
+        values: Целое или массив знаковых целых (int32/int64, тип сохраняется)
+        bits_m: Разрядность M
+
+    Returns:
+        Массив в диапазоне [-2^(M-1), 2^(M-1)-1]
+    """
+    v = np.asarray(values)
+    if v.dtype.kind != 'i':
+        v = v.astype(np.int64)
+    mask = v.dtype.type((1 << bits_m) - 1)
+    sign = v.dtype.type(1 << (bits_m - 1))
+    with np.errstate(over='ignore'):
+        return ((v + sign) & mask) - sign
+
+
+def _wrap_int(value: int, bits_m: int) -> int:
+    """Скалярный вариант wrap_m для состояний"""
+    mod = 1 << bits_m
+    r = value % mod
+    return r - mod if r >= (mod >> 1) else r
+
+
+def load_coefficients_csv(csv_path: str, fun_type: int, bits_q: int) -> np.ndarray:
+    """
+    Загрузка матрицы COEFF по правилам DigitalCodec::loadCoefficientsCSV
+
+    Args:
+        csv_path: Путь к CSV файлу
+        fun_type: Тип функции (1..5), определяет число столбцов
+        bits_q: Q, число строк должно быть ровно 2^Q
+
+    Returns:
+        Массив int64 формы (2^Q, 3 или 4)
+    """
+    cols = coeff_columns(fun_type)
+    rows = []
+    with open(csv_path, 'r') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip():
+                continue
+            if line.startswith('#'):
+                continue
+            row = []
+            for cell in line.split(','):
+                cell = cell.split(';', 1)[0].strip(' \t')
+                if not cell:
+                    continue
+                match = _CSV_NUMBER.match(cell)
+                if not match:
+                    raise ValueError(f'Некорректное число в CSV: {cell!r}')
+                # static_cast<int32_t>(stoll(token))
+                row.append(_wrap_int(int(match.group(1)), 32))
+            if row:
+                if len(row) != cols:
+                    raise ValueError('CSV row has wrong number of columns')
+                rows.append(row)
+    if len(rows) != (1 << bits_q):
+        raise ValueError('CSV rows != 2^Q')
+    return np.array(rows, dtype=np.int64)
+
+
+def ring_dtype(bits_m: int):
+    """
+    Беззнаковый тип для вычислений в кольце: переполнение в нём идёт по модулю
+    2^8/2^16/2^32, что кратно 2^M, поэтому достаточно одной маски в конце.
+    """
+    if bits_m <= 8:
+        return np.uint8
+    if bits_m <= 16:
+        return np.uint16
+    return np.uint32
+
+
+_RING_MASKS = {np.uint8: 0xFF, np.uint16: 0xFFFF, np.uint32: 0xFFFFFFFF}
+
+# Те же многочлены на целых Python (точная арифметика, приведение к M битам в конце)
+_PYTHON_FUNS = {
+    1: lambda r, x, y: r[0] * x + r[1] * y + r[2],
+    2: lambda r, x, y: r[0] * x * x + r[1] * y + r[2],
+    3: lambda r, x, y: r[0] * x * x + r[1] * y * y + r[2],
+    4: lambda r, x, y: r[0] * x * x * x + r[1] * y * y + r[2],
+    5: lambda r, x, y: r[0] * x + r[1] * x * y + r[2] * y + r[3],
+}
+
+# До скольких функций RR одного состояния считается на целых Python, а не в NumPy
+PYTHON_EVAL_MAX_FUNCS = 16
+
+
+def to_ring(values, dtype) -> np.ndarray:
+    """Перевод знаковых значений в беззнаковый тип кольца (по модулю)"""
+    dtype = np.dtype(dtype).type
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        # Приведение целых типов в NumPy отбрасывает старшие разряды
+        return values.astype(dtype)
+    return (values.astype(np.int64) & _RING_MASKS[dtype]).astype(dtype)
+
+
+def monomials(fun_type: int, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    Одночлены от (x, y), при которых стоят коэффициенты строки COEFF
+
+    Любой funType линеен по коэффициентам: f = Σ coeff[i]·mono[i] + coeff[-1],
+    поэтому одночлены считаются один раз на состояние, а не на каждую функцию.
+    """
+    with np.errstate(over='ignore'):
+        if fun_type == 1:    # a*x + b*y + q
+            return x, y
+        if fun_type == 2:    # a*x^2 + b*y + q
+            return x * x, y
+        if fun_type == 3:    # a*x^2 + b*y^2 + q
+            return x * x, y * y
+        if fun_type == 4:    # a*x^3 + b*y^2 + q
+            return x * x * x, y * y
+        if fun_type == 5:    # a*x + b*x*y + c*y + q
+            return x, x * y, y
+    raise ValueError('funType must be 1..5')
+
+
+def evaluate_ring(coeff_ring: np.ndarray, fun_type: int, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    DigitalCodingFun в беззнаковом кольце без промежуточных wrapM
+
+    Args:
+        coeff_ring: COEFF в типе ring_dtype (2^Q, cols)
+        fun_type: Тип функции 1..5
+        x, y: Состояния в том же типе, форма (..., 1) для трансляции по функциям
+
+    Returns:
+        Значения по модулю 2^8/2^16/2^32 (ещё не приведённые к M битам)
+    """
+    result = coeff_ring[:, -1]
+    with np.errstate(over='ignore'):
+        for i, mono in enumerate(monomials(fun_type, x, y)):
+            result = result + coeff_ring[:, i] * mono
+    return result
+
+
+def evaluate_functions(coeff: np.ndarray, fun_type: int, bits_m: int, x, y) -> np.ndarray:
+    """
+    Векторное вычисление DigitalCodingFun для всех 2^Q функций
+
+    Args:
+        coeff: Матрица COEFF (2^Q, cols)
+        fun_type: Тип функции 1..5
+        bits_m: Разрядность M
+        x: Состояние h1 (скаляр или массив)
+        y: Состояние h2 (скаляр или массив той же формы)
+
+    Returns:
+        Массив int64 формы shape(x) + (2^Q,) со значениями RR
+    """
+    dtype = ring_dtype(bits_m)
+    raw = evaluate_ring(to_ring(coeff, dtype), fun_type,
+                        to_ring(x, dtype)[..., None], to_ring(y, dtype)[..., None])
+    return wrap_m(raw.astype(np.int64), bits_m)
+
+
+def find_collision(rr: List[int]) -> Tuple[bool, int]:
+    """
+    Поиск коллизии среди RR с тем же minDupIdx, что и в encodeSymbols
+
+    Returns:
+        Tuple (есть коллизия, minDupIdx); при отсутствии коллизий minDupIdx = 2^Q
+    """
+    fun_count = len(rr)
+    if fun_count <= SIMPLE_SEARCH_MAX_FUNCS:
+        # Первая пара (i, j) в порядке перебора i < j
+        for i in range(fun_count):
+            for j in range(i + 1, fun_count):
+                if rr[i] == rr[j]:
+                    return True, j
+        return False, fun_count
+    # Первый индекс, значение которого уже встречалось раньше
+    seen = set()
+    for j, value in enumerate(rr):
+        if value in seen:
+            return True, j
+        seen.add(value)
+    return False, fun_count
+
+
+def pack_bytes_to_symbols(data: BytesLike, bits_q: int) -> np.ndarray:
+    """
+    Векторный аналог ByteSymbolReader: байты -> Q-битные символы (LSB first)
+
+    Как и в C++, символы хранятся в uint8, поэтому при Q > 8 старшие биты теряются.
+    """
+    raw = np.frombuffer(memoryview(data).cast('B'), dtype=np.uint8)
+    bits = np.unpackbits(raw, bitorder='little')
+    count = -(-bits.size // bits_q)
+    padded = np.zeros(count * bits_q, dtype=np.uint8)
+    padded[:bits.size] = bits
+    low = padded.reshape(count, bits_q)[:, :min(bits_q, 8)]
+    if low.shape[1] < 8:
+        low = np.pad(low, ((0, 0), (0, 8 - low.shape[1])))
+    return np.packbits(low, axis=1, bitorder='little').reshape(count)
+
+
+def unpack_symbols_to_bytes(symbols: np.ndarray, bits_q: int, expected_len: int) -> bytes:
+    """
+    Векторный аналог ByteSymbolWriter: Q-битные символы -> байты
+
+    Неполный последний байт дополняется нулями, результат обрезается до expected_len.
+    """
+    symbols = np.asarray(symbols, dtype=np.uint8)
+    bits = np.unpackbits(symbols[:, None], axis=1, bitorder='little')
+    if bits_q <= 8:
+        bits = bits[:, :bits_q]
+    else:
+        bits = np.pad(bits, ((0, 0), (0, bits_q - 8)))
+    return np.packbits(bits.reshape(-1), bitorder='little')[:expected_len].tobytes()
+
+
+def words_to_bytes(words: np.ndarray, bits_m: int) -> bytes:
+    """Сериализация M-битных слов в little-endian по bytesPerSymbol() байт (toBytes)"""
+    bps = bytes_per_symbol(bits_m)
+    u = (np.asarray(words, dtype=np.int64) & ((1 << bits_m) - 1)).astype('<u4')
+    return u.view(np.uint8).reshape(-1, 4)[:, :bps].tobytes()
+
+
+def bytes_to_words(data: BytesLike, bits_m: int) -> np.ndarray:
+    """Десериализация слов с расширением знака (fromBytes); неполный хвост отбрасывается"""
+    bps = bytes_per_symbol(bits_m)
+    raw = np.frombuffer(memoryview(data).cast('B'), dtype=np.uint8)
+    count = raw.size // bps
+    if bps == 3:
+        padded = np.zeros((count, 4), dtype=np.uint8)
+        padded[:, :3] = raw[:count * 3].reshape(count, 3)
+        raw = padded.reshape(-1)
+        bps = 4
+    unsigned = raw[:count * bps].view({1: np.uint8, 2: '<u2', 4: '<u4'}[bps])
+    return wrap_m(unsigned.astype(np.int32), bits_m)
+
+
+def _word_bits(words: np.ndarray, bits_m: int) -> np.ndarray:
+    """Биты слов подряд, по M на слово (LSB first)"""
+    u = (np.asarray(words, dtype=np.int64) & ((1 << bits_m) - 1)).astype('<u4')
+    bits = np.unpackbits(u.view(np.uint8).reshape(-1, 4), axis=1, bitorder='little')
+    return bits[:, :bits_m].reshape(-1)
+
+
+def _bits_to_words(bits: np.ndarray, bits_m: int) -> np.ndarray:
+    """Обратное к _word_bits: целые группы по M бит -> слова с расширением знака"""
+    rows = bits[:bits.size - bits.size % bits_m].reshape(-1, bits_m)
+    full = np.zeros((rows.shape[0], 32), dtype=np.uint8)
+    full[:, :bits_m] = rows
+    unsigned = np.packbits(full, axis=1, bitorder='little').view('<u4').reshape(-1)
+    return wrap_m(unsigned.astype(np.int32), bits_m)
+
+
+def packed_wire_bytes(words: int, bits_m: int) -> int:
+    """Размер плотной записи words слов (packedWireBytes)"""
+    return -(-words * bits_m // 8)
+
+
+def pack_words(words: np.ndarray, bits_m: int) -> bytes:
+    """Плотная сериализация (packWords): ровно M бит на слово, последний байт дополняется нулями"""
+    return np.packbits(_word_bits(words, bits_m), bitorder='little').tobytes()
+
+
+def unpack_words(data: BytesLike, bits_m: int, count: int = -1) -> np.ndarray:
+    """
+    Десериализация плотной записи (unpackWords)
+
+    Args:
+        count: Число слов (-1 = все целые слова; при M < 8 дополнение последнего байта
+            может дать лишнее слово, поэтому декодер берёт число слов из длины кадра)
+    """
+    raw = np.frombuffer(memoryview(data).cast('B'), dtype=np.uint8)
+    bits = np.unpackbits(raw, bitorder='little')
+    available = bits.size // bits_m
+    count = available if count < 0 else min(count, available)
+    return _bits_to_words(bits[:count * bits_m], bits_m)
+
+
+class DigitalCodec:
+    """
+    Эталонная реализация DigitalCodec на NumPy
+
+    Состояния кодера и декодера сохраняются между сообщениями, как в C++.
+    Случайные подстановки при коллизиях берутся из собственного генератора
+    (seed задаётся для воспроизводимости), остальное совпадает с C++ побитово.
+
+    Это эталон для проверки и инструментов анализа, а не рабочий кодек: на 1 ядре
+    (32 КБ, M = 8, Q = 2) кодирование - около 0.06 МБ/с по COEFF и 0.5 МБ/с по
+    таблицам, декодирование (векторное, блоками) - 3-6 МБ/с. Кодирование -
+    последовательная цепочка состояний (см. encode_symbols); для потоков данных
+    используется NativeCodec.
+    """
+
+    def __init__(self, params: Optional[CodecParams] = None, seed: Optional[int] = None):
+        self.params = CodecParams()
+        self.coeff: Optional[np.ndarray] = None
+        self._coeff_ring: Optional[np.ndarray] = None
+        self._coeff_rows: List[tuple] = []
+        self.enc_h1 = 0
+        self.enc_h2 = 0
+        self.dec_h1 = 0
+        self.dec_h2 = 0
+        self.stats: Dict[str, int] = {}
+        self._rng = np.random.default_rng(seed)
+        self._state_cache: Dict[Tuple[int, int], tuple] = {}
+        self.tables = None
+        self._table_views: Optional[tuple] = None
+        if params is not None:
+            self.configure(params)
+
+    @classmethod
+    def from_csv(cls, csv_path: str, params: CodecParams, seed: Optional[int] = None,
+                 use_tables: bool = False) -> 'DigitalCodec':
+        """
+        Создание кодека сразу с коэффициентами из CSV
+
+        Args:
+            csv_path: Путь к CSV с коэффициентами
+            params: Параметры кодека
+            seed: Seed генератора случайных подстановок
+            use_tables: Подключить предвычисленные таблицы из кеша (только M ≤ 8)
+        """
+        codec = cls(params, seed=seed)
+        codec.load_coefficients_csv(csv_path)
+        if use_tables:
+            from .tables import load_tables
+            codec.use_tables(load_tables(csv_path, params.fun_type, params.bits_q, params.bits_m))
+        return codec
+
+    @property
+    def fun_count(self) -> int:
+        return 1 << self.params.bits_q
+
+    def configure(self, params: CodecParams):
+        """Установка параметров и сброс состояний (DigitalCodec::configure)"""
+        params.validate()
+        self.params = params
+        self.coeff = None
+        self._coeff_ring = None
+        self._coeff_rows = []
+        self._state_cache.clear()
+        self.use_tables(None)
+        self.reset()
+
+    def load_coefficients_csv(self, csv_path: str):
+        """Загрузка коэффициентов из CSV (DigitalCodec::loadCoefficientsCSV)"""
+        self.set_coefficients(load_coefficients_csv(csv_path, self.params.fun_type, self.params.bits_q))
+
+    def set_coefficients(self, coeff: np.ndarray):
+        """Установка матрицы COEFF напрямую (2^Q строк, 3 или 4 столбца)"""
+        coeff = np.asarray(coeff, dtype=np.int64)
+        if coeff.shape != (self.fun_count, coeff_columns(self.params.fun_type)):
+            raise ValueError('COEFF shape does not match Q/funType')
+        self.coeff = coeff
+        self._coeff_ring = to_ring(coeff, ring_dtype(self.params.bits_m))
+        self._coeff_rows = [tuple(row) for row in coeff.tolist()]
+        self._state_cache.clear()
+        self.use_tables(None)
+
+    def use_tables(self, tables):
+        """
+        Подключение предвычисленных таблиц (CodecTables) для кодирования
+
+        Таблицы должны быть построены для тех же коэффициентов; None отключает их.
+        """
+        if tables is not None and (tables.bits_m, tables.bits_q, tables.fun_type) != (
+                self.params.bits_m, self.params.bits_q, self.params.fun_type):
+            raise ValueError('Таблицы построены для других M/Q/funType')
+        self.tables = tables
+        self._state_cache.clear()
+        if tables is None:
+            self._table_views = None
+        else:
+            # memoryview отдаёт int без накладных расходов скаляров NumPy;
+            # третья - RR как беззнаковые M-битные слова (для M = 8 это тот же буфер)
+            rr = np.ascontiguousarray(tables.rr).reshape(-1)
+            words = rr.view(np.uint8)
+            if self.params.bits_m < 8:
+                words = words & np.uint8((1 << self.params.bits_m) - 1)
+            self._table_views = (memoryview(rr), memoryview(np.ascontiguousarray(tables.min_dup)),
+                                 memoryview(words))
+
+    def reset(self):
+        """Сброс состояний к h1/h2 и обнуление статистики"""
+        self.sync_states(self.params.h1, self.params.h2)
+        self.reset_stats()
+
+    def sync_states(self, h1: int, h2: int):
+        """Синхронизация состояний кодера и декодера (DigitalCodec::syncStates)"""
+        self.enc_h1 = _wrap_int(h1, self.params.bits_m)
+        self.enc_h2 = _wrap_int(h2, self.params.bits_m)
+        self.dec_h1 = self.enc_h1
+        self.dec_h2 = self.enc_h2
+
+    def reset_stats(self):
+        """Обнуление агрегированных метрик"""
+        self.stats = {
+            'encoded_symbols': 0,
+            'encode_collisions': 0,
+            'encode_random_fallbacks': 0,
+            'encode_direct_info': 0,
+            'decoded_symbols': 0,
+            'decode_direct_info': 0,
+            'decode_skips': 0,
+        }
+
+    def evaluate(self, x, y) -> np.ndarray:
+        """RR для состояний (x, y): форма shape(x) + (2^Q,)"""
+        return wrap_m(self.evaluate_masked(x, y).astype(np.int64), self.params.bits_m)
+
+    def evaluate_masked(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """RR как беззнаковые M-битные значения (для сравнения со словами без знакового расширения)"""
+        if self._coeff_ring is None:
+            raise RuntimeError('load coefficients before encoding/decoding')
+        dtype = self._coeff_ring.dtype
+        raw = evaluate_ring(self._coeff_ring, self.params.fun_type,
+                            to_ring(x, dtype)[..., None], to_ring(y, dtype)[..., None])
+        return raw & dtype.type((1 << self.params.bits_m) - 1)
+
+    def _evaluate_state(self, x: int, y: int) -> List[int]:
+        """RR одного состояния кодера списком целых"""
+        if self.fun_count > PYTHON_EVAL_MAX_FUNCS:
+            return self.evaluate(x, y).tolist()
+        fun = _PYTHON_FUNS[self.params.fun_type]
+        bits_m = self.params.bits_m
+        return [_wrap_int(fun(row, x, y), bits_m) for row in self._coeff_rows]
+
+    def _state_info(self, x: int, y: int) -> tuple:
+        """Результат проверки коллизий для состояния кодера (кешируется)"""
+        key = (x, y)
+        info = self._state_cache.get(key)
+        if info is None:
+            rr = self._evaluate_state(x, y)
+            collision, min_dup = find_collision(rr)
+            info = (rr, collision, min_dup, frozenset(rr) if collision else None)
+            if len(self._state_cache) >= ENCODE_STATE_CACHE_LIMIT:
+                self._state_cache.clear()
+            self._state_cache[key] = info
+        return info
+
+    def _table_row_set(self, row: int) -> frozenset:
+        """Множество RR строки таблицы (кешируется, нужно только при коллизиях)"""
+        rr_set = self._state_cache.get(row)
+        if rr_set is None:
+            fun_count = self.fun_count
+            rr_set = frozenset(self._table_views[0][row * fun_count:(row + 1) * fun_count])
+            self._state_cache[row] = rr_set
+        return rr_set
+
+    def _random_word(self, rr_set: frozenset) -> int:
+        """Случайное слово вне RR (и вне 1..2^Q в режиме InfoInsteadOfRand)"""
+        bits_m = self.params.bits_m
+        lo = -(1 << (bits_m - 1))
+        hi = (1 << (bits_m - 1)) - 1
+        info = self.params.info_instead_of_rand
+        fun_count = self.fun_count
+        while True:
+            value = int(self._rng.integers(lo, hi, endpoint=True))
+            if value not in rr_set and (not info or value < 1 or value > fun_count):
+                return value
+
+    def encode_symbols(self, symbols: np.ndarray) -> np.ndarray:
+        """
+        Кодирование Q-битных символов (DigitalCodec::encodeSymbols)
+
+        Следующее состояние зависит от только что выданного слова, поэтому
+        цепочка идёт по одному символу в цикле Python, и NumPy её не ускоряет:
+        по таблицам (M ≤ 8) в цикле остаётся только выборка слова, всё прочее
+        считается векторно (_encode_symbols_tables).
+
+        Returns:
+            Массив int64 закодированных M-битных слов
+        """
+        if self._table_views is not None:
+            return self._encode_symbols_tables(symbols)
+        fun_count = self.fun_count
+        info_mode = self.params.info_instead_of_rand
+        out = []
+        x, y = self.enc_h1, self.enc_h2
+        collisions = fallbacks = direct = 0
+
+        for sym in np.asarray(symbols, dtype=np.int64).tolist():
+            if sym >= fun_count:
+                sym %= fun_count
+            rr, collision, min_dup, rr_set = self._state_info(x, y)
+            nxt = rr[sym]
+            if collision:
+                collisions += 1
+            if collision and sym >= min_dup:
+                direct_val = sym + 1
+                if direct_val not in rr_set and info_mode:
+                    nxt = direct_val
+                    direct += 1
+                else:
+                    nxt = self._random_word(rr_set)
+                    fallbacks += 1
+            out.append(nxt)
+            x, y = nxt, x
+        out = np.array(out, dtype=np.int64)
+
+        self.enc_h1, self.enc_h2 = x, y
+        if self.params.stats_mode:
+            self.stats['encoded_symbols'] += len(out)
+            self.stats['encode_collisions'] += collisions
+            self.stats['encode_random_fallbacks'] += fallbacks
+            self.stats['encode_direct_info'] += direct
+        return out
+
+    def _encode_symbols_tables(self, symbols: np.ndarray) -> np.ndarray:
+        """
+        encode_symbols по таблицам: в цикле только выборка слова по номеру строки
+
+        Состояние хранится сразу номером строки ((x << M) | y), слова - беззнаковые;
+        знаковые слова и число коллизий считаются векторно после цикла.
+        """
+        fun_count = self.fun_count
+        info_mode = self.params.info_instead_of_rand
+        bits_m = self.params.bits_m
+        mask = (1 << bits_m) - 1
+        _, table_min_dup, table_words = self._table_views
+        syms = np.asarray(symbols, dtype=np.int64) % fun_count
+        out = []
+        unwrapped = []
+        row = ((self.enc_h1 & mask) << bits_m) | (self.enc_h2 & mask)
+        fallbacks = direct = 0
+
+        for sym in syms.tolist():
+            min_dup = table_min_dup[row]
+            if sym < min_dup:
+                word = table_words[row * fun_count + sym]
+            else:
+                rr_set = self._table_row_set(row)
+                direct_val = sym + 1
+                if direct_val not in rr_set and info_mode:
+                    word = direct_val & mask
+                    direct += 1
+                    if direct_val > mask >> 1:
+                        # Как в encodeSymbols, слово остаётся sym + 1 без приведения к знаковому
+                        unwrapped.append((len(out), direct_val))
+                else:
+                    word = self._random_word(rr_set) & mask
+                    fallbacks += 1
+            out.append(word)
+            row = (word << bits_m) | (row >> bits_m)
+        words = np.array(out, dtype=np.int64)
+        result = wrap_m(words, bits_m)
+        for pos, value in unwrapped:
+            result[pos] = value
+
+        history = np.empty(words.size + 2, dtype=np.int64)
+        history[0] = self.enc_h2 & mask
+        history[1] = self.enc_h1 & mask
+        history[2:] = words
+        if words.size > 1:
+            self.enc_h1, self.enc_h2 = int(result[-1]), int(result[-2])
+        elif words.size:
+            self.enc_h1, self.enc_h2 = int(result[-1]), self.enc_h1
+        if self.params.stats_mode:
+            rows = (history[1:-1] << bits_m) | history[:-2]
+            min_dups = np.frombuffer(table_min_dup, dtype=np.int32)[rows]
+            self.stats['encoded_symbols'] += words.size
+            self.stats['encode_collisions'] += int(np.count_nonzero(min_dups < fun_count))
+            self.stats['encode_random_fallbacks'] += fallbacks
+            self.stats['encode_direct_info'] += direct
+        return result
+
+    def decode_words(self, words: np.ndarray) -> np.ndarray:
+        """
+        Декодирование M-битных слов (DigitalCodec::decodeSymbols)
+
+        Returns:
+            Массив uint8 декодированных символов (пропуски удалены)
+        """
+        positions, direct = self._decode_positions(words)
+        keep = positions >= 0
+        if self.params.stats_mode:
+            decoded = int(np.count_nonzero(keep))
+            self.stats['decoded_symbols'] += decoded
+            self.stats['decode_direct_info'] += int(np.count_nonzero(direct))
+            self.stats['decode_skips'] += positions.size - decoded
+        # static_cast<uint8_t>(matched)
+        return (positions[keep] & 0xFF).astype(np.uint8)
+
+    def decode_positions(self, words: np.ndarray) -> np.ndarray:
+        """
+        Символ для каждого принятого слова без удаления пропусков
+
+        Состояние декодера продвигается так же, как в decode_words; нужно для
+        сравнения с переданными символами по позициям (моделирование канала).
+
+        Returns:
+            Массив int32: индекс символа или -1 для пропущенного слова
+        """
+        return self._decode_positions(words)[0]
+
+    def _decode_positions(self, words: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Состояние декодера - это два предыдущих принятых слова, поэтому (x, y)
+        для всех позиций известны заранее и RR считается блоками целиком.
+
+        Returns:
+            Tuple (символы по позициям, -1 = пропуск; маска прямых передач Info)
+        """
+        words = np.asarray(words, dtype=np.int32)
+        count = words.size
+        if count == 0:
+            return np.empty(0, dtype=np.int32), np.zeros(0, dtype=bool)
+        history = np.empty(count + 2, dtype=np.int32)
+        history[0] = self.dec_h2
+        history[1] = self.dec_h1
+        history[2:] = words
+        matched = self._match_words(words, history[1:-1], history[:-2])
+
+        fun_count = self.fun_count
+        direct = (matched < 0) & (words >= 1) & (words <= fun_count)
+        if not self.params.info_instead_of_rand:
+            direct[:] = False
+        positions = np.where(direct, words - 1, matched).astype(np.int32)
+
+        self.dec_h1 = int(history[-1])
+        self.dec_h2 = int(history[-2])
+        return positions, direct
+
+    def _match_words(self, words: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Индекс первой функции, давшей observed, или -1
+
+        Позиции независимы (окно x, y, observed известно заранее), поэтому поток
+        режется на блоки, которые при decode_threads != 1 считаются в пуле потоков
+        (NumPy отпускает GIL на больших массивах).
+        """
+        count = words.size
+        matched = np.full(count, -1, dtype=np.int32)
+        threads = self.params.decode_threads or os.cpu_count() or 1
+        block = DECODE_BLOCK_WORDS
+        if threads > 1:
+            block = min(block, max(DECODE_MIN_THREAD_WORDS, -(-count // threads)))
+        ranges = [(start, min(count, start + block)) for start in range(0, count, block)]
+        if threads > 1 and len(ranges) > 1:
+            with ThreadPoolExecutor(max_workers=min(threads, len(ranges))) as pool:
+                for _ in pool.map(lambda r: self._match_block(words, x, y, matched, *r), ranges):
+                    pass
+        else:
+            for start, stop in ranges:
+                self._match_block(words, x, y, matched, start, stop)
+        return matched
+
+    def _match_block(self, words: np.ndarray, x: np.ndarray, y: np.ndarray,
+                     matched: np.ndarray, start: int, stop: int):
+        """
+        Сопоставление блока [start, stop) с RR на месте в matched
+
+        Функции перебираются от последней к первой, так что при совпадении
+        нескольких RR остаётся наименьший индекс (как первое вхождение в rrMap).
+        """
+        dtype = self._coeff_ring.dtype.type
+        mask = dtype((1 << self.params.bits_m) - 1)
+        coeff = self._coeff_ring
+        observed = to_ring(words[start:stop], dtype) & mask
+        monos = monomials(self.params.fun_type, to_ring(x[start:stop], dtype), to_ring(y[start:stop], dtype))
+        block = matched[start:stop]
+        with np.errstate(over='ignore'):
+            for ff in range(self.fun_count - 1, -1, -1):
+                value = coeff[ff, 0] * monos[0]
+                for i in range(1, len(monos)):
+                    value += coeff[ff, i] * monos[i]
+                value += coeff[ff, -1]
+                value &= mask
+                block[value == observed] = ff
+
+    def _wire_bytes(self, words: np.ndarray) -> bytes:
+        """Слова в формате кадра: плотно (packed_wire) или по bytesPerSymbol() байт"""
+        if self.params.packed_wire:
+            return pack_words(words, self.params.bits_m)
+        return words_to_bytes(words, self.params.bits_m)
+
+    def encode_message(self, data: BytesLike, use_hash: bool = False) -> bytes:
+        """
+        Кодирование сообщения: [len (2 байта LE)] + закодированные слова
+        (с state_header первые два слова - состояния кодера перед кадром)
+
+        Args:
+            data: Исходные байты
+            use_hash: Добавить SHA-256 перед данными
+
+        Returns:
+            Кадр в том же формате, что DigitalCodec::encodeMessage
+        """
+        payload = bytes(data)
+        if use_hash:
+            payload = hashlib.sha256(payload).digest() + payload
+        length = len(payload)
+        symbols = pack_bytes_to_symbols(payload, self.params.bits_q)
+        state = (self.enc_h1, self.enc_h2)
+        words = self.encode_symbols(symbols)
+        if self.params.state_header:
+            words = np.concatenate((np.array(state, dtype=words.dtype), words))
+        return bytes((length & 0xFF, (length >> 8) & 0xFF)) + self._wire_bytes(words)
+
+    def decode_message(self, framed: BytesLike, expected_len: int = 0, use_hash: bool = False) -> bytes:
+        """
+        Декодирование кадра encode_message
+
+        Args:
+            framed: Кадр [len (2 байта LE)] + слова
+            expected_len: Длина результата (0 = взять из кадра)
+            use_hash: Проверить и отрезать SHA-256
+
+        Returns:
+            Декодированные байты (b'' если кадр короче заголовка
+            или, с state_header, двух слов состояний)
+        """
+        view = memoryview(framed).cast('B')
+        if len(view) < 2:
+            return b''
+        length = view[0] | (view[1] << 8)
+        if expected_len != 0:
+            length = expected_len
+        header_words = 2 if self.params.state_header else 0
+        if self.params.packed_wire:
+            words = unpack_words(view[2:], self.params.bits_m, -(-length * 8 // self.params.bits_q) + header_words)
+        else:
+            words = bytes_to_words(view[2:], self.params.bits_m)
+        if len(words) < header_words:
+            return b''
+        if header_words:
+            # Состояния из кадра заменяют текущие, как в DigitalCodec::decodeMessageInto
+            self.dec_h1, self.dec_h2 = int(words[0]), int(words[1])
+            words = words[header_words:]
+        decoded = unpack_symbols_to_bytes(self.decode_words(words), self.params.bits_q, length)
+
+        if use_hash:
+            if len(decoded) < SHA256_BYTES:
+                print('❌ Декодированный буфер слишком мал для проверки хеша!', file=sys.stderr)
+                return b''
+            data = decoded[SHA256_BYTES:]
+            if hashlib.sha256(data).digest() != decoded[:SHA256_BYTES]:
+                print('⚠️  Хеш не совпадает в decode_message — данные могут быть повреждены!', file=sys.stderr)
+            return data
+        return decoded
+
+    def encode_stream(self, chunks: Iterable[BytesLike]) -> Iterator[bytes]:
+        """
+        Потоковое кодирование (аналог StreamEncoder)
+
+        Блоки режутся по границе lcm(8, Q) бит, хвост переносится в следующий блок,
+        поэтому результат не зависит от размеров блоков и совпадает с
+        encode_message() всего входа без 2-байтового заголовка.
+
+        Args:
+            chunks: Итерируемые блоки исходных байт произвольного размера
+
+        Yields:
+            Закодированные слова очередного блока
+        """
+        bits_q = self.params.bits_q
+        align = bits_q // math.gcd(8, bits_q)  # байт в целом числе символов
+        carry = b''
+        wire = np.empty(0, dtype=np.uint8)  # packed_wire: биты неполного выходного байта
+
+        def emit(words: np.ndarray) -> bytes:
+            nonlocal wire
+            if not self.params.packed_wire:
+                return words_to_bytes(words, self.params.bits_m)
+            bits = np.concatenate((wire, _word_bits(words, self.params.bits_m)))
+            whole = bits.size - bits.size % 8
+            wire = bits[whole:]
+            return np.packbits(bits[:whole], bitorder='little').tobytes()
+
+        for chunk in chunks:
+            data = carry + bytes(chunk)
+            whole = len(data) - len(data) % align
+            carry = data[whole:]
+            if whole:
+                out = emit(self.encode_symbols(pack_bytes_to_symbols(data[:whole], bits_q)))
+                if out:
+                    yield out
+        if carry:
+            # Последний неполный символ дополняется нулями, как в ByteSymbolReader
+            out = emit(self.encode_symbols(pack_bytes_to_symbols(carry, bits_q)))
+            if out:
+                yield out
+        if wire.size:
+            yield np.packbits(wire, bitorder='little').tobytes()
+
+    def decode_stream(self, chunks: Iterable[BytesLike], total_len: int = 0) -> Iterator[bytes]:
+        """
+        Потоковое декодирование вывода encode_stream (аналог StreamDecoder)
+
+        Args:
+            chunks: Блоки закодированных байт произвольного размера
+            total_len: Длина исходных данных (0 = неизвестна, биты дополнения отбрасываются;
+                при packed_wire и M < 8 нужна, чтобы отбросить слово из дополнения последнего байта)
+
+        Yields:
+            Декодированные байты очередного блока
+        """
+        bits_q = self.params.bits_q
+        bps = bytes_per_symbol(self.params.bits_m)
+        align = 8 // math.gcd(8, bits_q)  # символов в целом числе байт
+        pending = b''
+        wire = np.empty(0, dtype=np.uint8)  # packed_wire: биты неполного входного слова
+        symbols = np.empty(0, dtype=np.uint8)
+        produced = 0
+        for chunk in chunks:
+            if self.params.packed_wire:
+                bits = np.concatenate((wire, np.unpackbits(np.frombuffer(bytes(chunk), dtype=np.uint8),
+                                                           bitorder='little')))
+                words = _bits_to_words(bits, self.params.bits_m)
+                wire = bits[words.size * self.params.bits_m:]
+            else:
+                data = pending + bytes(chunk)
+                whole = len(data) - len(data) % bps
+                pending = data[whole:]
+                words = bytes_to_words(data[:whole], self.params.bits_m)
+            if not words.size:
+                continue
+            decoded = self.decode_words(words)
+            symbols = np.concatenate((symbols, decoded))
+            ready = symbols.size - symbols.size % align
+            out = unpack_symbols_to_bytes(symbols[:ready], bits_q, ready * bits_q // 8)
+            symbols = symbols[ready:]
+            if total_len:
+                out = out[:max(0, total_len - produced)]
+            produced += len(out)
+            if out:
+                yield out
+        if symbols.size:
+            # Неполный байт нужен только если известная длина ещё не набрана
+            limit = symbols.size * bits_q // 8
+            if total_len:
+                limit = min(-(-symbols.size * bits_q // 8), total_len - produced)
+            out = unpack_symbols_to_bytes(symbols, bits_q, max(0, limit))
+            if out:
+                yield out
@@ -0,0 +1,288 @@
+"""
+LightCrypto GUI - Привязка к C++ DigitalCodec через libdigitalcodec.so
+Вызов рабочего кодека из Python без запуска tap_encrypt (C ABI из src/digital_codec_c.h)
+"""
+
+import ctypes
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ..constants import CODEC_SHARED_LIB
+from .engine import BytesLike, CodecParams
+
+# Должна совпадать с LC_CODEC_API_VERSION
+NATIVE_API_VERSION = 5
+
+LC_CODEC_EINVAL = -1
+LC_CODEC_ERUNTIME = -2
+LC_CODEC_ENOSPC = -3
+
+_STATS_FIELDS = (
+    'encoded_symbols',
+    'encode_collisions',
+    'encode_random_fallbacks',
+    'encode_direct_info',
+    'decoded_symbols',
+    'decode_direct_info',
+    'decode_skips',
+    'collision_cache_hits',
+    'collision_cache_misses',
+)
+
+
+class _Params(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_int32) for name in (
+        'bits_m', 'bits_q', 'fun_type', 'h1', 'h2', 'info_instead_of_rand',
+        'debug_mode', 'stats_mode', 'decode_threads', 'encode_table_symbols', 'compiled_kernel',
+        'packed_wire', 'state_header', 'certified_fast_path', 'collision_cache_bits', 'simd_level')] + [
+        ('random_seed', ctypes.c_uint64)]
+
+
+class _Stats(ctypes.Structure):
+    _fields_ = [(name, ctypes.c_uint64) for name in _STATS_FIELDS]
+
+
+_lib_cache: Dict[str, ctypes.CDLL] = {}
+
+
+def load_library(path: str = CODEC_SHARED_LIB) -> ctypes.CDLL:
+    """
+    Загрузка libdigitalcodec.so и объявление сигнатур (один раз на путь)
+
+    Raises:
+        OSError: Библиотека не найдена или несовместимой версии
+    """
+    lib = _lib_cache.get(path)
+    if lib is not None:
+        return lib
+    lib = ctypes.CDLL(path)
+
+    handle = ctypes.c_void_p
+    buf = ctypes.c_void_p
+    size = ctypes.c_size_t
+    lib.lc_codec_api_version.restype = ctypes.c_int
+    lib.lc_codec_create.restype = handle
+    lib.lc_codec_destroy.argtypes = [handle]
+    lib.lc_codec_last_error.argtypes = [handle]
+    lib.lc_codec_last_error.restype = ctypes.c_char_p
+    lib.lc_codec_configure.argtypes = [handle, ctypes.POINTER(_Params)]
+    lib.lc_codec_load_csv.argtypes = [handle, ctypes.c_char_p]
+    lib.lc_codec_kernel_active.argtypes = [handle]
+    lib.lc_codec_certified.argtypes = [handle]
+    lib.lc_codec_encode_bound.argtypes = [handle, size, ctypes.c_int]
+    lib.lc_codec_encode_bound.restype = size
+    lib.lc_codec_decode_bound.argtypes = [buf, size, size]
+    lib.lc_codec_decode_bound.restype = size
+    lib.lc_codec_encode_message.argtypes = [handle, buf, size, ctypes.c_int, buf, size]
+    lib.lc_codec_encode_message.restype = ctypes.c_int64
+    lib.lc_codec_decode_message.argtypes = [handle, buf, size, size, ctypes.c_int, buf, size]
+    lib.lc_codec_decode_message.restype = ctypes.c_int64
+    lib.lc_codec_reset.argtypes = [handle]
+    lib.lc_codec_sync_states.argtypes = [handle, ctypes.c_int32, ctypes.c_int32]
+    lib.lc_codec_get_states.argtypes = [handle] + [ctypes.POINTER(ctypes.c_int32)] * 4
+    lib.lc_codec_get_stats.argtypes = [handle, ctypes.POINTER(_Stats)]
+    lib.lc_codec_reset_stats.argtypes = [handle]
+
+    version = lib.lc_codec_api_version()
+    if version != NATIVE_API_VERSION:
+        raise OSError(f'{path}: версия C ABI {version}, ожидалась {NATIVE_API_VERSION}')
+    _lib_cache[path] = lib
+    return lib
+
+
+def _as_bytes_array(data: BytesLike) -> np.ndarray:
+    """Представление любого объекта с buffer protocol как uint8 без копирования"""
+    return np.frombuffer(memoryview(data).cast('B'), dtype=np.uint8)
+
+
+def _pointer(array: np.ndarray) -> Optional[int]:
+    """Адрес данных массива для ctypes (NULL для пустого)"""
+    return array.ctypes.data if array.size else None
+
+
+class NativeCodec:
+    """
+    C++ DigitalCodec в текущем процессе
+
+    Интерфейс повторяет DigitalCodec из engine.py (encode_message/decode_message,
+    sync_states, stats), но работу выполняет libdigitalcodec.so. Входные данные
+    передаются указателем на буфер вызывающего без копирования; результат можно
+    записать в собственный буфер через аргумент out.
+    """
+
+    def __init__(self, params: Optional[CodecParams] = None, lib_path: str = CODEC_SHARED_LIB, **options):
+        self._lib = load_library(lib_path)
+        self._handle = self._lib.lc_codec_create()
+        if not self._handle:
+            raise MemoryError('lc_codec_create failed')
+        self.params = CodecParams()
+        if params is not None:
+            self.configure(params, **options)
+
+    @classmethod
+    def from_csv(cls, csv_path: str, params: CodecParams, lib_path: str = CODEC_SHARED_LIB,
+                 **options) -> 'NativeCodec':
+        """Создание кодека сразу с коэффициентами из CSV (options - аргументы configure)"""
+        codec = cls(params, lib_path=lib_path, **options)
+        codec.load_coefficients_csv(csv_path)
+        return codec
+
+    def close(self):
+        """Освобождение C++ объекта"""
+        if self._handle:
+            self._lib.lc_codec_destroy(self._handle)
+            self._handle = None
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self) -> 'NativeCodec':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _check(self, code: int) -> int:
+        """Перевод кода ошибки C ABI в исключение"""
+        if code >= 0:
+            return code
+        message = self._lib.lc_codec_last_error(self._handle).decode('utf-8', 'replace')
+        if code == LC_CODEC_EINVAL:
+            raise ValueError(message)
+        if code == LC_CODEC_ENOSPC:
+            raise BufferError(message)
+        raise RuntimeError(message)
+
+    def configure(self, params: CodecParams, debug_mode: bool = False, encode_table_symbols: int = 0,
+                  compiled_kernel: bool = False, random_seed: int = 0, certified_fast_path: bool = True,
+                  collision_cache_bits: int = 16, simd_level: int = -1):
+        """
+        Установка параметров и сброс состояний (DigitalCodec::configure)
+
+        Args:
+            params: Параметры кодека
+            debug_mode: Пошаговый вывод C++ кодека
+            encode_table_symbols: k-символьные таблицы кодирования (0 = выкл.)
+            compiled_kernel: Собирать ядро под ключ при загрузке CSV (src/codec_kernel.h)
+            random_seed: Seed случайных подстановок (0 = std::random_device)
+            certified_fast_path: Загружать <csv>.cert и не проверять коллизии для инъективного ключа
+            collision_cache_bits: Кеш коллизий на 2^bits состояний (0 = выкл.)
+            simd_level: Векторное вычисление RR (-1 = лучшее для процессора, 0 = скалярное, 1 = SSE4.1, 2 = AVX2)
+        """
+        params.validate()
+        native = _Params(
+            bits_m=params.bits_m, bits_q=params.bits_q, fun_type=params.fun_type,
+            h1=params.h1, h2=params.h2,
+            info_instead_of_rand=int(params.info_instead_of_rand),
+            debug_mode=int(debug_mode), stats_mode=int(params.stats_mode),
+            decode_threads=params.decode_threads, encode_table_symbols=encode_table_symbols,
+            compiled_kernel=int(compiled_kernel), packed_wire=int(params.packed_wire),
+            state_header=int(params.state_header), certified_fast_path=int(certified_fast_path),
+            collision_cache_bits=collision_cache_bits, simd_level=simd_level, random_seed=random_seed)
+        self._check(self._lib.lc_codec_configure(self._handle, ctypes.byref(native)))
+        self.params = params
+
+    def load_coefficients_csv(self, csv_path: str):
+        """Загрузка коэффициентов из CSV (DigitalCodec::loadCoefficientsCSV)"""
+        self._check(self._lib.lc_codec_load_csv(self._handle, csv_path.encode('utf-8')))
+
+    @property
+    def kernel_active(self) -> bool:
+        """Используется ли собранное под ключ ядро"""
+        return bool(self._lib.lc_codec_kernel_active(self._handle))
+
+    @property
+    def certified(self) -> bool:
+        """Загружен ли подходящий сертификат инъективности (<csv>.cert)"""
+        return bool(self._lib.lc_codec_certified(self._handle))
+
+    def _output(self, out, bound: int) -> Tuple[np.ndarray, Optional[bytearray]]:
+        """Буфер результата: переданный вызывающим или новый bytearray размера bound"""
+        if out is not None:
+            view = memoryview(out).cast('B')
+            if view.readonly:
+                raise BufferError('out must be a writable buffer')
+            return np.frombuffer(view, dtype=np.uint8), None
+        owned = bytearray(bound)
+        return np.frombuffer(owned, dtype=np.uint8), owned
+
+    def encode_message(self, data: BytesLike, use_hash: bool = False, out=None):
+        """
+        Кодирование сообщения (DigitalCodec::encodeMessage)
+
+        Args:
+            data: Исходные байты (любой объект с buffer protocol)
+            use_hash: Добавить SHA-256 перед данными
+            out: Необязательный записываемый буфер не меньше encode_bound()
+
+        Returns:
+            bytearray с кадром, либо число записанных в out байт
+        """
+        src = _as_bytes_array(data)
+        dst, owned = self._output(out, self.encode_bound(src.size, use_hash))
+        written = self._check(self._lib.lc_codec_encode_message(
+            self._handle, _pointer(src), src.size, int(use_hash), _pointer(dst), dst.size))
+        if owned is None:
+            return written
+        del dst  # снимаем экспорт буфера, иначе bytearray нельзя укоротить
+        del owned[written:]
+        return owned
+
+    def decode_message(self, framed: BytesLike, expected_len: int = 0, use_hash: bool = False, out=None):
+        """
+        Декодирование кадра (DigitalCodec::decodeMessage)
+
+        Args:
+            framed: Кадр [len (2 байта LE)] + слова
+            expected_len: Длина результата (0 = взять из кадра)
+            use_hash: Проверить и отрезать SHA-256
+            out: Необязательный записываемый буфер не меньше decode_bound()
+
+        Returns:
+            bytearray с данными, либо число записанных в out байт
+        """
+        src = _as_bytes_array(framed)
+        bound = self._lib.lc_codec_decode_bound(_pointer(src), src.size, expected_len)
+        dst, owned = self._output(out, bound)
+        written = self._check(self._lib.lc_codec_decode_message(
+            self._handle, _pointer(src), src.size, expected_len, int(use_hash), _pointer(dst), dst.size))
+        if owned is None:
+            return written
+        del dst  # снимаем экспорт буфера, иначе bytearray нельзя укоротить
+        del owned[written:]
+        return owned
+
+    def encode_bound(self, length: int, use_hash: bool = False) -> int:
+        """Максимальный размер кадра encode_message для length байт"""
+        return self._lib.lc_codec_encode_bound(self._handle, length, int(use_hash))
+
+    def decode_bound(self, framed: BytesLike, expected_len: int = 0) -> int:
+        """Максимальный размер результата decode_message для кадра"""
+        src = _as_bytes_array(framed)
+        return self._lib.lc_codec_decode_bound(_pointer(src), src.size, expected_len)
+
+    def reset(self):
+        """Сброс состояний к h1/h2 и обнуление статистики"""
+        self._lib.lc_codec_reset(self._handle)
+
+    def sync_states(self, h1: int, h2: int):
+        """Синхронизация состояний кодера и декодера (DigitalCodec::syncStates)"""
+        self._lib.lc_codec_sync_states(self._handle, h1, h2)
+
+    def states(self) -> Tuple[int, int, int, int]:
+        """Текущие состояния (enc_h1, enc_h2, dec_h1, dec_h2)"""
+        values = [ctypes.c_int32() for _ in range(4)]
+        self._lib.lc_codec_get_states(self._handle, *(ctypes.byref(v) for v in values))
+        return tuple(v.value for v in values)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Агрегированные метрики (заполняются при stats_mode), ключи как в engine.py"""
+        native = _Stats()
+        self._lib.lc_codec_get_stats(self._handle, ctypes.byref(native))
+        return {name: getattr(native, name) for name in _STATS_FIELDS}
+
+    def reset_stats(self):
+        """Обнуление агрегированных метрик"""
+        self._lib.lc_codec_reset_stats(self._handle)
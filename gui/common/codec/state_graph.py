@@ -0,0 +1,357 @@
+"""
+LightCrypto GUI - Граф переходов состояний кодера
+При фиксированном ключе кодер - конечный автомат над (h1, h2); для малых M
+строятся все переходы, компоненты сильной связности, достижимость и
+стационарная заселённость состояний при равномерных символах
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .analysis import symbol_outcomes
+from .engine import evaluate_ring, load_coefficients_csv, ring_dtype, to_ring, wrap_m
+from .tables import CodecTables, cached_tables
+
+# Граф строится целиком: 2^(2M) состояний, не больше 65536
+GRAPH_MAX_BITS = 8
+# Степенной метод для стационарного распределения
+STATIONARY_MAX_ITER = 20000
+STATIONARY_TOL = 1e-12
+# Состояние считается посещаемым, если его доля больше этого порога
+OCCUPANCY_EPS = 1e-12
+
+
+@dataclass
+class StateGraph:
+    """
+    Переходы кодера: рёбра src → dst с вероятностью prob при равномерном символе
+
+    Случайная подстановка раскрывается в рёбра ко всем допустимым словам
+    (равновероятно, как _random_word в engine.py).
+    """
+    bits_m: int
+    bits_q: int
+    fun_type: int
+    src: np.ndarray
+    dst: np.ndarray
+    prob: np.ndarray
+    collision: np.ndarray      # (состояния,) bool
+    direct: np.ndarray         # (состояния,) доля символов с прямой передачей Info
+    fallback: np.ndarray       # (состояния,) доля символов со случайной подстановкой
+
+    @property
+    def states(self) -> int:
+        return 1 << (2 * self.bits_m)
+
+    def state_index(self, h1: int, h2: int) -> int:
+        """Номер состояния (h1, h2): старшие M бит - h1"""
+        mask = (1 << self.bits_m) - 1
+        return ((h1 & mask) << self.bits_m) | (h2 & mask)
+
+
+@dataclass
+class StateGraphMetrics:
+    """
+    Метрики графа переходов
+
+    bottom_sccs: Замкнутые компоненты (из них нет выхода) - куда в итоге уходит поток:
+                 size, occupancy (стационарная доля), collision_rate (внутри компоненты)
+    effective_states: exp(энтропия) стационарного распределения
+    stationary_*: Доли, взвешенные стационарной заселённостью (долгосрочные)
+    uniform_collision_rate: Доля состояний с коллизией при равномерных состояниях
+    """
+    bits_m: int
+    bits_q: int
+    fun_type: int
+    states: int
+    edges: int
+    scc_count: int
+    largest_scc: int
+    bottom_sccs: List[dict] = field(default_factory=list)
+    reachable_states: int = 0
+    occupied_states: int = 0
+    effective_states: float = 0.0
+    uniform_collision_rate: float = 0.0
+    stationary_collision_rate: float = 0.0
+    stationary_fallback_rate: float = 0.0
+    stationary_direct_rate: float = 0.0
+    iterations: int = 0
+    converged: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def build_state_graph(coeff: np.ndarray, fun_type: int, bits_q: int, bits_m: int,
+                      info_instead_of_rand: bool = True,
+                      tables: Optional[CodecTables] = None) -> StateGraph:
+    """
+    Все переходы кодера для матрицы COEFF (M ≤ GRAPH_MAX_BITS)
+
+    Переход при символе sym: (x, y) → (next, x), где next - RR[sym], sym + 1
+    (InfoInsteadOfRand) или случайное слово вне RR, как в DigitalCodec::encodeSymbols.
+    С tables (таблицы этого ключа) RR и коллизии берутся из них: строки
+    таблиц уже идут в порядке номеров состояний.
+    """
+    if bits_m > GRAPH_MAX_BITS:
+        raise ValueError(f'state graph is limited to M <= {GRAPH_MAX_BITS}')
+    fun_count = 1 << bits_q
+    size = 1 << bits_m
+    mask = size - 1
+    index = np.arange(size * size, dtype=np.int64)
+    x = wrap_m(index >> bits_m, bits_m)
+    y = wrap_m(index & mask, bits_m)
+
+    if tables is not None:
+        if (tables.bits_m, tables.bits_q, tables.fun_type) != (bits_m, bits_q, fun_type):
+            raise ValueError('Таблицы построены для других Q, M или типа функции')
+        rr = np.asarray(tables.rr, dtype=np.int64)
+        min_dup = np.asarray(tables.min_dup)
+    else:
+        dtype = ring_dtype(bits_m)
+        raw = evaluate_ring(to_ring(coeff, dtype), fun_type, to_ring(x, dtype)[:, None], to_ring(y, dtype)[:, None])
+        rr = wrap_m((raw & dtype((1 << bits_m) - 1)).astype(np.int64), bits_m)
+        min_dup = None
+    collision, direct, fallback = symbol_outcomes(rr, info_instead_of_rand, min_dup)
+
+    # Детерминированные переходы: RR[sym] или sym + 1
+    words = np.where(direct, np.arange(1, fun_count + 1)[None, :], rr)
+    keep = ~fallback
+    x_bits = (index >> bits_m)[:, None]
+    src = np.broadcast_to(index[:, None], rr.shape)[keep]
+    dst = (((words & mask) << bits_m) | x_bits)[keep]
+    prob = np.full(src.size, 1.0 / fun_count)
+
+    # Случайные подстановки: равновероятно любое слово вне RR (и вне 1..2^Q при Info)
+    fallback_count = fallback.sum(axis=1)
+    sources = np.flatnonzero(fallback_count)
+    if sources.size:
+        values = np.arange(size, dtype=np.int64)
+        signed = wrap_m(values, bits_m)
+        allowed = ~(rr[sources][:, :, None] == signed[None, None, :]).any(axis=1)
+        if info_instead_of_rand:
+            allowed &= ~((signed >= 1) & (signed <= fun_count))[None, :]
+        rows, cols = np.nonzero(allowed)
+        weight = fallback_count[sources] / fun_count / allowed.sum(axis=1)
+        src = np.concatenate([src, sources[rows]])
+        dst = np.concatenate([dst, (cols << bits_m) | (sources[rows] >> bits_m)])
+        prob = np.concatenate([prob, weight[rows]])
+
+    return StateGraph(bits_m=bits_m, bits_q=bits_q, fun_type=fun_type,
+                      src=src.astype(np.int64), dst=dst.astype(np.int64), prob=prob,
+                      collision=collision, direct=direct.mean(axis=1), fallback=fallback.mean(axis=1))
+
+
+def _csr(src: np.ndarray, dst: np.ndarray, states: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Списки смежности в формате CSR (повторы рёбер не удаляются - на обход не влияют)"""
+    order = np.argsort(src, kind='stable')
+    indptr = np.zeros(states + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=states), out=indptr[1:])
+    return indptr, dst[order]
+
+
+def _reach(indptr: np.ndarray, indices: np.ndarray, start: int, allowed: np.ndarray) -> np.ndarray:
+    """Маска вершин из allowed, достижимых из start (поиск в ширину по фронту)"""
+    seen = np.zeros(indptr.size - 1, dtype=bool)
+    seen[start] = True
+    frontier = np.array([start], dtype=np.int64)
+    while frontier.size:
+        starts = indptr[frontier]
+        lengths = indptr[frontier + 1] - starts
+        # Индексы рёбер всех вершин фронта одним массивом
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        fresh = np.zeros_like(seen)
+        fresh[indices[offsets]] = True
+        fresh &= allowed & ~seen
+        frontier = np.flatnonzero(fresh)
+        seen |= fresh
+    return seen
+
+
+def strongly_connected_components(graph: StateGraph, pivot: Optional[int] = None) -> np.ndarray:
+    """
+    Компоненты сильной связности
+
+    Компонента pivot находится векторно как пересечение прямой и обратной
+    достижимости (обычно это почти весь граф), остальные вершины - итеративным
+    алгоритмом Тарьяна: удаление целой компоненты не меняет остальные.
+
+    Returns:
+        Номер компоненты для каждого состояния
+    """
+    states = graph.states
+    indptr, indices = _csr(graph.src, graph.dst, states)
+    everything = np.ones(states, dtype=bool)
+    pivot = 0 if pivot is None else pivot
+    forward = _reach(indptr, indices, pivot, everything)
+    backward = _reach(*_csr(graph.dst, graph.src, states), pivot, everything)
+    giant = forward & backward
+    if giant.all():
+        return np.zeros(states, dtype=np.int64)
+
+    component = np.where(giant, 0, -1).tolist()
+    indptr = indptr.tolist()
+    indices = indices.tolist()
+    order = [-1] * states
+    low = [0] * states
+    on_stack = [False] * states
+    stack = []
+    counter = 0
+    components = 1
+
+    for root in np.flatnonzero(~giant).tolist():
+        if order[root] >= 0:
+            continue
+        work = [(root, indptr[root])]
+        order[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            node, pos = work[-1]
+            end = indptr[node + 1]
+            # Обход следующего непосещённого соседа (вершины компоненты pivot пропускаются)
+            while pos < end:
+                nxt = indices[pos]
+                pos += 1
+                if component[nxt] == 0:
+                    continue
+                if order[nxt] < 0:
+                    work[-1] = (node, pos)
+                    order[nxt] = low[nxt] = counter
+                    counter += 1
+                    stack.append(nxt)
+                    on_stack[nxt] = True
+                    work.append((nxt, indptr[nxt]))
+                    break
+                if on_stack[nxt] and order[nxt] < low[node]:
+                    low[node] = order[nxt]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+                if low[node] == order[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = components
+                        if member == node:
+                            break
+                    components += 1
+    return np.array(component, dtype=np.int64)
+
+
+def reachable_states(graph: StateGraph, start: int) -> np.ndarray:
+    """Маска состояний, достижимых из start"""
+    indptr, indices = _csr(graph.src, graph.dst, graph.states)
+    return _reach(indptr, indices, start, np.ones(graph.states, dtype=bool))
+
+
+def stationary_distribution(graph: StateGraph, start: Optional[int] = None,
+                            max_iter: int = STATIONARY_MAX_ITER, tol: float = STATIONARY_TOL):
+    """
+    Долгосрочная заселённость состояний (степенной метод)
+
+    Используется «ленивая» цепь (1/2·I + 1/2·P): её предел тот же, но сходимость
+    есть и для периодических циклов.
+
+    Args:
+        start: Начальное состояние (None - равномерное начальное распределение)
+
+    Returns:
+        Tuple (распределение, число итераций, сошлось ли)
+    """
+    states = graph.states
+    if start is None:
+        pi = np.full(states, 1.0 / states)
+    else:
+        pi = np.zeros(states)
+        pi[start] = 1.0
+    for iteration in range(1, max_iter + 1):
+        moved = np.bincount(graph.dst, weights=pi[graph.src] * graph.prob, minlength=states)
+        nxt = 0.5 * (pi + moved)
+        delta = np.abs(nxt - pi).sum()
+        pi = nxt
+        if delta < tol:
+            return pi / pi.sum(), iteration, True
+    return pi / pi.sum(), max_iter, False
+
+
+def analyze_state_graph(coeff: np.ndarray, fun_type: int, bits_q: int, bits_m: int,
+                        info_instead_of_rand: bool = True,
+                        start: Optional[Tuple[int, int]] = None,
+                        tables: Optional[CodecTables] = None) -> StateGraphMetrics:
+    """
+    Метрики графа переходов кодера
+
+    Args:
+        coeff: Матрица COEFF (2^Q, cols)
+        fun_type: Тип функции 1..5
+        bits_q: Q
+        bits_m: M (≤ GRAPH_MAX_BITS)
+        info_instead_of_rand: Режим InfoInsteadOfRand
+        start: Начальные (h1, h2) для достижимости и заселённости (None - все состояния)
+        tables: Таблицы этого ключа: RR и коллизии берутся из них
+
+    Returns:
+        StateGraphMetrics
+    """
+    graph = build_state_graph(coeff, fun_type, bits_q, bits_m, info_instead_of_rand, tables)
+    start_index = None if start is None else graph.state_index(*start)
+
+    pi, iterations, converged = stationary_distribution(graph, start_index)
+    # Самое заселённое состояние лежит в замкнутой компоненте - обычно самой крупной
+    component = strongly_connected_components(graph, pivot=int(np.argmax(pi)))
+    sizes = np.bincount(component)
+    # Замкнутая компонента: ни одно ребро не выходит за её пределы
+    leaving = np.zeros(sizes.size, dtype=bool)
+    outside = component[graph.src] != component[graph.dst]
+    leaving[component[graph.src[outside]]] = True
+
+    collision = graph.collision.astype(np.float64)
+    occupancy = np.bincount(component, weights=pi, minlength=sizes.size)
+    collided = np.bincount(component, weights=collision, minlength=sizes.size)
+
+    bottom = []
+    for comp in np.flatnonzero(~leaving):
+        bottom.append({
+            'size': int(sizes[comp]),
+            'occupancy': float(occupancy[comp]),
+            'collision_rate': float(collided[comp] / sizes[comp]),
+        })
+    bottom.sort(key=lambda item: -item['occupancy'])
+
+    if start_index is None:
+        reachable = graph.states
+    else:
+        reachable = int(np.count_nonzero(reachable_states(graph, start_index)))
+    occupied = pi > OCCUPANCY_EPS
+    entropy = -float(np.sum(pi[occupied] * np.log(pi[occupied])))
+
+    return StateGraphMetrics(
+        bits_m=bits_m, bits_q=bits_q, fun_type=fun_type,
+        states=graph.states, edges=int(graph.src.size),
+        scc_count=int(sizes.size), largest_scc=int(sizes.max()),
+        bottom_sccs=bottom,
+        reachable_states=reachable,
+        occupied_states=int(np.count_nonzero(occupied)),
+        effective_states=float(np.exp(entropy)),
+        uniform_collision_rate=float(collision.mean()),
+        stationary_collision_rate=float(pi @ collision),
+        stationary_fallback_rate=float(pi @ graph.fallback),
+        stationary_direct_rate=float(pi @ graph.direct),
+        iterations=iterations, converged=converged,
+    )
+
+
+def analyze_csv_state_graph(csv_path: str, fun_type: int, bits_q: int, bits_m: int,
+                            info_instead_of_rand: bool = True,
+                            start: Optional[Tuple[int, int]] = None) -> StateGraphMetrics:
+    """analyze_state_graph для CSV в формате loadCoefficientsCSV (по кешу таблиц, где он есть)"""
+    coeff = load_coefficients_csv(csv_path, fun_type, bits_q)
+    tables = cached_tables(csv_path, fun_type, bits_q, bits_m)
+    return analyze_state_graph(coeff, fun_type, bits_q, bits_m, info_instead_of_rand, start, tables)
@@ -0,0 +1,309 @@
+"""
+LightCrypto GUI - Предвычисленные таблицы кодека для малых M
+При M ≤ 8 состояний (h1, h2) всего 2^(2M) (65536 для M=8), поэтому выход
+DigitalCodingFun для всех состояний помещается в таблицу int8 [2^(2M), 2^Q].
+Таблицы строятся один раз на CSV и хранятся на диске как .npy (mmap).
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from ..constants import CODEC_TABLES_CACHE_DIR
+from .engine import (
+    SIMPLE_SEARCH_MAX_FUNCS,
+    evaluate_ring,
+    load_coefficients_csv,
+    ring_dtype,
+    to_ring,
+    wrap_m,
+)
+
+# Таблицы строятся только для M ≤ 8 (значения RR помещаются в int8)
+TABLE_MAX_BITS_M = 8
+# 65536 x 2^10 int8 = 64 МБ; больше таблица на диске не имеет смысла
+TABLE_MAX_BITS_Q = 10
+# Версия формата кеша (меняется при изменении содержимого таблиц)
+TABLE_FORMAT_VERSION = 1
+# Сколько состояний обрабатывается за один проход при построении
+BUILD_BLOCK_STATES = 4096
+# Строки RR короче этого сортируются как int32, а не поразрядно
+RADIX_SORT_MIN_FUNCS = 16
+# Предел элементов RR блока в CodecTables.with_functions
+WITH_FUNCTIONS_BLOCK_ELEMENTS = 1 << 20
+
+_TABLE_FILES = ('rr', 'dup_mask', 'min_dup')
+
+
+def csv_content_hash(csv_path: str) -> str:
+    """SHA-256 содержимого CSV (ключ кеша не зависит от имени и mtime файла)"""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def state_index(h1, h2, bits_m: int = TABLE_MAX_BITS_M):
+    """
+    Номер строки таблицы для состояния (h1, h2)
+
+    Args:
+        h1, h2: Знаковые M-битные состояния (скаляры или массивы)
+        bits_m: Разрядность M
+
+    Returns:
+        ((h1 mod 2^M) << M) | (h2 mod 2^M)
+    """
+    mask = (1 << bits_m) - 1
+    return ((h1 & mask) << bits_m) | (h2 & mask)
+
+
+@dataclass
+class CodecTables:
+    """
+    Таблицы переходов и коллизий одного ключа
+
+    rr: RR всех функций, int8 [2^(2M), 2^Q]
+    dup_mask: Битовая маска функций, чьё значение RR повторяется, uint8 [2^(2M), ceil(2^Q/8)]
+    min_dup: minDupIdx как в encodeSymbols, 2^Q если коллизии нет, int32 [2^(2M)]
+    """
+    bits_m: int
+    bits_q: int
+    fun_type: int
+    rr: np.ndarray
+    dup_mask: np.ndarray
+    min_dup: np.ndarray
+    key: str = ''
+
+    @property
+    def fun_count(self) -> int:
+        return 1 << self.bits_q
+
+    @property
+    def state_count(self) -> int:
+        return 1 << (2 * self.bits_m)
+
+    def has_collision(self) -> np.ndarray:
+        """Булев массив по состояниям: есть ли коллизия RR"""
+        return self.min_dup < self.fun_count
+
+    def duplicates(self, h1: int, h2: int) -> np.ndarray:
+        """Булев массив по функциям: участвует ли RR функции в коллизии"""
+        row = self.dup_mask[state_index(h1, h2, self.bits_m)]
+        return np.unpackbits(row, bitorder='little')[:self.fun_count].astype(bool)
+
+    def lookup(self, h1: int, h2: int) -> np.ndarray:
+        """RR для состояния (h1, h2)"""
+        return self.rr[state_index(h1, h2, self.bits_m)]
+
+    def with_functions(self, coeff: np.ndarray, functions) -> 'CodecTables':
+        """
+        Таблицы ключа, отличающегося от этого только строками COEFF functions
+
+        RR функции зависит только от своей строки COEFF, поэтому пересчитываются
+        лишь эти столбцы RR, а маска повторов и minDupIdx - по готовому RR.
+        Результат в памяти (для перебора ключей-мутаций в keysearch).
+        """
+        functions = np.asarray(sorted(set(int(f) for f in functions)), dtype=np.int64)
+        rr = np.array(self.rr)
+        dup_mask = np.empty_like(self.dup_mask)
+        min_dup = np.empty_like(self.min_dup)
+        dtype = ring_dtype(self.bits_m)
+        coeff_ring = to_ring(np.asarray(coeff)[functions], dtype)
+        mask = dtype((1 << self.bits_m) - 1)
+        # Блоки крупнее, чем при построении: проходов меньше, а для 2^Q ≤ 4 по
+        # 4096 состояний основное время уходило бы на вызовы numpy
+        block = max(BUILD_BLOCK_STATES, WITH_FUNCTIONS_BLOCK_ELEMENTS // self.fun_count)
+        for start in range(0, self.state_count, block):
+            stop = min(self.state_count, start + block)
+            if functions.size:
+                x, y = _state_grid(start, stop, self.bits_m)
+                raw = evaluate_ring(coeff_ring, self.fun_type, to_ring(x, dtype)[:, None], to_ring(y, dtype)[:, None])
+                rr[start:stop, functions] = wrap_m((raw & mask).astype(np.int16), self.bits_m).astype(np.int8)
+            dup_mask[start:stop], min_dup[start:stop] = collision_block(rr[start:stop])
+        return CodecTables(bits_m=self.bits_m, bits_q=self.bits_q, fun_type=self.fun_type,
+                           rr=rr, dup_mask=dup_mask, min_dup=min_dup)
+
+
+def tables_supported(bits_q: int, bits_m: int) -> bool:
+    """Строятся ли таблицы для (Q, M): M ≤ 8 и Q ≤ min(M, TABLE_MAX_BITS_Q)"""
+    return 1 <= bits_m <= TABLE_MAX_BITS_M and 1 <= bits_q <= min(bits_m, TABLE_MAX_BITS_Q)
+
+
+def _state_grid(start: int, stop: int, bits_m: int):
+    """Состояния h1, h2 (знаковые) для строк таблицы start..stop-1"""
+    index = np.arange(start, stop, dtype=np.int64)
+    mask = (1 << bits_m) - 1
+    return wrap_m(index >> bits_m, bits_m), wrap_m(index & mask, bits_m)
+
+
+def _min_dup_simple(rr: np.ndarray) -> np.ndarray:
+    """minDupIdx для 2^Q ≤ 4: j первой пары (i, j) в порядке перебора i < j"""
+    states, fun_count = rr.shape
+    min_dup = np.full(states, fun_count, dtype=np.int32)
+    pairs = [(i, j) for i in range(fun_count) for j in range(i + 1, fun_count)]
+    # В обратном порядке, чтобы первая по порядку пара записалась последней
+    for i, j in reversed(pairs):
+        min_dup[rr[:, i] == rr[:, j]] = j
+    return min_dup
+
+
+def collision_block(rr: np.ndarray):
+    """
+    Маска повторов и minDupIdx для блока состояний
+
+    Устойчивая сортировка строки ставит равные значения подряд в порядке
+    индексов, поэтому все элементы группы, кроме первого, встречались раньше.
+    """
+    states, fun_count = rr.shape
+    if rr.dtype.itemsize < 4 and fun_count < RADIX_SORT_MIN_FUNCS:
+        # Устойчивая сортировка int8/int16 в numpy поразрядная: на коротких строках она в разы медленнее int32
+        rr = rr.astype(np.int32)
+    order = np.argsort(rr, axis=1, kind='stable')
+    ordered = np.take_along_axis(rr, order, axis=1)
+    same_prev = np.zeros(rr.shape, dtype=bool)
+    same_prev[:, 1:] = ordered[:, 1:] == ordered[:, :-1]
+    same_next = np.zeros(rr.shape, dtype=bool)
+    same_next[:, :-1] = same_prev[:, 1:]
+
+    dup = np.zeros(rr.shape, dtype=bool)
+    np.put_along_axis(dup, order, same_prev | same_next, axis=1)
+
+    if fun_count <= SIMPLE_SEARCH_MAX_FUNCS:
+        min_dup = _min_dup_simple(rr)
+    else:
+        later = np.where(same_prev, order, fun_count)
+        min_dup = later.min(axis=1).astype(np.int32)
+    return np.packbits(dup, axis=1, bitorder='little'), min_dup
+
+
+def build_tables(coeff: np.ndarray, fun_type: int, bits_q: int,
+                 bits_m: int = TABLE_MAX_BITS_M, out_dir: Optional[str] = None) -> CodecTables:
+    """
+    Построение таблиц для матрицы COEFF
+
+    Args:
+        coeff: Матрица COEFF (2^Q, cols)
+        fun_type: Тип функции 1..5
+        bits_q: Q
+        bits_m: M (1..8)
+        out_dir: Если задан, таблицы пишутся прямо в .npy файлы этого каталога
+
+    Returns:
+        CodecTables (при out_dir - поверх memmap)
+    """
+    if not 1 <= bits_m <= TABLE_MAX_BITS_M:
+        raise ValueError(f'Таблицы поддерживаются только для M ≤ {TABLE_MAX_BITS_M}')
+    if not tables_supported(bits_q, bits_m):
+        raise ValueError(f'Таблицы поддерживаются только для Q ≤ min(M, {TABLE_MAX_BITS_Q})')
+
+    fun_count = 1 << bits_q
+    states = 1 << (2 * bits_m)
+    shapes = {
+        'rr': ((states, fun_count), np.int8),
+        'dup_mask': ((states, (fun_count + 7) // 8), np.uint8),
+        'min_dup': ((states,), np.int32),
+    }
+    arrays = {}
+    for name, (shape, dtype) in shapes.items():
+        if out_dir is None:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[name] = np.lib.format.open_memmap(
+                os.path.join(out_dir, f'{name}.npy'), mode='w+', dtype=dtype, shape=shape)
+
+    dtype = ring_dtype(bits_m)
+    coeff_ring = to_ring(coeff, dtype)
+    mask = dtype((1 << bits_m) - 1)
+    for start in range(0, states, BUILD_BLOCK_STATES):
+        stop = min(states, start + BUILD_BLOCK_STATES)
+        x, y = _state_grid(start, stop, bits_m)
+        raw = evaluate_ring(coeff_ring, fun_type, to_ring(x, dtype)[:, None], to_ring(y, dtype)[:, None])
+        rr = wrap_m((raw & mask).astype(np.int16), bits_m).astype(np.int8)
+        arrays['rr'][start:stop] = rr
+        arrays['dup_mask'][start:stop], arrays['min_dup'][start:stop] = collision_block(rr)
+
+    for array in arrays.values():
+        if isinstance(array, np.memmap):
+            array.flush()
+    return CodecTables(bits_m=bits_m, bits_q=bits_q, fun_type=fun_type, **arrays)
+
+
+def table_cache_path(csv_path: str, fun_type: int, bits_q: int,
+                     bits_m: int = TABLE_MAX_BITS_M, cache_dir: Optional[str] = None) -> str:
+    """Каталог кеша таблиц для (содержимое CSV, funType, Q, M)"""
+    key = csv_content_hash(csv_path)
+    name = f'{key[:32]}_f{fun_type}_q{bits_q}_m{bits_m}_v{TABLE_FORMAT_VERSION}'
+    return os.path.join(cache_dir or CODEC_TABLES_CACHE_DIR, name)
+
+
+def _open_tables(path: str, fun_type: int, bits_q: int, bits_m: int) -> CodecTables:
+    """Открытие таблиц из кеша через mmap (только чтение)"""
+    arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode='r') for name in _TABLE_FILES}
+    if arrays['rr'].shape != (1 << (2 * bits_m), 1 << bits_q):
+        raise ValueError(f'Повреждённый кеш таблиц: {path}')
+    return CodecTables(bits_m=bits_m, bits_q=bits_q, fun_type=fun_type,
+                       key=os.path.basename(path), **arrays)
+
+
+def load_tables(csv_path: str, fun_type: int, bits_q: int,
+                bits_m: int = TABLE_MAX_BITS_M, cache_dir: Optional[str] = None) -> CodecTables:
+    """
+    Таблицы для ключа из CSV: из кеша, либо построение и сохранение
+
+    Сборка идёт во временный каталог рядом с кешем и переименовывается
+    целиком, так что параллельные процессы не видят недописанных файлов.
+
+    Args:
+        csv_path: Путь к CSV с коэффициентами
+        fun_type: Тип функции 1..5
+        bits_q: Q
+        bits_m: M (1..8)
+        cache_dir: Каталог кеша (по умолчанию CODEC_TABLES_CACHE_DIR)
+
+    Returns:
+        CodecTables поверх memmap
+    """
+    path = table_cache_path(csv_path, fun_type, bits_q, bits_m, cache_dir)
+    if os.path.isdir(path):
+        try:
+            return _open_tables(path, fun_type, bits_q, bits_m)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Кеш таблиц будет перестроен: {e}", file=sys.stderr)
+            shutil.rmtree(path, ignore_errors=True)
+
+    coeff = load_coefficients_csv(csv_path, fun_type, bits_q)
+    parent = os.path.dirname(path)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.build_', dir=parent)
+    try:
+        build_tables(coeff, fun_type, bits_q, bits_m, out_dir=tmp_dir)
+        try:
+            os.rename(tmp_dir, path)
+        except OSError:
+            # Другой процесс успел сохранить те же таблицы
+            if not os.path.isdir(path):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return _open_tables(path, fun_type, bits_q, bits_m)
+
+
+def cached_tables(csv_path: str, fun_type: int, bits_q: int, bits_m: int,
+                  cache_dir: Optional[str] = None) -> Optional[CodecTables]:
+    """
+    load_tables для (Q, M), где таблицы поддерживаются, иначе None
+
+    Для анализа, графа состояний, автоподбора и моделирования канала: RR и
+    коллизии всех состояний читаются из кеша вместо вычисления по COEFF.
+    """
+    if not tables_supported(bits_q, bits_m):
+        return None
+    return load_tables(csv_path, fun_type, bits_q, bits_m, cache_dir)
@@ -225,6 +225,30 @@ class ConfigManager:
         """Сохранить состояние сбора статистики"""
         self.set('custom_debug_stats', enabled)
     
+    def get_custom_packed_wire(self) -> bool:
+        """Получить состояние плотного формата кадров"""
+        return self.get('custom_packed_wire', False)
+    
+    def set_custom_packed_wire(self, enabled: bool):
+        """Сохранить состояние плотного формата кадров"""
+        self.set('custom_packed_wire', enabled)
+    
+    def get_custom_state_header(self) -> bool:
+        """Получить состояние заголовка кадра с состояниями кодера"""
+        return self.get('custom_state_header', False)
+    
+    def set_custom_state_header(self, enabled: bool):
+        """Сохранить состояние заголовка кадра с состояниями кодера"""
+        self.set('custom_state_header', enabled)
+    
+    def get_custom_codec_lanes(self) -> int:
+        """Получить число полос кодека (0 = одна цепочка состояний)"""
+        return self.get('custom_codec_lanes', 0)
+    
+    def set_custom_codec_lanes(self, lanes: int):
+        """Сохранить число полос кодека"""
+        self.set('custom_codec_lanes', lanes)
+    
     def get_custom_inject_errors(self) -> bool:
         """Получить состояние внесения ошибок"""
         return self.get('custom_inject_errors', False)
@@ -0,0 +1,24 @@
+"""
+LightCrypto GUI - Проверка соответствия реализаций кодека
+Побайтное сравнение ускоренных путей codec_cli с эталоном и замер скорости
+"""
+
+from .harness import (
+    VARIANTS,
+    ConformanceConfig,
+    ConformanceResult,
+    check_configuration,
+    run_conformance,
+    split_frames,
+    write_results,
+)
+
+__all__ = [
+    'VARIANTS',
+    'ConformanceConfig',
+    'ConformanceResult',
+    'check_configuration',
+    'run_conformance',
+    'split_frames',
+    'write_results',
+]
@@ -0,0 +1,65 @@
+"""
+LightCrypto GUI - Проверка соответствия кодека из командной строки
+
+Запуск из каталога gui (после сборки build/codec_cli):
+    python3 -m common.conformance --cases 5 --out conformance.csv
+    python3 -m common.conformance --reference-cli /path/to/old/codec_cli --csv Q=4.csv
+"""
+
+import argparse
+import sys
+
+from ..constants import CIPHER_KEYS_DIR, CODEC_CLI
+from .harness import CONFORMANCE_M_CANDIDATES, VARIANTS, ConformanceConfig, run_conformance, write_results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Побайтная сверка путей кодека и замер скорости')
+    parser.add_argument('--cli', default=CODEC_CLI, help='Проверяемый codec_cli')
+    parser.add_argument('--reference-cli', default='', help='Эталонный codec_cli (по умолчанию - базовый режим --cli)')
+    parser.add_argument('--keys-dir', default=CIPHER_KEYS_DIR, help='Каталог ключей')
+    parser.add_argument('--csv', action='append', default=[], help='Имя CSV в каталоге ключей (можно несколько)')
+    parser.add_argument('--m', default=','.join(str(m) for m in CONFORMANCE_M_CANDIDATES),
+                        help='Проверяемые M через запятую')
+    parser.add_argument('--variants', default=','.join(VARIANTS), help='Ускоренные пути через запятую')
+    parser.add_argument('--cases', type=int, default=3, help='Случайных входов на конфигурацию')
+    parser.add_argument('--max-len', type=int, default=4096, help='Максимальная длина входа (байт)')
+    parser.add_argument('--bench-bytes', type=int, default=1 << 20, help='Данных для замера скорости (0 = без замера)')
+    parser.add_argument('--no-hash', action='store_true', help='Без SHA-256 в сообщениях')
+    parser.add_argument('--no-python', action='store_true', help='Без сверки с движком на NumPy')
+    parser.add_argument('--workers', type=int, default=0, help='Потоков (0 = все ядра)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', help='Файл результатов (.json или .csv)')
+    args = parser.parse_args(argv)
+
+    config = ConformanceConfig(cli=args.cli, reference_cli=args.reference_cli, keys_dir=args.keys_dir,
+                               csv_files=args.csv,
+                               m_candidates=[int(m) for m in args.m.split(',') if m.strip()],
+                               variants=[v.strip() for v in args.variants.split(',') if v.strip()],
+                               cases=args.cases, max_len=args.max_len, bench_bytes=args.bench_bytes,
+                               use_hash=not args.no_hash, python_reference=not args.no_python,
+                               workers=args.workers, seed=args.seed)
+
+    def progress(part):
+        for r in part:
+            mark = '✅' if r.mismatches == 0 else '❌'
+            print(f'{mark} {r.csv_name} M={r.bits_m} Q={r.bits_q} fun={r.fun_type} {r.variant}: '
+                  f'{r.cases} входов, расхождений {r.mismatches}, '
+                  f'encode {r.encode_mb_s:.1f} МБ/с, decode {r.decode_mb_s:.1f} МБ/с', flush=True)
+            for failure in r.failures:
+                print(f'   ⚠️ {failure}', flush=True)
+
+    results = run_conformance(config, progress)
+    mismatches = sum(r.mismatches for r in results)
+    if args.out:
+        write_results(results, args.out)
+        print(f'✅ Результаты записаны: {args.out}')
+    if mismatches:
+        print(f'❌ Расхождений: {mismatches}')
+        return 1
+    print(f'✅ Все пути совпадают ({len(results)} проверок)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+LightCrypto GUI - Проверка соответствия и скорости реализаций кодека
+codec_cli (build/codec_cli) со всеми ускоренными путями сравнивается побайтно
+с эталоном: базовым режимом того же или другого бинарника и движком на NumPy.
+Для каждой конфигурации (ключ, M, Q, funType) записывается скорость в МБ/с
+"""
+
+import csv
+import json
+import os
+import re
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..codec.autotune import key_shape
+from ..codec.engine import (CodecParams, DigitalCodec, bytes_per_symbol, bytes_to_words, pack_words,
+                            packed_wire_bytes)
+from ..constants import CIPHER_KEYS_DIR, CODEC_CLI
+
+# Ускоренные пути codec_cli; каждый обязан давать те же байты, что базовый режим
+# (базовый режим использует <csv>.cert, если он есть; 'nocert' - полная проверка коллизий;
+# базовый режим выбирает SIMD по процессору, 'scalar' - без векторных ядер)
+VARIANTS: Dict[str, List[str]] = {
+    'table2': ['--encode-table', '2'],
+    'table4': ['--encode-table', '4'],
+    'kernel': ['--codec-kernel'],
+    'threads': ['--decode-threads', '0'],
+    'nocert': ['--no-cert'],
+    'packed': ['--packed-wire'],
+    'scalar': ['--simd', 'scalar'],
+    # StreamEncoder/StreamDecoder кусками по 7 байт в плотном формате: при M < 8 добивание
+    # последнего байта вмещает целое слово, и поток обязан остановиться на длине сообщения
+    'stream': ['--packed-wire', '--stream', '7'],
+}
+# Пути с другим форматом кадра: эталон для них - кадры базового режима в этом формате
+PACKED_VARIANTS = ('packed', 'stream')
+# Потоковый API работает без хеша: входы с хешем эти пути пропускают
+NO_HASH_VARIANTS = ('stream',)
+# k-символьные таблицы есть только при M ≤ 8
+TABLE_MAX_BITS = 8
+CONFORMANCE_M_CANDIDATES = (6, 7, 8, 12, 16, 24, 31)
+# Длина заголовка кадра и хеша encodeMessage
+FRAME_HEADER = 2
+HASH_BYTES = 32
+# Сколько расхождений сохранять в отчёте на конфигурацию
+MAX_FAILURES_KEPT = 5
+
+_STAT_FIELD = re.compile(r'(\w+)=([-+\d.eE]+)')
+
+
+@dataclass
+class ConformanceConfig:
+    """
+    Параметры прогона
+
+    cases: Случайных входов на конфигурацию (длина, h1/h2, seed, размер сообщения)
+    bench_bytes: Объём данных для замера скорости (0 = без замера)
+    reference_cli: Эталонный бинарник (по умолчанию - базовый режим cli)
+    """
+    cli: str = CODEC_CLI
+    reference_cli: str = ''
+    keys_dir: str = CIPHER_KEYS_DIR
+    csv_files: List[str] = field(default_factory=list)   # пусто = все *.csv
+    m_candidates: List[int] = field(default_factory=lambda: list(CONFORMANCE_M_CANDIDATES))
+    variants: List[str] = field(default_factory=lambda: list(VARIANTS))
+    cases: int = 3
+    max_len: int = 4096
+    bench_bytes: int = 1 << 20
+    use_hash: bool = True
+    python_reference: bool = True
+    workers: int = 0             # 0 = все ядра
+    seed: int = 1
+
+
+@dataclass
+class ConformanceResult:
+    """Итог одной конфигурации и одного пути (variant 'baseline' - эталон и движок NumPy)"""
+    csv_name: str
+    bits_m: int
+    bits_q: int
+    fun_type: int
+    variant: str
+    cases: int
+    mismatches: int
+    encode_mb_s: float = 0.0
+    decode_mb_s: float = 0.0
+    failures: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _run_cli(binary: str, mode: str, args: Sequence[str], data: bytes) -> Tuple[bytes, Dict[str, float]]:
+    """Запуск codec_cli; возвращает stdout и поля строки статистики"""
+    proc = subprocess.run([binary, mode, *args, '--stats'], input=data,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    stderr = proc.stderr.decode('utf-8', 'replace')
+    if proc.returncode != 0:
+        raise RuntimeError(f'{os.path.basename(binary)} {mode}: {stderr.strip()}')
+    stats = {}
+    for line in stderr.splitlines():
+        if line.startswith('📊'):
+            stats = {name: float(value) for name, value in _STAT_FIELD.findall(line)}
+    return proc.stdout, stats
+
+
+def split_frames(framed: bytes, bits_m: int, bits_q: int, packed: bool = False) -> List[bytes]:
+    """Разбиение потока кадров encodeMessage по длинам из заголовков"""
+    frames = []
+    pos = 0
+    bps = bytes_per_symbol(bits_m)
+    while pos + FRAME_HEADER <= len(framed):
+        length = framed[pos] | (framed[pos + 1] << 8)
+        words = -(-length * 8 // bits_q)
+        size = FRAME_HEADER + (packed_wire_bytes(words, bits_m) if packed else words * bps)
+        frames.append(framed[pos:pos + size])
+        pos += size
+    return frames
+
+
+def repack_frames(framed: bytes, bits_m: int, bits_q: int) -> bytes:
+    """Кадры обычного формата -> те же кадры в плотном формате (packedWire)"""
+    return b''.join(frame[:FRAME_HEADER] + pack_words(bytes_to_words(frame[FRAME_HEADER:], bits_m), bits_m)
+                    for frame in split_frames(framed, bits_m, bits_q))
+
+
+def _python_reference(csv_path: str, params: CodecParams, data: bytes, chunk: int, use_hash: bool,
+                      ref_encoded: bytes, fallbacks: int) -> Tuple[List[str], bytes]:
+    """Сверка с движком на NumPy: декодирование всегда, кодирование - если не было случайных подстановок"""
+    problems = []
+    decoder = DigitalCodec.from_csv(csv_path, params)
+    decoded = b''.join(decoder.decode_message(frame, use_hash=use_hash)
+                       for frame in split_frames(ref_encoded, params.bits_m, params.bits_q))
+    if fallbacks == 0:
+        encoder = DigitalCodec.from_csv(csv_path, params)
+        encoded = b''.join(encoder.encode_message(data[pos:pos + chunk], use_hash=use_hash)
+                           for pos in range(0, len(data), chunk))
+        if encoded != ref_encoded:
+            problems.append('python encode differs')
+        if decoded != data:
+            problems.append('roundtrip differs without fallbacks')
+    return problems, decoded
+
+
+def check_configuration(config: ConformanceConfig, csv_name: str, bits_m: int, bits_q: int,
+                        fun_type: int) -> List[ConformanceResult]:
+    """
+    Все случайные входы и замер скорости для одной (ключ, M, Q, funType)
+
+    Returns:
+        ConformanceResult для базового режима и каждого ускоренного пути
+    """
+    csv_path = os.path.join(config.keys_dir, csv_name)
+    reference = config.reference_cli or config.cli
+    variants = [v for v in config.variants
+                if v in VARIANTS and not (v.startswith('table') and bits_m > TABLE_MAX_BITS)]
+    results = {name: ConformanceResult(csv_name, bits_m, bits_q, fun_type, name, 0, 0)
+               for name in ['baseline'] + variants}
+
+    def fail(name: str, message: str):
+        result = results[name]
+        result.mismatches += 1
+        if len(result.failures) < MAX_FAILURES_KEPT:
+            result.failures.append(message)
+
+    # Seed прогона зависит только от конфигурации - повтор воспроизводим
+    rng = np.random.default_rng([config.seed, bits_m, bits_q, fun_type, sum(csv_name.encode())])
+    limit = 1 << (bits_m - 1)
+    max_chunk = 0xFFFF - (HASH_BYTES if config.use_hash else 0)
+    for case in range(config.cases):
+        length = int(rng.integers(0, config.max_len + 1))
+        data = rng.integers(0, 256, size=length, dtype=np.uint8).tobytes()
+        h1, h2 = (int(v) for v in rng.integers(-limit, limit, size=2))
+        seed = int(rng.integers(1, 1 << 62))
+        chunk = int(rng.integers(1, min(max_chunk, max(length, 1)) + 1))
+        use_hash = config.use_hash and bool(rng.integers(0, 2))
+        base_args = ['--csv', csv_path, '--m', str(bits_m), '--q', str(bits_q), '--fun', str(fun_type),
+                     '--h1', str(h1), '--h2', str(h2), '--seed', str(seed), '--chunk', str(chunk)]
+        if use_hash:
+            base_args.append('--hash')
+        label = f'case {case}: len={length} h1={h1} h2={h2} seed={seed} chunk={chunk} hash={int(use_hash)}'
+
+        ref_encoded, ref_stats = _run_cli(reference, 'encode', base_args, data)
+        ref_decoded, _ = _run_cli(reference, 'decode', base_args, ref_encoded)
+        results['baseline'].cases += 1
+        if reference != config.cli:
+            encoded, _ = _run_cli(config.cli, 'encode', base_args, data)
+            decoded, _ = _run_cli(config.cli, 'decode', base_args, ref_encoded)
+            if encoded != ref_encoded or decoded != ref_decoded:
+                fail('baseline', f'{label}: cli differs from reference cli')
+        if config.python_reference:
+            params = CodecParams(bits_m=bits_m, bits_q=bits_q, fun_type=fun_type, h1=h1, h2=h2)
+            fallbacks = int(ref_stats.get('encode_random_fallbacks', 0))
+            problems, py_decoded = _python_reference(csv_path, params, data, chunk, use_hash,
+                                                     ref_encoded, fallbacks)
+            if py_decoded != ref_decoded:
+                problems.append('python decode differs')
+            for problem in problems:
+                fail('baseline', f'{label}: {problem}')
+
+        packed_encoded = (repack_frames(ref_encoded, bits_m, bits_q)
+                          if any(name in PACKED_VARIANTS for name in variants) else b'')
+        for name in variants:
+            if use_hash and name in NO_HASH_VARIANTS:
+                continue
+            results[name].cases += 1
+            expected = packed_encoded if name in PACKED_VARIANTS else ref_encoded
+            encoded, _ = _run_cli(config.cli, 'encode', base_args + VARIANTS[name], data)
+            decoded, _ = _run_cli(config.cli, 'decode', base_args + VARIANTS[name], expected)
+            if encoded != expected:
+                fail(name, f'{label}: encode differs')
+            if decoded != ref_decoded:
+                fail(name, f'{label}: decode differs')
+
+    if config.bench_bytes > 0:
+        data = rng.integers(0, 256, size=config.bench_bytes, dtype=np.uint8).tobytes()
+        base_args = ['--csv', csv_path, '--m', str(bits_m), '--q', str(bits_q), '--fun', str(fun_type),
+                     '--seed', str(config.seed)]
+        for name, result in results.items():
+            args = base_args + VARIANTS.get(name, [])
+            encoded, enc_stats = _run_cli(config.cli, 'encode', args, data)
+            _, dec_stats = _run_cli(config.cli, 'decode', args, encoded)
+            result.encode_mb_s = enc_stats.get('mb_s', 0.0)
+            result.decode_mb_s = dec_stats.get('mb_s', 0.0)
+    return list(results.values())
+
+
+def configurations(config: ConformanceConfig) -> List[Tuple[str, int, int, int]]:
+    """Все (ключ, M, Q, funType) для прогона: M ≥ Q, funType по числу столбцов CSV"""
+    names = config.csv_files or sorted(f for f in os.listdir(config.keys_dir) if f.endswith('.csv'))
+    result = []
+    for name in names:
+        try:
+            shape = key_shape(os.path.join(config.keys_dir, name))
+        except (OSError, UnicodeDecodeError):
+            continue
+        if shape is None:
+            continue
+        bits_q, fun_types = shape
+        for fun_type in fun_types:
+            for bits_m in config.m_candidates:
+                if bits_q <= bits_m <= 31:
+                    result.append((name, bits_m, bits_q, fun_type))
+    return result
+
+
+def run_conformance(config: ConformanceConfig,
+                    progress: Optional[Callable[[List[ConformanceResult]], None]] = None) -> List[ConformanceResult]:
+    """
+    Прогон всех конфигураций в пуле потоков (работа - в дочерних процессах codec_cli)
+
+    Args:
+        config: Параметры прогона
+        progress: Вызывается с результатами каждой завершённой конфигурации
+
+    Returns:
+        Все ConformanceResult
+    """
+    if not os.path.exists(config.cli):
+        raise FileNotFoundError(f'{config.cli} не найден - соберите проект (cmake --build build)')
+    workers = config.workers or os.cpu_count() or 1
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(check_configuration, config, *item) for item in configurations(config)]
+        for future in futures:
+            part = future.result()
+            results.extend(part)
+            if progress:
+                progress(part)
+    return results
+
+
+def write_results(results: List[ConformanceResult], path: str):
+    """Запись результатов: .json - все поля, иначе CSV (строка на конфигурацию и путь)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump([r.to_dict() for r in results], f, indent=2, ensure_ascii=False)
+        return
+    fields = [name for name in ConformanceResult.__dataclass_fields__ if name != 'failures']
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        for r in results:
+            row = r.to_dict()
+            writer.writerow([row[name] for name in fields])
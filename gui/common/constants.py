@@ -11,10 +11,13 @@ GUI_ROOT = os.path.join(PROJECT_ROOT, 'gui')
 BUILD_DIR = os.path.join(PROJECT_ROOT, 'build')
 CIPHER_KEYS_DIR = os.path.join(PROJECT_ROOT, 'CipherKeys')
 PROFILES_DIR = os.path.join(GUI_ROOT, 'profiles', 'custom_codec')
+CODEC_TABLES_CACHE_DIR = os.path.expanduser('~/.cache/lightcrypto/codec_tables')
+CODEC_SHARED_LIB = os.path.join(BUILD_DIR, 'libdigitalcodec.so')
 
 # Исполняемые файлы
 TAP_ENCRYPT = os.path.join(BUILD_DIR, 'tap_encrypt')
 TAP_DECRYPT = os.path.join(BUILD_DIR, 'tap_decrypt')
+CODEC_CLI = os.path.join(BUILD_DIR, 'codec_cli')
 
 # Скрипты setup
 SETUP_TAP_A = os.path.join(PROJECT_ROOT, 'setup_tap_A.sh')
@@ -66,6 +69,8 @@ LAUNCHER_HEIGHT = 400
 ROLE_SELECTOR_WIDTH = 500
 ROLE_SELECTOR_HEIGHT = 350
 
+KEY_HEATMAP_SIZE = 256  # Тепловая карта коллизий ключа (пикселей)
+
 # === ОТСТУПЫ И ИНТЕРВАЛЫ ===
 PADDING_SECTION = 0
 PADDING_INTERNAL = 8
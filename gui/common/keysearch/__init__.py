@@ -0,0 +1,24 @@
+"""
+LightCrypto GUI - Поиск ключей кодека
+Генерация CipherKeys с минимумом коллизий для заданных (M, Q, funType)
+"""
+
+from .search import (
+    Candidate,
+    KeySearch,
+    SearchConfig,
+    default_key_name,
+    load_checkpoint,
+    score_metrics,
+    write_key_csv,
+)
+
+__all__ = [
+    'Candidate',
+    'KeySearch',
+    'SearchConfig',
+    'default_key_name',
+    'load_checkpoint',
+    'score_metrics',
+    'write_key_csv',
+]
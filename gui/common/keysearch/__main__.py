@@ -0,0 +1,51 @@
+"""
+LightCrypto GUI - Поиск ключей кодека из командной строки
+
+Запуск из каталога gui:
+    python3 -m common.keysearch --m 8 --q 2 --fun 1 --rounds 100 --checkpoint search.json
+"""
+
+import argparse
+import sys
+
+from .search import KeySearch, SearchConfig, write_key_csv
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Поиск коэффициентов CipherKeys с минимумом коллизий')
+    parser.add_argument('--m', type=int, default=8, help='Разрядность M')
+    parser.add_argument('--q', type=int, default=2, help='Бит информации на символ Q')
+    parser.add_argument('--fun', type=int, default=1, help='funType 1..5')
+    parser.add_argument('--rounds', type=int, default=50, help='Число раундов (всего, с учётом контрольной точки)')
+    parser.add_argument('--candidates', type=int, default=64, help='Кандидатов на задачу')
+    parser.add_argument('--workers', type=int, default=0, help='Процессов (0 = все ядра)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--bound', type=int, default=0, help='Граница |коэффициента| (0 = весь M-битный диапазон)')
+    parser.add_argument('--no-info', action='store_true', help='Оценка без InfoInsteadOfRand')
+    parser.add_argument('--checkpoint', help='JSON контрольной точки (продолжение поиска, если существует)')
+    parser.add_argument('--out', help='Путь CSV (по умолчанию CipherKeys/Q=<Q>_search_fun<F>_M<M>.csv)')
+    parser.add_argument('--overwrite', action='store_true', help='Перезаписать существующий CSV')
+    args = parser.parse_args(argv)
+
+    config = SearchConfig(bits_m=args.m, bits_q=args.q, fun_type=args.fun,
+                          info_instead_of_rand=not args.no_info, rounds=args.rounds,
+                          candidates_per_task=args.candidates, workers=args.workers,
+                          seed=args.seed, coeff_bound=args.bound)
+
+    def progress(search: KeySearch):
+        m = search.best.metrics
+        print(f"🔎 Раунд {search.round}/{config.rounds}: проверено {search.evaluated}, "
+              f"лучший score={search.best.score:.6g} (коллизии {m['collision_rate']:.4%}, "
+              f"подстановки {m['fallback_rate']:.4%}, Info {m['direct_rate']:.4%})", flush=True)
+
+    best = KeySearch(config, args.checkpoint).run(progress)
+    if best is None:
+        print('❌ Кандидаты не проверялись (rounds = 0?)', file=sys.stderr)
+        return 1
+    path = write_key_csv(best, config, args.out, args.overwrite)
+    print(f'✅ Ключ записан: {path}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
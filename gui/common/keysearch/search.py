@@ -0,0 +1,272 @@
+"""
+LightCrypto GUI - Поиск коэффициентов CipherKeys
+Случайный поиск с мутациями лучшего ключа в пуле процессов; цель - минимум
+случайных подстановок, коллизий и прямых передач Info по всем состояниям
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from ..codec.analysis import ANALYSIS_MAX_STATES, KeyMetrics, analyze_key
+from ..codec.engine import coeff_columns
+from ..codec.tables import build_tables, tables_supported
+from ..constants import CIPHER_KEYS_DIR
+
+# Версия формата файла контрольной точки
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class SearchConfig:
+    """
+    Параметры поиска
+
+    weights: Веса (fallback_rate, collision_rate, direct_rate) в целевой функции
+    coeff_bound: Коэффициенты берутся из [-bound, bound] (0 = весь M-битный диапазон)
+    mutation_share: Доля кандидатов, получаемых мутацией лучшего ключа
+    """
+    bits_m: int = 8
+    bits_q: int = 2
+    fun_type: int = 1
+    info_instead_of_rand: bool = True
+    rounds: int = 50
+    candidates_per_task: int = 64
+    tasks_per_round: int = 0     # 0 = по числу процессов
+    workers: int = 0             # 0 = все ядра
+    seed: int = 1
+    max_states: int = ANALYSIS_MAX_STATES
+    coeff_bound: int = 0
+    mutation_share: float = 0.5
+    weights: List[float] = field(default_factory=lambda: [1.0, 0.1, 0.01])
+
+    def validate(self):
+        """Проверка диапазонов, как в CodecParams.validate()"""
+        if not (1 <= self.bits_m <= 31):
+            raise ValueError('bitsM must be in 1..31')
+        if not (1 <= self.bits_q <= 16):
+            raise ValueError('bitsQ must be in 1..16')
+        if not (1 <= self.fun_type <= 5):
+            raise ValueError('funType must be 1..5')
+        if self.candidates_per_task < 1 or self.rounds < 0:
+            raise ValueError('candidates_per_task >= 1 and rounds >= 0 required')
+
+    def same_key_space(self, other: 'SearchConfig') -> bool:
+        """Совместимость контрольной точки: те же M, Q, funType и режим Info"""
+        return (self.bits_m, self.bits_q, self.fun_type, self.info_instead_of_rand) == (
+            other.bits_m, other.bits_q, other.fun_type, other.info_instead_of_rand)
+
+
+@dataclass
+class Candidate:
+    """Ключ-кандидат и его оценка"""
+    coeff: List[List[int]]
+    score: float
+    metrics: dict
+
+
+def score_metrics(metrics: KeyMetrics, weights) -> float:
+    """Целевая функция (меньше - лучше)"""
+    return (weights[0] * metrics.fallback_rate
+            + weights[1] * metrics.collision_rate
+            + weights[2] * metrics.direct_rate)
+
+
+def _coeff_limit(config: SearchConfig) -> int:
+    """Граница коэффициентов: арифметика идёт по модулю 2^M, шире брать бессмысленно"""
+    full = (1 << (config.bits_m - 1)) - 1 if config.bits_m > 1 else 1
+    return min(config.coeff_bound, full) if config.coeff_bound > 0 else full
+
+
+def _random_coeff(rng: np.random.Generator, config: SearchConfig) -> np.ndarray:
+    limit = _coeff_limit(config)
+    shape = (1 << config.bits_q, coeff_columns(config.fun_type))
+    return rng.integers(-limit, limit, size=shape, endpoint=True, dtype=np.int64)
+
+
+def _mutate(rng: np.random.Generator, parent: np.ndarray, config: SearchConfig) -> np.ndarray:
+    """Замена одного-двух коэффициентов лучшего ключа"""
+    limit = _coeff_limit(config)
+    child = parent.copy()
+    for _ in range(int(rng.integers(1, 3))):
+        row = int(rng.integers(0, child.shape[0]))
+        col = int(rng.integers(0, child.shape[1]))
+        child[row, col] = int(rng.integers(-limit, limit, endpoint=True))
+    return child
+
+
+def evaluate_batch(config_dict: dict, seed: int, parent: Optional[List[List[int]]]) -> Candidate:
+    """
+    Оценка candidates_per_task кандидатов в рабочем процессе
+
+    Args:
+        config_dict: SearchConfig в виде словаря (передаётся между процессами)
+        seed: Seed генератора кандидатов этой задачи
+        parent: Лучший ключ для мутаций (None - только случайные кандидаты)
+
+    Returns:
+        Лучший кандидат задачи
+    """
+    config = SearchConfig(**config_dict)
+    rng = np.random.default_rng(seed)
+    parent_arr = None if parent is None else np.array(parent, dtype=np.int64)
+    # Таблицы лучшего ключа строятся один раз на задачу (M ≤ 8): у мутации
+    # пересчитываются только RR изменённых функций, коллизии - по готовому RR
+    parent_tables = None
+    if parent_arr is not None and tables_supported(config.bits_q, config.bits_m):
+        parent_tables = build_tables(parent_arr, config.fun_type, config.bits_q, config.bits_m)
+    best = None
+    for _ in range(config.candidates_per_task):
+        tables = None
+        if parent_arr is not None and rng.random() < config.mutation_share:
+            coeff = _mutate(rng, parent_arr, config)
+            if parent_tables is not None:
+                changed = np.flatnonzero((coeff != parent_arr).any(axis=1))
+                tables = parent_tables.with_functions(coeff, changed)
+        else:
+            coeff = _random_coeff(rng, config)
+        # Одинаковый seed выборки состояний - оценки сравнимы между задачами
+        metrics = analyze_key(coeff, config.fun_type, config.bits_q, config.bits_m,
+                              config.info_instead_of_rand, config.max_states, seed=config.seed,
+                              tables=tables)
+        score = score_metrics(metrics, config.weights)
+        if best is None or score < best.score:
+            best = Candidate(coeff=coeff.tolist(), score=score, metrics=metrics.to_dict())
+            if score == 0.0:
+                break
+    return best
+
+
+def save_checkpoint(path: str, config: SearchConfig, round_index: int, evaluated: int,
+                    best: Optional[Candidate]):
+    """Атомарная запись контрольной точки (JSON)"""
+    state = {
+        'version': CHECKPOINT_VERSION,
+        'config': asdict(config),
+        'round': round_index,
+        'evaluated': evaluated,
+        'best': asdict(best) if best else None,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f'{path}.tmp{os.getpid()}'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str) -> dict:
+    """Чтение контрольной точки; ValueError при несовместимой версии"""
+    with open(path, 'r') as f:
+        state = json.load(f)
+    if state.get('version') != CHECKPOINT_VERSION:
+        raise ValueError(f'Неподдерживаемая версия контрольной точки: {path}')
+    state['config'] = SearchConfig(**state['config'])
+    if state['best'] is not None:
+        state['best'] = Candidate(**state['best'])
+    return state
+
+
+class KeySearch:
+    """
+    Поиск ключа для (M, Q, funType) в пуле процессов
+
+    Каждый раунд - tasks_per_round задач по candidates_per_task кандидатов;
+    часть кандидатов - мутации лучшего найденного ключа. После раунда
+    состояние пишется в контрольную точку, поиск продолжается с неё.
+    """
+
+    def __init__(self, config: SearchConfig, checkpoint_path: Optional[str] = None):
+        config.validate()
+        self.config = config
+        self.checkpoint_path = checkpoint_path
+        self.round = 0
+        self.evaluated = 0
+        self.best: Optional[Candidate] = None
+
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            state = load_checkpoint(checkpoint_path)
+            if not config.same_key_space(state['config']):
+                raise ValueError('Контрольная точка от поиска с другими M/Q/funType')
+            self.round = state['round']
+            self.evaluated = state['evaluated']
+            self.best = state['best']
+
+    @property
+    def workers(self) -> int:
+        return self.config.workers or os.cpu_count() or 1
+
+    def run(self, progress: Optional[Callable[['KeySearch'], None]] = None) -> Optional[Candidate]:
+        """
+        Поиск до config.rounds раундов (с учётом уже пройденных) или до ключа без потерь
+
+        Args:
+            progress: Вызывается после каждого раунда
+
+        Returns:
+            Лучший найденный кандидат
+        """
+        tasks = self.config.tasks_per_round or self.workers
+        config_dict = asdict(self.config)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while self.round < self.config.rounds:
+                if self.best is not None and self.best.score == 0.0:
+                    break
+                parent = self.best.coeff if self.best else None
+                # Seed задачи зависит только от номера раунда: повтор после рестарта детерминирован
+                seeds = [self.config.seed * 1_000_003 + self.round * tasks + t for t in range(tasks)]
+                for result in pool.map(evaluate_batch, [config_dict] * tasks, seeds, [parent] * tasks):
+                    if self.best is None or result.score < self.best.score:
+                        self.best = result
+                self.round += 1
+                self.evaluated += tasks * self.config.candidates_per_task
+                if self.checkpoint_path:
+                    save_checkpoint(self.checkpoint_path, self.config, self.round, self.evaluated, self.best)
+                if progress:
+                    progress(self)
+        return self.best
+
+
+def default_key_name(config: SearchConfig) -> str:
+    """Имя CSV в стиле CipherKeys (Q=5_optimized_fun1.csv)"""
+    return f'Q={config.bits_q}_search_fun{config.fun_type}_M{config.bits_m}.csv'
+
+
+def write_key_csv(candidate: Candidate, config: SearchConfig, path: Optional[str] = None,
+                  overwrite: bool = False) -> str:
+    """
+    Запись ключа в формате loadCoefficientsCSV (комментарии '#' с метриками)
+
+    Args:
+        candidate: Найденный ключ
+        config: Параметры поиска
+        path: Путь CSV (по умолчанию CipherKeys/<default_key_name>)
+        overwrite: Разрешить перезапись существующего файла
+
+    Returns:
+        Путь записанного файла
+    """
+    path = path or os.path.join(CIPHER_KEYS_DIR, default_key_name(config))
+    if os.path.exists(path) and not overwrite:
+        raise FileExistsError(path)
+    m = candidate.metrics
+    formula = {
+        1: 'a*x + b*y + q',
+        2: 'a*x^2 + b*y + q',
+        3: 'a*x^2 + b*y^2 + q',
+        4: 'a*x^3 + b*y^2 + q',
+        5: 'a*x + b*x*y + c*y + q',
+    }[config.fun_type]
+    scope = 'все состояния' if m['exhaustive'] else f"выборка {m['states']} состояний"
+    lines = [
+        f'# Коэффициенты для Q={config.bits_q}, funType={config.fun_type} ({formula}), найдены keysearch',
+        f"# M={config.bits_m}: коллизии {m['collision_rate']:.6f}, случайные подстановки "
+        f"{m['fallback_rate']:.6f}, прямые Info {m['direct_rate']:.6f} ({scope})",
+    ]
+    lines += [', '.join(str(v) for v in row) for row in candidate.coeff]
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
@@ -9,6 +9,7 @@ import os
 import json
 import random
 import re
+import threading
 
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,6 +18,13 @@ from common.constants import *
 from common.config import ConfigManager
 from common.utils import scan_csv_files, analyze_csv, validate_codec_params
 
+try:
+    from common.codec.analysis import analyze_csv_heatmap
+    from common.codec.autotune import LinkTarget, autotune
+except ImportError:  # NumPy не установлен - анализ коллизий и автоподбор недоступны
+    analyze_csv_heatmap = None
+    autotune = None
+
 
 class CodecPanel:
     """
@@ -42,6 +50,9 @@ class CodecPanel:
         self.funType_var = tk.IntVar(value=config.get_custom_funType())
         self.h1_var = tk.IntVar(value=config.get_custom_h1())
         self.h2_var = tk.IntVar(value=config.get_custom_h2())
+        self.packed_wire_var = tk.BooleanVar(value=config.get_custom_packed_wire())
+        self.state_header_var = tk.BooleanVar(value=config.get_custom_state_header())
+        self.codec_lanes_var = tk.IntVar(value=config.get_custom_codec_lanes())
         self.debug_var = tk.BooleanVar(value=config.get_custom_debug())
         self.debug_stats_var = tk.BooleanVar(value=config.get_custom_debug_stats())
         self.inject_errors_var = tk.BooleanVar(value=config.get_custom_inject_errors())
@@ -50,6 +61,10 @@ class CodecPanel:
         # Данные CSV
         self.csv_analysis = None
         self.csv_files = []
+        self.key_metrics = None
+        self._key_analysis_id = 0  # номер последнего запроса анализа (устаревшие результаты отбрасываются)
+        self._heatmap_image = None
+        self._autotune_running = False
         
         # Создание панели
         self.frame = tk.LabelFrame(
@@ -138,6 +153,22 @@ class CodecPanel:
         )
         refresh_btn.pack(side=tk.LEFT, padx=5)
         
+        self.autotune_btn = tk.Button(
+            row1,
+            text=f"{EMOJI_CUSTOM} Автоподбор",
+            font=FONT_BUTTON,
+            bg=COLOR_INFO,
+            fg='white',
+            command=self._run_autotune,
+            cursor='hand2'
+        )
+        self.autotune_btn.pack(side=tk.LEFT, padx=5)
+        self._create_tooltip(
+            self.autotune_btn,
+            "Перебор ключей CipherKeys, funType и M: замер скорости, расширения\n"
+            "и коллизий, выбор конфигурации с наибольшей полезной скоростью."
+        )
+        
         # Второй ряд: Информация о CSV
         self.csv_info_label = tk.Label(
             csv_frame,
@@ -152,6 +183,38 @@ class CodecPanel:
             justify=tk.LEFT
         )
         self.csv_info_label.pack(fill=tk.X, pady=5)
+        
+        # Третий ряд: Анализ коллизий ключа и тепловая карта
+        analysis_row = tk.Frame(csv_frame, bg=COLOR_PANEL)
+        analysis_row.pack(fill=tk.X, pady=5)
+        
+        self.heatmap_canvas = tk.Canvas(
+            analysis_row,
+            width=KEY_HEATMAP_SIZE,
+            height=KEY_HEATMAP_SIZE,
+            bg=COLOR_BACKGROUND,
+            highlightthickness=1,
+            highlightbackground=COLOR_TEXT_SECONDARY
+        )
+        self.heatmap_canvas.pack(side=tk.LEFT, padx=5)
+        self._create_tooltip(
+            self.heatmap_canvas,
+            "Доля состояний с коллизиями по (h1, h2): строки - h1, столбцы - h2.\n"
+            "Белый - коллизий нет, красный - коллизии во всех состояниях ячейки."
+        )
+        
+        self.key_analysis_label = tk.Label(
+            analysis_row,
+            text=f"{EMOJI_BULB} Анализ коллизий появится после выбора CSV",
+            font=FONT_NORMAL,
+            bg=COLOR_PANEL,
+            fg=COLOR_TEXT_PRIMARY,
+            anchor=tk.NW,
+            padx=10,
+            wraplength=350,
+            justify=tk.LEFT
+        )
+        self.key_analysis_label.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     
     def _create_params_section(self):
         """Секция параметров алгоритма"""
@@ -358,6 +421,54 @@ class CodecPanel:
         info_btn.pack(side=tk.LEFT, padx=5)
         self._create_tooltip(info_btn, TOOLTIP_H1_H2)
         
+        # Формат кадров (должен совпадать у отправителя и получателя)
+        packed_checkbox = tk.Checkbutton(
+            params_frame,
+            text="Плотный формат кадров (ровно M бит на слово, без выравнивания до байта)",
+            variable=self.packed_wire_var,
+            font=FONT_NORMAL,
+            bg=COLOR_PANEL,
+            fg=COLOR_TEXT_PRIMARY,
+            activebackground=COLOR_PANEL,
+            selectcolor=COLOR_PANEL
+        )
+        packed_checkbox.pack(anchor=tk.W, pady=(10, 5))
+        
+        state_header_checkbox = tk.Checkbutton(
+            params_frame,
+            text="Состояния кодера в каждом кадре (устойчивость к потерям без синхронизации)",
+            variable=self.state_header_var,
+            font=FONT_NORMAL,
+            bg=COLOR_PANEL,
+            fg=COLOR_TEXT_PRIMARY,
+            activebackground=COLOR_PANEL,
+            selectcolor=COLOR_PANEL
+        )
+        state_header_checkbox.pack(anchor=tk.W, pady=5)
+        
+        # Полосы кодека для кадров tap (тоже должны совпадать у обеих сторон)
+        lanes_frame = tk.Frame(params_frame, bg=COLOR_PANEL)
+        lanes_frame.pack(anchor=tk.W, pady=5)
+        
+        lanes_label = tk.Label(
+            lanes_frame,
+            text="Полосы кодека (0 = выкл.):",
+            font=FONT_NORMAL,
+            bg=COLOR_PANEL,
+            fg=COLOR_TEXT_PRIMARY
+        )
+        lanes_label.pack(side=tk.LEFT)
+        
+        lanes_spinbox = tk.Spinbox(
+            lanes_frame,
+            from_=0,
+            to=256,
+            textvariable=self.codec_lanes_var,
+            font=FONT_NORMAL,
+            width=10
+        )
+        lanes_spinbox.pack(side=tk.LEFT, padx=5)
+        
         # Секция тестирования и отладки
         debug_frame = tk.LabelFrame(
             params_frame,
@@ -650,6 +761,173 @@ class CodecPanel:
         
         # Валидация
         self._validate_params()
+        
+        # Анализ коллизий ключа в фоне
+        self._start_key_analysis(csv_path)
+    
+    def _start_key_analysis(self, csv_path):
+        """Запуск анализа коллизий ключа в фоновом потоке"""
+        if analyze_csv_heatmap is None:
+            self.key_analysis_label.config(
+                text=f"{EMOJI_WARNING} Анализ коллизий недоступен: установите NumPy",
+                bg=COLOR_STATUS_WARN
+            )
+            return
+        
+        valid_types = self.csv_analysis['valid_fun_types']
+        fun_type = self.funType_var.get()
+        if fun_type not in valid_types:
+            fun_type = valid_types[0]
+        bits_q = self.csv_analysis['Q']
+        bits_m = self.M_var.get()
+        
+        self._key_analysis_id += 1
+        request_id = self._key_analysis_id
+        self.key_metrics = None
+        self.heatmap_canvas.delete('all')
+        self.key_analysis_label.config(
+            text=f"{EMOJI_IPERF} Анализ коллизий (M={bits_m}, Q={bits_q}, fun={fun_type})...",
+            bg=COLOR_PANEL
+        )
+        
+        def worker():
+            try:
+                result = analyze_csv_heatmap(csv_path, fun_type, bits_q, bits_m)
+                error = None
+            except Exception as e:
+                result, error = None, str(e)
+            # Виджеты Tk обновляются только из главного потока
+            self.frame.after(0, lambda: self._on_key_analysis_done(request_id, result, error))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _on_key_analysis_done(self, request_id, result, error):
+        """Вывод результата анализа коллизий (главный поток)"""
+        if request_id != self._key_analysis_id:
+            return  # пока шёл анализ, выбрали другой CSV
+        
+        if error is not None:
+            self.key_analysis_label.config(
+                text=f"{EMOJI_ERROR} Анализ коллизий: {error}",
+                bg=COLOR_STATUS_ERROR
+            )
+            return
+        
+        metrics, heatmap = result
+        self.key_metrics = metrics
+        self._draw_heatmap(heatmap)
+        
+        scope = "все состояния" if metrics.exhaustive else f"выборка {metrics.states} состояний"
+        text = (
+            f"{EMOJI_IPERF} Ключ при M={metrics.bits_m} ({scope}):\n"
+            f"• коллизии: {metrics.collision_rate:.2%} состояний\n"
+            f"• случайные подстановки: {metrics.fallback_rate:.3%} символов\n"
+            f"• прямая передача Info: {metrics.direct_rate:.2%} символов\n"
+            f"• расширение на линии: ×{metrics.expansion_ratio:.2f}"
+        )
+        if metrics.fallback_rate == 0:
+            bg = COLOR_STATUS_OK
+        elif metrics.fallback_rate < 0.01:
+            bg = COLOR_STATUS_WARN
+        else:
+            bg = COLOR_STATUS_ERROR
+        self.key_analysis_label.config(text=text, bg=bg)
+        
+        if self.terminal:
+            level = 'success' if metrics.fallback_rate == 0 else 'warning'
+            self.terminal.print_to_terminal(
+                f"{EMOJI_IPERF} Коллизии ключа: {metrics.collision_rate:.2%} состояний, "
+                f"подстановки {metrics.fallback_rate:.3%}, Info {metrics.direct_rate:.2%}, "
+                f"расширение ×{metrics.expansion_ratio:.2f}",
+                level
+            )
+    
+    def _draw_heatmap(self, heatmap):
+        """Отрисовка карты коллизий: белый (0) → красный (1), серый - нет данных"""
+        side = heatmap.shape[0]
+        levels = [f"#ff{v:02x}{v:02x}" for v in range(255, -1, -1)]
+        rows = []
+        for row in heatmap.tolist():
+            cells = [COLOR_IND_INACTIVE if value != value else levels[int(round(value * 255))]
+                     for value in row]
+            rows.append('{' + ' '.join(cells) + '}')
+        
+        image = tk.PhotoImage(width=side, height=side)
+        image.put(' '.join(rows))
+        zoom = max(1, KEY_HEATMAP_SIZE // side)
+        if zoom > 1:
+            image = image.zoom(zoom, zoom)
+        
+        self._heatmap_image = image  # ссылка нужна, иначе Tk удалит изображение
+        self.heatmap_canvas.delete('all')
+        self.heatmap_canvas.create_image(0, 0, anchor=tk.NW, image=image)
+    
+    def _run_autotune(self):
+        """Автоподбор ключа, M и funType в фоновом потоке"""
+        if autotune is None:
+            if self.terminal:
+                self.terminal.print_to_terminal(f"{EMOJI_WARNING} Автоподбор недоступен: установите NumPy", 'warning')
+            return
+        if self._autotune_running:
+            return
+        
+        # Ошибки на линии - из настройки инжекции ошибок (вероятность искажения слова)
+        error_rate = self.error_rate_var.get() / 100.0 if self.inject_errors_var.get() else 0.0
+        target = LinkTarget(error_rate=error_rate)
+        
+        self._autotune_running = True
+        self.autotune_btn.config(state='disabled')
+        if self.terminal:
+            self.terminal.print_to_terminal(
+                f"{EMOJI_CUSTOM} Автоподбор: payload {target.max_payload} байт, "
+                f"ошибки {error_rate:.2%} слов, канал {target.link_mbps:.0f} Мбит/с...",
+                'info'
+            )
+        
+        def worker():
+            try:
+                results = autotune(target)
+                error = None
+            except Exception as e:
+                results, error = None, str(e)
+            self.frame.after(0, lambda: self._on_autotune_done(results, error))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def _on_autotune_done(self, results, error):
+        """Применение лучшей конфигурации автоподбора (главный поток)"""
+        self._autotune_running = False
+        self.autotune_btn.config(state='normal')
+        
+        if error is not None or not results:
+            if self.terminal:
+                message = error or "нет подходящих ключей"
+                self.terminal.print_to_terminal(f"{EMOJI_ERROR} Автоподбор: {message}", 'error')
+            return
+        
+        if self.terminal:
+            for place, r in enumerate(results[:3], start=1):
+                self.terminal.print_to_terminal(
+                    f"  {place}. {r.csv_name}: M={r.bits_m}, Q={r.bits_q}, fun={r.fun_type} - "
+                    f"{r.goodput_mbps:.2f} Мбит/с (расширение ×{r.expansion:.2f}, "
+                    f"подстановки {r.fallback_rate:.3%}, доставка пакетов {r.packet_success:.1%})",
+                    'info'
+                )
+        
+        best = results[0]
+        self.csv_var.set(best.csv_name)
+        self._on_csv_selected()
+        self.M_var.set(best.bits_m)
+        self.funType_var.set(best.fun_type)
+        self.funType_combo.current(best.fun_type - 1)
+        self._validate_params()
+        self._start_key_analysis(os.path.join(CIPHER_KEYS_DIR, best.csv_name))
+        
+        if self.terminal:
+            self.terminal.print_to_terminal(
+                f"{EMOJI_SUCCESS} Применено: {best.csv_name}, M={best.bits_m}, Q={best.bits_q}, fun={best.fun_type}",
+                'success'
+            )
     
     def _format_fun_types(self, cols):
         """Форматирование допустимых типов функций"""
@@ -801,7 +1079,10 @@ class CodecPanel:
             'Q': self.Q_var.get(),
             'funType': self.funType_var.get(),
             'h1': self.h1_var.get(),
-            'h2': self.h2_var.get()
+            'h2': self.h2_var.get(),
+            'packedWire': self.packed_wire_var.get(),
+            'stateHeader': self.state_header_var.get(),
+            'codecLanes': self.codec_lanes_var.get()
         }
         
         # Сохранение в файл
@@ -861,6 +1142,9 @@ class CodecPanel:
             self.funType_var.set(profile.get('funType', 1))
             self.h1_var.set(profile.get('h1', CODEC_H1_DEFAULT))
             self.h2_var.set(profile.get('h2', CODEC_H2_DEFAULT))
+            self.packed_wire_var.set(profile.get('packedWire', False))
+            self.state_header_var.set(profile.get('stateHeader', False))
+            self.codec_lanes_var.set(profile.get('codecLanes', 0))
             
             # Обновление интерфейса
             self._on_csv_selected()
@@ -894,6 +1178,9 @@ class CodecPanel:
         self.h1_var.set(CODEC_H1_DEFAULT)
         self.h2_var.set(CODEC_H2_DEFAULT)
         self.auto_Q_var.set(True)
+        self.packed_wire_var.set(False)
+        self.state_header_var.set(False)
+        self.codec_lanes_var.set(0)
         self.debug_var.set(False)
         self.debug_stats_var.set(False)
         self.inject_errors_var.set(False)
@@ -929,6 +1216,12 @@ class CodecPanel:
             '--h1', str(self.h1_var.get()),
             '--h2', str(self.h2_var.get())
         ]
+        if self.packed_wire_var.get():
+            cmd_parts.append('--packed-wire')
+        if self.state_header_var.get():
+            cmd_parts.append('--state-header')
+        if self.codec_lanes_var.get() > 0:
+            cmd_parts.extend(['--lanes', str(self.codec_lanes_var.get())])
         
         command = ' '.join(cmd_parts)
         
@@ -955,6 +1248,9 @@ class CodecPanel:
             'funType': self.funType_var.get(),
             'h1': self.h1_var.get(),
             'h2': self.h2_var.get(),
+            'packedWire': self.packed_wire_var.get(),
+            'stateHeader': self.state_header_var.get(),
+            'codecLanes': self.codec_lanes_var.get(),
             'debug': self.debug_var.get(),
             'debugStats': self.debug_stats_var.get(),
             'injectErrors': self.inject_errors_var.get(),
@@ -970,6 +1266,9 @@ class CodecPanel:
         self.config.set_custom_h1(self.h1_var.get())
         self.config.set_custom_h2(self.h2_var.get())
         self.config.set_custom_auto_q(self.auto_Q_var.get())
+        self.config.set_custom_packed_wire(self.packed_wire_var.get())
+        self.config.set_custom_state_header(self.state_header_var.get())
+        self.config.set_custom_codec_lanes(self.codec_lanes_var.get())
         self.config.set_custom_debug(self.debug_var.get())
         self.config.set_custom_debug_stats(self.debug_stats_var.get())
         self.config.set_custom_inject_errors(self.inject_errors_var.get())
@@ -109,6 +109,12 @@ class CustomCodecDecryptGUI(LibSodiumDecryptGUI):
             '--h2', str(params['h2'])
         ]
         
+        if params.get('packedWire'):
+            cmd.append('--packed-wire')
+        if params.get('stateHeader'):
+            cmd.append('--state-header')
+        if params.get('codecLanes', 0) > 0:
+            cmd.extend(['--lanes', str(params['codecLanes'])])
         if params.get('debug'):
             cmd.append('--debug')
         if params.get('debugStats'):
@@ -0,0 +1,399 @@
+// codec_cli: DigitalCodec stdin -> stdout driver for conformance and throughput checks.
+//
+//   codec_cli encode --csv KEY.csv --m 8 --q 2 --fun 1 [options] < data > framed
+//   codec_cli decode --csv KEY.csv --m 8 --q 2 --fun 1 [options] < framed > data
+//
+// Input is split into messages of --chunk bytes, each coded with encodeMessage();
+// codec states are carried between messages exactly as in a tap_encrypt session.
+// With --seed the collision fallback generator is deterministic, so two builds
+// (or two code paths) with the same options must produce identical bytes.
+// --stats prints one "key=value" summary line to stderr (codec time only).
+// --lanes N codes message i on lane i % N (codec_lanes.h): frames get the lane id byte
+// and the lanes run on --lane-threads threads; the output does not depend on the threads.
+
+#include <algorithm>
+#include <chrono>
+#include <cstdint>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <functional>
+#include <iostream>
+#include <memory>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <sodium.h>
+
+#include "codec_lanes.h"
+#include "codec_simd.h"
+#include "digital_codec.h"
+
+namespace {
+
+constexpr size_t kMaxMessage = 0xFFFF;  // длина в заголовке кадра - 2 байта
+constexpr size_t kHashBytes = crypto_hash_sha256_BYTES;
+
+void print_usage(const char *prog) {
+    std::cerr << "Использование: " << prog << " encode|decode --csv <file> [параметры]\n"
+              << "  --m <1..31>            Разрядность M (по умолчанию 8)\n"
+              << "  --q <1..16>            Бит информации на символ Q (по умолчанию 6)\n"
+              << "  --fun <1..5>           funType (по умолчанию 1)\n"
+              << "  --h1 <n> --h2 <n>      Начальные состояния\n"
+              << "  --seed <n>             Seed случайных подстановок (0 = случайный)\n"
+              << "  --no-info              Без InfoInsteadOfRand\n"
+              << "  --hash                 SHA-256 в каждом сообщении\n"
+              << "  --chunk <bytes>        Размер сообщения при кодировании (по умолчанию 4096)\n"
+              << "  --encode-table <k>     k-символьные таблицы кодирования (M<=8)\n"
+              << "  --codec-kernel         Ядро, скомпилированное под ключ\n"
+              << "  --decode-threads <n>   Потоки декодирования (0 = все ядра)\n"
+              << "  --cert <file>          Сертификат инъективности (по умолчанию <csv>.cert)\n"
+              << "  --no-cert              Без сертификата: проверка коллизий для каждого символа\n"
+              << "  --collision-cache <b>  Кеш коллизий на 2^b состояний (0 = выкл., по умолчанию 16)\n"
+              << "  --packed-wire          Плотный формат кадра: ровно M бит на слово\n"
+              << "  --state-header         Кадр начинается с состояний (h1, h2) кодера\n"
+              << "  --simd <level>         auto|scalar|sse4.1|avx2 - векторное вычисление RR (по умолчанию auto)\n"
+              << "  --lanes <n>            Независимые полосы кодека (сообщение i - полоса i % n)\n"
+              << "  --lane-threads <n>     Потоки полос (0 = все ядра, по умолчанию)\n"
+              << "  --stream <bytes>       Сообщения через StreamEncoder/StreamDecoder кусками по <bytes>\n"
+              << "  --stats                Итоговая строка статистики в stderr\n";
+}
+
+std::vector<uint8_t> read_all(FILE *in) {
+    std::vector<uint8_t> data;
+    uint8_t buf[1 << 16];
+    size_t n;
+    while ((n = std::fread(buf, 1, sizeof(buf), in)) > 0) {
+        data.insert(data.end(), buf, buf + n);
+    }
+    return data;
+}
+
+// Размер кадра encodeMessage для длины полезной нагрузки len (с хешем, если он есть)
+size_t frame_size(size_t len, const digitalcodec::CodecParams &params) {
+    const size_t words = (len * 8 + params.bitsQ - 1) / params.bitsQ + (params.stateHeader ? 2 : 0);
+    if (params.packedWire) return 2 + digitalcodec::packedWireBytes(words, params.bitsM);
+    return 2 + words * static_cast<size_t>((params.bitsM + 7) / 8);
+}
+
+void print_stats(const std::string &mode, size_t messages, size_t bytes_in, size_t bytes_out, double seconds,
+                 const digitalcodec::DigitalCodec &codec, const digitalcodec::CodecStats &s, int lanes) {
+    // Пропускная способность - по полезным данным (вход кодера / выход декодера)
+    const size_t data_bytes = (mode == "encode") ? bytes_in : bytes_out;
+    std::cerr << "📊 " << mode
+              << " messages=" << messages
+              << " bytes_in=" << bytes_in
+              << " bytes_out=" << bytes_out
+              << " seconds=" << seconds
+              << " mb_s=" << (seconds > 0.0 ? data_bytes / seconds / 1e6 : 0.0)
+              << " kernel=" << (codec.kernelActive() ? 1 : 0)
+              << " certified=" << (codec.certified() ? 1 : 0)
+              << " simd=" << codec.simdName()
+              << " lanes=" << lanes
+              << " encoded_symbols=" << s.encodedSymbols
+              << " encode_collisions=" << s.encodeCollisions
+              << " encode_random_fallbacks=" << s.encodeRandomFallbacks
+              << " encode_direct_info=" << s.encodeDirectInfo
+              << " decoded_symbols=" << s.decodedSymbols
+              << " decode_direct_info=" << s.decodeDirectInfo
+              << " decode_skips=" << s.decodeSkips
+              << " collision_cache_hits=" << s.collisionCacheHits
+              << " collision_cache_misses=" << s.collisionCacheMisses
+              << "\n";
+}
+
+bool write_output(const std::vector<uint8_t> &output) {
+    if (!output.empty() && std::fwrite(output.data(), 1, output.size(), stdout) != output.size()) {
+        std::cerr << "❌ Ошибка записи в stdout\n";
+        return false;
+    }
+    std::fflush(stdout);
+    return true;
+}
+
+// Сообщения одной полосы обрабатывает один поток (полоса % потоков) по порядку
+void run_lanes(int lanes, int lane_threads, const std::vector<int> &lane_of, const std::function<void(size_t)> &job) {
+    int threads = lane_threads > 0 ? lane_threads : static_cast<int>(std::thread::hardware_concurrency());
+    threads = std::max(1, std::min(threads, lanes));
+    std::vector<std::thread> pool;
+    for (int w = 0; w < threads; ++w) {
+        pool.emplace_back([&, w] {
+            for (size_t i = 0; i < lane_of.size(); ++i) {
+                if (lane_of[i] % threads == w) job(i);
+            }
+        });
+    }
+    for (auto &t : pool) t.join();
+}
+
+// --lanes: размер каждого кадра и выхода известен заранее, потоки пишут в свои участки output
+int lanes_main(const std::string &mode, const digitalcodec::CodecParams &params, const std::string &csv_path,
+               const std::string &cert_path, size_t chunk, bool use_hash, bool stats, int lanes, int lane_threads) {
+    std::unique_ptr<digitalcodec::CodecLanes> codec;
+    try {
+        codec = std::make_unique<digitalcodec::CodecLanes>(params, csv_path, lanes);
+        for (int l = 0; l < lanes && !cert_path.empty() && params.certifiedFastPath; ++l) {
+            if (!codec->lane(l).loadCertificate(cert_path)) {
+                std::cerr << "⚠️  Сертификат " << cert_path << " не подходит к ключу\n";
+                break;
+            }
+        }
+    } catch (const std::exception &e) {
+        std::cerr << "❌ Ошибка кодека: " << e.what() << "\n";
+        return 1;
+    }
+
+    const std::vector<uint8_t> input = read_all(stdin);
+    std::vector<uint8_t> output;
+    std::vector<int> lane_of;
+    std::vector<size_t> in_pos, in_len, out_pos;
+    double seconds = 0.0;
+
+    if (mode == "encode") {
+        size_t total = 0;
+        for (size_t pos = 0; pos < input.size(); pos += chunk) {
+            const size_t len = std::min(chunk, input.size() - pos);
+            lane_of.push_back(static_cast<int>(lane_of.size() % static_cast<size_t>(lanes)));
+            in_pos.push_back(pos);
+            in_len.push_back(len);
+            out_pos.push_back(total);
+            total += codec->encodeFrameBound(len, use_hash);
+        }
+        out_pos.push_back(total);
+        output.resize(total);
+        const auto t0 = std::chrono::steady_clock::now();
+        run_lanes(lanes, lane_threads, lane_of, [&](size_t i) {
+            codec->encodeFrameInto(lane_of[i], input.data() + in_pos[i], in_len[i], use_hash,
+                                   output.data() + out_pos[i], out_pos[i + 1] - out_pos[i]);
+        });
+        seconds = std::chrono::duration<double>(std::chrono::steady_clock::now() - t0).count();
+    } else {
+        size_t pos = 0;
+        size_t total = 0;
+        while (pos + digitalcodec::kLaneHeaderBytes + 2 <= input.size()) {
+            const int lane = input[pos];
+            const size_t len = (size_t)input[pos + 1] | ((size_t)input[pos + 2] << 8);
+            const size_t size = digitalcodec::kLaneHeaderBytes + frame_size(len, params);
+            if (pos + size > input.size()) {
+                std::cerr << "❌ Обрезанный кадр на смещении " << pos << "\n";
+                return 1;
+            }
+            if (lane >= lanes) {
+                std::cerr << "❌ Кадр полосы " << lane << " на смещении " << pos << " при --lanes " << lanes << "\n";
+                return 1;
+            }
+            lane_of.push_back(lane);
+            in_pos.push_back(pos);
+            in_len.push_back(size);
+            out_pos.push_back(total);
+            total += len;
+            pos += size;
+        }
+        if (pos != input.size()) {
+            std::cerr << "❌ Лишние байты в конце входа: " << (input.size() - pos) << "\n";
+            return 1;
+        }
+        out_pos.push_back(total);
+        output.resize(total);
+        std::vector<size_t> decoded(lane_of.size(), 0);
+        const auto t0 = std::chrono::steady_clock::now();
+        run_lanes(lanes, lane_threads, lane_of, [&](size_t i) {
+            decoded[i] = codec->decodeFrameInto(input.data() + in_pos[i], in_len[i], use_hash,
+                                                output.data() + out_pos[i], out_pos[i + 1] - out_pos[i]);
+        });
+        seconds = std::chrono::duration<double>(std::chrono::steady_clock::now() - t0).count();
+        // Без хеша участки заполнены целиком; с хешем - сдвигаем данные без него
+        size_t end = 0;
+        for (size_t i = 0; i < decoded.size(); ++i) {
+            if (decoded[i] && end != out_pos[i]) std::memmove(output.data() + end, output.data() + out_pos[i], decoded[i]);
+            end += decoded[i];
+        }
+        output.resize(end);
+    }
+
+    if (!write_output(output)) return 1;
+    if (stats) {
+        print_stats(mode, lane_of.size(), input.size(), output.size(), seconds, codec->lane(0), codec->debugStats(), lanes);
+    }
+    return 0;
+}
+
+} // namespace
+
+int main(int argc, char **argv) {
+    if (argc < 2) {
+        print_usage(argv[0]);
+        return 2;
+    }
+    const std::string mode = argv[1];
+    if (mode != "encode" && mode != "decode") {
+        print_usage(argv[0]);
+        return 2;
+    }
+
+    digitalcodec::CodecParams params;
+    std::string csv_path;
+    size_t chunk = 4096;
+    bool use_hash = false;
+    bool stats = false;
+    std::string cert_path;
+    int lanes = 0;
+    int lane_threads = 0;
+    size_t stream_piece = 0;
+
+    for (int i = 2; i < argc; ++i) {
+        const std::string arg = argv[i];
+        const bool has_value = i + 1 < argc;
+        if (arg == "--csv" && has_value) { csv_path = argv[++i]; continue; }
+        if (arg == "--m" && has_value) { params.bitsM = std::atoi(argv[++i]); continue; }
+        if (arg == "--q" && has_value) { params.bitsQ = std::atoi(argv[++i]); continue; }
+        if (arg == "--fun" && has_value) { params.funType = std::atoi(argv[++i]); continue; }
+        if (arg == "--h1" && has_value) { params.h1 = std::atoi(argv[++i]); continue; }
+        if (arg == "--h2" && has_value) { params.h2 = std::atoi(argv[++i]); continue; }
+        if (arg == "--seed" && has_value) { params.randomSeed = std::strtoull(argv[++i], nullptr, 10); continue; }
+        if (arg == "--no-info") { params.infoInsteadOfRand = false; continue; }
+        if (arg == "--hash") { use_hash = true; continue; }
+        if (arg == "--chunk" && has_value) { chunk = std::strtoull(argv[++i], nullptr, 10); continue; }
+        if (arg == "--encode-table" && has_value) { params.encodeTableSymbols = std::atoi(argv[++i]); continue; }
+        if (arg == "--codec-kernel") { params.compiledKernel = true; continue; }
+        if (arg == "--decode-threads" && has_value) { params.decodeThreads = std::atoi(argv[++i]); continue; }
+        if (arg == "--cert" && has_value) { cert_path = argv[++i]; continue; }
+        if (arg == "--collision-cache" && has_value) { params.collisionCacheBits = std::atoi(argv[++i]); continue; }
+        if (arg == "--no-cert") { params.certifiedFastPath = false; continue; }
+        if (arg == "--packed-wire") { params.packedWire = true; continue; }
+        if (arg == "--state-header") { params.stateHeader = true; continue; }
+        if (arg == "--simd" && has_value) {
+            const std::string level = argv[++i];
+            if (level == "auto") params.simdLevel = -1;
+            else if (level == "scalar") params.simdLevel = digitalcodec::kSimdScalar;
+            else if (level == "sse4.1") params.simdLevel = digitalcodec::kSimdSse41;
+            else if (level == "avx2") params.simdLevel = digitalcodec::kSimdAvx2;
+            else {
+                std::cerr << "❌ Неизвестный уровень --simd: " << level << "\n";
+                return 2;
+            }
+            continue;
+        }
+        if (arg == "--lanes" && has_value) { lanes = std::atoi(argv[++i]); continue; }
+        if (arg == "--lane-threads" && has_value) { lane_threads = std::atoi(argv[++i]); continue; }
+        if (arg == "--stream" && has_value) { stream_piece = std::strtoull(argv[++i], nullptr, 10); continue; }
+        if (arg == "--stats") { stats = true; continue; }
+        std::cerr << "❌ Неизвестный аргумент: " << arg << "\n";
+        print_usage(argv[0]);
+        return 2;
+    }
+    if (csv_path.empty()) {
+        std::cerr << "❌ Не указан --csv\n";
+        return 2;
+    }
+    const size_t max_chunk = kMaxMessage - (use_hash ? kHashBytes : 0);
+    if (chunk == 0 || chunk > max_chunk) {
+        std::cerr << "❌ --chunk должен быть в диапазоне 1.." << max_chunk << "\n";
+        return 2;
+    }
+    if (lanes < 0 || lanes > digitalcodec::kMaxCodecLanes) {
+        std::cerr << "❌ --lanes должен быть в диапазоне 0.." << digitalcodec::kMaxCodecLanes << "\n";
+        return 2;
+    }
+    if (stream_piece > 0 && (use_hash || params.stateHeader || lanes > 0)) {
+        std::cerr << "❌ --stream несовместим с --hash, --state-header и --lanes\n";
+        return 2;
+    }
+    if (sodium_init() < 0) {
+        std::cerr << "❌ Ошибка инициализации libsodium\n";
+        return 1;
+    }
+
+    params.statsMode = stats;
+    if (lanes > 0) {
+        return lanes_main(mode, params, csv_path, cert_path, chunk, use_hash, stats, lanes, lane_threads);
+    }
+    digitalcodec::DigitalCodec codec;
+    try {
+        codec.configure(params);
+        codec.loadCoefficientsCSV(csv_path);
+        if (!cert_path.empty() && params.certifiedFastPath && !codec.loadCertificate(cert_path)) {
+            std::cerr << "⚠️  Сертификат " << cert_path << " не подходит к ключу\n";
+        }
+    } catch (const std::exception &e) {
+        std::cerr << "❌ Ошибка кодека: " << e.what() << "\n";
+        return 1;
+    }
+
+    const std::vector<uint8_t> input = read_all(stdin);
+    std::vector<uint8_t> output;
+    output.reserve(input.size());
+    size_t messages = 0;
+    double seconds = 0.0;
+
+    if (mode == "encode") {
+        for (size_t pos = 0; pos < input.size(); pos += chunk) {
+            const size_t len = std::min(chunk, input.size() - pos);
+            if (stream_piece > 0) {
+                // Тот же кадр, что у encodeMessage: заголовок длины и поток StreamEncoder
+                output.push_back(static_cast<uint8_t>(len & 0xFF));
+                output.push_back(static_cast<uint8_t>(len >> 8));
+                const auto t0 = std::chrono::steady_clock::now();
+                digitalcodec::StreamEncoder encoder(codec);
+                for (size_t off = 0; off < len; off += stream_piece) {
+                    encoder.push(input.data() + pos + off, std::min(stream_piece, len - off), output);
+                }
+                encoder.finish(output);
+                seconds += std::chrono::duration<double>(std::chrono::steady_clock::now() - t0).count();
+                ++messages;
+                continue;
+            }
+            const size_t old = output.size();
+            const size_t bound = codec.encodeMessageBound(len, use_hash);
+            output.resize(old + bound);
+            const auto t0 = std::chrono::steady_clock::now();
+            const size_t n = codec.encodeMessageInto(input.data() + pos, len, use_hash, output.data() + old, bound);
+            seconds += std::chrono::duration<double>(std::chrono::steady_clock::now() - t0).count();
+            output.resize(old + n);
+            ++messages;
+        }
+    } else {
+        size_t pos = 0;
+        while (pos + 2 <= input.size()) {
+            const size_t len = (size_t)input[pos] | ((size_t)input[pos + 1] << 8);
+            const size_t size = frame_size(len, params);
+            if (pos + size > input.size()) {
+                std::cerr << "❌ Обрезанный кадр на смещении " << pos << "\n";
+                return 1;
+            }
+            if (stream_piece > 0) {
+                // Тело кадра кусками через StreamDecoder с известной длиной сообщения
+                const auto t0 = std::chrono::steady_clock::now();
+                digitalcodec::StreamDecoder decoder(codec, len);
+                for (size_t off = 2; off < size; off += stream_piece) {
+                    decoder.push(input.data() + pos + off, std::min(stream_piece, size - off), output);
+                }
+                decoder.finish(output);
+                seconds += std::chrono::duration<double>(std::chrono::steady_clock::now() - t0).count();
+                pos += size;
+                ++messages;
+                continue;
+            }
+            const size_t old = output.size();
+            const size_t bound = digitalcodec::DigitalCodec::decodeMessageBound(input.data() + pos, size);
+            output.resize(old + bound);
+            const auto t0 = std::chrono::steady_clock::now();
+            const size_t n = codec.decodeMessageInto(input.data() + pos, size, 0, use_hash, output.data() + old, bound);
+            seconds += std::chrono::duration<double>(std::chrono::steady_clock::now() - t0).count();
+            output.resize(old + n);
+            pos += size;
+            ++messages;
+        }
+        if (pos != input.size()) {
+            std::cerr << "❌ Лишние байты в конце входа: " << (input.size() - pos) << "\n";
+            return 1;
+        }
+    }
+
+    if (!write_output(output)) return 1;
+    if (stats) {
+        print_stats(mode, messages, input.size(), output.size(), seconds, codec, codec.debugStats(), 0);
+    }
+    return 0;
+}
@@ -0,0 +1,155 @@
+#include "codec_kernel.h"
+
+#include <dlfcn.h>
+#include <unistd.h>
+
+#include <cstdio>
+#include <cstdlib>
+#include <filesystem>
+#include <fstream>
+#include <iomanip>
+#include <sstream>
+#include <stdexcept>
+
+namespace digitalcodec {
+
+namespace {
+
+// Одночлены при коэффициентах строки COEFF (в кольце uint32_t, приведение к M битам в конце)
+const char *monomialSource(int funType) {
+    switch (funType) {
+        case 1: return "    const uint32_t m0 = ux, m1 = uy;\n";                     // a*x + b*y + q
+        case 2: return "    const uint32_t m0 = ux * ux, m1 = uy;\n";                // a*x^2 + b*y + q
+        case 3: return "    const uint32_t m0 = ux * ux, m1 = uy * uy;\n";           // a*x^2 + b*y^2 + q
+        case 4: return "    const uint32_t m0 = ux * ux * ux, m1 = uy * uy;\n";      // a*x^3 + b*y^2 + q
+        case 5: return "    const uint32_t m0 = ux, m1 = ux * uy, m2 = uy;\n";       // a*x + b*x*y + c*y + q
+        default: throw std::invalid_argument("funType must be 1..5");
+    }
+}
+
+std::string hexImmediate(int32_t v) {
+    std::ostringstream ss;
+    ss << "0x" << std::hex << std::uppercase << std::setw(8) << std::setfill('0')
+       << static_cast<uint32_t>(v) << "u";
+    return ss.str();
+}
+
+// FNV-1a: имя файла в кеше зависит только от исходника и компилятора
+uint64_t fnv1a(const std::string &data) {
+    uint64_t h = 1469598103934665603ull;
+    for (unsigned char c : data) {
+        h ^= c;
+        h *= 1099511628211ull;
+    }
+    return h;
+}
+
+std::string shellQuote(const std::string &s) {
+    std::string out = "'";
+    for (char c : s) {
+        if (c == '\'') out += "'\\''";
+        else out += c;
+    }
+    return out + "'";
+}
+
+} // namespace
+
+std::string generateKernelSource(const CodecParams &params, const std::vector<std::vector<int32_t>> &coeff) {
+    const int funCount = 1 << params.bitsQ;
+    if (static_cast<int>(coeff.size()) != funCount) {
+        throw std::invalid_argument("COEFF rows != 2^Q");
+    }
+    const uint32_t mask = (1u << params.bitsM) - 1u;
+    const uint32_t sign = 1u << (params.bitsM - 1);
+    const int monos = (params.funType == 5) ? 3 : 2;
+
+    std::ostringstream src;
+    src << "/* LightCrypto codec kernel: M=" << params.bitsM << " Q=" << params.bitsQ
+        << " funType=" << params.funType << " (generated, do not edit) */\n"
+        << "#include <stdint.h>\n\n"
+        << "/* (v mod 2^M) sign-extended to int32, same as DigitalCodec::wrapM */\n"
+        << "#define LC_WRAP(v) ((int32_t)(((v) & " << hexImmediate(static_cast<int32_t>(mask)) << ") ^ "
+        << hexImmediate(static_cast<int32_t>(sign)) << ") - (int32_t)" << hexImmediate(static_cast<int32_t>(sign)) << ")\n\n"
+        << "int lc_kernel_abi_version(void) { return " << kKernelAbiVersion << "; }\n"
+        << "int lc_kernel_fun_count(void) { return " << funCount << "; }\n\n"
+        << "void lc_kernel_eval(int32_t x, int32_t y, int32_t *rr) {\n"
+        << "    const uint32_t ux = (uint32_t)x, uy = (uint32_t)y;\n"
+        << monomialSource(params.funType);
+    for (int ff = 0; ff < funCount; ++ff) {
+        const auto &row = coeff[ff];
+        src << "    rr[" << ff << "] = LC_WRAP(";
+        for (int i = 0; i < monos; ++i) {
+            src << hexImmediate(row[i]) << " * m" << i << " + ";
+        }
+        src << hexImmediate(row[monos]) << ");\n";
+    }
+    src << "}\n";
+    return src.str();
+}
+
+std::string defaultKernelCacheDir() {
+    if (const char *xdg = std::getenv("XDG_CACHE_HOME")) {
+        if (*xdg) return std::string(xdg) + "/lightcrypto/codec_kernels";
+    }
+    const char *home = std::getenv("HOME");
+    return std::string(home ? home : "/tmp") + "/.cache/lightcrypto/codec_kernels";
+}
+
+std::string buildKernel(const CodecParams &params, const std::vector<std::vector<int32_t>> &coeff,
+                        const std::string &cacheDir) {
+    const std::string source = generateKernelSource(params, coeff);
+    const char *ccEnv = std::getenv("CC");
+    const std::string compiler = (ccEnv && *ccEnv) ? ccEnv : "cc";
+
+    std::ostringstream name;
+    name << "kernel_" << std::hex << std::setw(16) << std::setfill('0') << fnv1a(compiler + "\n" + source);
+    const std::string base = cacheDir + "/" + name.str();
+    const std::string soPath = base + ".so";
+    if (std::filesystem::exists(soPath)) {
+        return soPath;
+    }
+
+    std::filesystem::create_directories(cacheDir);
+    // Временные имена уникальны для процесса, готовый .so появляется атомарным rename
+    const std::string tmpBase = base + ".tmp" + std::to_string(::getpid());
+    const std::string srcPath = tmpBase + ".c";
+    {
+        std::ofstream out(srcPath);
+        if (!out) throw std::runtime_error("Failed to write kernel source: " + srcPath);
+        out << source;
+    }
+    const std::string tmpSo = tmpBase + ".so";
+    const std::string cmd = compiler + " -O2 -shared -fPIC -o " + shellQuote(tmpSo) + " " + shellQuote(srcPath);
+    const int rc = std::system(cmd.c_str());
+    if (rc != 0) {
+        std::remove(srcPath.c_str());
+        std::remove(tmpSo.c_str());
+        throw std::runtime_error("Kernel compilation failed: " + cmd);
+    }
+    std::filesystem::rename(srcPath, base + ".c");
+    std::filesystem::rename(tmpSo, soPath);
+    return soPath;
+}
+
+KernelLibrary::KernelLibrary(const std::string &path, int funCount) : path_(path) {
+    handle_ = dlopen(path.c_str(), RTLD_NOW | RTLD_LOCAL);
+    if (!handle_) {
+        const char *err = dlerror();
+        throw std::runtime_error("dlopen failed: " + std::string(err ? err : path));
+    }
+    auto abi = reinterpret_cast<int (*)()>(dlsym(handle_, "lc_kernel_abi_version"));
+    auto count = reinterpret_cast<int (*)()>(dlsym(handle_, "lc_kernel_fun_count"));
+    eval_ = reinterpret_cast<KernelEvalFn>(dlsym(handle_, "lc_kernel_eval"));
+    if (!abi || !count || !eval_ || abi() != kKernelAbiVersion || count() != funCount) {
+        dlclose(handle_);
+        handle_ = nullptr;
+        throw std::runtime_error("Kernel does not match codec parameters: " + path);
+    }
+}
+
+KernelLibrary::~KernelLibrary() {
+    if (handle_) dlclose(handle_);
+}
+
+} // namespace digitalcodec
@@ -0,0 +1,51 @@
+#pragma once
+
+#include <cstdint>
+#include <string>
+#include <vector>
+
+#include "digital_codec.h"
+
+// Key-specialized DigitalCodingFun kernels.
+// The coefficients of a CipherKeys CSV are constant for the life of a session, so a C
+// source with all coefficients folded in as immediates and the 2^Q evaluations unrolled
+// is generated, compiled with the system compiler ($CC, default cc) into a cached .so
+// and loaded with dlopen.
+
+namespace digitalcodec {
+
+// Generated entry point: RR of all 2^Q functions for state (x, y), already wrapped to M bits
+using KernelEvalFn = void (*)(int32_t x, int32_t y, int32_t *rr);
+
+constexpr int kKernelAbiVersion = 1;
+
+// C source of the kernel for the given parameters and COEFF matrix
+std::string generateKernelSource(const CodecParams &params, const std::vector<std::vector<int32_t>> &coeff);
+
+// $XDG_CACHE_HOME/lightcrypto/codec_kernels (or ~/.cache/...)
+std::string defaultKernelCacheDir();
+
+// Path of the compiled kernel in cacheDir; compiles it on a cache miss.
+// Throws std::runtime_error if the compiler fails.
+std::string buildKernel(const CodecParams &params, const std::vector<std::vector<int32_t>> &coeff,
+                        const std::string &cacheDir = defaultKernelCacheDir());
+
+// dlopen()ed kernel; the library is closed on destruction
+class KernelLibrary {
+public:
+    // Throws std::runtime_error if the library cannot be loaded or does not match funCount
+    KernelLibrary(const std::string &path, int funCount);
+    ~KernelLibrary();
+    KernelLibrary(const KernelLibrary &) = delete;
+    KernelLibrary &operator=(const KernelLibrary &) = delete;
+
+    KernelEvalFn eval() const { return eval_; }
+    const std::string &path() const { return path_; }
+
+private:
+    void *handle_ = nullptr;
+    KernelEvalFn eval_ = nullptr;
+    std::string path_;
+};
+
+} // namespace digitalcodec
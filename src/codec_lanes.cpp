@@ -0,0 +1,221 @@
+#include "codec_lanes.h"
+
+#include <algorithm>
+#include <stdexcept>
+
+namespace digitalcodec {
+
+// Заголовки кадров для flowLane
+static constexpr size_t kEthHeader = 14;
+static constexpr uint16_t kEtherTypeVlan = 0x8100;
+static constexpr uint16_t kEtherTypeQinQ = 0x88A8;
+static constexpr uint16_t kEtherTypeIpv4 = 0x0800;
+static constexpr uint16_t kEtherTypeIpv6 = 0x86DD;
+static constexpr uint8_t kProtoTcp = 6;
+static constexpr uint8_t kProtoUdp = 17;
+
+static constexpr uint64_t kFnvOffset = 1469598103934665603ull;
+static constexpr uint64_t kFnvPrime = 1099511628211ull;
+
+static inline uint64_t fnvMix(uint64_t h, const uint8_t *data, size_t len) {
+    for (size_t i = 0; i < len; ++i) {
+        h = (h ^ data[i]) * kFnvPrime;
+    }
+    return h;
+}
+
+static inline uint64_t splitmix64(uint64_t x) {
+    x += 0x9E3779B97F4A7C15ull;
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9ull;
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EBull;
+    return x ^ (x >> 31);
+}
+
+static inline int32_t wrapBits(uint64_t v, int bitsM) {
+    const uint32_t mask = static_cast<uint32_t>((1ull << bitsM) - 1ull);
+    const uint32_t sign = 1u << (bitsM - 1);
+    return static_cast<int32_t>(((static_cast<uint32_t>(v) & mask) ^ sign) - sign);
+}
+
+void laneInitialStates(const CodecParams &params, int lane, int32_t &h1, int32_t &h2) {
+    if (lane == 0) {
+        h1 = params.h1;
+        h2 = params.h2;
+        return;
+    }
+    const uint64_t seed = (static_cast<uint64_t>(static_cast<uint32_t>(params.h1)) << 32)
+                        | static_cast<uint32_t>(params.h2);
+    const uint64_t a = splitmix64(seed ^ (static_cast<uint64_t>(lane) * 0xD6E8FEB86659FD93ull));
+    const uint64_t b = splitmix64(a);
+    h1 = wrapBits(a, params.bitsM);
+    h2 = wrapBits(b, params.bitsM);
+}
+
+int flowLane(const uint8_t *frame, size_t len, int lanes) {
+    if (lanes <= 1 || len < kEthHeader) return 0;
+    size_t pos = 12;
+    uint16_t type = static_cast<uint16_t>((frame[pos] << 8) | frame[pos + 1]);
+    while ((type == kEtherTypeVlan || type == kEtherTypeQinQ) && pos + 6 <= len) {
+        pos += 4;
+        type = static_cast<uint16_t>((frame[pos] << 8) | frame[pos + 1]);
+    }
+    pos += 2;
+
+    uint64_t h = kFnvOffset;
+    if (type == kEtherTypeIpv4 && pos + 20 <= len) {
+        const uint8_t *ip = frame + pos;
+        const size_t ihl = static_cast<size_t>(ip[0] & 0x0F) * 4;
+        const uint8_t proto = ip[9];
+        h = fnvMix(h, &proto, 1);
+        h = fnvMix(h, ip + 12, 8);  // src + dst
+        // Порты есть только в первом фрагменте
+        const bool firstFragment = ((ip[6] & 0x1F) | ip[7]) == 0;
+        if ((proto == kProtoTcp || proto == kProtoUdp) && firstFragment && ihl >= 20 && pos + ihl + 4 <= len) {
+            h = fnvMix(h, ip + ihl, 4);
+        }
+    } else if (type == kEtherTypeIpv6 && pos + 40 <= len) {
+        const uint8_t *ip = frame + pos;
+        const uint8_t next = ip[6];
+        h = fnvMix(h, &next, 1);
+        h = fnvMix(h, ip + 8, 32);  // src + dst
+        if ((next == kProtoTcp || next == kProtoUdp) && pos + 44 <= len) {
+            h = fnvMix(h, ip + 40, 4);
+        }
+    } else {
+        h = fnvMix(h, frame, 12);  // dst MAC + src MAC
+    }
+    return static_cast<int>(splitmix64(h) % static_cast<uint64_t>(lanes));
+}
+
+CodecLanes::CodecLanes(const CodecParams &params, const std::string &csvPath, int lanes)
+    : params_(params) {
+    if (lanes < 1 || lanes > kMaxCodecLanes) {
+        throw std::invalid_argument("lanes must be in 1.." + std::to_string(kMaxCodecLanes));
+    }
+    lanes_.reserve(static_cast<size_t>(lanes));
+    for (int i = 0; i < lanes; ++i) {
+        CodecParams laneParams = params;
+        laneInitialStates(params, i, laneParams.h1, laneParams.h2);
+        // Разные последовательности случайных подстановок при заданном seed
+        if (params.randomSeed != 0) laneParams.randomSeed = params.randomSeed + static_cast<uint64_t>(i);
+        auto codec = std::make_unique<DigitalCodec>();
+        codec->configure(laneParams);
+        codec->loadCoefficientsCSV(csvPath);
+        codec->reset();
+        lanes_.push_back(std::move(codec));
+    }
+    // Одни k-символьные таблицы на все полосы: каждая строка строится один раз
+    for (size_t i = 1; i < lanes_.size(); ++i) lanes_[i]->shareEncodeTables(*lanes_.front());
+}
+
+void CodecLanes::reset() {
+    for (auto &codec : lanes_) codec->reset();
+}
+
+size_t CodecLanes::encodeFrameBound(size_t input_len, bool use_hash) const {
+    return kLaneHeaderBytes + lanes_.front()->encodeMessageBound(input_len, use_hash);
+}
+
+size_t CodecLanes::encodeFrameInto(int lane, const uint8_t *input, size_t input_len, bool use_hash,
+                                   uint8_t *out, size_t out_cap) {
+    if (lane < 0 || lane >= lanes()) {
+        throw std::out_of_range("encodeFrameInto: no lane " + std::to_string(lane));
+    }
+    if (out_cap < kLaneHeaderBytes) {
+        throw std::length_error("encodeFrameInto: output buffer is smaller than encodeFrameBound()");
+    }
+    out[0] = static_cast<uint8_t>(lane);
+    return kLaneHeaderBytes + lanes_[static_cast<size_t>(lane)]->encodeMessageInto(
+        input, input_len, use_hash, out + kLaneHeaderBytes, out_cap - kLaneHeaderBytes);
+}
+
+int CodecLanes::frameLane(const uint8_t *framed, size_t framed_len) const {
+    if (framed_len < kLaneHeaderBytes + 2) return -1;
+    const int lane = framed[0];
+    return lane < lanes() ? lane : -1;
+}
+
+size_t CodecLanes::decodeFrameInto(const uint8_t *framed, size_t framed_len, bool use_hash,
+                                   uint8_t *out, size_t out_cap) {
+    const int lane = frameLane(framed, framed_len);
+    if (lane < 0) return 0;
+    return lanes_[static_cast<size_t>(lane)]->decodeMessageInto(
+        framed + kLaneHeaderBytes, framed_len - kLaneHeaderBytes, 0, use_hash, out, out_cap);
+}
+
+CodecStats CodecLanes::debugStats() const {
+    CodecStats total;
+    for (const auto &codec : lanes_) total += codec->debugStats();
+    return total;
+}
+
+void CodecLanes::printDebugStats(const std::string &context) const {
+    if (!params_.statsMode) {
+        return;
+    }
+    printCodecStats(debugStats(), context.empty()
+        ? "📊 Статистика цифрового кодека (" + std::to_string(lanes()) + " полос)" : context);
+}
+
+LaneWorkers::LaneWorkers(int threads, int lanes, Handler handler, size_t queueLimit)
+    : handler_(std::move(handler)), queueLimit_(std::max<size_t>(1, queueLimit)) {
+    int count = threads > 0 ? threads : static_cast<int>(std::thread::hardware_concurrency());
+    count = std::max(1, std::min(count, std::max(1, lanes)));
+    workers_.reserve(static_cast<size_t>(count));
+    for (int i = 0; i < count; ++i) {
+        workers_.push_back(std::make_unique<Worker>());
+    }
+    for (int i = 0; i < count; ++i) {
+        workers_[static_cast<size_t>(i)]->thread = std::thread(&LaneWorkers::run, this, i);
+    }
+}
+
+LaneWorkers::~LaneWorkers() {
+    for (auto &worker : workers_) {
+        {
+            std::lock_guard<std::mutex> lock(worker->mutex);
+            worker->stop = true;
+        }
+        worker->ready.notify_one();
+    }
+    for (auto &worker : workers_) {
+        if (worker->thread.joinable()) worker->thread.join();
+    }
+}
+
+void LaneWorkers::submit(int lane, const uint8_t *data, size_t len) {
+    Worker &worker = *workers_[static_cast<size_t>(lane) % workers_.size()];
+    {
+        std::unique_lock<std::mutex> lock(worker.mutex);
+        worker.space.wait(lock, [&] { return worker.jobs.size() < queueLimit_; });
+        Job job;
+        job.lane = lane;
+        if (!worker.spare.empty()) {
+            job.data = std::move(worker.spare.back());
+            worker.spare.pop_back();
+        }
+        job.data.assign(data, data + len);
+        worker.jobs.push_back(std::move(job));
+    }
+    worker.ready.notify_one();
+}
+
+void LaneWorkers::run(int index) {
+    Worker &worker = *workers_[static_cast<size_t>(index)];
+    while (true) {
+        Job job;
+        {
+            std::unique_lock<std::mutex> lock(worker.mutex);
+            worker.ready.wait(lock, [&] { return worker.stop || !worker.jobs.empty(); });
+            if (worker.jobs.empty()) return;  // stop и очередь пуста
+            job = std::move(worker.jobs.front());
+            worker.jobs.pop_front();
+        }
+        worker.space.notify_one();
+        handler_(index, job.lane, job.data.data(), job.data.size());
+        std::lock_guard<std::mutex> lock(worker.mutex);
+        worker.spare.push_back(std::move(job.data));
+    }
+}
+
+} // namespace digitalcodec
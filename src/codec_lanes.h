@@ -0,0 +1,108 @@
+#pragma once
+
+#include <condition_variable>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "digital_codec.h"
+
+// Multi-lane codec mode.
+// One DigitalCodec is a single h1/h2 chain, so every frame of a session is coded strictly
+// after the previous one on one core. In lane mode frames are spread over N independent
+// codecs (lanes) sharing the key, each with its own state chain started from
+// laneInitialStates(). A lane frame is [lane id (1 byte)] [encodeMessage frame of the lane],
+// so the receiver decodes it on the same lane. The sender picks the lane by flow (flowLane),
+// frames of one flow stay in order on one lane and different lanes run in parallel (LaneWorkers).
+
+namespace digitalcodec {
+
+constexpr int kMaxCodecLanes = 256;   // lane id is one byte
+constexpr size_t kLaneHeaderBytes = 1;
+
+// Initial (h1, h2) of a lane: lane 0 keeps params.h1/h2, the others are mixed from
+// (h1, h2, lane) and wrapped to M bits, so both ends derive the same states
+void laneInitialStates(const CodecParams &params, int lane, int32_t &h1, int32_t &h2);
+
+// Lane of an Ethernet frame: hash of the IPv4/IPv6 5-tuple (addresses, protocol and
+// TCP/UDP ports, 802.1Q tags skipped); other frames hash the MAC pair
+int flowLane(const uint8_t *frame, size_t len, int lanes);
+
+class CodecLanes {
+public:
+    // configure() and loadCoefficientsCSV() for every lane (certificate and compiledKernel
+    // as for one codec, k-symbol encode tables shared by all lanes).
+    // Throws std::invalid_argument if lanes is not in 1..kMaxCodecLanes.
+    CodecLanes(const CodecParams &params, const std::string &csvPath, int lanes);
+
+    int lanes() const { return static_cast<int>(lanes_.size()); }
+    DigitalCodec &lane(int i) { return *lanes_[static_cast<size_t>(i)]; }
+    const DigitalCodec &lane(int i) const { return *lanes_[static_cast<size_t>(i)]; }
+    // Every lane back to its initial states
+    void reset();
+
+    // Lane frames. A lane is a DigitalCodec: encode and decode of one lane may run in two
+    // threads, but one direction of a lane must not be used from two threads at once.
+    size_t encodeFrameBound(size_t input_len, bool use_hash = false) const;
+    size_t encodeFrameInto(int lane, const uint8_t *input, size_t input_len, bool use_hash,
+                           uint8_t *out, size_t out_cap);
+    // Lane id of a lane frame, -1 if the frame is too short or the lane does not exist
+    int frameLane(const uint8_t *framed, size_t framed_len) const;
+    // 0 for a malformed frame (see frameLane), otherwise as decodeMessageInto
+    size_t decodeFrameInto(const uint8_t *framed, size_t framed_len, bool use_hash,
+                           uint8_t *out, size_t out_cap);
+
+    // Sum of the lane statistics
+    CodecStats debugStats() const;
+    void printDebugStats(const std::string &context = "") const;
+
+private:
+    CodecParams params_;
+    std::vector<std::unique_ptr<DigitalCodec>> lanes_;
+};
+
+// Worker threads for lane frames: lane i is always served by worker i % threads, so the
+// frames of a lane are handled in submission order and different lanes in parallel.
+// Frames are copied into bounded per-worker queues (buffers are reused); submit() blocks
+// while the queue of the worker is full.
+class LaneWorkers {
+public:
+    // worker: 0..threads()-1, for per-thread output buffers of the handler
+    using Handler = std::function<void(int worker, int lane, const uint8_t *data, size_t len)>;
+
+    // threads = 0: one per core, never more than lanes
+    LaneWorkers(int threads, int lanes, Handler handler, size_t queueLimit = 1024);
+    ~LaneWorkers();  // handles the queued frames and joins
+    LaneWorkers(const LaneWorkers &) = delete;
+    LaneWorkers &operator=(const LaneWorkers &) = delete;
+
+    int threads() const { return static_cast<int>(workers_.size()); }
+    void submit(int lane, const uint8_t *data, size_t len);
+
+private:
+    struct Job {
+        int lane = 0;
+        std::vector<uint8_t> data;
+    };
+    struct Worker {
+        std::mutex mutex;
+        std::condition_variable ready;
+        std::condition_variable space;
+        std::deque<Job> jobs;
+        std::vector<std::vector<uint8_t>> spare;  // buffers of handled jobs
+        bool stop = false;
+        std::thread thread;
+    };
+    void run(int index);
+
+    Handler handler_;
+    size_t queueLimit_;
+    std::vector<std::unique_ptr<Worker>> workers_;
+};
+
+} // namespace digitalcodec
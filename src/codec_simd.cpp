@@ -0,0 +1,240 @@
+#include "codec_simd.h"
+
+#if defined(__x86_64__) && (defined(__GNUC__) || defined(__clang__))
+#define LC_CODEC_X86_SIMD 1
+#include <immintrin.h>
+#endif
+
+namespace digitalcodec {
+
+#ifdef LC_CODEC_X86_SIMD
+
+// Мономы funType для состояния (x, y) - та же арифметика по модулю 2^32, что у evalRangeImpl:
+// a*x + b*y + q | a*x^2 + b*y + q | a*x^2 + b*y^2 + q | a*x^3 + b*y^2 + q | a*x + b*x*y + c*y + q
+template <int FunType>
+static inline void monomials(int32_t x, int32_t y, uint32_t &m0, uint32_t &m1, uint32_t &m2) {
+    const uint32_t ux = static_cast<uint32_t>(x);
+    const uint32_t uy = static_cast<uint32_t>(y);
+    m2 = 0;
+    if constexpr (FunType == 1) {
+        m0 = ux; m1 = uy;
+    } else if constexpr (FunType == 2) {
+        m0 = ux * ux; m1 = uy;
+    } else if constexpr (FunType == 3) {
+        m0 = ux * ux; m1 = uy * uy;
+    } else if constexpr (FunType == 4) {
+        m0 = ux * ux * ux; m1 = uy * uy;
+    } else {
+        m0 = ux; m1 = ux * uy; m2 = uy;
+    }
+}
+
+// --- AVX2: 8 функций на вектор ---
+
+// Приведение к M битам со знаком: сдвиг влево на 32-M и арифметический обратно
+// (то же, что ((v & mask) ^ sign) - sign для любого M)
+template <int FunType>
+__attribute__((target("avx2")))
+static void evalAllAvx2(const int32_t *coeff, int funCount, int bitsM, int32_t x, int32_t y, int32_t *rr) {
+    uint32_t m0, m1, m2;
+    monomials<FunType>(x, y, m0, m1, m2);
+    const __m256i vm0 = _mm256_set1_epi32(static_cast<int32_t>(m0));
+    const __m256i vm1 = _mm256_set1_epi32(static_cast<int32_t>(m1));
+    const __m256i vm2 = _mm256_set1_epi32(static_cast<int32_t>(m2));
+    const __m128i shift = _mm_cvtsi32_si128(32 - bitsM);
+    const int32_t *c0 = coeff;
+    const int32_t *c1 = c0 + funCount;
+    const int32_t *c2 = c1 + funCount;
+    const int32_t *c3 = c2 + funCount;
+    for (int ff = 0; ff < funCount; ff += 8) {
+        __m256i v = _mm256_add_epi32(
+            _mm256_mullo_epi32(_mm256_loadu_si256(reinterpret_cast<const __m256i *>(c0 + ff)), vm0),
+            _mm256_mullo_epi32(_mm256_loadu_si256(reinterpret_cast<const __m256i *>(c1 + ff)), vm1));
+        const __m256i k2 = _mm256_loadu_si256(reinterpret_cast<const __m256i *>(c2 + ff));
+        if constexpr (FunType == 5) {
+            v = _mm256_add_epi32(v, _mm256_mullo_epi32(k2, vm2));
+            v = _mm256_add_epi32(v, _mm256_loadu_si256(reinterpret_cast<const __m256i *>(c3 + ff)));
+        } else {
+            (void)vm2; (void)c3;
+            v = _mm256_add_epi32(v, k2);
+        }
+        v = _mm256_sra_epi32(_mm256_sll_epi32(v, shift), shift);
+        _mm256_storeu_si256(reinterpret_cast<__m256i *>(rr + ff), v);
+    }
+}
+
+__attribute__((target("avx2")))
+static inline unsigned equalMaskAvx2(__m256i block, int32_t value) {
+    const __m256i eq = _mm256_cmpeq_epi32(block, _mm256_set1_epi32(value));
+    return static_cast<unsigned>(_mm256_movemask_ps(_mm256_castsi256_ps(eq)));
+}
+
+__attribute__((target("avx2")))
+static int firstDuplicateAvx2(const int32_t *rr, int funCount) {
+    for (int b = 0; b < funCount; b += 8) {
+        const __m256i block = _mm256_loadu_si256(reinterpret_cast<const __m256i *>(rr + b));
+        // Значения предыдущих блоков - все 8 дорожек
+        __m256i dup = _mm256_setzero_si256();
+        for (int i = 0; i < b; ++i) {
+            dup = _mm256_or_si256(dup, _mm256_cmpeq_epi32(block, _mm256_set1_epi32(rr[i])));
+        }
+        unsigned mask = static_cast<unsigned>(_mm256_movemask_ps(_mm256_castsi256_ps(dup)));
+        // Внутри блока - только дорожки после i
+        for (int i = 0; i < 7; ++i) {
+            mask |= equalMaskAvx2(block, rr[b + i]) & (0xFEu << i) & 0xFFu;
+        }
+        if (mask) return b + __builtin_ctz(mask);
+    }
+    return funCount;
+}
+
+__attribute__((target("avx2")))
+static int findAvx2(const int32_t *rr, int funCount, int32_t value) {
+    const __m256i needle = _mm256_set1_epi32(value);
+    for (int b = 0; b < funCount; b += 8) {
+        const __m256i eq = _mm256_cmpeq_epi32(_mm256_loadu_si256(reinterpret_cast<const __m256i *>(rr + b)), needle);
+        const unsigned mask = static_cast<unsigned>(_mm256_movemask_ps(_mm256_castsi256_ps(eq)));
+        if (mask) return b + __builtin_ctz(mask);
+    }
+    return -1;
+}
+
+// --- SSE4.1: 4 функции на вектор (pmulld) ---
+
+template <int FunType>
+__attribute__((target("sse4.1")))
+static void evalAllSse41(const int32_t *coeff, int funCount, int bitsM, int32_t x, int32_t y, int32_t *rr) {
+    uint32_t m0, m1, m2;
+    monomials<FunType>(x, y, m0, m1, m2);
+    const __m128i vm0 = _mm_set1_epi32(static_cast<int32_t>(m0));
+    const __m128i vm1 = _mm_set1_epi32(static_cast<int32_t>(m1));
+    const __m128i vm2 = _mm_set1_epi32(static_cast<int32_t>(m2));
+    const __m128i shift = _mm_cvtsi32_si128(32 - bitsM);
+    const int32_t *c0 = coeff;
+    const int32_t *c1 = c0 + funCount;
+    const int32_t *c2 = c1 + funCount;
+    const int32_t *c3 = c2 + funCount;
+    for (int ff = 0; ff < funCount; ff += 4) {
+        __m128i v = _mm_add_epi32(
+            _mm_mullo_epi32(_mm_loadu_si128(reinterpret_cast<const __m128i *>(c0 + ff)), vm0),
+            _mm_mullo_epi32(_mm_loadu_si128(reinterpret_cast<const __m128i *>(c1 + ff)), vm1));
+        const __m128i k2 = _mm_loadu_si128(reinterpret_cast<const __m128i *>(c2 + ff));
+        if constexpr (FunType == 5) {
+            v = _mm_add_epi32(v, _mm_mullo_epi32(k2, vm2));
+            v = _mm_add_epi32(v, _mm_loadu_si128(reinterpret_cast<const __m128i *>(c3 + ff)));
+        } else {
+            (void)vm2; (void)c3;
+            v = _mm_add_epi32(v, k2);
+        }
+        v = _mm_sra_epi32(_mm_sll_epi32(v, shift), shift);
+        _mm_storeu_si128(reinterpret_cast<__m128i *>(rr + ff), v);
+    }
+}
+
+__attribute__((target("sse4.1")))
+static inline unsigned equalMaskSse41(__m128i block, int32_t value) {
+    const __m128i eq = _mm_cmpeq_epi32(block, _mm_set1_epi32(value));
+    return static_cast<unsigned>(_mm_movemask_ps(_mm_castsi128_ps(eq)));
+}
+
+__attribute__((target("sse4.1")))
+static int firstDuplicateSse41(const int32_t *rr, int funCount) {
+    for (int b = 0; b < funCount; b += 4) {
+        const __m128i block = _mm_loadu_si128(reinterpret_cast<const __m128i *>(rr + b));
+        __m128i dup = _mm_setzero_si128();
+        for (int i = 0; i < b; ++i) {
+            dup = _mm_or_si128(dup, _mm_cmpeq_epi32(block, _mm_set1_epi32(rr[i])));
+        }
+        unsigned mask = static_cast<unsigned>(_mm_movemask_ps(_mm_castsi128_ps(dup)));
+        for (int i = 0; i < 3; ++i) {
+            mask |= equalMaskSse41(block, rr[b + i]) & (0xEu << i) & 0xFu;
+        }
+        if (mask) return b + __builtin_ctz(mask);
+    }
+    return funCount;
+}
+
+__attribute__((target("sse4.1")))
+static int findSse41(const int32_t *rr, int funCount, int32_t value) {
+    const __m128i needle = _mm_set1_epi32(value);
+    for (int b = 0; b < funCount; b += 4) {
+        const __m128i eq = _mm_cmpeq_epi32(_mm_loadu_si128(reinterpret_cast<const __m128i *>(rr + b)), needle);
+        const unsigned mask = static_cast<unsigned>(_mm_movemask_ps(_mm_castsi128_ps(eq)));
+        if (mask) return b + __builtin_ctz(mask);
+    }
+    return -1;
+}
+
+static SimdEvalAllFn selectEvalAvx2(int funType) {
+    switch (funType) {
+        case 1: return &evalAllAvx2<1>;
+        case 2: return &evalAllAvx2<2>;
+        case 3: return &evalAllAvx2<3>;
+        case 4: return &evalAllAvx2<4>;
+        default: return &evalAllAvx2<5>;
+    }
+}
+
+static SimdEvalAllFn selectEvalSse41(int funType) {
+    switch (funType) {
+        case 1: return &evalAllSse41<1>;
+        case 2: return &evalAllSse41<2>;
+        case 3: return &evalAllSse41<3>;
+        case 4: return &evalAllSse41<4>;
+        default: return &evalAllSse41<5>;
+    }
+}
+
+SimdLevel detectSimdLevel() {
+    static const SimdLevel level = [] {
+        __builtin_cpu_init();
+        if (__builtin_cpu_supports("avx2")) return kSimdAvx2;
+        if (__builtin_cpu_supports("sse4.1")) return kSimdSse41;
+        return kSimdScalar;
+    }();
+    return level;
+}
+
+#else
+
+SimdLevel detectSimdLevel() {
+    return kSimdScalar;
+}
+
+#endif
+
+const char *simdLevelName(SimdLevel level) {
+    switch (level) {
+        case kSimdAvx2: return "avx2";
+        case kSimdSse41: return "sse4.1";
+        default: return "scalar";
+    }
+}
+
+SimdKernels selectSimdKernels(int requestedLevel, int funType, int funCount) {
+    SimdKernels kernels;
+    const SimdLevel supported = detectSimdLevel();
+    int level = (requestedLevel < 0 || requestedLevel > supported) ? supported : requestedLevel;
+    // Уровень подходит, только если funCount кратно числу дорожек
+    if (level == kSimdAvx2 && funCount % 8 != 0) level = kSimdSse41;
+    if (level == kSimdSse41 && funCount % 4 != 0) level = kSimdScalar;
+    const bool duplicates = funCount <= kSimdMaxDuplicateFuncs;
+#ifdef LC_CODEC_X86_SIMD
+    if (level == kSimdAvx2) {
+        kernels.level = kSimdAvx2;
+        kernels.evalAll = selectEvalAvx2(funType);
+        kernels.firstDuplicate = duplicates ? &firstDuplicateAvx2 : nullptr;
+        kernels.find = &findAvx2;
+    } else if (level == kSimdSse41) {
+        kernels.level = kSimdSse41;
+        kernels.evalAll = selectEvalSse41(funType);
+        kernels.firstDuplicate = duplicates ? &firstDuplicateSse41 : nullptr;
+        kernels.find = &findSse41;
+    }
+#else
+    (void)level; (void)duplicates; (void)funType;
+#endif
+    return kernels;
+}
+
+} // namespace digitalcodec
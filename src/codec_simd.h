@@ -0,0 +1,46 @@
+#pragma once
+
+#include <cstdint>
+
+// Vectorized RR evaluation and RR searches.
+// For one state (x, y) all 2^Q functions share the monomials and differ only in their
+// COEFF column entries, so RR is a few vector multiply-adds over the SoA columns.
+// AVX2 / SSE4.1 variants are compiled with target attributes and picked at runtime
+// from the CPU (x86-64); elsewhere only the scalar evaluators of DigitalCodec are used.
+
+namespace digitalcodec {
+
+enum SimdLevel {
+    kSimdScalar = 0,
+    kSimdSse41 = 1,
+    kSimdAvx2 = 2,
+};
+
+// Vector searches of firstDuplicate are quadratic in funCount: only up to Q = 6
+constexpr int kSimdMaxDuplicateFuncs = 64;
+
+// RR of all funCount functions for (x, y), wrapped to M bits (same values as evalRange)
+using SimdEvalAllFn = void (*)(const int32_t *coeff, int funCount, int bitsM,
+                               int32_t x, int32_t y, int32_t *rr);
+// Smallest j with rr[j] == rr[i] for some i < j, funCount if all values differ
+using SimdFirstDuplicateFn = int (*)(const int32_t *rr, int funCount);
+// Index of the first rr[ff] == value or -1
+using SimdFindFn = int (*)(const int32_t *rr, int funCount, int32_t value);
+
+struct SimdKernels {
+    SimdLevel level = kSimdScalar;
+    SimdEvalAllFn evalAll = nullptr;
+    SimdFirstDuplicateFn firstDuplicate = nullptr;  // nullptr if funCount > kSimdMaxDuplicateFuncs
+    SimdFindFn find = nullptr;
+};
+
+// Best level the CPU supports (detected once)
+SimdLevel detectSimdLevel();
+const char *simdLevelName(SimdLevel level);
+
+// Kernels for the requested level (-1 = detectSimdLevel()), clamped to what the CPU
+// supports and to funCount: a level is used only if funCount is a multiple of its lanes.
+// All pointers are nullptr for kSimdScalar.
+SimdKernels selectSimdKernels(int requestedLevel, int funType, int funCount);
+
+} // namespace digitalcodec
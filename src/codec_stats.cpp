@@ -0,0 +1,88 @@
+#include "codec_stats.h"
+
+#include <algorithm>
+#include <iomanip>
+#include <iostream>
+#include <sstream>
+
+namespace digitalcodec {
+
+CodecStats statsDelta(const CodecStats &later, const CodecStats &earlier) {
+    CodecStats d;
+    d.encodedSymbols = later.encodedSymbols - earlier.encodedSymbols;
+    d.encodeCollisions = later.encodeCollisions - earlier.encodeCollisions;
+    d.encodeRandomFallbacks = later.encodeRandomFallbacks - earlier.encodeRandomFallbacks;
+    d.encodeDirectInfo = later.encodeDirectInfo - earlier.encodeDirectInfo;
+    d.decodedSymbols = later.decodedSymbols - earlier.decodedSymbols;
+    d.decodeDirectInfo = later.decodeDirectInfo - earlier.decodeDirectInfo;
+    d.decodeSkips = later.decodeSkips - earlier.decodeSkips;
+    d.collisionCacheHits = later.collisionCacheHits - earlier.collisionCacheHits;
+    d.collisionCacheMisses = later.collisionCacheMisses - earlier.collisionCacheMisses;
+    return d;
+}
+
+static double percent(uint64_t part, uint64_t total) {
+    return total ? 100.0 * static_cast<double>(part) / static_cast<double>(total) : 0.0;
+}
+
+void printStatsRates(const CodecStats &delta, double seconds, const std::string &label) {
+    const double perSecond = seconds > 0.0 ? 1.0 / seconds : 0.0;
+    // Одна строка собирается целиком, чтобы не перемешиваться с выводом других потоков
+    std::ostringstream line;
+    line << std::fixed << "📈 " << label << " за " << std::setprecision(1) << seconds << " с:";
+    if (delta.encodedSymbols) {
+        line << " кодирование " << std::setprecision(0) << delta.encodedSymbols * perSecond << " симв/с"
+             << std::setprecision(2)
+             << " (коллизии " << percent(delta.encodeCollisions, delta.encodedSymbols) << "%"
+             << ", подстановки " << percent(delta.encodeRandomFallbacks, delta.encodedSymbols) << "%)";
+    }
+    if (delta.decodedSymbols) {
+        line << (delta.encodedSymbols ? "," : "")
+             << " декодирование " << std::setprecision(0) << delta.decodedSymbols * perSecond << " симв/с"
+             << std::setprecision(2)
+             << " (пропуски " << percent(delta.decodeSkips, delta.decodedSymbols) << "%)";
+    }
+    line << "\n";
+    std::cout << line.str() << std::flush;
+}
+
+StatsSampler::StatsSampler(std::vector<Source> sources, std::chrono::milliseconds interval, std::string label)
+    : sources_(std::move(sources)),
+      interval_(std::max(interval, std::chrono::milliseconds(1))),
+      label_(std::move(label)) {
+    thread_ = std::thread(&StatsSampler::run, this);
+}
+
+StatsSampler::~StatsSampler() {
+    {
+        std::lock_guard<std::mutex> lock(mutex_);
+        stop_ = true;
+    }
+    wake_.notify_one();
+    if (thread_.joinable()) thread_.join();
+}
+
+CodecStats StatsSampler::snapshot() const {
+    CodecStats total;
+    for (const auto &source : sources_) total += source();
+    return total;
+}
+
+void StatsSampler::run() {
+    CodecStats last = snapshot();
+    auto lastTime = std::chrono::steady_clock::now();
+    std::unique_lock<std::mutex> lock(mutex_);
+    while (!wake_.wait_for(lock, interval_, [&] { return stop_; })) {
+        const CodecStats now = snapshot();
+        const auto nowTime = std::chrono::steady_clock::now();
+        const CodecStats delta = statsDelta(now, last);
+        // Простой канала (нет символов за интервал) не печатаем
+        if (delta.encodedSymbols || delta.decodedSymbols) {
+            printStatsRates(delta, std::chrono::duration<double>(nowTime - lastTime).count(), label_);
+        }
+        last = now;
+        lastTime = nowTime;
+    }
+}
+
+} // namespace digitalcodec
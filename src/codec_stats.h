@@ -0,0 +1,53 @@
+#pragma once
+
+#include <chrono>
+#include <condition_variable>
+#include <functional>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include "digital_codec.h"
+
+// Periodic codec statistics.
+// printDebugStats() dumps the cumulative counters, so frame loops calling it inline pay
+// for console I/O on the data path and never see rates. StatsSampler samples the counters
+// of one or more sources (codecs, lanes, threads) from its own thread, merges them at
+// snapshot time and prints the per-second rates of the interval since the previous sample.
+
+namespace digitalcodec {
+
+// Difference of two snapshots of the same counters (later - earlier)
+CodecStats statsDelta(const CodecStats &later, const CodecStats &earlier);
+
+// One-line report of an interval: symbol rates per second and the collision, fallback
+// and skip rates relative to the symbols coded in the interval
+void printStatsRates(const CodecStats &delta, double seconds, const std::string &label);
+
+class StatsSampler {
+public:
+    using Source = std::function<CodecStats()>;
+
+    // Starts sampling at once; intervals without coded symbols are not printed
+    StatsSampler(std::vector<Source> sources, std::chrono::milliseconds interval, std::string label);
+    ~StatsSampler();  // stops the thread
+    StatsSampler(const StatsSampler &) = delete;
+    StatsSampler &operator=(const StatsSampler &) = delete;
+
+    // Sum of the sources now
+    CodecStats snapshot() const;
+
+private:
+    void run();
+
+    std::vector<Source> sources_;
+    std::chrono::milliseconds interval_;
+    std::string label_;
+    std::mutex mutex_;
+    std::condition_variable wake_;
+    bool stop_ = false;
+    std::thread thread_;
+};
+
+} // namespace digitalcodec
@@ -1,23 +1,201 @@
 #include "digital_codec.h"
+#include "codec_kernel.h"
+#include "codec_simd.h"
 
+#include <algorithm>
 #include <cassert>
 #include <cctype>
 #include <cstdlib>
+#include <condition_variable>
 #include <cstring>
 #include <ctime>
 #include <fstream>
+#include <iomanip>
 #include <iostream>
+#include <mutex>
 #include <sstream>
 #include <stdexcept>
 #include <sodium.h>
-#include <unordered_set>
 #include <unordered_map>
 #include <random>
+#include <thread>
 
 namespace digitalcodec {
 
 static inline int64_t ipow2(int n) { return (int64_t)1 << n; }
 
+// Минимум слов на поток для параллельного декодирования (меньше - накладные расходы)
+static constexpr size_t kMinWordsPerDecodeThread = 4096;
+
+// k-символьные таблицы кодирования: до 4 слов по 8 бит в одном uint32,
+// не больше 2^8 комбинаций символов на состояние
+static constexpr int kMultiMaxSymbols = 4;
+static constexpr int kMultiMaxComboBits = 8;
+static constexpr int kMultiMaxCombos = 1 << kMultiMaxComboBits;
+static constexpr int kMultiMaxFuncs = 1 << (kMultiMaxComboBits / 2);  // k >= 2
+static constexpr uint8_t kMultiDeterministic = 0x80;
+// Строки таблиц выделяются из блоков такого размера (в uint32)
+static constexpr size_t kMultiChunkWords = static_cast<size_t>(1) << 18;
+// Предел полного объёма таблиц: поиск выигрывает у посимвольного пути, только пока таблицы
+// в кеше (8 МБ, Q=2_5.csv: M=7 k=2 (1.4 МБ) 7.2 -> 8.9 МБ/с, M=8 k=2 (5.8 МБ) 6.2 -> 2.7 МБ/с)
+static constexpr size_t kMultiMaxTableBytes = static_cast<size_t>(2) << 20;
+
+// Сертификат инъективности: формат записи и число контрольных состояний при загрузке
+static constexpr const char *kCertificateSuffix = ".cert";
+static constexpr const char *kCertificateRecord = "injective";
+static constexpr int kCertificateSpotChecks = 256;
+
+// Кеш коллизий: битовая маска directInRR на uint64 - не больше 64 функций (Q <= 6)
+static constexpr int kCollisionCacheMaxFuncs = 64;
+static constexpr int kCollisionCacheMaxBits = 24;
+// Пробное окно: если за первые столько поисков попаданий меньше 1/4, кеш отключается
+// (при больших M случайный трафик почти не повторяет состояния, промахи только мешают)
+static constexpr uint64_t kCollisionCacheProbeLookups = 1 << 16;
+static constexpr uint64_t kCollisionCacheMinHitRatio = 4;
+
+// === DigitalCodingFun evaluators ===
+// Кольцо по модулю 2^M: сложение и умножение считаются в uint32 (по модулю 2^32)
+// и приводятся к M битам один раз в конце - результат совпадает с wrapM после
+// каждой операции. Мономы (x, x^2, x*y, ...) вычисляются один раз на состояние,
+// внутренний цикл по функциям - скалярное произведение со столбцами COEFF.
+
+// Word width: 8 / 16 - M равно ширине типа, приведение - простое сужение;
+// 32 - любое другое M, знаковое расширение через маску
+template <int Width>
+static inline int32_t wrapWidth(uint32_t v, uint32_t mask, uint32_t sign) {
+    if constexpr (Width == 8) {
+        (void)mask; (void)sign;
+        return static_cast<int8_t>(static_cast<uint8_t>(v));
+    } else if constexpr (Width == 16) {
+        (void)mask; (void)sign;
+        return static_cast<int16_t>(static_cast<uint16_t>(v));
+    } else {
+        return static_cast<int32_t>((v & mask) ^ sign) - static_cast<int32_t>(sign);
+    }
+}
+
+template <int FunType, int Width>
+static void evalRangeImpl(const int32_t *coeff, int funCount, int bitsM,
+                          int32_t x, int32_t y, int first, int last, int32_t *rr) {
+    const uint32_t ux = static_cast<uint32_t>(x);
+    const uint32_t uy = static_cast<uint32_t>(y);
+    uint32_t m0, m1, m2 = 0;
+    if constexpr (FunType == 1) {        // a*x + b*y + q
+        m0 = ux; m1 = uy;
+    } else if constexpr (FunType == 2) { // a*x^2 + b*y + q
+        m0 = ux * ux; m1 = uy;
+    } else if constexpr (FunType == 3) { // a*x^2 + b*y^2 + q
+        m0 = ux * ux; m1 = uy * uy;
+    } else if constexpr (FunType == 4) { // a*x^3 + b*y^2 + q
+        m0 = ux * ux * ux; m1 = uy * uy;
+    } else {                             // a*x + b*x*y + c*y + q
+        m0 = ux; m1 = ux * uy; m2 = uy;
+    }
+    const uint32_t mask = static_cast<uint32_t>(ipow2(bitsM) - 1);
+    const uint32_t sign = static_cast<uint32_t>(ipow2(bitsM - 1));
+    const uint32_t *c0 = reinterpret_cast<const uint32_t *>(coeff);
+    const uint32_t *c1 = c0 + funCount;
+    const uint32_t *c2 = c1 + funCount;
+    const uint32_t *c3 = c2 + funCount;
+    for (int ff = first; ff < last; ++ff) {
+        uint32_t v = c0[ff] * m0 + c1[ff] * m1;
+        if constexpr (FunType == 5) {
+            v += c2[ff] * m2 + c3[ff];
+        } else {
+            v += c2[ff];
+        }
+        rr[ff - first] = wrapWidth<Width>(v, mask, sign);
+    }
+}
+
+template <int FunType>
+static auto selectEvalWidth(int bitsM) -> decltype(&evalRangeImpl<FunType, 8>) {
+    if (bitsM == 8) return &evalRangeImpl<FunType, 8>;
+    if (bitsM == 16) return &evalRangeImpl<FunType, 16>;
+    return &evalRangeImpl<FunType, 32>;
+}
+
+// Индекс первой функции с RR[ff] == observed или -1.
+// RR строится заново для каждого слова, поэтому любой обратный индекс (хеш-таблица,
+// таблица 2^M с поколениями, сортировка) - это 2^Q записей ради одного поиска;
+// просмотр с ранним выходом дешевле (в среднем 2^(Q-1) сравнений без записей).
+static inline int findFirstMatch(const int32_t *RR, int funCount, int32_t observed) {
+    for (int ff = 0; ff < funCount; ++ff) {
+        if (RR[ff] == observed) return ff;
+    }
+    return -1;
+}
+
+// Рабочие потоки decodeFusedParallel (определены до деструктора кодека, который их останавливает).
+// Потоки создаются по мере надобности и живут до уничтожения кодека; участок 0
+// выполняет вызывающий поток. Задание - указатель на функцию и контекст (без аллокаций)
+struct DigitalCodec::DecodeWorkers {
+    using Job = void (*)(void *ctx, size_t part);
+
+    ~DecodeWorkers() {
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            stop = true;
+        }
+        start.notify_all();
+        for (auto &t : threads) t.join();
+    }
+
+    // job(ctx, part) для part в [0, parts); возврат после завершения всех участков
+    void run(size_t parts, Job job, void *ctx) {
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            while (threads.size() + 1 < parts) {
+                threads.emplace_back(&DecodeWorkers::loop, this, threads.size() + 1, generation);
+            }
+            job_ = job;
+            ctx_ = ctx;
+            parts_ = parts;
+            pending_ = parts - 1;
+            ++generation;
+        }
+        if (parts > 1) start.notify_all();
+        job(ctx, 0);
+        std::unique_lock<std::mutex> lock(mutex);
+        done.wait(lock, [&] { return pending_ == 0; });
+    }
+
+    void loop(size_t part, uint64_t seen) {
+        std::unique_lock<std::mutex> lock(mutex);
+        for (;;) {
+            start.wait(lock, [&] { return stop || generation != seen; });
+            if (stop) return;
+            seen = generation;
+            if (part >= parts_) continue;
+            lock.unlock();
+            job_(ctx_, part);
+            lock.lock();
+            if (--pending_ == 0) done.notify_one();
+        }
+    }
+
+    std::mutex mutex;
+    std::condition_variable start;
+    std::condition_variable done;
+    std::vector<std::thread> threads;
+    uint64_t generation = 0;
+    bool stop = false;
+    Job job_ = nullptr;
+    void *ctx_ = nullptr;
+    size_t parts_ = 0;
+    size_t pending_ = 0;
+
+    // Буферы вызова (ёмкость только растёт)
+    std::vector<int32_t> history;
+    std::vector<int16_t> decoded;
+    std::vector<std::vector<int32_t>> rr;  // RR каждого участка
+    std::vector<uint64_t> directCounts;
+    std::vector<uint64_t> skipCounts;
+};
+
+DigitalCodec::DigitalCodec() = default;
+DigitalCodec::~DigitalCodec() = default;
+
 void DigitalCodec::configure(const CodecParams &params) {
     if (params.bitsM <= 0 || params.bitsM > 31) {
         throw std::invalid_argument("bitsM must be in 1..31");
@@ -30,7 +208,55 @@ void DigitalCodec::configure(const CodecParams &params) {
     }
     params_ = params;
     cols_ = (params_.funType == 5) ? 4 : 3;
+    funCount_ = static_cast<int>(ipow2(params_.bitsQ));
     coeff_.clear();
+    certified_ = false;
+    switch (params_.funType) {
+        case 1: evalRange_ = selectEvalWidth<1>(params_.bitsM); break;
+        case 2: evalRange_ = selectEvalWidth<2>(params_.bitsM); break;
+        case 3: evalRange_ = selectEvalWidth<3>(params_.bitsM); break;
+        case 4: evalRange_ = selectEvalWidth<4>(params_.bitsM); break;
+        default: evalRange_ = selectEvalWidth<5>(params_.bitsM); break;
+    }
+    const SimdKernels simd = selectSimdKernels(params_.simdLevel, params_.funType, funCount_);
+    simdLevel_ = simd.level;
+    simdEvalAll_ = simd.evalAll;
+    simdFirstDuplicate_ = simd.firstDuplicate;
+    simdFind_ = simd.find;
+    clearKernel();
+
+    collisionCache_.clear();
+    collisionCacheBits_ = 0;
+    if (params_.collisionCacheBits > 0) {
+        if (funCount_ <= kCollisionCacheMaxFuncs) {
+            // Больше 2^(2M) записей не нужно: при 2M <= bits слот - само состояние
+            collisionCacheBits_ = std::min({params_.collisionCacheBits, kCollisionCacheMaxBits, 2 * params_.bitsM});
+        } else if (params_.debugMode) {
+            std::cout << "ℹ️  [Codec] Кеш коллизий доступен только при Q<=6" << std::endl;
+        }
+    }
+
+    multiK_ = 0;
+    multiTable_.reset();
+    if (params_.encodeTableSymbols > 1) {
+        const int k = params_.encodeTableSymbols;
+        if (params_.bitsM <= 8 && k <= kMultiMaxSymbols && k * params_.bitsQ <= kMultiMaxComboBits) {
+            // Строка: указатель, слова (uint32) и meta на каждую комбинацию
+            const size_t combos = static_cast<size_t>(1) << (k * params_.bitsQ);
+            const size_t tableBytes = (static_cast<size_t>(1) << (2 * params_.bitsM))
+                                    * (sizeof(void *) + combos * (sizeof(uint32_t) + 1));
+            if (tableBytes <= kMultiMaxTableBytes) {
+                multiK_ = k;
+            } else {
+                std::cerr << "⚠️  k-символьные таблицы при M=" << params_.bitsM << ", k=" << k << " заняли бы "
+                          << (tableBytes >> 10) << " КБ (предел " << (kMultiMaxTableBytes >> 10)
+                          << " КБ) и медленнее посимвольного кодирования — используется посимвольное кодирование\n";
+            }
+        } else {
+            std::cerr << "⚠️  k-символьные таблицы доступны только при M<=8, k<=" << kMultiMaxSymbols
+                      << " и k*Q<=" << kMultiMaxComboBits << " — используется посимвольное кодирование\n";
+        }
+    }
     reset();
 }
 
@@ -42,6 +268,11 @@ void DigitalCodec::loadCoefficientsCSV(const std::string &csvPath) {
     if (!in) throw std::runtime_error("Failed to open coefficients CSV: " + csvPath);
 
     coeff_.clear();
+    certified_ = false;
+    clearKernel();
+    multiTable_.reset();  // таблицы строились для прежних коэффициентов
+    collisionCache_.clear();
+    std::vector<std::vector<int32_t>> rows;
     std::string line;
     while (std::getline(in, line)) {
         // Skip empty/comment lines
@@ -70,13 +301,125 @@ void DigitalCodec::loadCoefficientsCSV(const std::string &csvPath) {
             if ((int)row.size() != cols_) {
                 throw std::runtime_error("CSV row has wrong number of columns");
             }
-            coeff_.push_back(std::move(row));
+            rows.push_back(std::move(row));
         }
     }
-    const size_t expectedRows = static_cast<size_t>(ipow2(params_.bitsQ));
-    if (coeff_.size() != expectedRows) {
+    if (rows.size() != static_cast<size_t>(funCount_)) {
         throw std::runtime_error("CSV rows != 2^Q");
     }
+    coeff_.resize(static_cast<size_t>(cols_) * funCount_);
+    for (int ff = 0; ff < funCount_; ++ff) {
+        for (int col = 0; col < cols_; ++col) {
+            coeff_[static_cast<size_t>(col) * funCount_ + ff] = rows[ff][col];
+        }
+    }
+
+    if (params_.certifiedFastPath) {
+        loadCertificate(csvPath + kCertificateSuffix);
+    }
+
+    if (params_.compiledKernel) {
+        try {
+            compileKernel();
+        } catch (const std::exception &e) {
+            std::cerr << "⚠️  Не удалось собрать ядро кодека (" << e.what()
+                      << ") — используется DigitalCodingFun\n";
+        }
+    }
+}
+
+void DigitalCodec::compileKernel(const std::string &cacheDir) {
+    if (coeff_.empty()) {
+        throw std::logic_error("loadCoefficientsCSV() before compileKernel()");
+    }
+    const auto rows = coefficientRows();
+    loadKernel(cacheDir.empty() ? buildKernel(params_, rows) : buildKernel(params_, rows, cacheDir));
+}
+
+uint64_t DigitalCodec::coefficientHash() const {
+    uint64_t h = 1469598103934665603ull;
+    for (int ff = 0; ff < funCount_; ++ff) {
+        for (int col = 0; col < cols_; ++col) {
+            uint32_t v = static_cast<uint32_t>(coeff_[static_cast<size_t>(col) * funCount_ + ff]);
+            for (int i = 0; i < 4; ++i) {
+                h ^= v & 0xFFu;
+                h *= 1099511628211ull;
+                v >>= 8;
+            }
+        }
+    }
+    return h;
+}
+
+bool DigitalCodec::loadCertificate(const std::string &certPath) {
+    certified_ = false;
+    if (coeff_.empty()) {
+        throw std::logic_error("loadCoefficientsCSV() before loadCertificate()");
+    }
+    std::ifstream in(certPath);
+    if (!in) return false;
+
+    const uint64_t hash = coefficientHash();
+    bool matched = false;
+    std::string line;
+    while (!matched && std::getline(in, line)) {
+        std::istringstream ss(line);
+        std::string kind;
+        if (!(ss >> kind) || kind != kCertificateRecord) continue;
+        int m = 0, q = 0, fun = 0;
+        uint64_t coeffHash = 0;
+        bool hasHash = false;
+        std::string field;
+        while (ss >> field) {
+            const size_t eq = field.find('=');
+            if (eq == std::string::npos) continue;
+            const std::string key = field.substr(0, eq);
+            const std::string value = field.substr(eq + 1);
+            try {
+                if (key == "bits_m") m = std::stoi(value);
+                else if (key == "bits_q") q = std::stoi(value);
+                else if (key == "fun_type") fun = std::stoi(value);
+                else if (key == "coeff") { coeffHash = std::stoull(value, nullptr, 16); hasHash = true; }
+            } catch (const std::exception &) {
+                m = 0;  // повреждённая запись не подходит
+            }
+        }
+        matched = hasHash && m == params_.bitsM && q == params_.bitsQ && fun == params_.funType && coeffHash == hash;
+    }
+    if (!matched) return false;
+
+    // Запись совпала с ключом: контрольная проверка части состояний против испорченного файла
+    std::vector<int32_t> RR(funCount_);
+    std::mt19937_64 gen(hash);
+    const uint32_t mask = static_cast<uint32_t>(ipow2(params_.bitsM) - 1);
+    for (int i = 0; i < kCertificateSpotChecks; ++i) {
+        const uint64_t r = gen();
+        const int32_t x = wrapM(static_cast<int64_t>(r & mask));
+        const int32_t y = wrapM(static_cast<int64_t>((r >> 32) & mask));
+        evaluateAll(x, y, RR.data());
+        std::sort(RR.begin(), RR.end());
+        if (std::adjacent_find(RR.begin(), RR.end()) != RR.end()) {
+            std::cerr << "⚠️  Сертификат " << certPath << " не подтверждён: коллизия в состоянии ("
+                      << x << ", " << y << ") — используется проверка коллизий\n";
+            return false;
+        }
+    }
+    certified_ = true;
+    if (params_.debugMode) {
+        std::cout << "✅ [Codec] Ключ сертифицирован как инъективный: " << certPath << std::endl;
+    }
+    return true;
+}
+
+void DigitalCodec::loadKernel(const std::string &soPath) {
+    auto kernel = std::make_unique<KernelLibrary>(soPath, static_cast<int>(ipow2(params_.bitsQ)));
+    kernelEval_ = kernel->eval();
+    kernel_ = std::move(kernel);
+}
+
+void DigitalCodec::clearKernel() {
+    kernelEval_ = nullptr;
+    kernel_.reset();
 }
 
 void DigitalCodec::reset() {
@@ -84,6 +427,12 @@ void DigitalCodec::reset() {
     enc_h2_ = wrapM(params_.h2);
     dec_h1_ = enc_h1_;
     dec_h2_ = enc_h2_;
+    if (params_.randomSeed != 0) {
+        std::seed_seq seq{static_cast<uint32_t>(params_.randomSeed), static_cast<uint32_t>(params_.randomSeed >> 32)};
+        rng_.seed(seq);
+    } else {
+        rng_.seed(std::random_device{}());
+    }
     resetDebugStats();
     if (params_.debugMode) {
         std::cout << "🔄 [Codec] Состояния инициализированы: enc_h1_=" << enc_h1_
@@ -176,66 +525,119 @@ int32_t DigitalCodec::fromBytes(const uint8_t* data) const {
     return static_cast<int32_t>(val);
 }
 
-int32_t DigitalCodec::digitalCodingFun(int funcIndex1Based, int32_t x, int32_t y) const {
-    assert(funcIndex1Based >= 1);
-    int idx = funcIndex1Based - 1;
-    const auto &row = coeff_.at(static_cast<size_t>(idx));
-    const int32_t a = row[0];
-    const int32_t b = row[1];
-    const int32_t q = row[2];
-
-    // Оптимизация для M=8: используем прямые операции без вызова wrapM
-    if (params_.bitsM == 8) {
-        auto mul8 = [](int32_t lhs, int32_t rhs) -> int32_t {
-            return static_cast<int8_t>(static_cast<uint8_t>(lhs * rhs));
-        };
-        auto add8 = [](int32_t lhs, int32_t rhs) -> int32_t {
-            return static_cast<int8_t>(static_cast<uint8_t>(lhs + rhs));
-        };
-        
-        switch (params_.funType) {
-            case 1: // a*x + b*y + q
-                return add8(add8(mul8(a, x), mul8(b, y)), q);
-            case 2: // a*x^2 + b*y + q
-                return add8(add8(mul8(a, mul8(x, x)), mul8(b, y)), q);
-            case 3: // a*x^2 + b*y^2 + q
-                return add8(add8(mul8(a, mul8(x, x)), mul8(b, mul8(y, y))), q);
-            case 4: // a*x^3 + b*y^2 + q
-                return add8(add8(mul8(a, mul8(mul8(x, x), x)), mul8(b, mul8(y, y))), q);
-            case 5: { // a*x + b*x*y + c*y + q
-                const int32_t c = row[2];
-                const int32_t q5 = row[3];
-                return add8(add8(add8(mul8(a, x), mul8(b, mul8(x, y))), mul8(c, y)), q5);
-            }
-            default:
-                return 0;
+size_t packedWireBytes(size_t words, int bitsM) {
+    return (words * static_cast<size_t>(bitsM) + 7) / 8;
+}
+
+// Упаковка через 64-битный аккумулятор: слово дописывается целиком,
+// наружу уходят по 32 бита (в аккумуляторе остаётся < 32 + 31 бит)
+void packWords(const uint8_t *padded, size_t words, int bitsM, uint8_t *packed) {
+    const int bps = (bitsM + 7) / 8;
+    const uint64_t mask = (1ull << bitsM) - 1ull;
+    uint64_t acc = 0;
+    int bits = 0;
+    uint8_t *dst = packed;
+    for (size_t i = 0; i < words; ++i, padded += bps) {
+        uint32_t u = padded[0];
+        for (int b = 1; b < bps; ++b) u |= static_cast<uint32_t>(padded[b]) << (8 * b);
+        acc |= (static_cast<uint64_t>(u) & mask) << bits;
+        bits += bitsM;
+        if (bits >= 32) {
+            dst[0] = static_cast<uint8_t>(acc);
+            dst[1] = static_cast<uint8_t>(acc >> 8);
+            dst[2] = static_cast<uint8_t>(acc >> 16);
+            dst[3] = static_cast<uint8_t>(acc >> 24);
+            dst += 4;
+            acc >>= 32;
+            bits -= 32;
         }
     }
-    
-    // Общий случай для других M
-    auto mul = [&](int64_t lhs, int64_t rhs) { return wrapM(lhs * rhs); };
-    auto add = [&](int64_t lhs, int64_t rhs) { return wrapM(lhs + rhs); };
+    while (bits > 0) {
+        *dst++ = static_cast<uint8_t>(acc);
+        acc >>= 8;
+        bits -= 8;
+    }
+}
 
-    switch (params_.funType) {
-        case 1: // a*x + b*y + q
-            return add(add(mul(a, x), mul(b, y)), q);
-        case 2: // a*x^2 + b*y + q
-            return add(add(mul(a, mul(x, x)), mul(b, y)), q);
-        case 3: // a*x^2 + b*y^2 + q
-            return add(add(mul(a, mul(x, x)), mul(b, mul(y, y))), q);
-        case 4: // a*x^3 + b*y^2 + q
-            return add(add(mul(a, mul(mul(x, x), x)), mul(b, mul(y, y))), q);
-        case 5: { // a*x + b*x*y + c*y + q
-            const int32_t c = row[2];
-            const int32_t q5 = row[3];
-            return add(add(add(mul(a, x), mul(b, mul(x, y))), mul(c, y)), q5);
-        }
-        default:
-            return 0;
+void unpackWords(const uint8_t *packed, size_t words, int bitsM, uint8_t *padded) {
+    const int bps = (bitsM + 7) / 8;
+    const uint64_t mask = (1ull << bitsM) - 1ull;
+    const size_t total = packedWireBytes(words, bitsM);
+    size_t pos = 0;
+    uint64_t acc = 0;
+    int bits = 0;
+    for (size_t i = 0; i < words; ++i, padded += bps) {
+        // Подкачка по 4 байта, пока хватает входа; в хвосте - побайтно
+        while (bits < bitsM) {
+            if (pos + 4 <= total) {
+                const uint64_t chunk = static_cast<uint64_t>(packed[pos]) |
+                                       (static_cast<uint64_t>(packed[pos + 1]) << 8) |
+                                       (static_cast<uint64_t>(packed[pos + 2]) << 16) |
+                                       (static_cast<uint64_t>(packed[pos + 3]) << 24);
+                acc |= chunk << bits;
+                pos += 4;
+                bits += 32;
+            } else {
+                acc |= static_cast<uint64_t>(packed[pos++]) << bits;
+                bits += 8;
+            }
+        }
+        uint32_t u = static_cast<uint32_t>(acc & mask);
+        acc >>= bitsM;
+        bits -= bitsM;
+        for (int b = 0; b < bps; ++b) {
+            padded[b] = static_cast<uint8_t>(u);
+            u >>= 8;
+        }
+    }
+}
+
+void DigitalCodec::evaluateAll(int32_t x, int32_t y, int32_t *RR) const {
+    if (kernelEval_) {
+        kernelEval_(x, y, RR);
+        return;
+    }
+    if (simdEvalAll_) {
+        simdEvalAll_(coeff_.data(), funCount_, params_.bitsM, x, y, RR);
+        return;
+    }
+    evalRange_(coeff_.data(), funCount_, params_.bitsM, x, y, 0, funCount_, RR);
+}
+
+int DigitalCodec::findValue(const int32_t *RR, int funCount, int32_t value) const {
+    return simdFind_ ? simdFind_(RR, funCount, value) : findFirstMatch(RR, funCount, value);
+}
+
+const char *DigitalCodec::simdName() const {
+    return simdLevelName(static_cast<SimdLevel>(simdLevel_));
+}
+
+int32_t DigitalCodec::digitalCodingFun(int funcIndex1Based, int32_t x, int32_t y) const {
+    assert(funcIndex1Based >= 1 && funcIndex1Based <= funCount_);
+    const int idx = funcIndex1Based - 1;
+    int32_t result;
+    evalRange_(coeff_.data(), funCount_, params_.bitsM, x, y, idx, idx + 1, &result);
+    return result;
+}
+
+void DigitalCodec::requireCoefficients() const {
+    if (coeff_.empty()) {
+        throw std::out_of_range("COEFF is not loaded (loadCoefficientsCSV())");
+    }
+}
+
+std::vector<std::vector<int32_t>> DigitalCodec::coefficientRows() const {
+    std::vector<std::vector<int32_t>> rows(static_cast<size_t>(funCount_), std::vector<int32_t>(cols_));
+    for (int ff = 0; ff < funCount_; ++ff) {
+        for (int col = 0; col < cols_; ++col) {
+            rows[ff][col] = coeff_[static_cast<size_t>(col) * funCount_ + ff];
+        }
     }
+    return rows;
 }
 
 std::vector<uint8_t> DigitalCodec::encodeBytes(const std::vector<uint8_t> &input) {
+    requireCoefficients();
     // Interpret each input byte as an information symbol in range [0..2^Q-1].
     // WARNING: This will lose data if input bytes are outside [0..2^Q-1]!
     // For arbitrary byte data, use encodeMessage() instead.
@@ -269,6 +671,7 @@ std::vector<uint8_t> DigitalCodec::encodeBytes(const std::vector<uint8_t> &input
 }
 
 std::vector<uint8_t> DigitalCodec::decodeBytes(const std::vector<uint8_t> &coded) {
+    requireCoefficients();
     // Best-effort inverse assuming unique mapping (no collisions, no skips)
     const int funCount = static_cast<int>(ipow2(params_.bitsQ));
     const int bps = bytesPerSymbol();
@@ -304,132 +707,583 @@ std::vector<uint8_t> DigitalCodec::decodeBytes(const std::vector<uint8_t> &coded
     return out;
 }
 
-// === High-level message API ===
-std::vector<uint8_t> DigitalCodec::packBytesToSymbols(const std::vector<uint8_t> &input) const {
-    const int q = params_.bitsQ;
-    
-    // Оптимизация для частого случая Q=2 (4 символа на байт)
-    if (q == 2) {
-        const size_t estimated_size = input.size() * 4;
-        std::vector<uint8_t> symbols;
-        symbols.reserve(estimated_size);
-        const uint32_t mask = 0x3u; // 2 бита
-        
-        for (uint8_t b : input) {
-            symbols.push_back(static_cast<uint8_t>(b & mask));
-            symbols.push_back(static_cast<uint8_t>((b >> 2) & mask));
-            symbols.push_back(static_cast<uint8_t>((b >> 4) & mask));
-            symbols.push_back(static_cast<uint8_t>((b >> 6) & mask));
+// === Fused message kernels ===
+// Источники и приёмники шаблонных циклов encodeFused/decodeFused: символы берутся
+// прямо из байтов сообщения, слова пишутся прямо в кадр (и обратно при декодировании),
+// без промежуточных векторов символов и слов.
+namespace {
+
+// Q-битные символы из байтов: младшие биты первыми, последний символ дополняется нулями.
+// Два отрезка подряд (SHA-256 и данные) читаются без склейки в один буфер
+class ByteSymbolReader {
+public:
+    ByteSymbolReader(const uint8_t *data, size_t len, int q,
+                     const uint8_t *tail = nullptr, size_t tailLen = 0)
+        : cur_(data), end_(data + len), next_(tail), nextEnd_(tail + tailLen), q_(q),
+          mask_((1u << q) - 1u), remaining_(((len + tailLen) * 8 + q - 1) / q) {}
+
+    size_t remaining() const { return remaining_; }
+
+    uint8_t next() {
+        refill(q_);
+        const uint8_t sym = static_cast<uint8_t>(acc_ & mask_);
+        acc_ >>= q_;
+        bits_ -= q_;
+        --remaining_;
+        return sym;
+    }
+
+    // k следующих символов без продвижения (k * Q <= kMultiMaxComboBits)
+    void peek(size_t k, uint8_t *syms) {
+        const int need = static_cast<int>(k) * q_;
+        refill(need);
+        uint64_t acc = acc_;
+        for (size_t s = 0; s < k; ++s, acc >>= q_) syms[s] = static_cast<uint8_t>(acc & mask_);
+    }
+
+    void skip(size_t k) {
+        const int used = static_cast<int>(k) * q_;
+        acc_ >>= used;
+        bits_ -= used;
+        remaining_ -= k;
+    }
+
+private:
+    // В аккумуляторе не меньше need бит; за концом входа - нулевое дополнение
+    void refill(int need) {
+        while (bits_ < need) {
+            if (cur_ == end_) {
+                if (next_ == nextEnd_) {
+                    bits_ = need;
+                    return;
+                }
+                cur_ = next_;
+                end_ = nextEnd_;
+                next_ = nextEnd_;
+                continue;
+            }
+            if (bits_ <= 32 && end_ - cur_ >= 4) {
+                const uint64_t chunk = static_cast<uint64_t>(cur_[0]) |
+                                       (static_cast<uint64_t>(cur_[1]) << 8) |
+                                       (static_cast<uint64_t>(cur_[2]) << 16) |
+                                       (static_cast<uint64_t>(cur_[3]) << 24);
+                acc_ |= chunk << bits_;
+                cur_ += 4;
+                bits_ += 32;
+            } else {
+                acc_ |= static_cast<uint64_t>(*cur_++) << bits_;
+                bits_ += 8;
+            }
         }
-        return symbols;
     }
-    
-    const uint32_t mask = (1u << q) - 1u;
-    const size_t estimated_size = (input.size() * 8 + q - 1) / q;
-    std::vector<uint8_t> symbols;
-    symbols.reserve(estimated_size);
-    uint32_t bitbuf = 0;
-    int bitcount = 0;
-    
-    // Оптимизация: обрабатываем байты пакетно
-    for (size_t i = 0; i < input.size(); ++i) {
-        bitbuf |= (uint32_t)input[i] << bitcount;
-        bitcount += 8;
-        while (bitcount >= q) {
-            symbols.push_back(static_cast<uint8_t>(bitbuf & mask));
-            bitbuf >>= q;
-            bitcount -= q;
+
+    const uint8_t *cur_;
+    const uint8_t *end_;
+    const uint8_t *next_;
+    const uint8_t *nextEnd_;
+    int q_;
+    uint32_t mask_;
+    size_t remaining_;
+    uint64_t acc_ = 0;
+    int bits_ = 0;
+};
+
+// Готовый буфер символов (StreamEncoder, encodeSymbols)
+class ArraySymbolReader {
+public:
+    ArraySymbolReader(const uint8_t *symbols, size_t count) : cur_(symbols), remaining_(count) {}
+
+    size_t remaining() const { return remaining_; }
+    uint8_t next() { --remaining_; return *cur_++; }
+    void peek(size_t k, uint8_t *syms) const { std::memcpy(syms, cur_, k); }
+    void skip(size_t k) { cur_ += k; remaining_ -= k; }
+
+private:
+    const uint8_t *cur_;
+    size_t remaining_;
+};
+
+// Слово - bytesPerSymbol() байт little-endian (обычный формат кадра, как toBytes)
+class PaddedWordWriter {
+public:
+    PaddedWordWriter(uint8_t *dst, int bitsM)
+        : dst_(dst), bps_((bitsM + 7) / 8), mask_(static_cast<uint32_t>((1ull << bitsM) - 1ull)) {}
+
+    void put(int32_t v) {
+        const uint32_t u = static_cast<uint32_t>(v) & mask_;
+        dst_[0] = static_cast<uint8_t>(u);
+        if (bps_ > 1) {
+            dst_[1] = static_cast<uint8_t>(u >> 8);
+            if (bps_ > 2) {
+                dst_[2] = static_cast<uint8_t>(u >> 16);
+                if (bps_ > 3) dst_[3] = static_cast<uint8_t>(u >> 24);
+            }
+        }
+        dst_ += bps_;
+    }
+
+    uint8_t *finish() { return dst_; }
+
+private:
+    uint8_t *dst_;
+    int bps_;
+    uint32_t mask_;
+};
+
+// Ровно M бит на слово (packedWire), та же раскладка, что у packWords
+class PackedWordWriter {
+public:
+    PackedWordWriter(uint8_t *dst, int bitsM) : dst_(dst), m_(bitsM), mask_((1ull << bitsM) - 1ull) {}
+
+    void put(int32_t v) {
+        acc_ |= (static_cast<uint64_t>(static_cast<uint32_t>(v)) & mask_) << bits_;
+        bits_ += m_;
+        if (bits_ >= 32) {
+            dst_[0] = static_cast<uint8_t>(acc_);
+            dst_[1] = static_cast<uint8_t>(acc_ >> 8);
+            dst_[2] = static_cast<uint8_t>(acc_ >> 16);
+            dst_[3] = static_cast<uint8_t>(acc_ >> 24);
+            dst_ += 4;
+            acc_ >>= 32;
+            bits_ -= 32;
         }
     }
-    if (bitcount > 0) {
-        symbols.push_back(static_cast<uint8_t>(bitbuf & mask));
+
+    // Дописывает неполные байты, возвращает конец вывода
+    uint8_t *finish() {
+        for (; bits_ > 0; bits_ -= 8, acc_ >>= 8) *dst_++ = static_cast<uint8_t>(acc_);
+        bits_ = 0;
+        return dst_;
     }
-    return symbols;
+
+private:
+    uint8_t *dst_;
+    int m_;
+    uint64_t mask_;
+    uint64_t acc_ = 0;
+    int bits_ = 0;
+};
+
+static inline int32_t signExtendM(uint32_t u, uint32_t signBit) {
+    return static_cast<int32_t>((u ^ signBit) - signBit);
 }
 
-std::vector<uint8_t> DigitalCodec::unpackSymbolsToBytes(const std::vector<uint8_t> &symbols, size_t expected_len) const {
-    const int q = params_.bitsQ;
-    
-    // Оптимизация для частого случая Q=2 (4 символа на байт)
-    if (q == 2) {
-        std::vector<uint8_t> out;
-        out.reserve(expected_len);
-        
-        // Обрабатываем все символы группами по 4, пока не достигнем expected_len
-        for (size_t i = 0; i + 3 < symbols.size() && out.size() < expected_len; i += 4) {
-            uint8_t byte = symbols[i] | (symbols[i+1] << 2) | (symbols[i+2] << 4) | (symbols[i+3] << 6);
-            out.push_back(byte);
+// Слова по bytesPerSymbol() байт со знаковым расширением из M бит (как fromBytes)
+class PaddedWordReader {
+public:
+    PaddedWordReader(const uint8_t *src, size_t words, int bitsM)
+        : cur_(src), remaining_(words), bps_((bitsM + 7) / 8),
+          mask_(static_cast<uint32_t>((1ull << bitsM) - 1ull)), sign_(1u << (bitsM - 1)) {}
+
+    size_t remaining() const { return remaining_; }
+
+    int32_t next() {
+        uint32_t u = cur_[0];
+        if (bps_ > 1) {
+            u |= static_cast<uint32_t>(cur_[1]) << 8;
+            if (bps_ > 2) {
+                u |= static_cast<uint32_t>(cur_[2]) << 16;
+                if (bps_ > 3) u |= static_cast<uint32_t>(cur_[3]) << 24;
+            }
         }
-        
-        // Обработка остатка (если есть неполная группа из 4 символов)
-        size_t processed = (out.size() * 4);
-        if (processed < symbols.size() && out.size() < expected_len) {
-            size_t remaining = symbols.size() - processed;
-            uint8_t byte = 0;
-            for (size_t i = 0; i < remaining && i < 4; ++i) {
-                byte |= symbols[processed + i] << (i * 2);
+        cur_ += bps_;
+        --remaining_;
+        return signExtendM(u & mask_, sign_);
+    }
+
+private:
+    const uint8_t *cur_;
+    size_t remaining_;
+    int bps_;
+    uint32_t mask_;
+    uint32_t sign_;
+};
+
+// Ровно M бит на слово (packedWire), та же подкачка, что у unpackWords
+class PackedWordReader {
+public:
+    PackedWordReader(const uint8_t *src, size_t words, int bitsM)
+        : cur_(src), end_(src + packedWireBytes(words, bitsM)), remaining_(words), m_(bitsM),
+          mask_((1ull << bitsM) - 1ull), sign_(1u << (bitsM - 1)) {}
+
+    size_t remaining() const { return remaining_; }
+
+    int32_t next() {
+        while (bits_ < m_) {
+            if (end_ - cur_ >= 4) {
+                const uint64_t chunk = static_cast<uint64_t>(cur_[0]) |
+                                       (static_cast<uint64_t>(cur_[1]) << 8) |
+                                       (static_cast<uint64_t>(cur_[2]) << 16) |
+                                       (static_cast<uint64_t>(cur_[3]) << 24);
+                acc_ |= chunk << bits_;
+                cur_ += 4;
+                bits_ += 32;
+            } else {
+                acc_ |= static_cast<uint64_t>(*cur_++) << bits_;
+                bits_ += 8;
             }
-            out.push_back(byte);
         }
-        
-        // Обрезаем до expected_len если нужно
-        if (out.size() > expected_len) {
-            out.resize(expected_len);
+        const uint32_t u = static_cast<uint32_t>(acc_ & mask_);
+        acc_ >>= m_;
+        bits_ -= m_;
+        --remaining_;
+        return signExtendM(u, sign_);
+    }
+
+private:
+    const uint8_t *cur_;
+    const uint8_t *end_;
+    size_t remaining_;
+    int m_;
+    uint64_t mask_;
+    uint32_t sign_;
+    uint64_t acc_ = 0;
+    int bits_ = 0;
+};
+
+// Декодированные Q-битные символы собираются в байты (младшие биты первыми),
+// не больше limit байт; неполный последний байт дописывает finish()
+class ByteSymbolWriter {
+public:
+    ByteSymbolWriter(uint8_t *out, size_t limit, int q) : out_(out), limit_(limit), q_(q) {}
+
+    void put(uint8_t sym) {
+        if (written_ >= limit_) return;
+        acc_ |= static_cast<uint32_t>(sym) << bits_;
+        bits_ += q_;
+        while (bits_ >= 8 && written_ < limit_) {
+            out_[written_++] = static_cast<uint8_t>(acc_);
+            acc_ >>= 8;
+            bits_ -= 8;
         }
-        return out;
     }
-    
-    std::vector<uint8_t> out;
-    out.reserve(expected_len);
-    uint32_t bitbuf = 0;
-    int bitcount = 0;
-    
-    // Оптимизация: обрабатываем символы пакетно
-    for (size_t i = 0; i < symbols.size() && out.size() < expected_len; ++i) {
-        bitbuf |= ((uint32_t)symbols[i]) << bitcount;
-        bitcount += q;
-        while (bitcount >= 8 && out.size() < expected_len) {
-            out.push_back(static_cast<uint8_t>(bitbuf & 0xFFu));
-            bitbuf >>= 8;
-            bitcount -= 8;
+
+    size_t finish() {
+        if (written_ < limit_ && bits_ > 0) out_[written_++] = static_cast<uint8_t>(acc_);
+        bits_ = 0;
+        return written_;
+    }
+
+private:
+    uint8_t *out_;
+    size_t limit_;
+    int q_;
+    size_t written_ = 0;
+    uint32_t acc_ = 0;
+    int bits_ = 0;
+};
+
+// Символы по одному байту (StreamDecoder, decodeSymbols)
+class SymbolVectorWriter {
+public:
+    explicit SymbolVectorWriter(std::vector<uint8_t> &out) : out_(out) {}
+    void put(uint8_t sym) { out_.push_back(sym); }
+
+private:
+    std::vector<uint8_t> &out_;
+};
+
+} // namespace
+
+// Строка состояния: combos упакованных слов (uint32), за ними combos байт meta
+// (флаг детерминированности | коллизии | прямые передачи Info). Строки публикуются один раз:
+// чтение без блокировки, мьютекс только при выделении новой строки из блока
+struct DigitalCodec::MultiTable {
+    MultiTable(size_t states, size_t combos)
+        : combos(combos), rowWords(combos + (combos + 3) / 4), rows(new std::atomic<const uint32_t *>[states]) {
+        for (size_t i = 0; i < states; ++i) rows[i].store(nullptr, std::memory_order_relaxed);
+    }
+
+    const uint32_t *row(size_t i) const { return rows[i].load(std::memory_order_acquire); }
+
+    // Копия построенной строки в общий блок; если строку уже опубликовал другой поток - его копия
+    const uint32_t *publish(size_t i, const uint32_t *out, const uint8_t *meta) {
+        std::lock_guard<std::mutex> lock(mutex);
+        if (const uint32_t *existing = rows[i].load(std::memory_order_relaxed)) return existing;
+        if (chunks.empty() || chunkUsed + rowWords > kMultiChunkWords) {
+            chunks.emplace_back(new uint32_t[std::max(kMultiChunkWords, rowWords)]);
+            chunkUsed = 0;
         }
+        uint32_t *dst = chunks.back().get() + chunkUsed;
+        chunkUsed += rowWords;
+        std::memcpy(dst, out, combos * sizeof(uint32_t));
+        std::memcpy(dst + combos, meta, combos);
+        rows[i].store(dst, std::memory_order_release);
+        return dst;
     }
-    if (out.size() < expected_len && bitcount > 0) {
-        out.push_back(static_cast<uint8_t>(bitbuf & 0xFFu));
+
+    const size_t combos;
+    const size_t rowWords;
+    std::unique_ptr<std::atomic<const uint32_t *>[]> rows;
+    std::mutex mutex;
+    std::vector<std::unique_ptr<uint32_t[]>> chunks;
+    size_t chunkUsed = 0;
+};
+
+void DigitalCodec::shareEncodeTables(DigitalCodec &source) {
+    if (multiK_ == 0 || certified_ || source.multiK_ != multiK_) return;
+    if (!source.multiTable_) {
+        source.multiTable_ = std::make_shared<MultiTable>(static_cast<size_t>(1) << (2 * params_.bitsM),
+                                                          static_cast<size_t>(1) << (multiK_ * params_.bitsQ));
     }
-    if (out.size() > expected_len) {
-        out.resize(expected_len);
+    multiTable_ = source.multiTable_;
+}
+
+// Обход дерева префиксов: состояние анализируется один раз на префикс,
+// цепочки со случайной подстановкой остаются недетерминированными (meta = 0)
+void DigitalCodec::walkMultiRow(int depth, int32_t x, int32_t y, size_t combo, uint32_t packed,
+                                int collisions, int direct, uint32_t *out, uint8_t *meta) const {
+    if (depth == multiK_) {
+        out[combo] = packed;
+        meta[combo] = static_cast<uint8_t>(kMultiDeterministic | collisions | (direct << 3));
+        return;
     }
-    return out;
+    const int q = params_.bitsQ;
+    const int funCount = static_cast<int>(ipow2(q));
+    const int32_t maxVal = static_cast<int32_t>(ipow2(params_.bitsM - 1)) - 1;
+    int32_t RR[kMultiMaxFuncs];
+    evaluateAll(x, y, RR);
+    // minDupIdx по тем же правилам, что и в encodeSymbols
+    int minDupIdx = funCount;
+    if (funCount <= 4) {
+        for (int i = 0; i < funCount && minDupIdx == funCount; ++i) {
+            for (int j = i + 1; j < funCount; ++j) {
+                if (RR[i] == RR[j]) { minDupIdx = j; break; }
+            }
+        }
+    } else {
+        bool seen[256] = {};
+        for (int ff = 0; ff < funCount; ++ff) {
+            uint8_t key = static_cast<uint8_t>(RR[ff]);
+            if (seen[key]) { minDupIdx = ff; break; }
+            seen[key] = true;
+        }
+    }
+    const bool collision = minDupIdx < funCount;
+
+    for (int sym = 0; sym < funCount; ++sym) {
+        int32_t next;
+        int usedDirect = 0;
+        if (sym < minDupIdx) {
+            next = RR[sym];
+        } else {
+            const int32_t directVal = sym + 1;
+            bool directValInRR = false;
+            for (int ff = 0; ff < funCount; ++ff) {
+                if (RR[ff] == directVal) { directValInRR = true; break; }
+            }
+            // directVal вне M-битного диапазона не помещается в таблицу
+            if (directValInRR || !params_.infoInsteadOfRand || directVal > maxVal) {
+                continue;
+            }
+            next = directVal;
+            usedDirect = 1;
+        }
+        walkMultiRow(depth + 1, next, x,
+                     combo | (static_cast<size_t>(sym) << (depth * q)),
+                     packed | (static_cast<uint32_t>(static_cast<uint8_t>(next)) << (8 * depth)),
+                     collisions + (collision ? 1 : 0), direct + usedDirect, out, meta);
+    }
+}
+
+const uint32_t *DigitalCodec::buildMultiRow(size_t row) {
+    const int m = params_.bitsM;
+    uint32_t out[kMultiMaxCombos];
+    uint8_t meta[kMultiMaxCombos];
+    std::memset(meta, 0, multiTable_->combos);
+
+    const uint32_t mask = (1u << m) - 1u;
+    const int32_t x0 = wrapM(static_cast<int64_t>(row >> m));
+    const int32_t y0 = wrapM(static_cast<int64_t>(row & mask));
+    walkMultiRow(0, x0, y0, 0, 0, 0, 0, out, meta);
+    return multiTable_->publish(row, out, meta);
+}
+
+template <class Sink>
+bool DigitalCodec::encodeMultiStep(const uint8_t *syms, Sink &sink) {
+    const int q = params_.bitsQ;
+    const int funCount = static_cast<int>(ipow2(q));
+    size_t combo = 0;
+    for (int s = 0; s < multiK_; ++s) {
+        if (syms[s] >= funCount) return false;
+        combo |= static_cast<size_t>(syms[s]) << (s * q);
+    }
+
+    const uint32_t mask = (1u << params_.bitsM) - 1u;
+    const size_t row = ((static_cast<uint32_t>(enc_h1_) & mask) << params_.bitsM)
+                     | (static_cast<uint32_t>(enc_h2_) & mask);
+    const uint32_t *entries = multiTable_->row(row);
+    if (!entries) entries = buildMultiRow(row);
+    const uint8_t meta = reinterpret_cast<const uint8_t *>(entries + multiTable_->combos)[combo];
+    if (!(meta & kMultiDeterministic)) return false;
+
+    const uint32_t packed = entries[combo];
+    for (int s = 0; s < multiK_; ++s) {
+        const int32_t next = static_cast<int8_t>(static_cast<uint8_t>(packed >> (8 * s)));
+        enc_h2_ = enc_h1_;
+        enc_h1_ = next;
+        sink.put(next);
+    }
+
+    if (params_.statsMode) {
+        encMetrics_.encodedSymbols.add(multiK_);
+        encMetrics_.encodeCollisions.add(meta & 0x07);
+        encMetrics_.encodeDirectInfo.add((meta >> 3) & 0x07);
+    }
+    return true;
 }
 
-std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &symbols) {
+void DigitalCodec::ValueSet::clear(size_t capacity) {
+    // Заполнение не больше 1/2: линейное пробирование всегда находит пустую ячейку
+    size_t size = 8;
+    while (size < capacity * 2) size <<= 1;
+    if (keys.size() < size) {
+        keys.assign(size, 0);
+        stamps.assign(size, 0);
+        stamp = 0;
+        mask = size - 1;
+    }
+    if (++stamp == 0) {
+        std::fill(stamps.begin(), stamps.end(), 0u);
+        stamp = 1;
+    }
+}
+
+static inline size_t valueSlot(int32_t v, size_t mask) {
+    uint32_t h = static_cast<uint32_t>(v) * 0x9E3779B1u;
+    return static_cast<size_t>(h ^ (h >> 16)) & mask;
+}
+
+bool DigitalCodec::ValueSet::insert(int32_t v) {
+    size_t i = valueSlot(v, mask);
+    while (stamps[i] == stamp) {
+        if (keys[i] == v) return false;
+        i = (i + 1) & mask;
+    }
+    stamps[i] = stamp;
+    keys[i] = v;
+    return true;
+}
+
+bool DigitalCodec::ValueSet::contains(int32_t v) const {
+    size_t i = valueSlot(v, mask);
+    while (stamps[i] == stamp) {
+        if (keys[i] == v) return true;
+        i = (i + 1) & mask;
+    }
+    return false;
+}
+
+size_t DigitalCodec::collisionCacheSlot(uint64_t key) const {
+    if (collisionCacheBits_ == 2 * params_.bitsM) {
+        return static_cast<size_t>(((key >> 32) << params_.bitsM) | (key & 0xFFFFFFFFu));
+    }
+    return static_cast<size_t>((key * 0x9E3779B97F4A7C15ull) >> (64 - collisionCacheBits_));
+}
+
+template <class Source, class Sink>
+void DigitalCodec::encodeFused(Source &src, Sink &sink) {
+    requireCoefficients();
     const int funCount = static_cast<int>(ipow2(params_.bitsQ));
-    const int bps = bytesPerSymbol();
-    std::vector<uint8_t> out;
-    out.reserve(symbols.size() * bps);
     
     // Для малых Q (<=4) используем простой массив, для больших - хеш-таблицы
     const bool useSimpleArray = (funCount <= 4);
-    std::vector<int32_t> RR(funCount);
+    std::vector<int32_t> &RR = encScratch_.rr;
+    RR.resize(funCount);
     
-    // Для больших Q используем хеш-таблицы
-    std::unordered_set<int32_t> rrSet;
-    std::vector<bool> isFirstOccurrence;
-    if (!useSimpleArray) {
-        isFirstOccurrence.resize(funCount);
-        rrSet.reserve(funCount);
-    }
+    // Для больших Q используем хеш-таблицы (буферы из encScratch_),
+    // при Q <= 6 и SIMD - векторные сравнения прямо по RR
+    ValueSet &rrSet = encScratch_.rrSet;
+    const bool useVectorSearch = !useSimpleArray && simdFirstDuplicate_ != nullptr;
     
-    for (uint8_t symByte : symbols) {
-        int sym = static_cast<int>(symByte);
+    // Пошаговый вывод debugMode есть только у общего пути
+    const bool certified = certified_ && !params_.debugMode;
+    // k-символьные таблицы; сертифицированному ключу они не нужны (одна функция на символ)
+    const size_t multiK = (multiK_ > 0 && !params_.debugMode && !certified) ? static_cast<size_t>(multiK_) : 0;
+    if (multiK > 0 && !multiTable_) shareEncodeTables(*this);
+    bool useCache = collisionCacheBits_ > 0 && !certified && !params_.debugMode;
+    if (useCache && collisionCache_.empty()) {
+        collisionCache_.assign(static_cast<size_t>(1) << collisionCacheBits_, CollisionCacheEntry{});
+        collisionCacheLookups_ = 0;
+        collisionCacheHitCount_ = 0;
+    }
+    const uint32_t stateMask = static_cast<uint32_t>(ipow2(params_.bitsM) - 1);
+
+    uint8_t multiSyms[kMultiMaxSymbols];
+    while (src.remaining() > 0) {
+        if (multiK > 0 && src.remaining() >= multiK) {
+            src.peek(multiK, multiSyms);
+            if (encodeMultiStep(multiSyms, sink)) {
+                src.skip(multiK);
+                continue;
+            }
+        }
+        int sym = static_cast<int>(src.next());
         if (sym >= funCount) {
-            std::cerr << "❌ encodeSymbols: symbol " << sym << " >= funCount " << funCount << "!\n";
+            std::cerr << "❌ encodeFused: symbol " << sym << " >= funCount " << funCount << "!\n";
             sym = sym % funCount;
         }
         
         if (params_.statsMode) {
-            metrics_encoded_symbols_.fetch_add(1, std::memory_order_relaxed);
+            encMetrics_.encodedSymbols.add(1);
+        }
+        
+        if (certified) {
+            // Сертифицированный ключ: коллизий нет ни в одном состоянии, нужна только RR[sym]
+            int32_t next;
+            evalRange_(coeff_.data(), funCount, params_.bitsM, enc_h1_, enc_h2_, sym, sym + 1, &next);
+            enc_h2_ = enc_h1_;
+            enc_h1_ = next;
+            sink.put(next);
+            continue;
+        }
+        
+        CollisionCacheEntry *cacheEntry = nullptr;
+        uint64_t cacheKey = 0;
+        if (useCache && collisionCacheLookups_ < kCollisionCacheProbeLookups
+            && ++collisionCacheLookups_ == kCollisionCacheProbeLookups
+            && collisionCacheHitCount_ * kCollisionCacheMinHitRatio < kCollisionCacheProbeLookups) {
+            if (params_.statsMode) {
+                std::cerr << "ℹ️  [Codec] Кеш коллизий отключён: " << collisionCacheHitCount_ << "/"
+                          << kCollisionCacheProbeLookups << " попаданий в пробном окне\n";
+            }
+            collisionCacheBits_ = 0;
+            collisionCache_.clear();
+            collisionCache_.shrink_to_fit();
+            useCache = false;
+        }
+        if (useCache) {
+            cacheKey = (static_cast<uint64_t>(static_cast<uint32_t>(enc_h1_) & stateMask) << 32)
+                     | (static_cast<uint32_t>(enc_h2_) & stateMask);
+            CollisionCacheEntry &entry = collisionCache_[collisionCacheSlot(cacheKey)];
+            if (entry.key == cacheKey) {
+                ++collisionCacheHitCount_;
+                if (params_.statsMode) {
+                    encMetrics_.collisionCacheHits.add(1);
+                }
+                const bool fromRR = !entry.collision || sym < entry.minDupIdx;
+                const bool direct = !fromRR && params_.infoInsteadOfRand && !((entry.directInRR >> sym) & 1u);
+                if (fromRR || direct) {
+                    int32_t next = sym + 1;
+                    if (fromRR) {
+                        evalRange_(coeff_.data(), funCount, params_.bitsM, enc_h1_, enc_h2_, sym, sym + 1, &next);
+                    }
+                    if (params_.statsMode) {
+                        if (entry.collision) encMetrics_.encodeCollisions.add(1);
+                        if (direct) encMetrics_.encodeDirectInfo.add(1);
+                    }
+                    enc_h2_ = enc_h1_;
+                    enc_h1_ = next;
+                    sink.put(next);
+                    continue;
+                }
+                // Случайная подстановка - общим путём (нужен весь RR), запись уже в кеше
+            } else {
+                if (params_.statsMode) {
+                    encMetrics_.collisionCacheMisses.add(1);
+                }
+                cacheEntry = &entry;
+            }
         }
         
         int32_t x = enc_h1_;
@@ -440,9 +1294,7 @@ std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &sym
         }
         
         // Вычисляем все функции
-        for (int ff = 0; ff < funCount; ++ff) {
-            RR[ff] = digitalCodingFun(ff + 1, x, y);
-        }
+        evaluateAll(x, y, RR.data());
         
         // Проверяем коллизии (оптимизировано для малых Q)
         bool collisionDetected = false;
@@ -459,12 +1311,15 @@ std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &sym
                     }
                 }
             }
+        } else if (useVectorSearch) {
+            // Первый индекс, значение которого уже встречалось раньше (как у хеш-таблицы)
+            minDupIdx = simdFirstDuplicate_(RR.data(), funCount);
+            collisionDetected = minDupIdx < funCount;
         } else {
             // Для больших Q: используем хеш-таблицу
-            rrSet.clear();
+            rrSet.clear(static_cast<size_t>(funCount));
             for (int ff = 0; ff < funCount; ++ff) {
-                auto result = rrSet.insert(RR[ff]);
-                if (!result.second) {
+                if (!rrSet.insert(RR[ff])) {
                     // Дубликат найден
                     collisionDetected = true;
                     if (ff < minDupIdx) minDupIdx = ff;
@@ -472,6 +1327,14 @@ std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &sym
             }
         }
         
+        if (cacheEntry) {
+            uint64_t directInRR = 0;
+            for (int ff = 0; ff < funCount; ++ff) {
+                if (RR[ff] >= 1 && RR[ff] <= funCount) directInRR |= 1ull << (RR[ff] - 1);
+            }
+            *cacheEntry = CollisionCacheEntry{cacheKey, directInRR, static_cast<uint16_t>(minDupIdx), collisionDetected};
+        }
+        
         int32_t next;
         bool skipSymbol = false;
         bool usedDirectInfo = false;
@@ -494,8 +1357,10 @@ std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &sym
                             break;
                         }
                     }
+                } else if (useVectorSearch) {
+                    directValInRR = simdFind_(RR.data(), funCount, directVal) >= 0;
                 } else {
-                    directValInRR = (rrSet.find(directVal) != rrSet.end());
+                    directValInRR = rrSet.contains(directVal);
                 }
                 
                 if (!directValInRR && params_.infoInsteadOfRand) {
@@ -504,13 +1369,12 @@ std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &sym
                 } else {
                     // Генерируем случайное значение
                     skipSymbol = true;
-                    static thread_local std::mt19937 gen(std::random_device{}());
                     int32_t minVal = -(1 << (params_.bitsM - 1));
                     int32_t maxVal = (1 << (params_.bitsM - 1)) - 1;
                     std::uniform_int_distribution<int32_t> dist(minVal, maxVal);
                     
                     do {
-                        next = dist(gen);
+                        next = dist(rng_);
                         // Проверка: не равно ни одному из RR
                         bool inRR = false;
                         if (useSimpleArray) {
@@ -520,8 +1384,10 @@ std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &sym
                                     break;
                                 }
                             }
+                        } else if (useVectorSearch) {
+                            inRR = simdFind_(RR.data(), funCount, next) >= 0;
                         } else {
-                            inRR = (rrSet.find(next) != rrSet.end());
+                            inRR = rrSet.contains(next);
                         }
                         
                         if (!inRR && (!params_.infoInsteadOfRand || next < 1 || next > funCount)) {
@@ -538,13 +1404,13 @@ std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &sym
         
         if (params_.statsMode) {
             if (collisionDetected) {
-                metrics_encode_collisions_.fetch_add(1, std::memory_order_relaxed);
+                encMetrics_.encodeCollisions.add(1);
             }
             if (skipSymbol) {
-                metrics_encode_random_fallbacks_.fetch_add(1, std::memory_order_relaxed);
+                encMetrics_.encodeRandomFallbacks.add(1);
             }
             if (usedDirectInfo) {
-                metrics_encode_direct_info_.fetch_add(1, std::memory_order_relaxed);
+                encMetrics_.encodeDirectInfo.add(1);
             }
         }
         
@@ -560,29 +1426,28 @@ std::vector<uint8_t> DigitalCodec::encodeSymbols(const std::vector<uint8_t> &sym
         }
         
         // Записываем закодированное значение
-        toBytes(next, out);
+        sink.put(next);
     }
-    return out;
 }
 
-std::vector<uint8_t> DigitalCodec::decodeSymbols(const std::vector<uint8_t> &coded) {
+void DigitalCodec::encodeSymbols(const uint8_t *symbols, size_t count, std::vector<uint8_t> &out) {
+    const size_t old = out.size();
+    out.resize(old + count * static_cast<size_t>(bytesPerSymbol()));
+    ArraySymbolReader src(symbols, count);
+    PaddedWordWriter sink(out.data() + old, params_.bitsM);
+    encodeFused(src, sink);
+}
+
+template <class Source, class Sink>
+void DigitalCodec::decodeFused(Source &src, Sink &sink) {
+    requireCoefficients();
     const int funCount = static_cast<int>(ipow2(params_.bitsQ));
-    const int bps = bytesPerSymbol();
-    std::vector<uint8_t> out;
-    out.reserve(coded.size() / bps);
-    
-    // Для малых Q (<=4) используем простой линейный поиск, для больших - хеш-таблицу
-    const bool useSimpleSearch = (funCount <= 4);
-    std::vector<int32_t> RR(funCount);
     
-    // Для больших Q используем хеш-таблицу
-    std::unordered_map<int32_t, int> rrMap;
-    if (!useSimpleSearch) {
-        rrMap.reserve(funCount);
-    }
+    std::vector<int32_t> &RR = decScratch_.rr;
+    RR.resize(funCount);
     
-    for (size_t i = 0; i + bps <= coded.size(); i += bps) {
-        int32_t observed = fromBytes(&coded[i]);
+    while (src.remaining() > 0) {
+        int32_t observed = src.next();
         int32_t x = dec_h1_;
         int32_t y = dec_h2_;
         bool decoded_symbol = false;
@@ -590,46 +1455,21 @@ std::vector<uint8_t> DigitalCodec::decodeSymbols(const std::vector<uint8_t> &cod
         bool decode_skip = false;
         
         // Вычисляем все функции
-        for (int ff = 0; ff < funCount; ++ff) {
-            RR[ff] = digitalCodingFun(ff + 1, x, y);
-        }
+        evaluateAll(x, y, RR.data());
         
         if (params_.debugMode) {
             std::cout << "🔍 [Decode] Наблюдение=" << observed << ", h1=" << x << ", h2=" << y << std::endl;
         }
         
-        // Поиск совпадения
-        int matched = -1;
-        
-        if (useSimpleSearch) {
-            // Для малых Q: простой линейный поиск (быстрее для 4 элементов)
-            for (int ff = 0; ff < funCount; ++ff) {
-                if (RR[ff] == observed) {
-                    matched = ff;
-                    break;
-                }
-            }
-        } else {
-            // Для больших Q: строим хеш-таблицу и ищем
-            rrMap.clear();
-            for (int ff = 0; ff < funCount; ++ff) {
-                // Сохраняем только первое вхождение (как в оригинале)
-                if (rrMap.find(RR[ff]) == rrMap.end()) {
-                    rrMap[RR[ff]] = ff;
-                }
-            }
-            auto it = rrMap.find(observed);
-            if (it != rrMap.end()) {
-                matched = it->second;
-            }
-        }
+        // Поиск первого вхождения (как в оригинале)
+        const int matched = findValue(RR.data(), funCount, observed);
         
         if (matched >= 0) {
             // Найдено совпадение - декодируем символ
             int32_t next = observed;
             dec_h2_ = dec_h1_;
             dec_h1_ = next;
-            out.push_back(static_cast<uint8_t>(matched));
+            sink.put(static_cast<uint8_t>(matched));
             decoded_symbol = true;
             if (params_.debugMode) {
                 std::cout << "   ↳ [Decode] Совпадение функции #" << (matched + 1)
@@ -642,7 +1482,7 @@ std::vector<uint8_t> DigitalCodec::decodeSymbols(const std::vector<uint8_t> &cod
                 int32_t next = observed;
                 dec_h2_ = dec_h1_;
                 dec_h1_ = next;
-                out.push_back(static_cast<uint8_t>(observed - 1));  // observed-1 для индексации от 0
+                sink.put(static_cast<uint8_t>(observed - 1));  // observed-1 для индексации от 0
                 decoded_symbol = true;
                 decode_direct = true;
                 if (params_.debugMode) {
@@ -653,7 +1493,7 @@ std::vector<uint8_t> DigitalCodec::decodeSymbols(const std::vector<uint8_t> &cod
                 int32_t next = observed;
                 dec_h2_ = dec_h1_;
                 dec_h1_ = next;
-                // НЕ добавляем в out - это реализация пропуска символа
+                // НЕ передаём в sink - это реализация пропуска символа
                 if (params_.debugMode) {
                     std::cerr << "⚠️  Пропущен символ при декодировании (не найдено совпадение)";
                     std::cerr << " [observed=" << observed << ", x=" << x << ", y=" << y << "]\n";
@@ -664,121 +1504,463 @@ std::vector<uint8_t> DigitalCodec::decodeSymbols(const std::vector<uint8_t> &cod
         
         if (params_.statsMode) {
             if (decoded_symbol) {
-                metrics_decoded_symbols_.fetch_add(1, std::memory_order_relaxed);
+                decMetrics_.decodedSymbols.add(1);
             }
             if (decode_direct) {
-                metrics_decode_direct_info_.fetch_add(1, std::memory_order_relaxed);
+                decMetrics_.decodeDirectInfo.add(1);
             }
             if (decode_skip) {
-                metrics_decode_skips_.fetch_add(1, std::memory_order_relaxed);
+                decMetrics_.decodeSkips.add(1);
             }
         }
     }
-    return out;
 }
 
-std::vector<uint8_t> DigitalCodec::encodeMessage(const std::vector<uint8_t> &input, bool use_hash) {
+template <class Source, class Sink>
+void DigitalCodec::decodeFusedParallel(Source &src, Sink &sink) {
+    requireCoefficients();
+    const int funCount = static_cast<int>(ipow2(params_.bitsQ));
+    const size_t count = src.remaining();
+    if (count == 0) return;
+
+    if (!decodeWorkers_) decodeWorkers_ = std::make_unique<DecodeWorkers>();
+    DecodeWorkers &workers = *decodeWorkers_;
+
+    // Окно (x, y, observed) для позиции i: x = слово i-1, y = слово i-2
+    std::vector<int32_t> &history = workers.history;
+    history.resize(count + 2);
+    history[0] = dec_h2_;
+    history[1] = dec_h1_;
+    for (size_t i = 0; i < count; ++i) {
+        history[i + 2] = src.next();
+    }
+
+    size_t threads = params_.decodeThreads > 0
+        ? static_cast<size_t>(params_.decodeThreads)
+        : std::max<size_t>(1, std::thread::hardware_concurrency());
+    threads = std::max<size_t>(1, std::min(threads, count / kMinWordsPerDecodeThread));
+
+    // Символ для каждой позиции или -1 для пропуска
+    std::vector<int16_t> &decoded = workers.decoded;
+    decoded.resize(count);
+    std::vector<uint64_t> &directCounts = workers.directCounts;
+    std::vector<uint64_t> &skipCounts = workers.skipCounts;
+    directCounts.assign(threads, 0);
+    skipCounts.assign(threads, 0);
+    if (workers.rr.size() < threads) workers.rr.resize(threads);
+    for (size_t t = 0; t < threads; ++t) workers.rr[t].resize(funCount);
+
+    const size_t perThread = (count + threads - 1) / threads;
+    auto worker = [&](size_t t) {
+        const size_t begin = std::min(count, t * perThread);
+        const size_t end = std::min(count, begin + perThread);
+        int32_t *RR = workers.rr[t].data();
+        uint64_t direct = 0;
+        uint64_t skips = 0;
+        for (size_t i = begin; i < end; ++i) {
+            const int32_t y = history[i];
+            const int32_t x = history[i + 1];
+            const int32_t observed = history[i + 2];
+            evaluateAll(x, y, RR);
+            const int matched = findValue(RR, funCount, observed);
+            if (matched >= 0) {
+                decoded[i] = static_cast<int16_t>(static_cast<uint8_t>(matched));
+            } else if (params_.infoInsteadOfRand && observed >= 1 && observed <= funCount) {
+                decoded[i] = static_cast<int16_t>(static_cast<uint8_t>(observed - 1));
+                ++direct;
+            } else {
+                decoded[i] = -1;
+                ++skips;
+            }
+        }
+        directCounts[t] = direct;
+        skipCounts[t] = skips;
+    };
+
+    using Worker = decltype(worker);
+    workers.run(threads, [](void *ctx, size_t t) { (*static_cast<Worker *>(ctx))(t); }, &worker);
+
+    uint64_t produced = 0;
+    for (int16_t sym : decoded) {
+        if (sym >= 0) {
+            sink.put(static_cast<uint8_t>(sym));
+            ++produced;
+        }
+    }
+
+    dec_h1_ = history[count + 1];
+    dec_h2_ = history[count];
+
+    if (params_.statsMode) {
+        uint64_t direct = 0;
+        uint64_t skips = 0;
+        for (size_t t = 0; t < threads; ++t) {
+            direct += directCounts[t];
+            skips += skipCounts[t];
+        }
+        decMetrics_.decodedSymbols.add(produced);
+        decMetrics_.decodeDirectInfo.add(direct);
+        decMetrics_.decodeSkips.add(skips);
+    }
+}
+
+void DigitalCodec::decodeSymbols(const uint8_t *coded, size_t len, std::vector<uint8_t> &out) {
+    PaddedWordReader src(coded, len / static_cast<size_t>(bytesPerSymbol()), params_.bitsM);
+    SymbolVectorWriter sink(out);
+    decodeFused(src, sink);
+}
+
+void DigitalCodec::decodeSymbolsParallel(const uint8_t *coded, size_t len, std::vector<uint8_t> &out) {
+    PaddedWordReader src(coded, len / static_cast<size_t>(bytesPerSymbol()), params_.bitsM);
+    SymbolVectorWriter sink(out);
+    decodeFusedParallel(src, sink);
+}
+
+size_t DigitalCodec::encodeMessageBound(size_t input_len, bool use_hash) const {
+    const size_t payload = input_len + (use_hash ? crypto_hash_sha256_BYTES : 0);
+    const size_t words = (payload * 8 + params_.bitsQ - 1) / params_.bitsQ + (params_.stateHeader ? 2 : 0);
+    if (params_.packedWire) return 2 + packedWireBytes(words, params_.bitsM);
+    return 2 + words * static_cast<size_t>(bytesPerSymbol());
+}
+
+size_t DigitalCodec::encodeMessageInto(const uint8_t *input, size_t input_len, bool use_hash,
+                                       uint8_t *out, size_t out_cap) {
     // States are maintained across messages for network communication
+    if (out_cap < encodeMessageBound(input_len, use_hash)) {
+        throw std::length_error("encodeMessageInto: output buffer is smaller than encodeMessageBound()");
+    }
     
-    std::vector<uint8_t> payload_to_encode;
+    requireCoefficients();
     
-    if (use_hash) {
-        // Calculate SHA-256 hash of input data
-        unsigned char hash[crypto_hash_sha256_BYTES];
-        crypto_hash_sha256(hash, input.data(), input.size());
-        
-        // Prepend hash to data: [32 bytes hash] + [data]
-        payload_to_encode.reserve(crypto_hash_sha256_BYTES + input.size());
-        payload_to_encode.insert(payload_to_encode.end(), hash, hash + crypto_hash_sha256_BYTES);
-        payload_to_encode.insert(payload_to_encode.end(), input.begin(), input.end());
-    } else {
-        // Оптимизация: избегаем копирования, используем ссылку где возможно
-        payload_to_encode = input;
-    }
+    // Payload: [32 bytes hash] + [data] with use_hash; the hash is read as the first
+    // segment of the symbol source, so the data is never copied
+    unsigned char hash[crypto_hash_sha256_BYTES];
+    const size_t len = input_len + (use_hash ? crypto_hash_sha256_BYTES : 0);
+    if (use_hash) crypto_hash_sha256(hash, input, input_len);
+    ByteSymbolReader src = use_hash
+        ? ByteSymbolReader(hash, crypto_hash_sha256_BYTES, params_.bitsQ, input, input_len)
+        : ByteSymbolReader(input, input_len, params_.bitsQ);
     
     // Frame: [len(2 bytes little endian)] [encoded symbols]
-    const size_t len = payload_to_encode.size();
-    std::vector<uint8_t> symbols = packBytesToSymbols(payload_to_encode);
-    std::vector<uint8_t> coded = encodeSymbols(symbols);
-    
-    // Оптимизация: резервируем место заранее и используем прямой доступ
-    std::vector<uint8_t> framed;
-    framed.reserve(2 + coded.size());
-    framed.resize(2 + coded.size());
-    framed[0] = static_cast<uint8_t>(len & 0xFF);
-    framed[1] = static_cast<uint8_t>((len >> 8) & 0xFF);
-    std::memcpy(framed.data() + 2, coded.data(), coded.size());
+    out[0] = static_cast<uint8_t>(len & 0xFF);
+    out[1] = static_cast<uint8_t>((len >> 8) & 0xFF);
+    if (params_.packedWire) {
+        PackedWordWriter sink(out + 2, params_.bitsM);
+        if (params_.stateHeader) { sink.put(enc_h1_); sink.put(enc_h2_); }
+        encodeFused(src, sink);
+        return static_cast<size_t>(sink.finish() - out);
+    }
+    PaddedWordWriter sink(out + 2, params_.bitsM);
+    if (params_.stateHeader) { sink.put(enc_h1_); sink.put(enc_h2_); }
+    encodeFused(src, sink);
+    return static_cast<size_t>(sink.finish() - out);
+}
+
+std::vector<uint8_t> DigitalCodec::encodeMessage(const std::vector<uint8_t> &input, bool use_hash) {
+    std::vector<uint8_t> framed(encodeMessageBound(input.size(), use_hash));
+    framed.resize(encodeMessageInto(input.data(), input.size(), use_hash, framed.data(), framed.size()));
     return framed;
 }
 
-std::vector<uint8_t> DigitalCodec::decodeMessage(const std::vector<uint8_t> &coded, size_t expected_len, bool use_hash) {
+size_t DigitalCodec::decodeMessageBound(const uint8_t *coded, size_t coded_len, size_t expected_len) {
+    if (expected_len != 0) return expected_len;
+    if (coded_len < 2) return 0;
+    return static_cast<size_t>(coded[0]) | (static_cast<size_t>(coded[1]) << 8);
+}
+
+size_t DigitalCodec::decodeMessageInto(const uint8_t *coded, size_t coded_len, size_t expected_len, bool use_hash,
+                                       uint8_t *out, size_t out_cap) {
     // States are maintained across messages for network communication
-    if (coded.size() < 2) return {};
-    size_t len = (size_t)coded[0] | ((size_t)coded[1] << 8);
-    if (expected_len != 0) len = expected_len;
+    if (coded_len < 2) return 0;
+    const size_t len = decodeMessageBound(coded, coded_len, expected_len);
+    if (out_cap < len) {
+        throw std::length_error("decodeMessageInto: output buffer is smaller than decodeMessageBound()");
+    }
     
-    // Оптимизация: создаем payload напрямую из данных без лишних копирований
-    std::vector<uint8_t> payload(coded.begin() + 2, coded.end());
-    std::vector<uint8_t> symbols = decodeSymbols(payload);
-    std::vector<uint8_t> decoded_bytes = unpackSymbolsToBytes(symbols, len);
+    const uint8_t *payload = coded + 2;
+    const size_t payload_len = coded_len - 2;
+    const size_t header_words = params_.stateHeader ? 2 : 0;
+    ByteSymbolWriter sink(out, len, params_.bitsQ);
+    // Пошаговый вывод debugMode есть только в последовательном декодере
+    const bool parallel = params_.decodeThreads != 1 && !params_.debugMode;
+    // Состояния из заголовка кадра заменяют текущие: кадр не зависит от потерянных до него
+    auto seed = [&](auto &src) {
+        if (src.remaining() < header_words) return false;
+        if (header_words) {
+            dec_h1_ = src.next();
+            dec_h2_ = src.next();
+            if (params_.debugMode) {
+                std::cout << "🔄 [Codec] Состояния из заголовка кадра: dec_h1_=" << dec_h1_
+                          << ", dec_h2_=" << dec_h2_ << std::endl;
+            }
+        }
+        return true;
+    };
+    if (params_.packedWire) {
+        // Число слов ограничено длиной: при M < 8 в дополнение последнего байта помещается лишнее слово
+        const size_t symbols = (len * 8 + params_.bitsQ - 1) / params_.bitsQ;
+        const size_t words = std::min(symbols + header_words, payload_len * 8 / static_cast<size_t>(params_.bitsM));
+        PackedWordReader src(payload, words, params_.bitsM);
+        if (!seed(src)) return 0;
+        if (parallel) decodeFusedParallel(src, sink); else decodeFused(src, sink);
+    } else {
+        PaddedWordReader src(payload, payload_len / static_cast<size_t>(bytesPerSymbol()), params_.bitsM);
+        if (!seed(src)) return 0;
+        if (parallel) decodeFusedParallel(src, sink); else decodeFused(src, sink);
+    }
+    const size_t decoded_len = sink.finish();
     
     if (use_hash) {
         // Verify hash integrity
-        if (decoded_bytes.size() < crypto_hash_sha256_BYTES) {
+        if (decoded_len < crypto_hash_sha256_BYTES) {
             std::cerr << "❌ Декодированный буфер слишком мал для проверки хеша!\n";
-            std::cerr << "   Получено: " << decoded_bytes.size() << " байт, ожидалось минимум: " 
+            std::cerr << "   Получено: " << decoded_len << " байт, ожидалось минимум: " 
                       << crypto_hash_sha256_BYTES << " байт (SHA-256)\n";
             std::cerr << "   Возможные причины: повреждение данных, несовпадение параметров кодека (M/Q/CSV)\n";
-            return {};
+            return 0;
         }
         
-        // Extract received hash (first 32 bytes)
-        unsigned char received_hash[crypto_hash_sha256_BYTES];
-        std::memcpy(received_hash, decoded_bytes.data(), crypto_hash_sha256_BYTES);
-        
-        // Calculate actual hash of the data (after hash)
-        size_t data_len = decoded_bytes.size() - crypto_hash_sha256_BYTES;
+        // Calculate actual hash of the data (after hash) and compare with the received one (first 32 bytes)
+        const size_t data_len = decoded_len - crypto_hash_sha256_BYTES;
         unsigned char actual_hash[crypto_hash_sha256_BYTES];
-        crypto_hash_sha256(actual_hash, decoded_bytes.data() + crypto_hash_sha256_BYTES, data_len);
-        
-        // Return only the data part (without hash)
-        std::vector<uint8_t> result(decoded_bytes.begin() + crypto_hash_sha256_BYTES, decoded_bytes.end());
-        
-        // Compare hashes
-        if (std::memcmp(received_hash, actual_hash, crypto_hash_sha256_BYTES) != 0) {
+        crypto_hash_sha256(actual_hash, out + crypto_hash_sha256_BYTES, data_len);
+        if (std::memcmp(out, actual_hash, crypto_hash_sha256_BYTES) != 0) {
             std::cerr << "⚠️  Хеш не совпадает в decodeMessage — данные могут быть повреждены!\n";
             // Возвращаем данные несмотря на несовпадение хеша (для отладки)
         }
         
-        return result;
+        // Return only the data part (without hash)
+        std::memmove(out, out + crypto_hash_sha256_BYTES, data_len);
+        return data_len;
     }
     
-    return decoded_bytes;
+    return decoded_len;
+}
+
+std::vector<uint8_t> DigitalCodec::decodeMessage(const std::vector<uint8_t> &coded, size_t expected_len, bool use_hash) {
+    std::vector<uint8_t> decoded(decodeMessageBound(coded.data(), coded.size(), expected_len));
+    decoded.resize(decodeMessageInto(coded.data(), coded.size(), expected_len, use_hash,
+                                     decoded.data(), decoded.size()));
+    return decoded;
+}
+
+// === Streaming API ===
+void StreamEncoder::push(const uint8_t *data, size_t len, std::vector<uint8_t> &out) {
+    const int q = codec_.params_.bitsQ;
+    const uint32_t mask = (1u << q) - 1u;
+    symbols_.clear();
+    // Та же раскладка бит, что у ByteSymbolReader, но остаток переносится в следующий вызов
+    for (size_t i = 0; i < len; ++i) {
+        bitbuf_ |= (uint32_t)data[i] << bitcount_;
+        bitcount_ += 8;
+        while (bitcount_ >= q) {
+            symbols_.push_back(static_cast<uint8_t>(bitbuf_ & mask));
+            bitbuf_ >>= q;
+            bitcount_ -= q;
+        }
+    }
+    if (symbols_.empty()) return;
+    coded_.clear();
+    codec_.encodeSymbols(symbols_.data(), symbols_.size(), coded_);
+    emitWords(coded_, out);
+}
+
+void StreamEncoder::finish(std::vector<uint8_t> &out) {
+    if (bitcount_ > 0) {
+        const uint32_t mask = (1u << codec_.params_.bitsQ) - 1u;
+        symbols_.assign(1, static_cast<uint8_t>(bitbuf_ & mask));
+        coded_.clear();
+        codec_.encodeSymbols(symbols_.data(), symbols_.size(), coded_);
+        emitWords(coded_, out);
+    }
+    if (wirebits_ > 0) {
+        out.push_back(static_cast<uint8_t>(wirebuf_));
+    }
+    bitbuf_ = 0;
+    bitcount_ = 0;
+    wirebuf_ = 0;
+    wirebits_ = 0;
+}
+
+void StreamEncoder::emitWords(const std::vector<uint8_t> &coded, std::vector<uint8_t> &out) {
+    if (!codec_.params_.packedWire) {
+        out.insert(out.end(), coded.begin(), coded.end());
+        return;
+    }
+    const int m = codec_.params_.bitsM;
+    const size_t bps = static_cast<size_t>(codec_.bytesPerSymbol());
+    const uint64_t mask = (1ull << m) - 1ull;
+    const size_t words = coded.size() / bps;
+    auto carryWord = [&](size_t i) {
+        uint32_t u = 0;
+        for (size_t b = 0; b < bps; ++b) u |= static_cast<uint32_t>(coded[i * bps + b]) << (8 * b);
+        wirebuf_ |= (static_cast<uint64_t>(u) & mask) << wirebits_;
+        wirebits_ += m;
+        while (wirebits_ >= 8) {
+            out.push_back(static_cast<uint8_t>(wirebuf_));
+            wirebuf_ >>= 8;
+            wirebits_ -= 8;
+        }
+    };
+    // Слова до границы байта - через перенос (не больше 8), дальше группы по 8 слов
+    // (ровно M байт) - через packWords, хвост снова в перенос до следующего вызова
+    size_t i = 0;
+    for (; i < words && wirebits_ != 0; ++i) carryWord(i);
+    const size_t aligned = (wirebits_ == 0) ? (words - i) / 8 * 8 : 0;
+    if (aligned) {
+        const size_t old = out.size();
+        out.resize(old + packedWireBytes(aligned, m));
+        packWords(coded.data() + i * bps, aligned, m, out.data() + old);
+        i += aligned;
+    }
+    for (; i < words; ++i) carryWord(i);
+}
+
+void StreamDecoder::emitByte(uint8_t b, std::vector<uint8_t> &out) {
+    if (totalLen_ != 0 && produced_ >= totalLen_) return;
+    out.push_back(b);
+    ++produced_;
+}
+
+void StreamDecoder::push(const uint8_t *data, size_t len, std::vector<uint8_t> &out) {
+    const size_t bps = static_cast<size_t>(codec_.bytesPerSymbol());
+    if (codec_.params_.packedWire) {
+        // Распаковка в обычную раскладку; биты неполного слова переносятся в wirebuf_
+        const int m = codec_.params_.bitsM;
+        const uint64_t mask = (1ull << m) - 1ull;
+        words_.reserve(words_.size() + (len * 8 + wirebits_) / m * bps);
+        for (size_t i = 0; i < len; ++i) {
+            wirebuf_ |= static_cast<uint64_t>(data[i]) << wirebits_;
+            wirebits_ += 8;
+            while (wirebits_ >= m) {
+                uint32_t u = static_cast<uint32_t>(wirebuf_ & mask);
+                wirebuf_ >>= m;
+                wirebits_ -= m;
+                for (size_t b = 0; b < bps; ++b, u >>= 8) words_.push_back(static_cast<uint8_t>(u));
+            }
+        }
+    } else {
+        // words_ хранит неполное слово с прошлого вызова
+        words_.insert(words_.end(), data, data + len);
+    }
+    const auto &params = codec_.params_;
+    size_t whole = words_.size() - words_.size() % bps;
+    if (totalLen_ != 0) {
+        // Известная длина задаёт число слов (как min(symbols, payload*8/M) в decodeMessageInto):
+        // слово из нулевого добивания последнего байта (packedWire, M < 8) не декодируется -
+        // иначе при пропущенных символах оно дало бы лишний байт
+        const uint64_t maxWords = (totalLen_ * 8 + params.bitsQ - 1) / params.bitsQ;
+        const uint64_t left = maxWords > consumed_ ? maxWords - consumed_ : 0;
+        if (whole / bps > left) {
+            whole = static_cast<size_t>(left) * bps;
+            words_.resize(whole);
+            wirebuf_ = 0;
+            wirebits_ = 0;
+        }
+    }
+    if (whole == 0) return;
+    consumed_ += whole / bps;
+
+    symbols_.clear();
+    if (params.decodeThreads != 1 && !params.debugMode) {
+        codec_.decodeSymbolsParallel(words_.data(), whole, symbols_);
+    } else {
+        codec_.decodeSymbols(words_.data(), whole, symbols_);
+    }
+    // Неполное слово остаётся в начале words_ до следующего вызова
+    words_.erase(words_.begin(), words_.begin() + whole);
+
+    // Та же раскладка бит, что у ByteSymbolWriter
+    const int q = params.bitsQ;
+    for (uint8_t sym : symbols_) {
+        bitbuf_ |= ((uint32_t)sym) << bitcount_;
+        bitcount_ += q;
+        while (bitcount_ >= 8) {
+            emitByte(static_cast<uint8_t>(bitbuf_ & 0xFFu), out);
+            bitbuf_ >>= 8;
+            bitcount_ -= 8;
+        }
+    }
+}
+
+void StreamDecoder::finish(std::vector<uint8_t> &out) {
+    // Неполный байт нужен только если известная длина ещё не набрана
+    if (bitcount_ > 0 && totalLen_ != 0 && produced_ < totalLen_) {
+        emitByte(static_cast<uint8_t>(bitbuf_ & 0xFFu), out);
+    }
+    bitbuf_ = 0;
+    bitcount_ = 0;
+    words_.clear();
+    wirebuf_ = 0;
+    wirebits_ = 0;
 }
 
 void DigitalCodec::resetDebugStats() const {
-    metrics_encoded_symbols_.store(0, std::memory_order_relaxed);
-    metrics_encode_collisions_.store(0, std::memory_order_relaxed);
-    metrics_encode_random_fallbacks_.store(0, std::memory_order_relaxed);
-    metrics_encode_direct_info_.store(0, std::memory_order_relaxed);
-    metrics_decoded_symbols_.store(0, std::memory_order_relaxed);
-    metrics_decode_direct_info_.store(0, std::memory_order_relaxed);
-    metrics_decode_skips_.store(0, std::memory_order_relaxed);
+    for (Metrics *m : {&encMetrics_, &decMetrics_}) {
+        m->encodedSymbols.reset();
+        m->encodeCollisions.reset();
+        m->encodeRandomFallbacks.reset();
+        m->encodeDirectInfo.reset();
+        m->collisionCacheHits.reset();
+        m->collisionCacheMisses.reset();
+        m->decodedSymbols.reset();
+        m->decodeDirectInfo.reset();
+        m->decodeSkips.reset();
+    }
+}
+
+CodecStats DigitalCodec::debugStats() const {
+    CodecStats stats;
+    for (const Metrics *m : {&encMetrics_, &decMetrics_}) {
+        stats.encodedSymbols += m->encodedSymbols.load();
+        stats.encodeCollisions += m->encodeCollisions.load();
+        stats.encodeRandomFallbacks += m->encodeRandomFallbacks.load();
+        stats.encodeDirectInfo += m->encodeDirectInfo.load();
+        stats.collisionCacheHits += m->collisionCacheHits.load();
+        stats.collisionCacheMisses += m->collisionCacheMisses.load();
+        stats.decodedSymbols += m->decodedSymbols.load();
+        stats.decodeDirectInfo += m->decodeDirectInfo.load();
+        stats.decodeSkips += m->decodeSkips.load();
+    }
+    return stats;
+}
+
+CodecStats &CodecStats::operator+=(const CodecStats &other) {
+    encodedSymbols += other.encodedSymbols;
+    encodeCollisions += other.encodeCollisions;
+    encodeRandomFallbacks += other.encodeRandomFallbacks;
+    encodeDirectInfo += other.encodeDirectInfo;
+    decodedSymbols += other.decodedSymbols;
+    decodeDirectInfo += other.decodeDirectInfo;
+    decodeSkips += other.decodeSkips;
+    collisionCacheHits += other.collisionCacheHits;
+    collisionCacheMisses += other.collisionCacheMisses;
+    return *this;
+}
+
+void printCodecStats(const CodecStats &stats, const std::string &header) {
+    std::cout << header << "\n"
+              << "   🔢 Закодировано символов: " << stats.encodedSymbols << "\n"
+              << "   ⚠️  Коллизий обнаружено: " << stats.encodeCollisions << "\n"
+              << "   🎲 Случайных подстановок: " << stats.encodeRandomFallbacks << "\n"
+              << "   📡 Прямых передач Info: " << stats.encodeDirectInfo << "\n"
+              << "   ✅ Декодировано символов: " << stats.decodedSymbols << "\n"
+              << "   ℹ️  Декодировано через Info: " << stats.decodeDirectInfo << "\n"
+              << "   ⛔ Пропусков при декодировании: " << stats.decodeSkips << "\n";
+    const uint64_t lookups = stats.collisionCacheHits + stats.collisionCacheMisses;
+    if (lookups > 0) {
+        std::ostringstream rate;
+        rate << std::fixed << std::setprecision(1) << (100.0 * stats.collisionCacheHits / lookups);
+        std::cout << "   🗂️  Кеш коллизий: " << stats.collisionCacheHits << "/" << lookups
+                  << " попаданий (" << rate.str() << "%)\n";
+    }
 }
 
 void DigitalCodec::printDebugStats(const std::string &context) const {
     if (!params_.statsMode) {
         return;
     }
-    const std::string header = context.empty() ? "📊 Статистика цифрового кодека" : context;
-    std::cout << header << "\n"
-              << "   🔢 Закодировано символов: " << metrics_encoded_symbols_.load(std::memory_order_relaxed) << "\n"
-              << "   ⚠️  Коллизий обнаружено: " << metrics_encode_collisions_.load(std::memory_order_relaxed) << "\n"
-              << "   🎲 Случайных подстановок: " << metrics_encode_random_fallbacks_.load(std::memory_order_relaxed) << "\n"
-              << "   📡 Прямых передач Info: " << metrics_encode_direct_info_.load(std::memory_order_relaxed) << "\n"
-              << "   ✅ Декодировано символов: " << metrics_decoded_symbols_.load(std::memory_order_relaxed) << "\n"
-              << "   ℹ️  Декодировано через Info: " << metrics_decode_direct_info_.load(std::memory_order_relaxed) << "\n"
-              << "   ⛔ Пропусков при декодировании: " << metrics_decode_skips_.load(std::memory_order_relaxed) << "\n";
+    printCodecStats(debugStats(), context.empty() ? "📊 Статистика цифрового кодека" : context);
 }
 
 } // namespace digitalcodec
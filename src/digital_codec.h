@@ -2,6 +2,8 @@
 
 #include <atomic>
 #include <cstdint>
+#include <memory>
+#include <random>
 #include <string>
 #include <vector>
 #include <unordered_set>
@@ -24,14 +26,53 @@ struct CodecParams {
     bool statsMode = false;         // Collect aggregate statistics
     bool injectErrors = false;      // Artificial error injection flag (used on sender)
     double errorRate = 0.01;        // Probability (0..1) for artificial errors
+    int decodeThreads = 1;          // Whole-stream decode workers (1 = sequential, 0 = all cores)
+    int encodeTableSymbols = 0;     // k-symbol encode tables for M<=8 (0/1 = off, 2..4 symbols per lookup)
+    bool compiledKernel = false;    // Key-specialized kernel compiled at CSV load (see codec_kernel.h)
+    uint64_t randomSeed = 0;        // Seed of the collision fallback generator, reapplied by reset() (0 = std::random_device)
+    bool certifiedFastPath = true;  // Load <csv>.cert (common.codec.certificate) and skip collision checks for injective keys
+    int collisionCacheBits = 16;    // Per-state collision cache of encodeSymbols: 2^bits direct-mapped entries (0 = off, Q<=6)
+    bool packedWire = false;        // Dense wire format of messages and streams: exactly M bits per word (both ends must agree)
+    bool stateHeader = false;       // Message frames start with the encoder's (h1, h2) as two words; the decoder seeds from them (both ends must agree)
+    int simdLevel = -1;             // Vector RR evaluation/searches (codec_simd.h): -1 = best for the CPU, 0 = scalar, 1 = SSE4.1, 2 = AVX2
 };
 
+// Dense wire format (CodecParams::packedWire): coded words back to back, M bits each,
+// LSB first; the last byte is zero-padded. "padded" is the default layout of
+// bytesPerSymbol() little-endian bytes per word (DigitalCodec::toBytes).
+size_t packedWireBytes(size_t words, int bitsM);
+void packWords(const uint8_t *padded, size_t words, int bitsM, uint8_t *packed);
+// Reads packedWireBytes(words, bitsM) bytes of packed
+void unpackWords(const uint8_t *packed, size_t words, int bitsM, uint8_t *padded);
+
+class KernelLibrary;
+
+// Snapshot of the aggregate statistics (filled when statsMode is enabled)
+struct CodecStats {
+    uint64_t encodedSymbols = 0;
+    uint64_t encodeCollisions = 0;
+    uint64_t encodeRandomFallbacks = 0;
+    uint64_t encodeDirectInfo = 0;
+    uint64_t decodedSymbols = 0;
+    uint64_t decodeDirectInfo = 0;
+    uint64_t decodeSkips = 0;
+    uint64_t collisionCacheHits = 0;
+    uint64_t collisionCacheMisses = 0;
+
+    // Field-wise sum (merging the counters of several codecs or threads)
+    CodecStats &operator+=(const CodecStats &other);
+};
+
+// Multi-line report of a statistics snapshot (DigitalCodec::printDebugStats format)
+void printCodecStats(const CodecStats &stats, const std::string &header);
+
 // COEFF is a matrix with rows = 2^Q, columns depend on funType
 // For funType in {1,2,3,4}: 3 columns (a,b,q)
 // For funType == 5: 4 columns (a,b,c,q)
 class DigitalCodec {
 public:
-    DigitalCodec() = default;
+    DigitalCodec();
+    ~DigitalCodec();
 
     void configure(const CodecParams &params);
 
@@ -40,6 +81,31 @@ public:
     // Number of rows must be exactly 2^Q. Whitespace is allowed.
     void loadCoefficientsCSV(const std::string &csvPath);
 
+    // Generate, compile (cached) and load the key-specialized kernel for the loaded COEFF.
+    // Throws std::runtime_error if compilation or dlopen fails.
+    void compileKernel(const std::string &cacheDir = "");
+    // Load a previously compiled kernel .so; clearKernel() returns to digitalCodingFun
+    void loadKernel(const std::string &soPath);
+    void clearKernel();
+    bool kernelActive() const { return kernelEval_ != nullptr; }
+    // Instruction set of the vector evaluators chosen at configure(): "avx2", "sse4.1" or "scalar"
+    const char *simdName() const;
+
+    // Injectivity certificate: text records "injective bits_m=.. bits_q=.. fun_type=.. coeff=<fnv1a64>"
+    // written by the offline exhaustive check (python3 -m common.codec.certificate).
+    // A record matching the loaded COEFF, M, Q and funType proves RR has no collisions in any
+    // state, so encodeSymbols evaluates only RR[sym]. Returns true if a record was accepted;
+    // a missing file or no matching record leaves the regular path.
+    bool loadCertificate(const std::string &certPath);
+    bool certified() const { return certified_; }
+
+    // Use the k-symbol encode tables of source (same COEFF, M, Q, funType, infoInsteadOfRand
+    // and encodeTableSymbols; h1/h2 and randomSeed may differ), so lanes build every row once.
+    // No-op when this codec has no tables or is certified (tables are not used then).
+    void shareEncodeTables(DigitalCodec &source);
+    // FNV-1a 64 of COEFF as row-major little-endian int32 (the certificate "coeff" field)
+    uint64_t coefficientHash() const;
+
     // Reset internal generator states
     void reset();
     void syncStates(int32_t h1, int32_t h2);
@@ -47,6 +113,10 @@ public:
     // Get current encoder states
     int32_t get_enc_h1() const { return enc_h1_; }
     int32_t get_enc_h2() const { return enc_h2_; }
+    // Get current decoder states
+    int32_t get_dec_h1() const { return dec_h1_; }
+    int32_t get_dec_h2() const { return dec_h2_; }
+    const CodecParams &params() const { return params_; }
 
     // Encode raw bytes into coded bytes using the digital coding scheme.
     // Supports any M up to 31. Each state is serialized using bytesPerSymbol() bytes.
@@ -56,6 +126,9 @@ public:
     std::vector<uint8_t> decodeBytes(const std::vector<uint8_t> &coded);
 
     // Encode full message: packs input bytes into Q-bit symbols, then encodes symbols
+    // Frame: [len (2 bytes LE)] + words (bytesPerSymbol() bytes each, or M bits each with packedWire)
+    // With stateHeader the words start with the encoder states (h1, h2) the frame was coded from,
+    // so a frame decodes correctly after lost or reordered frames
     // If use_hash=true, prepends SHA-256 hash for integrity check
     // Default: false (for MATLAB compatibility - collision handling is enough)
     std::vector<uint8_t> encodeMessage(const std::vector<uint8_t> &input, bool use_hash = false);
@@ -63,21 +136,101 @@ public:
     // If use_hash=true, verifies SHA-256 hash and returns empty vector on mismatch
     // Default: false (for MATLAB compatibility)
     std::vector<uint8_t> decodeMessage(const std::vector<uint8_t> &coded, size_t expected_len, bool use_hash = false);
+
+    // Zero-allocation variants: same frames, written into a caller buffer. Symbols are read
+    // straight from the input and coded words written straight into out (and back on decode);
+    // the RR buffers are owned by the codec (separate for encode and decode, so one codec may
+    // encode and decode from two threads), so no heap allocation happens once they have grown
+    // (decodeThreads != 1 still starts threads).
+    // Return the number of bytes written; throw std::length_error if out_cap < the bound.
+    size_t encodeMessageBound(size_t input_len, bool use_hash = false) const;
+    size_t encodeMessageInto(const uint8_t *input, size_t input_len, bool use_hash,
+                             uint8_t *out, size_t out_cap);
+    // Decoded size of a frame: expected_len, or the length from its header
+    static size_t decodeMessageBound(const uint8_t *coded, size_t coded_len, size_t expected_len = 0);
+    // Returns 0 (like the empty vector of decodeMessage) if the frame is too short for its hash
+    // or, with stateHeader, for the two state words
+    size_t decodeMessageInto(const uint8_t *coded, size_t coded_len, size_t expected_len, bool use_hash,
+                             uint8_t *out, size_t out_cap);
     
     // Debug/statistics helpers
     void printDebugStats(const std::string &context = "") const;
     void resetDebugStats() const;
+    CodecStats debugStats() const;
 
 private:
-    // Helpers for symbol-level operation
-    std::vector<uint8_t> packBytesToSymbols(const std::vector<uint8_t> &input) const;
-    std::vector<uint8_t> unpackSymbolsToBytes(const std::vector<uint8_t> &symbols, size_t expected_len) const;
-    std::vector<uint8_t> encodeSymbols(const std::vector<uint8_t> &symbols);
-    std::vector<uint8_t> decodeSymbols(const std::vector<uint8_t> &coded);
+    friend class StreamEncoder;
+    friend class StreamDecoder;
+
+    // Fused single-pass kernels. Source yields Q-bit symbols (encode) or coded words (decode)
+    // and Sink receives the opposite; the message API reads symbols straight from the payload
+    // bytes and writes words straight into the frame, with no symbol or word buffers between.
+    // Readers/writers are defined in digital_codec.cpp next to the kernels.
+    template <class Source, class Sink> void encodeFused(Source &src, Sink &sink);
+    template <class Source, class Sink> void decodeFused(Source &src, Sink &sink);
+    // Decoder state is always the previous two coded words, so every position can be
+    // decoded independently: the words are split between decodeThreads workers.
+    template <class Source, class Sink> void decodeFusedParallel(Source &src, Sink &sink);
+    // Persistent workers and buffers of decodeFusedParallel (created on its first call),
+    // so per-call cost is a wake-up instead of thread creation and allocation
+    struct DecodeWorkers;
+
+    // Symbol-buffer wrappers of the kernels (streams). Outputs are appended, so callers
+    // pass reused buffers and nothing is allocated once their capacity suffices.
+    void encodeSymbols(const uint8_t *symbols, size_t count, std::vector<uint8_t> &out);
+    void decodeSymbols(const uint8_t *coded, size_t len, std::vector<uint8_t> &out);
+    void decodeSymbolsParallel(const uint8_t *coded, size_t len, std::vector<uint8_t> &out);
+
+    // k-symbol encode tables: one lookup maps (h1, h2, s1..sk) to k coded words.
+    // Rows are built lazily per state into stack buffers and published once into a store
+    // shared with other codecs (shareEncodeTables); chains that hit a random fallback are
+    // marked non-deterministic and encoded symbol by symbol. Certified keys skip the tables.
+    struct MultiTable;
+    const uint32_t *buildMultiRow(size_t row);
+    void walkMultiRow(int depth, int32_t x, int32_t y, size_t combo, uint32_t packed,
+                      int collisions, int direct, uint32_t *out, uint8_t *meta) const;
+    template <class Sink> bool encodeMultiStep(const uint8_t *syms, Sink &sink);
+
+    // Per-state collision cache: collision flag, minDupIdx and the "sym+1 is in RR" bits
+    // depend only on (x, y), so a hit needs RR[sym] alone (or nothing for direct info).
+    // Entries are filled on a miss of the full path; random fallbacks always take it.
+    struct CollisionCacheEntry {
+        uint64_t key = ~0ull;      // (x & mask) << 32 | (y & mask), ~0 = empty
+        uint64_t directInRR = 0;   // bit s: value s+1 is one of RR
+        uint16_t minDupIdx = 0;
+        bool collision = false;
+    };
+    size_t collisionCacheSlot(uint64_t key) const;
+
+    // Open-addressing set of RR values (collision checks for Q > 2). clear() bumps a stamp
+    // instead of erasing, so a symbol costs no allocation (std::unordered_set allocated per value)
+    struct ValueSet {
+        std::vector<int32_t> keys;
+        std::vector<uint32_t> stamps;
+        uint32_t stamp = 0;
+        size_t mask = 0;
+        void clear(size_t capacity);
+        bool insert(int32_t v);  // false if v is already in the set
+        bool contains(int32_t v) const;
+    };
+
+    // Scratch buffers of one direction of the codec (capacity only grows)
+    struct Scratch {
+        std::vector<int32_t> rr;
+        ValueSet rrSet;
+    };
+
+    // RR of all 2^Q functions for state (x, y): compiled kernel if loaded, else digitalCodingFun
+    void evaluateAll(int32_t x, int32_t y, int32_t *RR) const;
 
     // Compute DigitalCodingFun for one function index (1-based like MATLAB), given previous states x,y
     int32_t digitalCodingFun(int funcIndex1Based, int32_t x, int32_t y) const;
 
+    // Evaluators do not bounds-check: entry points throw std::out_of_range before the first symbol
+    void requireCoefficients() const;
+    // COEFF as [2^Q][cols] rows (for the kernel generator)
+    std::vector<std::vector<int32_t>> coefficientRows() const;
+
     // Wrap signed integer to M-bit two's complement range [-(2^(M-1))..(2^(M-1)-1)]
     int32_t wrapM(int64_t v) const;
 
@@ -88,23 +241,138 @@ private:
 
 private:
     CodecParams params_{};
-    std::vector<std::vector<int32_t>> coeff_; // [2^Q][cols]
+    // COEFF column by column: coeff_[col * funCount_ + ff] (struct of arrays, one buffer)
+    std::vector<int32_t> coeff_;
     int cols_ = 0;
+    int funCount_ = 0;
+
+    // DigitalCodingFun for functions [first, last) of state (x, y), specialized at configure()
+    // for funType and word width (M = 8, M = 16, other M in 32-bit arithmetic)
+    using EvalRangeFn = void (*)(const int32_t *coeff, int funCount, int bitsM,
+                                 int32_t x, int32_t y, int first, int last, int32_t *rr);
+    EvalRangeFn evalRange_ = nullptr;
+
+    // Vector kernels (codec_simd.h) selected at configure() for simdLevel, funType and 2^Q;
+    // nullptr = scalar evalRange_, ValueSet and findFirstMatch
+    int simdLevel_ = 0;
+    void (*simdEvalAll_)(const int32_t *coeff, int funCount, int bitsM, int32_t x, int32_t y, int32_t *rr) = nullptr;
+    int (*simdFirstDuplicate_)(const int32_t *rr, int funCount) = nullptr;
+    int (*simdFind_)(const int32_t *rr, int funCount, int32_t value) = nullptr;
+    // First index with RR[ff] == value or -1 (vector search when available)
+    int findValue(const int32_t *RR, int funCount, int32_t value) const;
+
+    // COEFF is proven injective for every state (loadCertificate)
+    bool certified_ = false;
+
+    // Key-specialized kernel (compiledKernel)
+    std::unique_ptr<KernelLibrary> kernel_;
+    void (*kernelEval_)(int32_t x, int32_t y, int32_t *rr) = nullptr;
 
     // rolling states for encode/decode
     int32_t enc_h1_ = 0;
     int32_t enc_h2_ = 0;
     int32_t dec_h1_ = 0;
     int32_t dec_h2_ = 0;
+
+    // Random words for collision fallbacks (seeded from params_.randomSeed in reset())
+    std::mt19937 rng_;
+
+    // k-symbol encode tables (see encodeTableSymbols), created on the first encode
+    int multiK_ = 0;
+    std::shared_ptr<MultiTable> multiTable_;
+
+    // Scratch buffers: encode and decode are separate (tap tools run them in two threads)
+    Scratch encScratch_;
+    Scratch decScratch_;
+    std::unique_ptr<DecodeWorkers> decodeWorkers_;
+
+    // Collision cache (see collisionCacheBits), allocated on the first encode
+    std::vector<CollisionCacheEntry> collisionCache_;
+    int collisionCacheBits_ = 0;
+    uint64_t collisionCacheLookups_ = 0;   // counted up to the probe window only
+    uint64_t collisionCacheHitCount_ = 0;
     
-    // Aggregate debug metrics (updated when statsMode enabled)
-    mutable std::atomic<uint64_t> metrics_encoded_symbols_{0};
-    mutable std::atomic<uint64_t> metrics_encode_collisions_{0};
-    mutable std::atomic<uint64_t> metrics_encode_random_fallbacks_{0};
-    mutable std::atomic<uint64_t> metrics_encode_direct_info_{0};
-    mutable std::atomic<uint64_t> metrics_decoded_symbols_{0};
-    mutable std::atomic<uint64_t> metrics_decode_direct_info_{0};
-    mutable std::atomic<uint64_t> metrics_decode_skips_{0};
+    // Aggregate debug metrics (updated when statsMode enabled). Encode and decode may run
+    // in two threads, so each direction has its own cache-line block written only by the
+    // thread running it: a relaxed load + store instead of a locked add, and the two writers
+    // never share a line. debugStats() sums the blocks; resetDebugStats() during coding
+    // may lose to a concurrent increment.
+    class Counter {
+    public:
+        void add(uint64_t n) { v_.store(v_.load(std::memory_order_relaxed) + n, std::memory_order_relaxed); }
+        uint64_t load() const { return v_.load(std::memory_order_relaxed); }
+        void reset() { v_.store(0, std::memory_order_relaxed); }
+
+    private:
+        std::atomic<uint64_t> v_{0};
+    };
+    struct alignas(64) Metrics {
+        Counter encodedSymbols;
+        Counter encodeCollisions;
+        Counter encodeRandomFallbacks;
+        Counter encodeDirectInfo;
+        Counter collisionCacheHits;
+        Counter collisionCacheMisses;
+        Counter decodedSymbols;
+        Counter decodeDirectInfo;
+        Counter decodeSkips;
+    };
+    mutable Metrics encMetrics_;
+    mutable Metrics decMetrics_;
+};
+
+// Streaming encoder: input bytes are pushed in caller-sized blocks, coded words are
+// appended to out as soon as whole Q-bit symbols are available. The partial bit buffer
+// and the codec state are carried between calls, so the output does not depend on
+// block boundaries and equals encodeMessage() of the whole input without its 2-byte header.
+// With packedWire the bits of an incomplete byte are carried too and flushed by finish().
+class StreamEncoder {
+public:
+    explicit StreamEncoder(DigitalCodec &codec) : codec_(codec) {}
+
+    void push(const uint8_t *data, size_t len, std::vector<uint8_t> &out);
+    // Flush the last partial symbol (zero-padded like encodeMessage)
+    void finish(std::vector<uint8_t> &out);
+
+private:
+    void emitWords(const std::vector<uint8_t> &coded, std::vector<uint8_t> &out);
+
+    DigitalCodec &codec_;
+    uint32_t bitbuf_ = 0;
+    int bitcount_ = 0;
+    std::vector<uint8_t> symbols_;  // reused between push() calls
+    std::vector<uint8_t> coded_;    // reused between push() calls
+    uint64_t wirebuf_ = 0;          // packedWire: bits of the incomplete output byte
+    int wirebits_ = 0;
+};
+
+// Streaming decoder for the output of StreamEncoder. Partial coded words and the
+// partial byte of decoded symbols are carried between calls.
+// totalLen is the original input length; 0 = unknown (trailing padding bits are dropped).
+// With packedWire and M < 8 the zero padding of the last byte can hold a whole word;
+// with totalLen known, decoding stops after ceil(totalLen*8/Q) words, so that word is
+// never decoded (even when skipped symbols leave produced bytes short of totalLen).
+class StreamDecoder {
+public:
+    explicit StreamDecoder(DigitalCodec &codec, uint64_t totalLen = 0)
+        : codec_(codec), totalLen_(totalLen) {}
+
+    void push(const uint8_t *data, size_t len, std::vector<uint8_t> &out);
+    void finish(std::vector<uint8_t> &out);
+
+private:
+    void emitByte(uint8_t b, std::vector<uint8_t> &out);
+
+    DigitalCodec &codec_;
+    uint64_t totalLen_ = 0;
+    uint64_t produced_ = 0;
+    uint64_t consumed_ = 0;       // words decoded so far (capped by totalLen)
+    uint32_t bitbuf_ = 0;
+    int bitcount_ = 0;
+    std::vector<uint8_t> words_;    // whole coded words of the current block (+ carried partial word)
+    std::vector<uint8_t> symbols_;  // reused between push() calls
+    uint64_t wirebuf_ = 0;        // packedWire: bits of the incomplete input word
+    int wirebits_ = 0;
 };
 
 } // namespace digitalcodec
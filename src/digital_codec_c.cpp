@@ -0,0 +1,140 @@
+#include "digital_codec_c.h"
+#include "digital_codec.h"
+
+#include <new>
+#include <stdexcept>
+#include <string>
+
+using digitalcodec::CodecParams;
+using digitalcodec::CodecStats;
+using digitalcodec::DigitalCodec;
+
+struct lc_codec {
+    DigitalCodec codec;
+    std::string error;
+};
+
+namespace {
+
+// Перевод исключений C++ в коды ошибок C ABI
+template <typename Fn>
+int64_t guarded(lc_codec *h, Fn &&fn) {
+    try {
+        h->error.clear();
+        return fn();
+    } catch (const std::logic_error &e) {  // включая std::invalid_argument
+        h->error = e.what();
+        return LC_CODEC_EINVAL;
+    } catch (const std::exception &e) {
+        h->error = e.what();
+        return LC_CODEC_ERUNTIME;
+    }
+}
+
+// Буфер меньше lc_codec_*_bound(): состояния кодека не меняются
+int64_t noSpace(lc_codec *h) {
+    h->error = "output buffer too small";
+    return LC_CODEC_ENOSPC;
+}
+
+} // namespace
+
+extern "C" {
+
+int lc_codec_api_version(void) { return LC_CODEC_API_VERSION; }
+
+lc_codec *lc_codec_create(void) { return new (std::nothrow) lc_codec(); }
+
+void lc_codec_destroy(lc_codec *codec) { delete codec; }
+
+const char *lc_codec_last_error(const lc_codec *codec) { return codec->error.c_str(); }
+
+int lc_codec_configure(lc_codec *codec, const lc_codec_params *params) {
+    return static_cast<int>(guarded(codec, [&]() -> int64_t {
+        CodecParams p;
+        p.bitsM = params->bits_m;
+        p.bitsQ = params->bits_q;
+        p.funType = params->fun_type;
+        p.h1 = params->h1;
+        p.h2 = params->h2;
+        p.infoInsteadOfRand = params->info_instead_of_rand != 0;
+        p.debugMode = params->debug_mode != 0;
+        p.statsMode = params->stats_mode != 0;
+        p.decodeThreads = params->decode_threads;
+        p.encodeTableSymbols = params->encode_table_symbols;
+        p.compiledKernel = params->compiled_kernel != 0;
+        p.packedWire = params->packed_wire != 0;
+        p.stateHeader = params->state_header != 0;
+        p.certifiedFastPath = params->certified_fast_path != 0;
+        p.collisionCacheBits = params->collision_cache_bits;
+        p.simdLevel = params->simd_level;
+        p.randomSeed = params->random_seed;
+        codec->codec.configure(p);
+        return LC_CODEC_OK;
+    }));
+}
+
+int lc_codec_load_csv(lc_codec *codec, const char *csv_path) {
+    return static_cast<int>(guarded(codec, [&]() -> int64_t {
+        codec->codec.loadCoefficientsCSV(csv_path);
+        return LC_CODEC_OK;
+    }));
+}
+
+int lc_codec_kernel_active(const lc_codec *codec) { return codec->codec.kernelActive() ? 1 : 0; }
+
+int lc_codec_certified(const lc_codec *codec) { return codec->codec.certified() ? 1 : 0; }
+
+size_t lc_codec_encode_bound(const lc_codec *codec, size_t input_len, int use_hash) {
+    return codec->codec.encodeMessageBound(input_len, use_hash != 0);
+}
+
+size_t lc_codec_decode_bound(const uint8_t *framed, size_t framed_len, size_t expected_len) {
+    return DigitalCodec::decodeMessageBound(framed, framed_len, expected_len);
+}
+
+int64_t lc_codec_encode_message(lc_codec *codec, const uint8_t *input, size_t input_len, int use_hash,
+                                uint8_t *out, size_t out_cap) {
+    return guarded(codec, [&]() -> int64_t {
+        if (out_cap < codec->codec.encodeMessageBound(input_len, use_hash != 0)) return noSpace(codec);
+        return static_cast<int64_t>(codec->codec.encodeMessageInto(input, input_len, use_hash != 0, out, out_cap));
+    });
+}
+
+int64_t lc_codec_decode_message(lc_codec *codec, const uint8_t *framed, size_t framed_len,
+                                size_t expected_len, int use_hash, uint8_t *out, size_t out_cap) {
+    return guarded(codec, [&]() -> int64_t {
+        if (out_cap < DigitalCodec::decodeMessageBound(framed, framed_len, expected_len)) return noSpace(codec);
+        return static_cast<int64_t>(codec->codec.decodeMessageInto(framed, framed_len, expected_len,
+                                                                   use_hash != 0, out, out_cap));
+    });
+}
+
+void lc_codec_reset(lc_codec *codec) { codec->codec.reset(); }
+
+void lc_codec_sync_states(lc_codec *codec, int32_t h1, int32_t h2) { codec->codec.syncStates(h1, h2); }
+
+void lc_codec_get_states(const lc_codec *codec, int32_t *enc_h1, int32_t *enc_h2,
+                         int32_t *dec_h1, int32_t *dec_h2) {
+    if (enc_h1) *enc_h1 = codec->codec.get_enc_h1();
+    if (enc_h2) *enc_h2 = codec->codec.get_enc_h2();
+    if (dec_h1) *dec_h1 = codec->codec.get_dec_h1();
+    if (dec_h2) *dec_h2 = codec->codec.get_dec_h2();
+}
+
+void lc_codec_get_stats(const lc_codec *codec, lc_codec_stats *stats) {
+    const CodecStats s = codec->codec.debugStats();
+    stats->encoded_symbols = s.encodedSymbols;
+    stats->encode_collisions = s.encodeCollisions;
+    stats->encode_random_fallbacks = s.encodeRandomFallbacks;
+    stats->encode_direct_info = s.encodeDirectInfo;
+    stats->decoded_symbols = s.decodedSymbols;
+    stats->decode_direct_info = s.decodeDirectInfo;
+    stats->decode_skips = s.decodeSkips;
+    stats->collision_cache_hits = s.collisionCacheHits;
+    stats->collision_cache_misses = s.collisionCacheMisses;
+}
+
+void lc_codec_reset_stats(lc_codec *codec) { codec->codec.resetDebugStats(); }
+
+} // extern "C"
@@ -0,0 +1,92 @@
+#pragma once
+
+#include <stddef.h>
+#include <stdint.h>
+
+// Flat C ABI over digitalcodec::DigitalCodec for the shared library (libdigitalcodec.so).
+// All buffers are owned by the caller; functions never keep pointers after returning.
+// Functions returning int/int64_t report errors as negative LC_CODEC_E* codes,
+// the message is available from lc_codec_last_error().
+
+#ifdef __cplusplus
+extern "C" {
+#endif
+
+#define LC_CODEC_API_VERSION 5
+
+#define LC_CODEC_OK 0
+#define LC_CODEC_EINVAL (-1)   // invalid parameters (std::invalid_argument / std::logic_error)
+#define LC_CODEC_ERUNTIME (-2) // CSV or other runtime failure
+#define LC_CODEC_ENOSPC (-3)   // output buffer too small, see lc_codec_*_bound()
+
+typedef struct lc_codec lc_codec;
+
+// Mirrors digitalcodec::CodecParams (bool fields are 0/1)
+typedef struct lc_codec_params {
+    int32_t bits_m;
+    int32_t bits_q;
+    int32_t fun_type;
+    int32_t h1;
+    int32_t h2;
+    int32_t info_instead_of_rand;
+    int32_t debug_mode;
+    int32_t stats_mode;
+    int32_t decode_threads;
+    int32_t encode_table_symbols;
+    int32_t compiled_kernel;
+    int32_t packed_wire;
+    int32_t state_header;
+    int32_t certified_fast_path;   // load <csv>.cert and skip collision checks for injective keys
+    int32_t collision_cache_bits;  // 2^bits collision cache entries (0 = off)
+    int32_t simd_level;            // -1 = best for the CPU, 0 = scalar, 1 = SSE4.1, 2 = AVX2
+    uint64_t random_seed;          // seed of the collision fallbacks (0 = std::random_device)
+} lc_codec_params;
+
+// Mirrors digitalcodec::CodecStats
+typedef struct lc_codec_stats {
+    uint64_t encoded_symbols;
+    uint64_t encode_collisions;
+    uint64_t encode_random_fallbacks;
+    uint64_t encode_direct_info;
+    uint64_t decoded_symbols;
+    uint64_t decode_direct_info;
+    uint64_t decode_skips;
+    uint64_t collision_cache_hits;
+    uint64_t collision_cache_misses;
+} lc_codec_stats;
+
+int lc_codec_api_version(void);
+
+lc_codec *lc_codec_create(void);
+void lc_codec_destroy(lc_codec *codec);
+const char *lc_codec_last_error(const lc_codec *codec);
+
+int lc_codec_configure(lc_codec *codec, const lc_codec_params *params);
+int lc_codec_load_csv(lc_codec *codec, const char *csv_path);
+// 1 if the key-specialized kernel (compiled_kernel) is in use
+int lc_codec_kernel_active(const lc_codec *codec);
+// 1 if a matching injectivity certificate was loaded (certified_fast_path)
+int lc_codec_certified(const lc_codec *codec);
+
+// Upper bounds of the output size for the given input
+size_t lc_codec_encode_bound(const lc_codec *codec, size_t input_len, int use_hash);
+size_t lc_codec_decode_bound(const uint8_t *framed, size_t framed_len, size_t expected_len);
+
+// encodeMessageInto/decodeMessageInto: no allocation once the codec scratch buffers have grown.
+// Return the number of bytes written; LC_CODEC_ENOSPC (codec states untouched) if out_cap < bound
+int64_t lc_codec_encode_message(lc_codec *codec, const uint8_t *input, size_t input_len, int use_hash,
+                                uint8_t *out, size_t out_cap);
+int64_t lc_codec_decode_message(lc_codec *codec, const uint8_t *framed, size_t framed_len,
+                                size_t expected_len, int use_hash, uint8_t *out, size_t out_cap);
+
+void lc_codec_reset(lc_codec *codec);
+void lc_codec_sync_states(lc_codec *codec, int32_t h1, int32_t h2);
+void lc_codec_get_states(const lc_codec *codec, int32_t *enc_h1, int32_t *enc_h2,
+                         int32_t *dec_h1, int32_t *dec_h2);
+
+void lc_codec_get_stats(const lc_codec *codec, lc_codec_stats *stats);
+void lc_codec_reset_stats(lc_codec *codec);
+
+#ifdef __cplusplus
+}
+#endif
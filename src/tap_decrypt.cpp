@@ -13,10 +13,15 @@
 #include <sodium.h>
 #include <arpa/inet.h> // для inet_pton
 #include <thread>
+#include <memory>
+#include <algorithm>
+#include "codec_lanes.h"
+#include "codec_stats.h"
 #include "digital_codec.h"
 #include "file_transfer.h"
 
 constexpr size_t MAX_PACKET_SIZE = 160000;  // Увеличено для поддержки Custom Codec (коэффициент расширения ~4x)
+constexpr size_t CODEC_MAX_MESSAGE = 0xFFFF; // Длина в заголовке кадра кодека - 2 байта
 constexpr size_t KEY_SIZE = crypto_aead_chacha20poly1305_IETF_KEYBYTES;
 constexpr size_t NONCE_SIZE = crypto_aead_chacha20poly1305_IETF_NPUBBYTES;
 constexpr size_t HASH_SIZE = crypto_hash_sha256_BYTES;
@@ -110,7 +115,8 @@ void send_frames_codec(int tap_fd, int sock, const sockaddr_in &dest_addr,
                        digitalcodec::DigitalCodec *codec,
                        const digitalcodec::CodecParams *params)
 {
-    size_t stats_counter = 0;
+    // Выход кодека - один буфер на весь цикл (encodeMessageInto не выделяет память)
+    std::vector<uint8_t> wire(codec->encodeMessageBound(CODEC_MAX_MESSAGE));
     while (true)
     {
         unsigned char buffer[MAX_PACKET_SIZE];
@@ -118,27 +124,45 @@ void send_frames_codec(int tap_fd, int sock, const sockaddr_in &dest_addr,
         if (nread <= 0)
             continue;
 
-        // Оптимизация: избегаем лишнего копирования
-        std::vector<uint8_t> payload;
-        payload.reserve(nread);
-        payload.assign(buffer, buffer + nread);
-        std::vector<uint8_t> framed = codec->encodeMessage(payload);
-        sendto(sock, framed.data(), framed.size(), 0, (sockaddr *)&dest_addr, sizeof(dest_addr));
+        // Кадр кодируется прямо из buffer
+        const size_t framed_len = codec->encodeMessageInto(buffer, static_cast<size_t>(nread), false,
+                                                           wire.data(), wire.size());
+        sendto(sock, wire.data(), framed_len, 0, (sockaddr *)&dest_addr, sizeof(dest_addr));
         // Уменьшаем частоту вывода для производительности
         static size_t frame_counter = 0;
         if (++frame_counter % 100 == 0 || (params && params->debugMode)) {
             std::cout << "📤 Отправлен кодированный кадр из tap1 (" << nread << " байт)\n";
         }
-        
-        if (params && params->statsMode) {
-            stats_counter++;
-            // Выводим статистику после каждого кадра или каждые 10 кадров
-            if (stats_counter == 1 || stats_counter % 10 == 0) {
-                std::string label = "📊 Статистика кодека (передача";
-                label += (stats_counter == 1 ? ", первый кадр" : ", каждые 10 кадров");
-                label += ")";
-                codec->printDebugStats(label);
-            }
+    }
+}
+
+// Отправка кадров tap1 по полосам (--lanes): кадры одного потока IP/порт идут по одной
+// полосе в исходном порядке, кодирование и отправка - в LaneWorkers
+void send_frames_lanes(int tap_fd, int sock, const sockaddr_in &dest_addr,
+                       digitalcodec::CodecLanes *lanes,
+                       const digitalcodec::CodecParams *params, int lane_threads)
+{
+    std::vector<std::vector<uint8_t>> wire;
+    digitalcodec::LaneWorkers workers(lane_threads, lanes->lanes(),
+        [&](int worker, int lane, const uint8_t *data, size_t len) {
+            std::vector<uint8_t> &out = wire[static_cast<size_t>(worker)];
+            const size_t framed_len = lanes->encodeFrameInto(lane, data, len, false, out.data(), out.size());
+            sendto(sock, out.data(), framed_len, 0, (sockaddr *)&dest_addr, sizeof(dest_addr));
+        });
+    wire.assign(static_cast<size_t>(workers.threads()), std::vector<uint8_t>(lanes->encodeFrameBound(CODEC_MAX_MESSAGE)));
+
+    size_t frame_counter = 0;
+    while (true)
+    {
+        unsigned char buffer[MAX_PACKET_SIZE];
+        ssize_t nread = read(tap_fd, buffer, sizeof(buffer));
+        if (nread <= 0)
+            continue;
+
+        const int lane = digitalcodec::flowLane(buffer, static_cast<size_t>(nread), lanes->lanes());
+        workers.submit(lane, buffer, static_cast<size_t>(nread));
+        if (++frame_counter % 100 == 0 || (params && params->debugMode)) {
+            std::cout << "📤 Отправлен кодированный кадр из tap1 (" << nread << " байт, полоса " << lane << ")\n";
         }
     }
 }
@@ -371,7 +395,8 @@ bool receive_file_codec(int sock, digitalcodec::DigitalCodec *codec, const std::
             
             // УЛУЧШЕННЫЙ ВАРИАНТ 1Б: Запрашиваем синхронизацию при ошибке декодирования
             // Это покрывает случаи, когда пропуск не обнаружен через chunk_index
-            if (sender_addr_known && header_received) {
+            // (со stateHeader кадр сам задаёт состояния - синхронизация не поможет, ждём повтора)
+            if (sender_addr_known && header_received && !codec_params.stateHeader) {
                 filetransfer::SyncRequest sync_req;
                 sync_req.expected_chunk = expected_chunk_index;
                 auto sync_req_bytes = filetransfer::serialize_sync_request(sync_req);
@@ -426,7 +451,11 @@ bool receive_file_codec(int sock, digitalcodec::DigitalCodec *codec, const std::
         if (filetransfer::deserialize_chunk(decoded_bytes.data(), decoded_bytes.size(), chunk_header, chunk_data)) {
             // ВАРИАНТ 1Б: Обнаружение пропусков по номерам последовательности
             // Если получен чанк с номером больше ожидаемого - обнаружен пропуск
-            if (chunk_header.chunk_index > expected_chunk_index) {
+            // Со stateHeader кадры после пропуска декодируются сами, запрос не нужен
+            if (chunk_header.chunk_index > expected_chunk_index && codec_params.stateHeader) {
+                std::cerr << "⚠️  Обнаружен пропуск чанков: ожидался " << expected_chunk_index 
+                          << ", получен " << chunk_header.chunk_index << " (состояния взяты из кадра)\n";
+            } else if (chunk_header.chunk_index > expected_chunk_index) {
                 std::cerr << "⚠️  Обнаружен пропуск чанков: ожидался " << expected_chunk_index 
                           << ", получен " << chunk_header.chunk_index << "\n";
                 std::cerr << "📤 Отправляем запрос синхронизации состояний...\n";
@@ -542,6 +571,9 @@ int main(int argc, char *argv[])
     bool use_codec = false;
     std::string codec_csv;
     digitalcodec::CodecParams codec_params;
+    int codec_lanes = 0;   // --lanes: 0 = одна цепочка состояний (кадры без номера полосы)
+    int lane_threads = 0;  // --lane-threads: 0 = все ядра
+    double stats_interval = 1.0;  // --stats-interval: период снимков статистики кадров, с
 
     std::vector<std::string> positionals;
     for (int i = 1; i < argc; ++i) {
@@ -557,6 +589,13 @@ int main(int argc, char *argv[])
         if (arg == "--h2" && i + 1 < argc) { codec_params.h2 = std::stoi(argv[++i]); continue; }
         if (arg == "--debug") { codec_params.debugMode = true; continue; }
         if (arg == "--debug-stats") { codec_params.statsMode = true; continue; }
+        if (arg == "--decode-threads" && i + 1 < argc) { codec_params.decodeThreads = std::stoi(argv[++i]); continue; }
+        if (arg == "--codec-kernel") { codec_params.compiledKernel = true; continue; }
+        if (arg == "--packed-wire") { codec_params.packedWire = true; continue; }
+        if (arg == "--state-header") { codec_params.stateHeader = true; continue; }
+        if (arg == "--stats-interval" && i + 1 < argc) { stats_interval = std::max(0.01, std::stod(argv[++i])); continue; }
+        if (arg == "--lanes" && i + 1 < argc) { codec_lanes = std::stoi(argv[++i]); continue; }
+        if (arg == "--lane-threads" && i + 1 < argc) { lane_threads = std::stoi(argv[++i]); continue; }
         positionals.push_back(arg);
     }
 
@@ -671,6 +710,8 @@ int main(int argc, char *argv[])
 
     // Initialize optional codec
     digitalcodec::DigitalCodec codec;
+    // Полосы - только для кадров tap (сообщения и файлы идут через codec)
+    std::unique_ptr<digitalcodec::CodecLanes> lanes;
     if (use_codec)
     {
         try {
@@ -689,12 +730,50 @@ int main(int argc, char *argv[])
             if (codec_params.statsMode) {
                 std::cout << "📈 Сбор статистики включён: доступны агрегированные показатели\n";
             }
+            if (codec_params.decodeThreads != 1) {
+                std::cout << "🧵 Параллельное декодирование: потоков "
+                          << (codec_params.decodeThreads > 0 ? std::to_string(codec_params.decodeThreads) : std::string("auto"))
+                          << "\n";
+            }
+            if (codec.kernelActive()) {
+                std::cout << "⚡ Используется ядро кодека, собранное под ключ\n";
+            }
+            if (codec_params.packedWire) {
+                std::cout << "📦 Плотный формат кадров: " << codec_params.bitsM << " бит на слово\n";
+            }
+            if (codec_params.stateHeader) {
+                std::cout << "🧭 Кадры несут начальные состояния кодера: синхронизация после потерь не нужна\n";
+            }
+            if (codec_lanes > 0 && !message_mode && !file_mode) {
+                lanes = std::make_unique<digitalcodec::CodecLanes>(codec_params, codec_csv, codec_lanes);
+                std::cout << "🛣️  Полосы кодека: " << codec_lanes << " (потоков: "
+                          << (lane_threads > 0 ? std::to_string(lane_threads) : std::string("auto"))
+                          << "), полоса кадра выбирается по потоку IP/порт\n";
+            }
         } catch (const std::exception &e) {
             std::cerr << "❌ Ошибка инициализации кодека: " << e.what() << "\n";
             return 1;
         }
     }
     
+    // Статистика кадров tap1: снимки с темпами раз в --stats-interval из отдельного потока
+    // (циклы кадров не печатают статистику сами; счётчики полос суммируются при снимке)
+    std::unique_ptr<digitalcodec::StatsSampler> stats_sampler;
+    if (use_codec && codec_params.statsMode && !message_mode && !file_mode)
+    {
+        std::vector<digitalcodec::StatsSampler::Source> sources;
+        if (lanes) {
+            for (int l = 0; l < lanes->lanes(); ++l) {
+                sources.push_back([&lanes, l] { return lanes->lane(l).debugStats(); });
+            }
+        } else {
+            sources.push_back([&codec] { return codec.debugStats(); });
+        }
+        stats_sampler = std::make_unique<digitalcodec::StatsSampler>(
+            std::move(sources), std::chrono::milliseconds(static_cast<long long>(stats_interval * 1000.0)),
+            "Статистика кодека (tap1)");
+    }
+
     // Для режима кодека без message_mode нужно запустить поток отправки
     // но сначала получим адрес отправителя из первого пакета
     bool send_thread_started = false;
@@ -728,6 +807,29 @@ int main(int argc, char *argv[])
     }
 
     // Основной цикл приёма (для режимов сообщений и кадров)
+    // Выход декодера кадров - один буфер на весь цикл (decodeMessageInto не выделяет память)
+    std::vector<uint8_t> decoded(use_codec ? CODEC_MAX_MESSAGE : 0);
+    // --lanes: кадры декодируются в LaneWorkers, у каждого потока свой буфер
+    std::vector<std::vector<uint8_t>> lane_decoded;
+    std::unique_ptr<digitalcodec::LaneWorkers> lane_workers;
+    if (lanes)
+    {
+        lane_workers = std::make_unique<digitalcodec::LaneWorkers>(lane_threads, lanes->lanes(),
+            [&](int worker, int lane, const uint8_t *data, size_t len) {
+                std::vector<uint8_t> &out = lane_decoded[static_cast<size_t>(worker)];
+                const size_t decoded_len = lanes->decodeFrameInto(data, len, false, out.data(), out.size());
+                if (decoded_len == 0)
+                {
+                    std::cerr << "❌ Критическая ошибка декодирования кадра полосы " << lane << " (буфер пуст)!\n";
+                    return;
+                }
+                write(tap_fd, out.data(), decoded_len);
+                if (codec_params.debugMode) {
+                    std::cout << "✅ Принят и раскодирован кадр (" << decoded_len << " байт, полоса " << lane << ")\n";
+                }
+            });
+        lane_decoded.assign(static_cast<size_t>(lane_workers->threads()), std::vector<uint8_t>(CODEC_MAX_MESSAGE));
+    }
     while (true)
     {
         unsigned char buffer[MAX_PACKET_SIZE];
@@ -749,7 +851,12 @@ int main(int argc, char *argv[])
             }
             else
             {
-                send_thread = std::thread(send_frames_codec, tap_fd, send_sock, sender_addr, &codec, &codec_params);
+                if (lanes) {
+                    send_thread = std::thread(send_frames_lanes, tap_fd, send_sock, sender_addr, lanes.get(),
+                                              &codec_params, lane_threads);
+                } else {
+                    send_thread = std::thread(send_frames_codec, tap_fd, send_sock, sender_addr, &codec, &codec_params);
+                }
                 send_thread_started = true;
                 std::cout << "🔄 Двунаправленная передача включена (кодек)\n";
             }
@@ -773,40 +880,40 @@ int main(int argc, char *argv[])
         }
         else
         {
-            if (use_codec)
+            if (lanes)
+            {
+                // РЕЖИМ ПОЛОС: кадр уходит в поток своей полосы, payload пишется в tap1 там же
+                const int lane = lanes->frameLane(buffer, static_cast<size_t>(nrecv));
+                if (lane < 0)
+                {
+                    std::cerr << "❌ Кадр без допустимого номера полосы (" << nrecv << " байт) отброшен\n";
+                    continue;
+                }
+                lane_workers->submit(lane, buffer, static_cast<size_t>(nrecv));
+            }
+            else if (use_codec)
             {
                 // РЕЖИМ КОДЕКА: принимаем кодированный кадр и пишем его payload в tap1
-                std::vector<uint8_t> framed(buffer, buffer + nrecv);
-                std::vector<uint8_t> decoded_bytes = codec.decodeMessage(framed, 0);
+                const size_t decoded_len = codec.decodeMessageInto(buffer, static_cast<size_t>(nrecv), 0, false,
+                                                                   decoded.data(), decoded.size());
                 if (!message_mode)
                 {
-                    if (decoded_bytes.empty())
+                    if (decoded_len == 0)
                     {
                         std::cerr << "❌ Критическая ошибка декодирования кадра (буфер пуст)!\n";
                         continue;
                     }
-                    write(tap_fd, decoded_bytes.data(), decoded_bytes.size());
-                    std::cout << "✅ Принят и раскодирован кадр (" << decoded_bytes.size() << " байт)\n";
-                    if (codec_params.statsMode) {
-                        static size_t stats_counter = 0;
-                        stats_counter++;
-                        // Выводим статистику после каждого кадра или каждые 10 кадров
-                        if (stats_counter == 1 || stats_counter % 10 == 0) {
-                            std::string label = "📊 Статистика кодека (приём кадров";
-                            label += (stats_counter == 1 ? ", первый кадр" : ", каждые 10 пакетов");
-                            label += ")";
-                            codec.printDebugStats(label);
-                        }
-                    }
+                    write(tap_fd, decoded.data(), decoded_len);
+                    std::cout << "✅ Принят и раскодирован кадр (" << decoded_len << " байт)\n";
                 }
                 else
                 {
-                    if (decoded_bytes.empty())
+                    if (decoded_len == 0)
                     {
                         std::cerr << "❌ Критическая ошибка декодирования сообщения (буфер пуст)!\n";
                         continue;
                     }
-                    std::string received_msg(decoded_bytes.begin(), decoded_bytes.end());
+                    std::string received_msg(decoded.begin(), decoded.begin() + decoded_len);
                     std::cout << "📩 Получено сообщение (" << received_msg.size() << " байт): \"" << received_msg << "\"\n";
                     if (codec_params.statsMode) {
                         codec.printDebugStats("📊 Статистика кодека (приём сообщения)");
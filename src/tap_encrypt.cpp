@@ -17,43 +17,51 @@
 #include <iomanip>
 #include <random>
 #include <algorithm>
+#include <memory>
+#include "codec_lanes.h"
+#include "codec_stats.h"
 #include "digital_codec.h"
 #include "file_transfer.h"
 
 
 constexpr size_t MAX_PACKET_SIZE = 160000;  // Увеличено для поддержки Custom Codec (коэффициент расширения ~4x)
+constexpr size_t CODEC_MAX_MESSAGE = 0xFFFF; // Длина в заголовке кадра кодека - 2 байта
 constexpr size_t KEY_SIZE = crypto_aead_chacha20poly1305_IETF_KEYBYTES;
 constexpr size_t NONCE_SIZE = crypto_aead_chacha20poly1305_IETF_NPUBBYTES;
 constexpr size_t HASH_SIZE = crypto_hash_sha256_BYTES;
 
 // Функция искусственного внесения ошибок для тестирования помехоустойчивости
-std::vector<uint8_t> inject_errors(const std::vector<uint8_t> &data, double error_rate, int bitsM) {
-    if (error_rate <= 0.0 || data.size() <= 2 || bitsM <= 0) {
-        return data;
+// packed_wire: слова записаны плотно по M бит (CodecParams::packedWire), иначе по bytesPerSymbol байт
+// Кадр изменяется на месте (data, size - кадр encodeMessage/encodeMessageInto)
+void inject_errors(uint8_t *data, size_t size, double error_rate, int bitsM, bool packed_wire = false) {
+    if (error_rate <= 0.0 || size <= 2 || bitsM <= 0) {
+        return;
     }
     
-    static std::mt19937 gen(std::random_device{}());
+    // Свой генератор у каждого потока (кадры полос кодируются в LaneWorkers)
+    static thread_local std::mt19937 gen(std::random_device{}());
     std::uniform_real_distribution<double> prob_dist(0.0, 1.0);
     
     const int bytes_per_symbol = (bitsM + 7) / 8;
     if (bytes_per_symbol <= 0) {
-        return data;
+        return;
     }
     
-    std::vector<uint8_t> corrupted = data;
     const size_t data_start = 2; // первые 2 байта = длина полезных данных
+    const size_t payload_bits = (size - data_start) * 8;
+    const size_t symbol_bits = packed_wire ? static_cast<size_t>(bitsM) : static_cast<size_t>(bytes_per_symbol) * 8;
     int errors_injected = 0;
     
-    for (size_t offset = data_start; offset + bytes_per_symbol <= corrupted.size(); offset += bytes_per_symbol) {
+    for (size_t symbol_idx = 0; (symbol_idx + 1) * symbol_bits <= payload_bits; ++symbol_idx) {
         if (prob_dist(gen) < error_rate) {
             std::uniform_int_distribution<int> bit_dist(0, bitsM - 1);
             int bit_index = bit_dist(gen);
-            size_t byte_idx = offset + (bit_index / 8);
-            int bit_in_byte = bit_index % 8;
-            if (byte_idx < corrupted.size()) {
-                corrupted[byte_idx] ^= (1u << bit_in_byte);
+            const size_t bit_pos = symbol_idx * symbol_bits + static_cast<size_t>(bit_index);
+            size_t byte_idx = data_start + bit_pos / 8;
+            int bit_in_byte = static_cast<int>(bit_pos % 8);
+            if (byte_idx < size) {
+                data[byte_idx] ^= (1u << bit_in_byte);
                 errors_injected++;
-                size_t symbol_idx = (offset - data_start) / bytes_per_symbol;
                 std::cout << "💉 [Внесение ошибок] Символ #" << symbol_idx
                           << ": инвертирован бит " << (bit_index + 1)
                           << " (байт " << byte_idx << ")\n";
@@ -64,8 +72,6 @@ std::vector<uint8_t> inject_errors(const std::vector<uint8_t> &data, double erro
     if (errors_injected > 0) {
         std::cout << "💉 [Внесение ошибок] Всего внесено ошибок: " << errors_injected << "\n";
     }
-    
-    return corrupted;
 }
 
 // Функция отправки синхронизации состояний кодека
@@ -205,10 +211,10 @@ void receive_frames(int tap_fd, int sock, const std::vector<unsigned char> &key)
     }
 }
 
-void receive_frames_codec(int tap_fd, int sock, digitalcodec::DigitalCodec *codec,
-                          const digitalcodec::CodecParams *params)
+void receive_frames_codec(int tap_fd, int sock, digitalcodec::DigitalCodec *codec)
 {
-    size_t stats_counter = 0;
+    // Выход декодера - один буфер на весь цикл (decodeMessageInto не выделяет память)
+    std::vector<uint8_t> decoded(CODEC_MAX_MESSAGE);
     while (true)
     {
         unsigned char buffer[MAX_PACKET_SIZE];
@@ -216,26 +222,54 @@ void receive_frames_codec(int tap_fd, int sock, digitalcodec::DigitalCodec *code
         if (nrecv <= 0)
             continue;
 
-        std::vector<uint8_t> framed(buffer, buffer + nrecv);
-        std::vector<uint8_t> decoded_bytes = codec->decodeMessage(framed, 0);
-        if (decoded_bytes.empty())
+        const size_t decoded_len = codec->decodeMessageInto(buffer, static_cast<size_t>(nrecv), 0, false,
+                                                            decoded.data(), decoded.size());
+        if (decoded_len == 0)
         {
             std::cerr << "❌ Критическая ошибка декодирования кадра (буфер пуст)!\n";
             continue;
         }
-        write(tap_fd, decoded_bytes.data(), decoded_bytes.size());
-        std::cout << "✅ Принят и раскодирован кадр из tap1 (" << decoded_bytes.size() << " байт)\n";
-        
-        if (params && params->statsMode) {
-            stats_counter++;
-            // Выводим статистику после каждого кадра или каждые 10 кадров
-            if (stats_counter == 1 || stats_counter % 10 == 0) {
-                std::string label = "📊 Статистика кодека (приём";
-                label += (stats_counter == 1 ? ", первый кадр" : ", каждые 10 пакетов");
-                label += ")";
-                codec->printDebugStats(label);
+        write(tap_fd, decoded.data(), decoded_len);
+        std::cout << "✅ Принят и раскодирован кадр из tap1 (" << decoded_len << " байт)\n";
+    }
+}
+
+// Приём кадров полос (--lanes): поток сокета только раздаёт кадры по полосам,
+// декодирование и запись в tap0 - в LaneWorkers, у каждого потока свой буфер
+void receive_frames_lanes(int tap_fd, int sock, digitalcodec::CodecLanes *lanes,
+                          const digitalcodec::CodecParams *params, int lane_threads)
+{
+    std::vector<std::vector<uint8_t>> decoded;
+    digitalcodec::LaneWorkers workers(lane_threads, lanes->lanes(),
+        [&](int worker, int lane, const uint8_t *data, size_t len) {
+            std::vector<uint8_t> &out = decoded[static_cast<size_t>(worker)];
+            const size_t decoded_len = lanes->decodeFrameInto(data, len, false, out.data(), out.size());
+            if (decoded_len == 0)
+            {
+                std::cerr << "❌ Критическая ошибка декодирования кадра полосы " << lane << " (буфер пуст)!\n";
+                return;
             }
+            write(tap_fd, out.data(), decoded_len);
+            if (params && params->debugMode) {
+                std::cout << "✅ Принят и раскодирован кадр из tap1 (" << decoded_len << " байт, полоса " << lane << ")\n";
+            }
+        });
+    decoded.assign(static_cast<size_t>(workers.threads()), std::vector<uint8_t>(CODEC_MAX_MESSAGE));
+
+    while (true)
+    {
+        unsigned char buffer[MAX_PACKET_SIZE];
+        ssize_t nrecv = recv(sock, buffer, sizeof(buffer), 0);
+        if (nrecv <= 0)
+            continue;
+
+        const int lane = lanes->frameLane(buffer, static_cast<size_t>(nrecv));
+        if (lane < 0)
+        {
+            std::cerr << "❌ Кадр без допустимого номера полосы (" << nrecv << " байт) отброшен\n";
+            continue;
         }
+        workers.submit(lane, buffer, static_cast<size_t>(nrecv));
     }
 }
 
@@ -496,20 +530,24 @@ bool send_file_codec(int sock, const sockaddr_in &dest_addr, digitalcodec::Digit
     auto start_time = std::chrono::high_resolution_clock::now();
     
     // 0. Начальная синхронизация состояний кодека с получателем
-    std::cout << "🔄 Начальная синхронизация состояний кодека...\n";
-    if (!send_codec_sync(sock, dest_addr, codec)) {
-        std::cerr << "❌ Критическая ошибка: не удалось отправить начальную синхронизацию\n";
-        print_stats_if_needed("📊 Статистика кодека (отправитель, ошибка синхронизации)");
-        fcntl(sock, F_SETFL, flags);
-        return false;
+    // (со stateHeader не нужна: каждый кадр несёт свои начальные состояния)
+    if (!codec_params.stateHeader) {
+        std::cout << "🔄 Начальная синхронизация состояний кодека...\n";
+        if (!send_codec_sync(sock, dest_addr, codec)) {
+            std::cerr << "❌ Критическая ошибка: не удалось отправить начальную синхронизацию\n";
+            print_stats_if_needed("📊 Статистика кодека (отправитель, ошибка синхронизации)");
+            fcntl(sock, F_SETFL, flags);
+            return false;
+        }
+        std::cout << "✅ Начальная синхронизация отправлена\n";
     }
-    std::cout << "✅ Начальная синхронизация отправлена\n";
     
     // 1. Отправляем заголовок файла
     auto header_bytes = filetransfer::serialize_file_header(sender.get_header(), sender.get_filename());
     std::vector<uint8_t> framed_header = codec->encodeMessage(header_bytes);
     if (codec_params.injectErrors) {
-        framed_header = inject_errors(framed_header, codec_params.errorRate, codec_params.bitsM);
+        inject_errors(framed_header.data(), framed_header.size(), codec_params.errorRate, codec_params.bitsM,
+                      codec_params.packedWire);
     }
     
     sendto(sock, framed_header.data(), framed_header.size(), 0, (sockaddr *)&dest_addr, sizeof(dest_addr));
@@ -585,7 +623,8 @@ bool send_file_codec(int sock, const sockaddr_in &dest_addr, digitalcodec::Digit
         // Кодируем чанк (состояния продолжают эволюционировать)
         std::vector<uint8_t> framed_chunk = codec->encodeMessage(chunk_bytes);
         if (codec_params.injectErrors) {
-            framed_chunk = inject_errors(framed_chunk, codec_params.errorRate, codec_params.bitsM);
+            inject_errors(framed_chunk.data(), framed_chunk.size(), codec_params.errorRate, codec_params.bitsM,
+                          codec_params.packedWire);
         }
         
         // Отправляем чанк с повторными попытками
@@ -690,6 +729,9 @@ int main(int argc, char *argv[])
     bool use_codec = false;
     std::string codec_csv;
     digitalcodec::CodecParams codec_params; // defaults: M=8, Q=4, fun=1, h1=7,h2=23
+    int codec_lanes = 0;   // --lanes: 0 = одна цепочка состояний (кадры без номера полосы)
+    int lane_threads = 0;  // --lane-threads: 0 = все ядра
+    double stats_interval = 1.0;  // --stats-interval: период снимков статистики кадров, с
 
     // Parse flags (order-agnostic). Collect positional args for IP/port afterwards
     std::vector<std::string> positionals;
@@ -707,6 +749,13 @@ int main(int argc, char *argv[])
         if (arg == "--debug") { codec_params.debugMode = true; continue; }
         if (arg == "--debug-stats") { codec_params.statsMode = true; continue; }
         if (arg == "--inject-errors") { codec_params.injectErrors = true; continue; }
+        if (arg == "--encode-table" && i + 1 < argc) { codec_params.encodeTableSymbols = std::stoi(argv[++i]); continue; }
+        if (arg == "--codec-kernel") { codec_params.compiledKernel = true; continue; }
+        if (arg == "--packed-wire") { codec_params.packedWire = true; continue; }
+        if (arg == "--state-header") { codec_params.stateHeader = true; continue; }
+        if (arg == "--stats-interval" && i + 1 < argc) { stats_interval = std::max(0.01, std::stod(argv[++i])); continue; }
+        if (arg == "--lanes" && i + 1 < argc) { codec_lanes = std::stoi(argv[++i]); continue; }
+        if (arg == "--lane-threads" && i + 1 < argc) { lane_threads = std::stoi(argv[++i]); continue; }
         if (arg == "--error-rate" && i + 1 < argc) {
             double rate = std::stod(argv[++i]);
             codec_params.errorRate = std::max(0.0, std::min(1.0, rate));
@@ -837,6 +886,8 @@ int main(int argc, char *argv[])
 
     // Initialize optional codec
     digitalcodec::DigitalCodec codec;
+    // Полосы - только для кадров tap (сообщения и файлы идут через codec)
+    std::unique_ptr<digitalcodec::CodecLanes> lanes;
     if (use_codec)
     {
         try {
@@ -859,11 +910,33 @@ int main(int argc, char *argv[])
                 std::cout << "💉 Искусственное внесение ошибок включено (вероятность: "
                           << std::fixed << std::setprecision(2) << (codec_params.errorRate * 100.0) << "%)\n";
             }
+            if (codec_params.encodeTableSymbols > 1) {
+                std::cout << "📑 Таблицы кодирования по " << codec_params.encodeTableSymbols << " символа за шаг\n";
+            }
+            if (codec.kernelActive()) {
+                std::cout << "⚡ Используется ядро кодека, собранное под ключ\n";
+            }
+            if (codec_params.packedWire) {
+                std::cout << "📦 Плотный формат кадров: " << codec_params.bitsM << " бит на слово\n";
+            }
+            if (codec_params.stateHeader) {
+                std::cout << "🧭 Кадры несут начальные состояния кодера: синхронизация после потерь не нужна\n";
+            }
+            if (codec_lanes > 0 && !message_mode && !file_mode) {
+                lanes = std::make_unique<digitalcodec::CodecLanes>(codec_params, codec_csv, codec_lanes);
+                std::cout << "🛣️  Полосы кодека: " << codec_lanes << " (потоков: "
+                          << (lane_threads > 0 ? std::to_string(lane_threads) : std::string("auto"))
+                          << "), полоса кадра выбирается по потоку IP/порт\n";
+            }
             
             // Запускаем приём кадров в отдельном потоке для кодека (если НЕ режим сообщений и НЕ режим файлов)
             if (!message_mode && !file_mode)
             {
-                receive_thread = std::thread(receive_frames_codec, tap_fd, sock, &codec, &codec_params);
+                if (lanes) {
+                    receive_thread = std::thread(receive_frames_lanes, tap_fd, sock, lanes.get(), &codec_params, lane_threads);
+                } else {
+                    receive_thread = std::thread(receive_frames_codec, tap_fd, sock, &codec);
+                }
                 std::cout << "🔄 Двунаправленная передача включена (кодек)\n";
             }
         } catch (const std::exception &e) {
@@ -872,6 +945,24 @@ int main(int argc, char *argv[])
         }
     }
 
+    // Статистика кадров tap0: снимки с темпами раз в --stats-interval из отдельного потока
+    // (циклы кадров не печатают статистику сами; счётчики полос суммируются при снимке)
+    std::unique_ptr<digitalcodec::StatsSampler> stats_sampler;
+    if (use_codec && codec_params.statsMode && !message_mode && !file_mode)
+    {
+        std::vector<digitalcodec::StatsSampler::Source> sources;
+        if (lanes) {
+            for (int l = 0; l < lanes->lanes(); ++l) {
+                sources.push_back([&lanes, l] { return lanes->lane(l).debugStats(); });
+            }
+        } else {
+            sources.push_back([&codec] { return codec.debugStats(); });
+        }
+        stats_sampler = std::make_unique<digitalcodec::StatsSampler>(
+            std::move(sources), std::chrono::milliseconds(static_cast<long long>(stats_interval * 1000.0)),
+            "Статистика кодека (tap0)");
+    }
+
     if (file_mode)
     {
         // Режим передачи файлов
@@ -908,7 +999,8 @@ int main(int argc, char *argv[])
                 std::vector<uint8_t> payload(user_message.begin(), user_message.end());
                 std::vector<uint8_t> framed = codec.encodeMessage(payload);
                 if (codec_params.injectErrors) {
-                    framed = inject_errors(framed, codec_params.errorRate, codec_params.bitsM);
+                    inject_errors(framed.data(), framed.size(), codec_params.errorRate, codec_params.bitsM,
+                                  codec_params.packedWire);
                 }
                 sendto(sock, framed.data(), framed.size(), 0, (sockaddr *)&dest_addr, sizeof(dest_addr));
                 std::cout << "📤 Сообщение закодировано и отправлено (" << framed.size() << " байт)\n";
@@ -960,42 +1052,60 @@ int main(int argc, char *argv[])
     else
     {
         // Режим отправки Ethernet-кадров из tap
+        // Выход кодека - один буфер на весь цикл (encodeMessageInto не выделяет память)
+        std::vector<uint8_t> wire(use_codec ? codec.encodeMessageBound(CODEC_MAX_MESSAGE) : 0);
+        // --lanes: кадры кодируются и отправляются в LaneWorkers, у каждого потока свой буфер
+        std::vector<std::vector<uint8_t>> lane_wire;
+        std::unique_ptr<digitalcodec::LaneWorkers> lane_workers;
+        if (lanes)
+        {
+            lane_workers = std::make_unique<digitalcodec::LaneWorkers>(lane_threads, lanes->lanes(),
+                [&](int worker, int lane, const uint8_t *data, size_t len) {
+                    std::vector<uint8_t> &out = lane_wire[static_cast<size_t>(worker)];
+                    const size_t framed_len = lanes->encodeFrameInto(lane, data, len, false, out.data(), out.size());
+                    if (codec_params.injectErrors) {
+                        // Номер полосы не искажаем - ошибки только в кадре кодека
+                        inject_errors(out.data() + digitalcodec::kLaneHeaderBytes,
+                                      framed_len - digitalcodec::kLaneHeaderBytes,
+                                      codec_params.errorRate, codec_params.bitsM, codec_params.packedWire);
+                    }
+                    sendto(sock, out.data(), framed_len, 0, (sockaddr *)&dest_addr, sizeof(dest_addr));
+                });
+            lane_wire.assign(static_cast<size_t>(lane_workers->threads()),
+                             std::vector<uint8_t>(lanes->encodeFrameBound(CODEC_MAX_MESSAGE)));
+        }
         while (true)
         {
             unsigned char buffer[MAX_PACKET_SIZE];
             ssize_t nread = read(tap_fd, buffer, sizeof(buffer));
             if (nread <= 0) continue;
 
-            if (use_codec)
+            if (lanes)
             {
-                // Кодек: кодируем кадр целиком как сообщение и отправляем напрямую
-                // Оптимизация: избегаем лишнего копирования
-                std::vector<uint8_t> payload;
-                payload.reserve(nread);
-                payload.assign(buffer, buffer + nread);
-                std::vector<uint8_t> framed = codec.encodeMessage(payload);
+                // Кадры одного потока IP/порт идут по одной полосе в исходном порядке
+                const int lane = digitalcodec::flowLane(buffer, static_cast<size_t>(nread), lanes->lanes());
+                lane_workers->submit(lane, buffer, static_cast<size_t>(nread));
+                static size_t frame_counter = 0;
+                if (++frame_counter % 100 == 0 || codec_params.debugMode) {
+                    std::cout << "📤 Отправлен кодированный кадр (" << nread << " байт, полоса " << lane << ")\n";
+                }
+            }
+            else if (use_codec)
+            {
+                // Кодек: кодируем кадр целиком как сообщение прямо из buffer и отправляем
+                const size_t framed_len = codec.encodeMessageInto(buffer, static_cast<size_t>(nread), false,
+                                                                  wire.data(), wire.size());
                 
                 if (codec_params.injectErrors) {
-                    framed = inject_errors(framed, codec_params.errorRate, codec_params.bitsM);
+                    inject_errors(wire.data(), framed_len, codec_params.errorRate, codec_params.bitsM,
+                                  codec_params.packedWire);
                 }
-                sendto(sock, framed.data(), framed.size(), 0, (sockaddr *)&dest_addr, sizeof(dest_addr));
+                sendto(sock, wire.data(), framed_len, 0, (sockaddr *)&dest_addr, sizeof(dest_addr));
                 // Уменьшаем частоту вывода для производительности
                 static size_t frame_counter = 0;
                 if (++frame_counter % 100 == 0 || codec_params.debugMode) {
                     std::cout << "📤 Отправлен кодированный кадр (" << nread << " байт)\n";
                 }
-                
-                if (codec_params.statsMode) {
-                    static size_t stats_counter = 0;
-                    stats_counter++;
-                    // Выводим статистику после каждого кадра или каждые 10 кадров
-                    if (stats_counter == 1 || stats_counter % 10 == 0) {
-                        std::string label = "📊 Статистика кодека (отправитель";
-                        label += (stats_counter == 1 ? ", первый кадр" : ", каждые 10 кадров");
-                        label += ")";
-                        codec.printDebugStats(label);
-                    }
-                }
             }
             else
             {